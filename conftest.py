@@ -0,0 +1,95 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from collections import namedtuple
+
+import pytest
+
+from stage.utils.utils_kafka import KafkaProducerPool
+from stage.utils.utils_ports import PortAllocator
+from stage.utils.utils_tables import TableFactory
+
+
+@pytest.fixture(scope='session')
+def port_allocator():
+    """Session-wide :py:class:`stage.utils.utils_ports.PortAllocator`, isolated per pytest-xdist worker.
+
+    Module-scoped fixtures needing a port should allocate (and release) it through this fixture.
+    """
+    return PortAllocator.for_worker(os.environ.get('PYTEST_XDIST_WORKER'))
+
+
+@pytest.fixture
+def port_factory(port_allocator):
+    """Callable returning a new port on every call, for tests needing several. Ports are released after the test."""
+    ports = []
+
+    def allocate():
+        port = port_allocator.allocate()
+        ports.append(port)
+        return port
+    yield allocate
+
+    for port in ports:
+        port_allocator.release(port)
+
+
+@pytest.fixture
+def free_port(port_factory):
+    """A port for SDC stages to listen on, reserved for the duration of the test."""
+    return port_factory()
+
+
+@pytest.fixture
+def table_factory(database):
+    """:py:class:`stage.utils.utils_tables.TableFactory` for the test's database, dropping its tables after the test."""
+    factory = TableFactory(database)
+    yield factory
+    factory.drop_all()
+
+
+@pytest.fixture(scope='function')
+def basic_rules_pipeline_builder(request, sdc_builder):
+    """Pipeline builder with a Dev Data Generator writing to one Trash and sending its events to another, to attach
+    rules to. Indirect parametrization with a dict overrides Dev Data Generator attributes, e.g.
+    ``{'delay_between_batches': 0}``.
+    """
+    pipeline_builder = sdc_builder.get_pipeline_builder()
+
+    dev_data_generator = pipeline_builder.add_stage('Dev Data Generator')
+    dev_data_generator.number_of_threads = 5
+    dev_data_generator.fields_to_generate = [{'type': 'STRING',
+                                              'precision': 10,
+                                              'scale': 2,
+                                              'field': 'random_string'}]
+    dev_data_generator.set_attributes(**getattr(request, 'param', {}))
+
+    trash_1 = pipeline_builder.add_stage('Trash')
+
+    trash_2 = pipeline_builder.add_stage('Trash')
+
+    dev_data_generator >> trash_1
+    dev_data_generator >= trash_2
+
+    yield namedtuple('PipelineBuilder', ['pipeline_builder',
+                                         'dev_data_generator'])(pipeline_builder, dev_data_generator)
+
+
+@pytest.fixture(scope='session')
+def kafka_producer_pool():
+    """Session-wide :py:class:`stage.utils.utils_kafka.KafkaProducerPool`, closing its producers after the session."""
+    pool = KafkaProducerPool()
+    yield pool
+    pool.close()
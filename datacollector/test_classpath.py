@@ -12,10 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+import hashlib
+import io
 import json
 import logging
+import os
 import pytest
+import tempfile
 import urllib.request
+from pathlib import Path
 
 from javaproperties import Properties
 
@@ -47,6 +53,17 @@ EXCLUDE_LIBS = {
     'streamsets-datacollector-mapr_spark_2_1_mep_3_0-lib'
 }
 
+STAGE_LIB_MANIFEST_URL = ('http://nightly.streamsets.com.s3-us-west-2.amazonaws.com/datacollector/latest/tarball/'
+                          'stage-lib-manifest.properties')
+# Local copy of the manifest. Can be pointed elsewhere through the environment, e.g. to a manifest shipped with an
+# offline test environment, in which case it is only ever read.
+STAGE_LIB_MANIFEST_CACHE_IS_USER_SUPPLIED = 'STAGE_LIB_MANIFEST_CACHE' in os.environ
+STAGE_LIB_MANIFEST_CACHE = Path(os.environ.get('STAGE_LIB_MANIFEST_CACHE',
+                                               Path(tempfile.gettempdir(), 'stage-lib-manifest.properties')))
+# When set, the manifest is never downloaded and the local copy has to exist.
+STAGE_LIB_MANIFEST_OFFLINE = os.environ.get('STAGE_LIB_MANIFEST_OFFLINE', '').lower() in ('1', 'true', 'yes')
+# Expected SHA-256 checksum of the manifest, checked whether it is downloaded or read from the local copy.
+STAGE_LIB_MANIFEST_SHA256 = os.environ.get('STAGE_LIB_MANIFEST_SHA256')
 
 @pytest.fixture(scope='module')
 def sdc_common_hook():
@@ -69,14 +86,47 @@ def pytest_generate_tests(metafunc):
 
 # Return all stage libraries that should be loaded at once (outside of the explicitly excluded ones).
 # Current implementation is temporary and will be replaced later on.
+@functools.lru_cache(maxsize=None)
 def get_all_stage_libs():
-    raw_stagelibs = urllib.request.urlopen("http://nightly.streamsets.com.s3-us-west-2.amazonaws.com/datacollector/latest/tarball/stage-lib-manifest.properties")
     p = Properties()
-    p.load(raw_stagelibs)
+    p.load(io.BytesIO(_load_stage_lib_manifest()))
     return [lib for lib in [lib.replace('stage-lib.', '') for lib in p if 'stage-lib.' in lib] if lib not in EXCLUDE_LIBS]
 
 
-def test_classpath(sdc_executor, stagelib):
+def _load_stage_lib_manifest():
+    """Return the stage-lib manifest, downloading it unless running offline and falling back to the local copy."""
+    if not STAGE_LIB_MANIFEST_OFFLINE:
+        try:
+            manifest = urllib.request.urlopen(STAGE_LIB_MANIFEST_URL).read()
+        except OSError as e:
+            logger.warning('Could not download %s (%s), using local copy %s',
+                           STAGE_LIB_MANIFEST_URL, e, STAGE_LIB_MANIFEST_CACHE)
+        else:
+            _verify_manifest_checksum(manifest, STAGE_LIB_MANIFEST_URL)
+            if not STAGE_LIB_MANIFEST_CACHE_IS_USER_SUPPLIED:
+                _write_atomically(STAGE_LIB_MANIFEST_CACHE, manifest)
+            return manifest
+
+    manifest = STAGE_LIB_MANIFEST_CACHE.read_bytes()
+    _verify_manifest_checksum(manifest, STAGE_LIB_MANIFEST_CACHE)
+    return manifest
+
+
+def _verify_manifest_checksum(manifest, source):
+    if STAGE_LIB_MANIFEST_SHA256 and hashlib.sha256(manifest).hexdigest() != STAGE_LIB_MANIFEST_SHA256.lower():
+        raise Exception(f'Checksum mismatch for stage-lib manifest {source}')
+
+
+def _write_atomically(path, data):
+    """Write data to a temporary file next to path and rename it over path, so readers never see a partial file."""
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f'.{path.name}.', delete=False) as temporary_file:
+        temporary_file.write(data)
+    os.replace(temporary_file.name, path)
+
+
+@pytest.fixture(scope='module')
+def classpath_health(sdc_executor):
+    """Classpath health report of the SDC instance, fetched once and indexed by stage library name."""
     # Validate that
     if sdc_executor.server_url:
         pytest.skip('This test is only applicable to Docker-based SDC test.')
@@ -84,12 +134,14 @@ def test_classpath(sdc_executor, stagelib):
     # Validate that we can get classpath health report from the rest
     result_list = sdc_executor.api_client.get_classpath_health()
     assert result_list
+    return {result['name']: result for result in result_list}
+
 
-    # And that we have report for our current stage
-    result_stage = [r for r in result_list if r['name'] == stagelib]
-    assert result_stage
+def test_classpath(classpath_health, stagelib):
+    # Validate that we have report for our current stage
+    assert stagelib in classpath_health
 
-    result_stage = result_stage[0]
+    result_stage = classpath_health[stagelib]
     logger.info('Health report: %s', json.dumps(result_stage, indent=4))
     assert not result_stage['unparseablePaths']
     assert not result_stage['versionCollisions']
@@ -98,6 +150,6 @@ def test_classpath(sdc_executor, stagelib):
 
 @pytest.mark.skip(reason="See explanation in SDC-10319.")
 @cluster('mapr')
-def test_mapr_classpath(sdc_executor, cluster):
+def test_mapr_classpath(classpath_health, cluster):
     for stagelib in cluster.sdc_stage_libs:
-        test_classpath(sdc_executor, stagelib)
+        test_classpath(classpath_health, stagelib)
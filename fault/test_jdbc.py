@@ -19,13 +19,14 @@ The tests in this module are for running JDBC based pipelines to assert on syste
 import logging
 import string
 import uuid
-from time import sleep
 
 import pytest
 import sqlalchemy
 from streamsets.testframework.markers import database
 from streamsets.testframework.utils import get_random_string
 
+from stage.utils.utils_wait import wait_for_pipeline_status
+
 logger = logging.getLogger(__name__)
 
 
@@ -74,7 +75,7 @@ def test_query_consumer_network(sdc_builder, sdc_executor, database):
         pipeline_cmd = sdc_executor.start_pipeline(pipeline)
         pipeline_cmd.wait_for_pipeline_output_records_count(int(number_of_rows/3))
         sdc_executor.container.network_disconnect()
-        sleep(5) # sleep few seconds to have pipeline go into retry mode
+        wait_for_pipeline_status(sdc_executor, pipeline, 'RETRY')
         sdc_executor.container.network_reconnect()
         pipeline_cmd.wait_for_finished()
 
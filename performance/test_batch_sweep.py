@@ -0,0 +1,115 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Batch size and batch wait time sweeps, reporting throughput against latency for each origin.
+
+The sweep harness lives in performance/utils/utils_sweep.py; the tests below only provide pipeline factories for the
+origins being tuned. Each test logs the full grid and its Pareto front, which is also attached to the benchmark's
+extra_info.
+"""
+
+import logging
+import string
+
+import pytest
+from streamsets.testframework.environments.cloudera import ClouderaManagerCluster
+from streamsets.testframework.markers import cluster
+from streamsets.testframework.utils import get_random_string
+
+from stage.utils.utils_kafka import produce_kafka_messages_batch
+from .utils.utils_sweep import log_sweep_report, pareto_front, sweep_batch_settings
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZES = (100, 1_000, 5_000, 10_000, 50_000)
+BATCH_WAIT_TIMES_IN_MS = (10, 100, 1_000, 5_000)
+NUMBER_OF_RECORDS = 1_000_000
+
+
+@pytest.fixture(scope='module')
+def sdc_builder_hook():
+    def hook(data_collector):
+        # Let batch sizes above the default cap of 1000 records take effect.
+        data_collector.sdc_properties['production.maxBatchSize'] = str(max(BATCH_SIZES))
+        data_collector.SDC_JAVA_OPTS = '-Xmx8192m -Xms8192m'
+    return hook
+
+
+def _record_front(benchmark, points):
+    benchmark.extra_info['pareto_front'] = [point._asdict() for point in pareto_front(points)]
+
+
+def test_dev_data_generator_batch_sweep(sdc_builder, sdc_executor, benchmark):
+    """Sweep the Dev Data Generator batch size. The origin has no batch wait time, so only one column is swept."""
+    def pipeline_factory(batch_size, batch_wait_time_in_ms):
+        pipeline_builder = sdc_builder.get_pipeline_builder()
+        dev_data_generator = pipeline_builder.add_stage('Dev Data Generator')
+        dev_data_generator.set_attributes(batch_size=batch_size,
+                                          delay_between_batches=0,
+                                          fields_to_generate=[{'field': 'name', 'type': 'STRING'},
+                                                              {'field': 'id', 'type': 'LONG'}])
+        trash = pipeline_builder.add_stage('Trash')
+        dev_data_generator >> trash
+        return pipeline_builder.build(f'Dev Data Generator batch sweep - {batch_size}')
+
+    points = []
+
+    def sweep():
+        points.extend(sweep_batch_settings(sdc_executor, pipeline_factory, BATCH_SIZES, [None], NUMBER_OF_RECORDS))
+
+    benchmark.pedantic(sweep, rounds=1)
+    log_sweep_report('Dev Data Generator batch size sweep', points)
+    _record_front(benchmark, points)
+
+
+@cluster('cdh', 'kafka')
+def test_kafka_consumer_batch_sweep(sdc_builder, sdc_executor, cluster, benchmark, kafka_producer_pool):
+    """Sweep the Kafka Consumer batch size and batch wait time over one pre-seeded topic.
+
+    Every grid point reads the topic from the beginning using its own consumer group.
+    """
+    if isinstance(cluster, ClouderaManagerCluster) and not hasattr(cluster, 'kafka'):
+        pytest.skip('Kafka tests require Kafka to be installed on the cluster')
+
+    topic = get_random_string(string.ascii_letters, 10)
+    produce_kafka_messages_batch(kafka_producer_pool, topic, cluster,
+                                 (f'message{i}'.encode() for i in range(NUMBER_OF_RECORDS)), 'TEXT')
+
+    def pipeline_factory(batch_size, batch_wait_time_in_ms):
+        pipeline_builder = sdc_builder.get_pipeline_builder()
+        kafka_consumer = pipeline_builder.add_stage('Kafka Consumer',
+                                                    type='origin',
+                                                    library=cluster.kafka.standalone_stage_lib)
+        kafka_consumer.set_attributes(data_format='TEXT',
+                                      topic=topic,
+                                      consumer_group=get_random_string(string.ascii_letters, 10),
+                                      max_batch_size_in_records=batch_size,
+                                      batch_wait_time_in_ms=batch_wait_time_in_ms,
+                                      kafka_configuration=[{'key': 'auto.offset.reset', 'value': 'earliest'}])
+        trash = pipeline_builder.add_stage('Trash')
+        kafka_consumer >> trash
+        pipeline = pipeline_builder.build(f'Kafka Consumer batch sweep - {batch_size}/{batch_wait_time_in_ms}')
+        pipeline.configuration['shouldRetry'] = False
+        return pipeline.configure_for_environment(cluster)
+
+    points = []
+
+    def sweep():
+        points.extend(sweep_batch_settings(sdc_executor, pipeline_factory, BATCH_SIZES, BATCH_WAIT_TIMES_IN_MS,
+                                           NUMBER_OF_RECORDS))
+
+    benchmark.pedantic(sweep, rounds=1)
+    log_sweep_report('Kafka Consumer batch size / batch wait time sweep', points)
+    _record_front(benchmark, points)
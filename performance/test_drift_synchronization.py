@@ -0,0 +1,145 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Hive drift synchronization throughput benchmarks with a controlled schema change frequency and partition count.
+
+The pipeline has the layout of the tests in pipeline/test_drift_synchonization.py:
+
+    dev_data_generator >> groovy_evaluator >> hive_metadata
+    hive_metadata >> hadoop_fs
+    hive_metadata >> hive_metastore
+
+The Groovy Evaluator numbers the records and adds a new column every ``schema_change_interval`` records, so that Hive
+Metadata has to emit a metadata record and Hive Metastore has to alter the table at that rate, and it cycles the
+partition attribute over ``number_of_partitions`` values. Besides throughput, the number of metadata records reaching
+Hive Metastore and their share of all records are reported.
+"""
+
+import logging
+import string
+
+import pytest
+from streamsets.testframework.markers import cluster, sdc_min_version
+from streamsets.testframework.utils import get_random_string
+
+from stage.utils.utils_wait import get_pipeline_counter
+from .utils.utils_benchmark import benchmark_pipeline, log_report, records_per_second
+
+logger = logging.getLogger(__name__)
+
+NUMBER_OF_BATCHES = 100
+# Dev Data Generator default batch size
+RECORDS_PER_BATCH = 1_000
+
+DRIFT_SCRIPT = """
+for (record in records) {{
+  long sequence = state['sequence'] ?: 0L
+  state['sequence'] = sequence + 1
+  record.value['drift_' + sequence.intdiv({schema_change_interval})] = sequence
+  record.attributes['table'] = '{table_name}'
+  record.attributes['partition'] = String.valueOf(sequence % {number_of_partitions})
+  output.write(record)
+}}
+"""
+
+
+@pytest.fixture(scope='module')
+def sdc_common_hook():
+    def hook(data_collector):
+        data_collector.add_stage_lib('streamsets-datacollector-groovy_2_4-lib')
+
+    return hook
+
+
+@pytest.fixture(scope='module')
+def drift_table():
+    rows = []
+    yield rows
+    log_report('Hive drift synchronization',
+               ['Records per schema', 'Partitions', 'Records/sec', 'Mean batch sec', 'Metadata records',
+                'Metadata %'],
+               sorted(rows))
+
+
+@sdc_min_version('3.0.0.0')
+@cluster('cdh', 'hdp')
+@pytest.mark.parametrize('number_of_partitions', (1, 10, 100))
+@pytest.mark.parametrize('schema_change_interval', (1_000, 10_000, NUMBER_OF_BATCHES * RECORDS_PER_BATCH))
+def test_drift_synchronization_throughput(sdc_builder, sdc_executor, cluster, benchmark, drift_table,
+                                          schema_change_interval, number_of_partitions):
+    """Benchmark the drift synchronization pipeline writing a fresh Avro table in the default Hive database."""
+    table_name = get_random_string(string.ascii_lowercase, 20)
+
+    pipeline_builder = sdc_builder.get_pipeline_builder()
+
+    dev_data_generator = pipeline_builder.add_stage('Dev Data Generator')
+    dev_data_generator.set_attributes(delay_between_batches=0,
+                                      fields_to_generate=[{'field': 'name', 'type': 'STRING'},
+                                                          {'field': 'value', 'type': 'LONG'}])
+
+    groovy_evaluator = pipeline_builder.add_stage('Groovy Evaluator', type='processor')
+    groovy_evaluator.set_attributes(enable_invokedynamic_compiler_option=True,
+                                    record_processing_mode='BATCH',
+                                    script=DRIFT_SCRIPT.format(schema_change_interval=schema_change_interval,
+                                                               table_name=table_name,
+                                                               number_of_partitions=number_of_partitions))
+
+    hive_metadata = pipeline_builder.add_stage('Hive Metadata')
+    hive_metadata.set_attributes(data_format='AVRO',
+                                 database_expression='default',
+                                 external_table=False,
+                                 partition_configuration=[{'name': 'part',
+                                                           'valueType': 'STRING',
+                                                           'valueEL': "${record:attribute('partition')}"}],
+                                 decimal_scale_expression='2',
+                                 decimal_precision_expression='4',
+                                 table_name="${record:attribute('table')}")
+
+    hadoop_fs = pipeline_builder.add_stage('Hadoop FS', type='destination')
+    hadoop_fs.set_attributes(avro_schema_location='HEADER',
+                             data_format='AVRO',
+                             directory_in_header=True,
+                             use_roll_attribute=True)
+
+    hive_metastore = pipeline_builder.add_stage('Hive Metastore', type='destination')
+
+    dev_data_generator >> groovy_evaluator >> hive_metadata
+    hive_metadata >> hadoop_fs
+    hive_metadata >> hive_metastore
+
+    pipeline = pipeline_builder.build(f'Hive drift benchmark - every {schema_change_interval} records, '
+                                      f'{number_of_partitions} partitions').configure_for_environment(cluster)
+    pipeline.configuration['shouldRetry'] = False
+
+    metadata_records = []
+
+    def count_metadata_records(executor, pipeline):
+        metadata_records.append(get_pipeline_counter(executor, pipeline,
+                                                     f'stage.{hive_metastore.instance_name}.inputRecords.counter'))
+
+    hive_cursor = cluster.hive.client.cursor()
+    try:
+        # A second round would find the columns of the first one in the table already, and not drift at all.
+        pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline, rounds=1,
+                                          number_of_batches=NUMBER_OF_BATCHES, before_stop=count_metadata_records)
+    finally:
+        logger.info('Dropping table %s in Hive...', table_name)
+        hive_cursor.execute(f'DROP TABLE IF EXISTS `{table_name}`')
+
+    metadata_share = 100 * metadata_records[0] / pipeline_run.input_records if pipeline_run.input_records else None
+    benchmark.extra_info.update(metadata_records=metadata_records[0], metadata_percentage=metadata_share)
+    drift_table.append([schema_change_interval, number_of_partitions,
+                        records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                        pipeline_run.mean_batch_processing_sec, metadata_records[0], metadata_share])
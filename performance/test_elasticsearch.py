@@ -0,0 +1,219 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Elasticsearch bulk indexing and scroll read benchmarks.
+
+The pipelines look like:
+
+    dev_data_generator >> es_target
+    es_origin >> trash
+
+The destination sends one bulk request and the origin one scroll request per batch, so besides docs/sec the mean
+batch processing time of the Elasticsearch stage is reported as its request latency. The origin stops the pipeline
+on its own once the scroll is exhausted, so its runs last until the pipeline finished and are measured from history.
+"""
+
+import logging
+import string
+import time
+import uuid
+
+import pytest
+from elasticsearch import helpers
+from elasticsearch_dsl import Index
+from elasticsearch_dsl.connections import connections
+from streamsets.testframework.markers import elasticsearch
+from streamsets.testframework.utils import get_random_string
+
+from .utils.utils_benchmark import PipelineRun, log_report, records_per_second, run_pipeline
+
+logger = logging.getLogger(__name__)
+
+NUMBER_OF_DOCUMENTS = 1_000_000
+NUMBER_OF_DESTINATION_RECORDS = 500_000
+BATCH_SIZES = (100, 1_000, 10_000)
+SCROLL_SIZES = (1_000, 5_000, 10_000)
+# Number of documents per bulk request while seeding the origin's index.
+SEED_CHUNK_SIZE = 10_000
+MAPPING = 'doc'
+
+
+@pytest.fixture(scope='module')
+def sdc_builder_hook():
+    def hook(data_collector):
+        # Let batch and scroll sizes above the default cap of 1000 records take effect.
+        data_collector.sdc_properties['production.maxBatchSize'] = str(max(BATCH_SIZES + SCROLL_SIZES))
+        data_collector.SDC_JAVA_OPTS = '-Xmx8192m -Xms8192m'
+    return hook
+
+
+@pytest.fixture(scope='module')
+def es_index(elasticsearch):
+    """Index holding NUMBER_OF_DOCUMENTS log-like documents, indexed with the bulk helper."""
+    index = get_random_string(string.ascii_letters, 10).lower()  # Elasticsearch indexes must be lower case
+    elasticsearch.connect()
+    actions = ({'_index': index, '_type': MAPPING, '_source': {'sequence': sequence,
+                                                               'level': ('INFO', 'WARN', 'ERROR')[sequence % 3],
+                                                               'message': f'log line {sequence}'}}
+               for sequence in range(NUMBER_OF_DOCUMENTS))
+    try:
+        logger.info('Indexing %s documents into %s ...', NUMBER_OF_DOCUMENTS, index)
+        helpers.bulk(connections.get_connection(), actions, chunk_size=SEED_CHUNK_SIZE)
+        assert Index(index).refresh()
+        yield index
+    finally:
+        Index(index).delete()
+
+
+@pytest.fixture(scope='module')
+def elasticsearch_table():
+    rows = []
+    yield rows
+    log_report('Elasticsearch stages',
+               ['Stage', 'Variant', 'Docs/sec', 'Mean batch sec', 'Mean request sec'],
+               sorted(rows))
+
+
+@elasticsearch
+@pytest.mark.parametrize('additional_properties', ('{}', '{"_retry_on_conflict":3}'))
+@pytest.mark.parametrize('default_operation', ('INDEX', 'UPDATE_WITH_DOC_AS_UPSERT'))
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_elasticsearch_target(sdc_builder, sdc_executor, elasticsearch, benchmark, elasticsearch_table,
+                              batch_size, default_operation, additional_properties):
+    """Benchmark bulk indexing generated records.
+
+    Indexed documents get ids assigned by Elasticsearch, as log lines usually do; upserts are keyed by a random long.
+    """
+    index = get_random_string(string.ascii_letters, 10).lower()
+
+    builder = sdc_builder.get_pipeline_builder()
+    dev_data_generator = builder.add_stage('Dev Data Generator')
+    dev_data_generator.set_attributes(batch_size=batch_size,
+                                      delay_between_batches=0,
+                                      fields_to_generate=[{'field': 'key', 'type': 'LONG'},
+                                                          {'field': 'message', 'type': 'STRING'}])
+
+    es_target = builder.add_stage('Elasticsearch', type='destination')
+    es_target.set_attributes(default_operation=default_operation, index=index, mapping=MAPPING,
+                             additional_properties=additional_properties)
+    if default_operation != 'INDEX':
+        es_target.document_id = "${record:value('/key')}"
+
+    dev_data_generator >> es_target
+    pipeline = builder.build(f'Elasticsearch destination benchmark - {default_operation}, {batch_size} records')
+    pipeline.configure_for_environment(elasticsearch)
+    pipeline.configuration['shouldRetry'] = False
+
+    runs = []
+
+    def run(executor, pipeline):
+        request_sec = []
+
+        def record_request_latency(executor, pipeline):
+            request_sec.append(_mean_stage_batch_processing_sec(executor, pipeline, es_target))
+
+        pipeline_run = run_pipeline(executor, pipeline, number_of_records=NUMBER_OF_DESTINATION_RECORDS,
+                                    before_stop=record_request_latency)
+        runs.append((pipeline_run, request_sec[0]))
+
+    try:
+        benchmark.pedantic(run, args=(sdc_executor, pipeline), rounds=2)
+    finally:
+        elasticsearch.connect()
+        Index(index).delete(ignore=404)
+
+    # The request latency is reported for the same run as the throughput.
+    pipeline_run, mean_request_sec = min(runs, key=lambda target_run: target_run[0].elapsed_sec)
+    benchmark.extra_info.update(elapsed_sec=pipeline_run.elapsed_sec,
+                                records_per_sec=records_per_second(pipeline_run.input_records,
+                                                                   pipeline_run.elapsed_sec),
+                                mean_batch_processing_sec=pipeline_run.mean_batch_processing_sec,
+                                mean_request_sec=mean_request_sec)
+    elasticsearch_table.append(['Elasticsearch destination',
+                                f'{default_operation}, batch size {batch_size}, {additional_properties}',
+                                records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                                pipeline_run.mean_batch_processing_sec, mean_request_sec])
+
+
+@elasticsearch
+@pytest.mark.parametrize('number_of_slices', (1, 2, 4))
+@pytest.mark.parametrize('scroll_size', SCROLL_SIZES)
+def test_elasticsearch_origin(sdc_builder, sdc_executor, elasticsearch, benchmark, es_index, elasticsearch_table,
+                              scroll_size, number_of_slices):
+    """Benchmark scrolling through the whole index with the given scroll size and number of slices."""
+    builder = sdc_builder.get_pipeline_builder()
+    es_origin = builder.add_stage('Elasticsearch', type='origin')
+    es_origin.set_attributes(index=es_index,
+                             query="{'query': {'match_all': {}}}",
+                             max_batch_size=scroll_size,
+                             number_of_slices=number_of_slices)
+    trash = builder.add_stage('Trash')
+
+    es_origin >> trash
+    pipeline = builder.build(f'Elasticsearch origin benchmark - scroll size {scroll_size}, {number_of_slices} slices')
+    pipeline.configure_for_environment(elasticsearch)
+
+    runs = []
+
+    def run(executor, pipeline):
+        runs.append(_run_until_finished(executor, pipeline, es_origin))
+
+    benchmark.pedantic(run, args=(sdc_executor, pipeline), rounds=2)
+
+    pipeline_run, mean_request_sec = min(runs, key=lambda origin_run: origin_run[0].elapsed_sec)
+    benchmark.extra_info.update(elapsed_sec=pipeline_run.elapsed_sec,
+                                records_per_sec=records_per_second(pipeline_run.input_records,
+                                                                   pipeline_run.elapsed_sec),
+                                mean_batch_processing_sec=pipeline_run.mean_batch_processing_sec,
+                                mean_request_sec=mean_request_sec)
+    elasticsearch_table.append(['Elasticsearch origin', f'scroll size {scroll_size}, {number_of_slices} slices',
+                                records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                                pipeline_run.mean_batch_processing_sec, mean_request_sec])
+
+    assert pipeline_run.input_records == NUMBER_OF_DOCUMENTS
+
+
+def _run_until_finished(sdc_executor, pipeline, stage):
+    """Run the pipeline until it finished by itself and return its :py:class:`PipelineRun` and the stage's mean batch
+    processing time, both taken from the pipeline history.
+    """
+    pipeline.id = str(uuid.uuid4())
+    sdc_executor.add_pipeline(pipeline)
+    try:
+        start_command = sdc_executor.start_pipeline(pipeline)
+        start_time = time.perf_counter()
+        start_command.wait_for_finished(timeout_sec=3600)
+        elapsed_sec = time.perf_counter() - start_time
+        metrics = sdc_executor.get_pipeline_history(pipeline).latest.metrics
+    finally:
+        sdc_executor.remove_pipeline(pipeline)
+
+    def mean_sec(timer_name):
+        return metrics.timer(timer_name)._data.get('mean')
+
+    pipeline_run = PipelineRun(elapsed_sec=elapsed_sec,
+                               batch_count=metrics.counter('pipeline.batchCount.counter').count,
+                               input_records=metrics.counter('pipeline.batchInputRecords.counter').count,
+                               output_records=metrics.counter('pipeline.batchOutputRecords.counter').count,
+                               error_records=metrics.counter('pipeline.batchErrorRecords.counter').count,
+                               mean_batch_processing_sec=mean_sec('pipeline.batchProcessing.timer'))
+    return pipeline_run, mean_sec(f'stage.{stage.instance_name}.batchProcessing.timer')
+
+
+def _mean_stage_batch_processing_sec(sdc_executor, pipeline, stage):
+    metrics = sdc_executor.api_client.get_pipeline_metrics(pipeline.id) or {}
+    timer = metrics.get('timers', {}).get(f'stage.{stage.instance_name}.batchProcessing.timer', {})
+    return timer.get('mean')
+
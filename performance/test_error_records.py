@@ -0,0 +1,177 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Error-record path throughput benchmarks.
+
+A configurable fraction of every batch is sent to error by a validating stage, either because a required field is
+missing or because a record precondition is not satisfied. The pipeline looks like:
+
+    dev_raw_data_source >> expression_evaluator (mutates the record) >> validator (TO_ERROR) >> trash
+
+and is run against the Discard, Write to File and Write to Another Pipeline error stages, with both the original and
+the stage error record policy. For Write to Another Pipeline, a second pipeline (sdc_rpc >> trash) receives the error
+records, and Write to File writes into a directory of its own that is removed after the test. Throughput per error
+ratio, and its degradation relative to the error-free run, is logged at the end of the module.
+"""
+
+import json
+import logging
+import os
+import string
+import tempfile
+
+import pytest
+from streamsets.testframework.utils import get_random_string
+
+from stage.utils.utils_files import remove_files_with_pipeline
+from .utils.utils_benchmark import benchmark_pipeline, log_report, records_per_second
+
+logger = logging.getLogger(__name__)
+
+RECORDS_PER_BATCH = 1_000
+NUMBER_OF_BATCHES = 200
+ERROR_RATIOS = (0.0, 0.01, 0.1, 0.33, 0.5, 1.0)
+
+
+def _raw_data(error_ratio, failure):
+    """Records with ids 0..RECORDS_PER_BATCH-1; the first error_ratio of them will fail validation."""
+    number_of_errors = round(RECORDS_PER_BATCH * error_ratio)
+    records = []
+    for i in range(RECORDS_PER_BATCH):
+        record = {'id': i, 'name': 'Jane Smith', 'address': {'state': 'NC', 'zipcode': '27023'}}
+        if failure == 'precondition' or i >= number_of_errors:
+            record['b'] = 'required'
+        records.append(record)
+    return '\n'.join(json.dumps(record) for record in records)
+
+
+def _build_pipeline(sdc_builder, sdc_executor, error_stage_label, error_record_policy, error_ratio, failure,
+                    sdc_rpc_port=None, error_directory=None):
+    pipeline_builder = sdc_builder.get_pipeline_builder()
+
+    dev_raw_data_source = pipeline_builder.add_stage('Dev Raw Data Source')
+    dev_raw_data_source.set_attributes(data_format='JSON', raw_data=_raw_data(error_ratio, failure))
+
+    expression_evaluator = pipeline_builder.add_stage('Expression Evaluator')
+    expression_evaluator.header_attribute_expressions = [{'attributeToSet': 'changed',
+                                                          'headerAttributeExpression': 'yes'}]
+
+    validator = pipeline_builder.add_stage('Expression Evaluator')
+    validator.on_record_error = 'TO_ERROR'
+    if failure == 'required_field':
+        validator.required_fields = ['/b']
+    else:
+        validator.preconditions = [f"${{record:value('/id') >= {round(RECORDS_PER_BATCH * error_ratio)}}}"]
+
+    trash = pipeline_builder.add_stage('Trash')
+
+    dev_raw_data_source >> expression_evaluator >> validator >> trash
+
+    error_stage = pipeline_builder.add_error_stage(error_stage_label)
+    if error_stage_label == 'Write to File':
+        error_stage.set_attributes(directory=error_directory,
+                                   files_prefix='sdc',
+                                   file_wait_time_in_secs='300',
+                                   max_file_size_in_mb=100)
+    elif error_stage_label == 'Write to Another Pipeline':
+        error_stage.sdc_rpc_connection = ['{}:{}'.format(sdc_executor.server_host, sdc_rpc_port)]
+        error_stage.sdc_rpc_id = 'error_benchmark'
+
+    pipeline = pipeline_builder.build(f'Error path benchmark - {error_stage_label}, {failure}, {error_ratio:.0%}')
+    pipeline.configuration['errorRecordPolicy'] = error_record_policy
+    return pipeline
+
+
+@pytest.fixture(scope='module')
+def sdc_common_hook():
+    def hook(data_collector):
+        # Needed to remove the files written by the Write to File error stage.
+        data_collector.add_stage_lib('streamsets-datacollector-jython_2_7-lib')
+    return hook
+
+
+@pytest.fixture
+def error_directory(sdc_executor):
+    """Directory for the Write to File error stage, unique to the test and removed from SDC's file system after it."""
+    directory = os.path.join(tempfile.gettempdir(), 'sdc-errors-{}'.format(get_random_string(string.ascii_letters, 10)))
+    yield directory
+    remove_files_with_pipeline(sdc_executor, [directory])
+
+
+@pytest.fixture(scope='module')
+def sdc_rpc_port(port_allocator):
+    """Port for SDC RPC stages to exchange error records."""
+    port = port_allocator.allocate()
+    yield port
+    port_allocator.release(port)
+
+
+@pytest.fixture(scope='module')
+def error_records_receiver(sdc_builder, sdc_executor, sdc_rpc_port):
+    """Pipeline receiving the records sent by the Write to Another Pipeline error stage."""
+    builder = sdc_builder.get_pipeline_builder()
+
+    origin = builder.add_stage('SDC RPC', type='origin')
+    origin.sdc_rpc_listening_port = sdc_rpc_port
+    origin.sdc_rpc_id = 'error_benchmark'
+
+    trash = builder.add_stage('Trash')
+
+    origin >> trash
+
+    pipeline = builder.build('Error path benchmark - error records receiver')
+    sdc_executor.add_pipeline(pipeline)
+    sdc_executor.start_pipeline(pipeline)
+    yield pipeline
+    sdc_executor.stop_pipeline(pipeline)
+    sdc_executor.remove_pipeline(pipeline)
+
+
+@pytest.fixture(scope='module')
+def throughput_table():
+    rows = {}
+    yield rows
+
+    report = []
+    for (error_stage_label, error_record_policy, failure), throughputs in sorted(rows.items()):
+        error_free_throughput = throughputs.get(0.0)
+        for error_ratio, throughput in sorted(throughputs.items()):
+            report.append([error_stage_label, error_record_policy, failure, f'{error_ratio:.0%}', throughput,
+                           f'{throughput / error_free_throughput:.0%}' if error_free_throughput else ''])
+    log_report('Error-record path throughput',
+               ['Error stage', 'Policy', 'Failure', 'Error ratio', 'Records/sec', 'Relative to 0%'],
+               report)
+
+
+@pytest.mark.parametrize('failure', ('required_field', 'precondition'))
+@pytest.mark.parametrize('error_ratio', ERROR_RATIOS)
+@pytest.mark.parametrize('error_record_policy', ('ORIGINAL_RECORD', 'STAGE_RECORD'))
+@pytest.mark.parametrize('error_stage_label', ('Discard', 'Write to File', 'Write to Another Pipeline'))
+def test_error_record_path(sdc_builder, sdc_executor, benchmark, throughput_table, request,
+                           error_stage_label, error_record_policy, error_ratio, failure):
+    """Benchmark pipeline throughput with the given fraction of records routed to the given error stage."""
+    sdc_rpc_port = error_directory = None
+    if error_stage_label == 'Write to Another Pipeline':
+        request.getfixturevalue('error_records_receiver')
+        sdc_rpc_port = request.getfixturevalue('sdc_rpc_port')
+    elif error_stage_label == 'Write to File':
+        error_directory = request.getfixturevalue('error_directory')
+
+    pipeline = _build_pipeline(sdc_builder, sdc_executor, error_stage_label, error_record_policy, error_ratio,
+                               failure, sdc_rpc_port, error_directory)
+    pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline, number_of_batches=NUMBER_OF_BATCHES)
+
+    throughput_table.setdefault((error_stage_label, error_record_policy, failure), {})[error_ratio] = (
+        records_per_second(NUMBER_OF_BATCHES * RECORDS_PER_BATCH, pipeline_run.elapsed_sec))
@@ -0,0 +1,193 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per-processor overhead micro-benchmarks for the field processors covered by stage/test_field_processors.py.
+
+Every benchmark runs a single processor between Dev Raw Data Source and Trash:
+
+    dev_raw_data_source >> processor >> trash
+
+on a record that carries the fields all of the processors below operate on. The same records are first run through
+a dev_raw_data_source >> trash baseline and its time is subtracted, leaving the net per-record cost of the processor.
+The resulting cost table is logged at the end of the module.
+"""
+
+import json
+import logging
+
+import pytest
+from streamsets.sdk.utils import Version
+
+from .utils.utils_benchmark import benchmark_pipeline, log_report, run_pipeline
+
+logger = logging.getLogger(__name__)
+
+RECORDS_PER_BATCH = 1_000
+NUMBER_OF_BATCHES = 500
+BASELINE_ROUNDS = 3
+
+RECORD = {
+    'contact': {
+        'name': 'Jane Smith',
+        'id': '557',
+        'passcode': 'mysecretcode',
+        'phone': '617-567-8888',
+        'password': None,
+        'address': {
+            'home': {
+                'state': 'North Carolina',
+                'zipcode': '27023'
+            }
+        }
+    },
+    'newcontact': {
+        'address': {}
+    },
+    'identity': {
+        'fname': 'Jane',
+        'lname': 'Smith'
+    },
+    'error': {
+        'text': 'ME-3042,message about error,additional information from server,network error'
+    },
+    'ballpoint': {
+        'color_list': ['black', 'blue', 'red'],
+        'unit_cost': '.10'
+    },
+    'itemID': [2, 113, 954, 6502],
+    'cost': [89.95, 8.95],
+    'OPS_name1': 'abc1',
+    'OPS_name2': 'abc2',
+    'amount': '12345.6789',
+    'readings': {
+        'value1': 19.2,
+        'value2': -16.5,
+        'value3': 1987.44
+    }
+}
+
+# Processor label -> (add_stage kwargs, stage attributes, minimum SDC version). The configurations follow the ones
+# used in stage/test_field_processors.py, adjusted to the fields of RECORD.
+PROCESSORS = {
+    'Field Flattener': ({}, dict(fields=['/contact/address'], flatten_in_place=False,
+                                 target_field='/newcontact/address', flatten='SPECIFIC_FIELDS',
+                                 name_separator='.', remove_flattened_field=True), None),
+    'Field Hasher': ({}, dict(hash_in_place=[{'sourceFieldsToHash': ['/contact/id'], 'hashType': 'MD5'}],
+                              hash_to_target=[{'sourceFieldsToHash': ['/contact/passcode'], 'hashType': 'SHA1',
+                                               'targetField': '/sha1passcode'}],
+                              hash_entire_record=False), None),
+    'Field Masker': ({}, dict(field_mask_configs=[{'fields': ['/contact/phone'], 'maskType': 'CUSTOM',
+                                                   'regex': '(.*)', 'groupsToShow': '1', 'mask': '###-xxx-xxxx'},
+                                                  {'fields': ['/contact/passcode'], 'maskType': 'FIXED_LENGTH',
+                                                   'regex': '(.*)', 'groupsToShow': '1'}]), None),
+    'Field Merger': ({}, dict(fields_to_merge=[{'fromField': '/identity', 'toField': '/uniqueid'}],
+                              overwrite_fields=True), None),
+    'Field Order': ({}, dict(extra_fields='DISCARD',
+                             fields_to_order=['/contact/address/home/zipcode', '/contact/address/home/state',
+                                              '/contact/address/home/country'],
+                             missing_fields='USE_DEFAULT', default_type='STRING', default_value='USA',
+                             output_type='LIST_MAP'), None),
+    'Field Pivoter': ({}, dict(copy_all_fields=True, field_to_pivot='/ballpoint/color_list',
+                               original_field_name_path='/ballpoint/color_list_path',
+                               pivoted_items_path='/ballpoint/color', save_original_field_name=True), None),
+    'Field Remover': ({}, dict(fields=['/contact/id', '/contact/name'], action='REMOVE'), None),
+    'Field Renamer': ({}, dict(fields_to_rename=[{'fromFieldExpression': '(.*)OPS_(.*)',
+                                                  'toFieldExpression': '$1$2'}]), None),
+    'Field Replacer': ({}, dict(replacement_rules=[{'setToNull': False, 'fields': '/contact/id',
+                                                    'replacement': 'XXX'},
+                                                   {'setToNull': True, 'fields': '/amount'}]), '3.1.0.0'),
+    'Field Splitter': ({}, dict(field_for_remaining_splits='/error/etcMessages', field_to_split='/error/text',
+                                new_split_fields=['/error/code', '/error/message'], not_enough_splits='CONTINUE',
+                                original_field='REMOVE', separator=',', too_many_splits='TO_LIST'), None),
+    'Field Type Converter': ({}, dict(conversion_method='BY_FIELD',
+                                      field_type_converter_configs=[{'fields': ['/amount'],
+                                                                     'targetType': 'DECIMAL',
+                                                                     'dataLocale': 'en,US',
+                                                                     'scale': -1,
+                                                                     'decimalScaleRoundingStrategy':
+                                                                         'ROUND_UNNECESSARY'}]), None),
+    'Field Zip': ({}, dict(field_does_not_exist='CONTINUE',
+                           fields_to_zip=[{'zippedFieldPath': '/purchase', 'firstField': '/itemID',
+                                           'secondField': '/cost'}],
+                           zip_values_only=False), None),
+    'Value Replacer': (dict(type='processor'),
+                       dict(conditionally_replace_values=[{'fieldNames': ['/contact/address/home/state'],
+                                                           'operator': 'ALL',
+                                                           'comparisonValue': 'North Carolina',
+                                                           'replacementValue': 'NC'}],
+                            replace_null_values=[{'fields': ['/contact/password'], 'newValue': 'mysecretcode'}],
+                            fields_to_null=[{'fieldsToNull': ['/identity/*name'],
+                                             'condition': "${record:value('/contact/id') > 0}"}]), None),
+    'Field Mapper': (dict(type='processor'),
+                     dict(operate_on='FIELD_VALUES', conditional_expression="${f:type() == 'DOUBLE'}",
+                          mapping_expression='${math:ceil(f:value())}', maintain_original_paths=False), '3.8.0'),
+}
+
+
+def _build_pipeline(sdc_builder, processor_label=None):
+    pipeline_builder = sdc_builder.get_pipeline_builder()
+    dev_raw_data_source = pipeline_builder.add_stage('Dev Raw Data Source')
+    dev_raw_data_source.set_attributes(data_format='JSON',
+                                       raw_data='\n'.join(json.dumps(RECORD) for _ in range(RECORDS_PER_BATCH)))
+    trash = pipeline_builder.add_stage('Trash')
+
+    if processor_label:
+        add_stage_kwargs, attributes, _ = PROCESSORS[processor_label]
+        processor = pipeline_builder.add_stage(processor_label, **add_stage_kwargs)
+        processor.set_attributes(**attributes)
+        dev_raw_data_source >> processor >> trash
+    else:
+        dev_raw_data_source >> trash
+
+    return pipeline_builder.build(f'{processor_label or "Baseline"} overhead benchmark pipeline')
+
+
+@pytest.fixture(scope='module')
+def baseline_run(sdc_builder, sdc_executor):
+    """Fastest of several runs of the same-shape dev_raw_data_source >> trash pipeline."""
+    pipeline = _build_pipeline(sdc_builder)
+    runs = [run_pipeline(sdc_executor, pipeline, number_of_batches=NUMBER_OF_BATCHES)
+            for _ in range(BASELINE_ROUNDS)]
+    yield min(runs, key=lambda pipeline_run: pipeline_run.elapsed_sec)
+
+
+@pytest.fixture(scope='module')
+def cost_table():
+    rows = []
+    yield rows
+    log_report('Net per-record cost of field processors',
+               ['Processor', 'Net usec/record', 'Total usec/record', 'Mean batch sec'],
+               sorted(rows, key=lambda row: row[1], reverse=True))
+
+
+@pytest.mark.parametrize('processor_label', sorted(PROCESSORS))
+def test_field_processor_overhead(sdc_builder, sdc_executor, benchmark, baseline_run, cost_table, processor_label):
+    """Benchmark a single field processor and record its net per-record cost over the baseline pipeline."""
+    min_version = PROCESSORS[processor_label][2]
+    if min_version and Version(sdc_builder.version) < Version(min_version):
+        pytest.skip(f'{processor_label} requires SDC {min_version} or later.')
+
+    pipeline = _build_pipeline(sdc_builder, processor_label)
+    processor_run = benchmark_pipeline(benchmark, sdc_executor, pipeline, number_of_batches=NUMBER_OF_BATCHES)
+
+    # Both pipelines read the same number of input records, so the per-record cost is normalized by input records
+    # even for processors such as Field Pivoter that emit more than one record per input.
+    number_of_records = NUMBER_OF_BATCHES * RECORDS_PER_BATCH
+    total_usec_per_record = processor_run.elapsed_sec * 1_000_000 / number_of_records
+    net_usec_per_record = (processor_run.elapsed_sec - baseline_run.elapsed_sec) * 1_000_000 / number_of_records
+    benchmark.extra_info.update(baseline_elapsed_sec=baseline_run.elapsed_sec,
+                                net_usec_per_record=net_usec_per_record)
+    cost_table.append([processor_label, net_usec_per_record, total_usec_per_record,
+                       processor_run.mean_batch_processing_sec])
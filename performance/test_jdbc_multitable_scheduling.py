@@ -0,0 +1,236 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+JDBC Multitable Consumer scheduling benchmarks with hundreds to thousands of tables matching one table pattern.
+
+The pipeline looks like:
+
+    jdbc_multitable_consumer >> trash
+    jdbc_multitable_consumer >= jdbc_query_executor
+    jdbc_multitable_consumer >= pipeline_finisher
+
+The JDBC Query executor stores every event of the origin, stamped with the SDC clock, in an events table, and the
+Pipeline Finisher stops the pipeline on the no-more-data event. Every run reports:
+
+- table discovery: time for the pipeline to reach RUNNING, during which the origin lists the matching tables,
+- time to first record: time from RUNNING until the first record left the origin,
+- per-table completion: time from RUNNING until the table-finished event of each table, derived from the SDC
+  timestamps of the events relative to the no-more-data event, and Jain's fairness index of the per-table read rates
+  (1 when every table is read at the same rate, 1/n when one table gets all the attention),
+- total throughput: rows of all tables over the time from RUNNING until the pipeline finished.
+
+The source tables are created once per table count and size mix, and shared by all strategies and thread counts.
+"""
+
+import logging
+import string
+import time
+import uuid
+from collections import namedtuple
+
+import pytest
+import sqlalchemy
+from streamsets.testframework.markers import database, sdc_min_version
+from streamsets.testframework.utils import get_random_string
+
+from stage.utils.utils_tables import create_tables, drop_tables
+from stage.utils.utils_wait import get_pipeline_counter, get_pipeline_status, wait_until
+from .utils.utils_benchmark import log_report, records_per_second
+
+logger = logging.getLogger(__name__)
+
+SMALL_TABLE_ROWS = 100
+LARGE_TABLE_ROWS = 20_000
+# In the mixed size mix, every LARGE_TABLE_INTERVAL-th table is a large one.
+LARGE_TABLE_INTERVAL = 10
+TABLE_SIZE_MIXES = ('small', 'mixed')
+# Statuses of a pipeline that is no longer running.
+FINAL_STATUSES = ('FINISHED', 'RUN_ERROR', 'STOPPED')
+
+SourceTables = namedtuple('SourceTables', ['prefix', 'rows_per_table'])
+
+# Result of a single run until the no-more-data event.
+#   discovery_sec: seconds from the start request until the pipeline was RUNNING.
+#   first_record_sec: seconds from RUNNING until the first output record, or until the pipeline finished if it did so
+#       before the first record was seen.
+#   elapsed_sec: seconds from RUNNING until the pipeline FINISHED.
+#   completion_sec: dictionary of lower case table name to seconds from RUNNING until its table-finished event.
+SchedulingRun = namedtuple('SchedulingRun', ['discovery_sec', 'first_record_sec', 'elapsed_sec', 'completion_sec'])
+
+
+@pytest.fixture(scope='module')
+def sdc_builder_hook():
+    def hook(data_collector):
+        data_collector.SDC_JAVA_OPTS = '-Xmx8192m -Xms8192m'
+    return hook
+
+
+@pytest.fixture(scope='module', params=[(number_of_tables, table_sizes)
+                                        for number_of_tables in (300, 1000, 3000)
+                                        for table_sizes in TABLE_SIZE_MIXES],
+                ids=lambda param: f'{param[0]}-{param[1]}-tables')
+def source_tables(request, database):
+    number_of_tables, table_sizes = request.param
+    prefix = get_random_string(string.ascii_lowercase, 6)
+    rows_per_table = {}
+    for index in range(number_of_tables):
+        is_large = table_sizes == 'mixed' and index % LARGE_TABLE_INTERVAL == 0
+        rows_per_table[f'{prefix}_{index:05d}'] = LARGE_TABLE_ROWS if is_large else SMALL_TABLE_ROWS
+
+    def table_rows(number_of_rows):
+        return ({'id': i, 'name': f'name-{i}'} for i in range(1, number_of_rows + 1))
+
+    tables = [sqlalchemy.Table(table_name, sqlalchemy.MetaData(),
+                               sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True, autoincrement=False),
+                               sqlalchemy.Column('name', sqlalchemy.String(40)))
+              for table_name in rows_per_table]
+    logger.info('Creating %s %s tables with prefix %s in %s database ...',
+                number_of_tables, table_sizes, prefix, database.type)
+    try:
+        create_tables(database.engine, tables,
+                      {table_name: table_rows(number_of_rows) for table_name, number_of_rows in rows_per_table.items()})
+        yield SourceTables(prefix, rows_per_table)
+    finally:
+        drop_tables(database.engine, rows_per_table)
+
+
+@pytest.fixture(scope='module')
+def scheduling_table():
+    rows = []
+    yield rows
+    log_report('JDBC Multitable Consumer scheduling',
+               ['Tables', 'Rows', 'Strategy', 'Threads', 'Discovery sec', 'First record sec', 'Elapsed sec',
+                'Records/sec', 'p50 table done sec', 'p95 table done sec', 'Fairness'],
+               sorted(rows))
+
+
+@sdc_min_version('3.0.0.0')
+@pytest.mark.parametrize('number_of_threads', (1, 8))
+@pytest.mark.parametrize('per_batch_strategy', ('SWITCH_TABLES', 'PROCESS_ALL_AVAILABLE_ROWS_FROM_TABLE'))
+@database
+def test_jdbc_multitable_consumer_scheduling(sdc_builder, sdc_executor, database, benchmark, table_factory,
+                                             scheduling_table, source_tables, per_batch_strategy, number_of_threads):
+    """Benchmark reading all source tables once with the given batch strategy and number of threads."""
+    events_table = table_factory.create_table(get_random_string(string.ascii_lowercase, 10),
+                                              sqlalchemy.Column('event_type', sqlalchemy.String(32)),
+                                              sqlalchemy.Column('table_name', sqlalchemy.String(128)),
+                                              sqlalchemy.Column('event_ms', sqlalchemy.BigInteger))
+
+    pipeline_builder = sdc_builder.get_pipeline_builder()
+
+    jdbc_multitable_consumer = pipeline_builder.add_stage('JDBC Multitable Consumer')
+    jdbc_multitable_consumer.set_attributes(table_configs=[{'tablePattern': f'{source_tables.prefix}%'}],
+                                            per_batch_strategy=per_batch_strategy,
+                                            number_of_threads=number_of_threads,
+                                            maximum_pool_size=number_of_threads,
+                                            minimum_idle_connections=number_of_threads)
+
+    trash = pipeline_builder.add_stage('Trash')
+
+    jdbc_query_executor = pipeline_builder.add_stage('JDBC Query', type='executor')
+    jdbc_query_executor.set_attributes(sql_query=f"INSERT INTO {events_table.name} (event_type, table_name, event_ms) "
+                                                 "VALUES ('${record:eventType()}', '${record:value('/table')}', "
+                                                 "${time:dateTimeToMilliseconds(time:now())})")
+
+    pipeline_finisher = pipeline_builder.add_stage('Pipeline Finisher Executor')
+    pipeline_finisher.set_attributes(stage_record_preconditions=["${record:eventType() == 'no-more-data'}"])
+
+    jdbc_multitable_consumer >> trash
+    jdbc_multitable_consumer >= jdbc_query_executor
+    jdbc_multitable_consumer >= pipeline_finisher
+
+    pipeline = pipeline_builder.build(f'JDBC Multitable scheduling - {len(source_tables.rows_per_table)} tables, '
+                                      f'{per_batch_strategy}, {number_of_threads} threads')
+    pipeline.configure_for_environment(database)
+
+    runs = []
+
+    def run(executor, pipeline):
+        runs.append(_run_until_no_more_data(executor, pipeline, database, events_table))
+
+    benchmark.pedantic(run, args=(sdc_executor, pipeline), rounds=2)
+
+    fastest_run = min(runs, key=lambda scheduling_run: scheduling_run.elapsed_sec)
+    total_rows = sum(source_tables.rows_per_table.values())
+    completion_sec = sorted(fastest_run.completion_sec.values())
+    fairness = _jain_index([source_tables.rows_per_table[table_name] / fastest_run.completion_sec[table_name.lower()]
+                            for table_name in source_tables.rows_per_table
+                            if fastest_run.completion_sec.get(table_name.lower())])
+
+    benchmark.extra_info.update(discovery_sec=fastest_run.discovery_sec,
+                                first_record_sec=fastest_run.first_record_sec,
+                                elapsed_sec=fastest_run.elapsed_sec,
+                                records_per_sec=records_per_second(total_rows, fastest_run.elapsed_sec),
+                                p50_table_done_sec=_percentile(completion_sec, 50),
+                                p95_table_done_sec=_percentile(completion_sec, 95),
+                                fairness=fairness)
+    scheduling_table.append([len(source_tables.rows_per_table), total_rows, per_batch_strategy, number_of_threads,
+                             fastest_run.discovery_sec, fastest_run.first_record_sec, fastest_run.elapsed_sec,
+                             records_per_second(total_rows, fastest_run.elapsed_sec),
+                             _percentile(completion_sec, 50), _percentile(completion_sec, 95), fairness])
+
+    assert len(fastest_run.completion_sec) == len(source_tables.rows_per_table)
+
+
+def _run_until_no_more_data(sdc_executor, pipeline, database, events_table):
+    database.engine.execute(events_table.delete())
+
+    pipeline.id = str(uuid.uuid4())
+    sdc_executor.add_pipeline(pipeline)
+    try:
+        start_time = time.perf_counter()
+        start_command = sdc_executor.start_pipeline(pipeline)
+        running_time = time.perf_counter()
+        # Small tables can be read completely before the first poll, after which the live metrics are gone, so a
+        # pipeline that already stopped counts as past its first record.
+        wait_until(lambda: (get_pipeline_counter(sdc_executor, pipeline, 'pipeline.batchOutputRecords.counter') > 0
+                            or get_pipeline_status(sdc_executor, pipeline) in FINAL_STATUSES),
+                   timeout_sec=3600,
+                   description=f'first record of pipeline {pipeline.id}')
+        first_record_time = time.perf_counter()
+        start_command.wait_for_finished(timeout_sec=3600)
+        finished_time = time.perf_counter()
+    finally:
+        sdc_executor.remove_pipeline(pipeline)
+
+    result = database.engine.execute(sqlalchemy.select([events_table.c.event_type,
+                                                        events_table.c.table_name,
+                                                        events_table.c.event_ms]))
+    events = result.fetchall()
+    result.close()
+
+    # The events are stamped by SDC, so they are placed on the test's timeline relative to the no-more-data event,
+    # which the pipeline finishes right after.
+    elapsed_sec = finished_time - running_time
+    no_more_data_ms = max(event_ms for event_type, _, event_ms in events if event_type == 'no-more-data')
+    completion_sec = {table_name.lower(): elapsed_sec - (no_more_data_ms - event_ms) / 1000
+                      for event_type, table_name, event_ms in events if event_type == 'table-finished'}
+    return SchedulingRun(discovery_sec=running_time - start_time,
+                         first_record_sec=first_record_time - running_time,
+                         elapsed_sec=elapsed_sec,
+                         completion_sec=completion_sec)
+
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, -(-len(sorted_values) * percent // 100) - 1)]
+
+
+def _jain_index(values):
+    """Jain's fairness index, ``(sum x)^2 / (n * sum x^2)``."""
+    squares = sum(value * value for value in values)
+    return sum(values) ** 2 / (len(values) * squares) if squares else None
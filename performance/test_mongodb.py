@@ -0,0 +1,263 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+MongoDB stage benchmarks, reporting documents per second for every stage of the MongoDB stage library.
+
+The pipelines look like:
+
+    mongodb_origin >> trash
+    mongodb_oplog >> trash
+    dev_data_generator >> expression_evaluator >> mongodb_destination
+    dev_raw_data_source >> mongodb_lookup >> trash
+
+The origin and lookup benchmarks share one collection seeded once per module; see the functional tests in
+stage/test_mongodb_stages.py for the stage configurations.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from string import ascii_letters
+
+import pytest
+from streamsets.sdk.utils import Version
+from streamsets.testframework.markers import mongodb, sdc_min_version
+from streamsets.testframework.utils import get_random_string
+
+from .utils.utils_benchmark import benchmark_pipeline, log_report, records_per_second
+
+logger = logging.getLogger(__name__)
+
+NUMBER_OF_DOCUMENTS = 500_000
+NUMBER_OF_OPLOG_DOCUMENTS = 200_000
+NUMBER_OF_DESTINATION_RECORDS = 200_000
+NUMBER_OF_LOOKUP_RECORDS = 200_000
+# Distinct keys looked up, repeated by Dev Raw Data Source in every batch.
+NUMBER_OF_LOOKUP_KEYS = 1_000
+INSERT_CHUNK_SIZE = 10_000
+BATCH_SIZES = (100, 1_000, 10_000)
+# sdc.operation.type values
+INSERT_OPERATION = 1
+UPSERT_OPERATION = 4
+
+FIRST_CREATED = datetime(2019, 1, 1)
+
+
+def _key(sequence):
+    # Zero-padded, so that the lexicographic order used for STRING offsets matches the numeric one.
+    return f'{sequence:010d}'
+
+
+@pytest.fixture(scope='module')
+def sdc_builder_hook():
+    def hook(data_collector):
+        # Let batch sizes above the default cap of 1000 records take effect.
+        data_collector.sdc_properties['production.maxBatchSize'] = str(max(BATCH_SIZES))
+    return hook
+
+
+@pytest.fixture(scope='module')
+def mongodb_collection(mongodb):
+    """Collection with NUMBER_OF_DOCUMENTS documents, with an index on every offset field used below."""
+    database_name = get_random_string(ascii_letters, 10)
+    collection = mongodb.engine[database_name][get_random_string(ascii_letters, 10)]
+    try:
+        logger.info('Adding %s documents into %s collection ...', NUMBER_OF_DOCUMENTS, collection.full_name)
+        _insert_documents(collection, range(1, NUMBER_OF_DOCUMENTS + 1))
+        collection.create_index('key')
+        collection.create_index('created')
+        yield collection
+    finally:
+        logger.info('Dropping %s database...', database_name)
+        mongodb.engine.drop_database(database_name)
+
+
+@pytest.fixture(scope='module')
+def mongodb_table():
+    rows = []
+    yield rows
+    log_report('MongoDB stages', ['Stage', 'Variant', 'Docs/sec', 'Mean batch sec'], sorted(rows))
+
+
+@mongodb
+@pytest.mark.parametrize('offset_field, offset_field_type, initial_offset',
+                         [('_id', 'OBJECTID', '2015-01-01 00:00:00'),
+                          ('created', 'DATE', '2015-01-01 00:00:00'),
+                          ('key', 'STRING', _key(0))])
+def test_mongodb_origin(sdc_builder, sdc_executor, mongodb, benchmark, mongodb_collection, mongodb_table,
+                        offset_field, offset_field_type, initial_offset):
+    """Benchmark reading the whole collection, ordered by the given offset field."""
+    pipeline_builder = sdc_builder.get_pipeline_builder()
+    pipeline_builder.add_error_stage('Discard')
+
+    mongodb_origin = pipeline_builder.add_stage('MongoDB', type='origin')
+    mongodb_origin.set_attributes(capped_collection=False,
+                                  database=mongodb_collection.database.name,
+                                  collection=mongodb_collection.name,
+                                  offset_field=offset_field,
+                                  offset_field_type=offset_field_type,
+                                  initial_offset=initial_offset)
+
+    trash = pipeline_builder.add_stage('Trash')
+    mongodb_origin >> trash
+    pipeline = pipeline_builder.build(f'MongoDB origin benchmark - {offset_field}').configure_for_environment(mongodb)
+
+    pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline, number_of_records=NUMBER_OF_DOCUMENTS)
+    mongodb_table.append(['MongoDB origin', f'offset {offset_field} ({offset_field_type})',
+                          records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                          pipeline_run.mean_batch_processing_sec])
+
+
+@mongodb
+@pytest.mark.parametrize('number_of_writers', (1, 4))
+def test_mongodb_oplog_origin(sdc_builder, sdc_executor, mongodb, benchmark, mongodb_table, number_of_writers):
+    """Benchmark tailing the oplog while the given number of threads insert documents.
+
+    The writers start once the pipeline is running, so the origin tails the oplog instead of catching up on it.
+    """
+    database_name = get_random_string(ascii_letters, 10)
+    collection = mongodb.engine[database_name][get_random_string(ascii_letters, 10)]
+
+    pipeline_builder = sdc_builder.get_pipeline_builder()
+    pipeline_builder.add_error_stage('Discard')
+
+    mongodb_oplog = pipeline_builder.add_stage('MongoDB Oplog')
+    mongodb_oplog.set_attributes(collection='oplog.rs', initial_timestamp_in_secs=int(time.time()), initial_ordinal=1)
+
+    trash = pipeline_builder.add_stage('Trash')
+    mongodb_oplog >> trash
+    pipeline = pipeline_builder.build(f'MongoDB Oplog benchmark - {number_of_writers} writers')
+    pipeline.configure_for_environment(mongodb)
+
+    documents_per_writer = NUMBER_OF_OPLOG_DOCUMENTS // number_of_writers
+    writers = ThreadPoolExecutor(max_workers=number_of_writers)
+    written = []
+
+    def start_writers(executor, pipeline):
+        written.extend(writers.submit(_insert_documents, collection,
+                                      range(writer * documents_per_writer + 1, (writer + 1) * documents_per_writer + 1))
+                       for writer in range(number_of_writers))
+
+    try:
+        # The initial timestamp is fixed in the pipeline, so a second round would read the first round's writes too.
+        pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline, rounds=1,
+                                          number_of_records=documents_per_writer * number_of_writers,
+                                          after_start=start_writers)
+        for future in written:
+            future.result()
+    finally:
+        writers.shutdown()
+        logger.info('Dropping %s database...', database_name)
+        mongodb.engine.drop_database(database_name)
+
+    mongodb_table.append(['MongoDB Oplog', f'{number_of_writers} concurrent writers',
+                          records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                          pipeline_run.mean_batch_processing_sec])
+
+
+@mongodb
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+@pytest.mark.parametrize('operation', ('insert', 'upsert'))
+def test_mongodb_destination(sdc_builder, sdc_executor, mongodb, benchmark, mongodb_table, operation, batch_size):
+    """Benchmark writing generated records with the given operation and batch size.
+
+    Upserts are keyed by a random long, so most of them insert a new document after an indexed lookup.
+    """
+    database_name = get_random_string(ascii_letters, 10)
+    collection_name = get_random_string(ascii_letters, 10)
+
+    pipeline_builder = sdc_builder.get_pipeline_builder()
+    pipeline_builder.add_error_stage('Discard')
+
+    dev_data_generator = pipeline_builder.add_stage('Dev Data Generator')
+    dev_data_generator.set_attributes(batch_size=batch_size,
+                                      delay_between_batches=0,
+                                      fields_to_generate=[{'field': 'key', 'type': 'LONG'},
+                                                          {'field': 'name', 'type': 'STRING'}])
+
+    expression_evaluator = pipeline_builder.add_stage('Expression Evaluator')
+    operation_type = INSERT_OPERATION if operation == 'insert' else UPSERT_OPERATION
+    expression_evaluator.header_attribute_expressions = [{'attributeToSet': 'sdc.operation.type',
+                                                          'headerAttributeExpression': str(operation_type)}]
+
+    mongodb_dest = pipeline_builder.add_stage('MongoDB', type='destination')
+    mongodb_dest.set_attributes(database=database_name, collection=collection_name)
+    # From 3.6.0, unique key field is a list, otherwise single string for older version.
+    mongodb_dest.unique_key_field = ['/key'] if Version(sdc_builder.version) >= Version('3.6.0') else '/key'
+
+    dev_data_generator >> expression_evaluator >> mongodb_dest
+    pipeline = pipeline_builder.build(f'MongoDB destination benchmark - {operation}, {batch_size} records')
+    pipeline.configure_for_environment(mongodb)
+
+    try:
+        mongodb.engine[database_name][collection_name].create_index('key')
+        pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline,
+                                          number_of_records=NUMBER_OF_DESTINATION_RECORDS)
+    finally:
+        logger.info('Dropping %s database...', database_name)
+        mongodb.engine.drop_database(database_name)
+
+    mongodb_table.append(['MongoDB destination', f'{operation}, batch size {batch_size}',
+                          records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                          pipeline_run.mean_batch_processing_sec])
+
+
+@mongodb
+@sdc_min_version('3.5.0')
+@pytest.mark.parametrize('enable_local_caching', (False, True))
+def test_mongodb_lookup_processor(sdc_builder, sdc_executor, mongodb, benchmark, mongodb_collection, mongodb_table,
+                                  enable_local_caching):
+    """Benchmark looking up NUMBER_OF_LOOKUP_KEYS distinct keys over and over, with and without the local cache."""
+    pipeline_builder = sdc_builder.get_pipeline_builder()
+    pipeline_builder.add_error_stage('Discard')
+
+    dev_raw_data_source = pipeline_builder.add_stage('Dev Raw Data Source')
+    lookup_data = ['key'] + [_key(i) for i in range(1, NUMBER_OF_LOOKUP_KEYS + 1)]
+    dev_raw_data_source.set_attributes(data_format='DELIMITED',
+                                       header_line='WITH_HEADER',
+                                       raw_data='\n'.join(lookup_data))
+
+    mongodb_lookup = pipeline_builder.add_stage('MongoDB Lookup', type='processor')
+    mongodb_lookup.set_attributes(capped_collection=False,
+                                  database=mongodb_collection.database.name,
+                                  collection=mongodb_collection.name,
+                                  result_field='/result',
+                                  document_to_sdc_field_mappings=[dict(keyName='key', sdcField='/key')],
+                                  enable_local_caching=enable_local_caching)
+
+    trash = pipeline_builder.add_stage('Trash')
+    dev_raw_data_source >> mongodb_lookup >> trash
+    pipeline = pipeline_builder.build(f'MongoDB Lookup benchmark - caching {enable_local_caching}')
+    pipeline.configure_for_environment(mongodb)
+
+    pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline, number_of_records=NUMBER_OF_LOOKUP_RECORDS)
+    mongodb_table.append(['MongoDB Lookup', 'local cache' if enable_local_caching else 'no cache',
+                          records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                          pipeline_run.mean_batch_processing_sec])
+
+
+def _insert_documents(collection, sequences):
+    chunk = []
+    for sequence in sequences:
+        chunk.append({'sequence': sequence,
+                      'key': _key(sequence),
+                      'created': FIRST_CREATED + timedelta(seconds=sequence),
+                      'name': f'name-{sequence}'})
+        if len(chunk) == INSERT_CHUNK_SIZE:
+            collection.insert_many(chunk, ordered=False)
+            chunk = []
+    if chunk:
+        collection.insert_many(chunk, ordered=False)
@@ -0,0 +1,113 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Pipeline-depth scaling benchmarks.
+
+Dev Identity passes batches through untouched, so pipelines made only of Dev Identity stages isolate the cost the
+pipeline runner pays to hand a batch from one stage to the next. Two topologies are measured:
+
+    chain:           dev_raw_data_source >> identity_1 >> ... >> identity_n >> trash
+
+    fan_out_fan_in:  dev_raw_data_source >> [lane_1, ..., lane_w] >> identity_merge >> trash
+                     (each lane being a chain of n/w identities, n identities in total)
+
+The per-stage handoff cost, i.e. the least squares slope of the mean batch latency over the number of stages, is
+logged at the end of the module for each topology.
+"""
+
+import json
+import logging
+
+import pytest
+
+from .utils.utils_benchmark import benchmark_pipeline, log_report, records_per_second
+
+logger = logging.getLogger(__name__)
+
+RECORDS_PER_BATCH = 1_000
+NUMBER_OF_BATCHES = 200
+FAN_OUT_WIDTH = 5
+
+RECORD = {'id': 557, 'name': 'Jane Smith', 'address': {'state': 'NC', 'zipcode': '27023'}}
+
+
+def _chain_identities(pipeline_builder, upstream_stage, number_of_stages):
+    for _ in range(number_of_stages):
+        identity = pipeline_builder.add_stage('Dev Identity')
+        upstream_stage >> identity
+        upstream_stage = identity
+    return upstream_stage
+
+
+def _build_pipeline(sdc_builder, topology, number_of_stages):
+    pipeline_builder = sdc_builder.get_pipeline_builder()
+    dev_raw_data_source = pipeline_builder.add_stage('Dev Raw Data Source')
+    dev_raw_data_source.set_attributes(data_format='JSON',
+                                       raw_data='\n'.join(json.dumps(RECORD) for _ in range(RECORDS_PER_BATCH)))
+    trash = pipeline_builder.add_stage('Trash')
+
+    if topology == 'chain':
+        _chain_identities(pipeline_builder, dev_raw_data_source, number_of_stages) >> trash
+    else:
+        # One identity merges the lanes back, the remaining stages are spread evenly across at least two lanes.
+        width = min(FAN_OUT_WIDTH, number_of_stages - 1)
+        identity_merge = pipeline_builder.add_stage('Dev Identity')
+        for lane in range(width):
+            lane_length = (number_of_stages - 1) // width + (1 if lane < (number_of_stages - 1) % width else 0)
+            _chain_identities(pipeline_builder, dev_raw_data_source, lane_length) >> identity_merge
+        identity_merge >> trash
+
+    return pipeline_builder.build(f'Pipeline depth benchmark - {topology} of {number_of_stages} identities')
+
+
+@pytest.fixture(scope='module')
+def depth_table():
+    rows = []
+    yield rows
+    log_report('Pipeline depth scaling',
+               ['Topology', 'Stages', 'Records/sec', 'Mean batch sec'],
+               sorted(rows))
+
+    for topology in {row[0] for row in rows}:
+        points = [(row[1], row[3]) for row in rows if row[0] == topology and row[3] is not None]
+        slope = _least_squares_slope(points)
+        if slope is not None:
+            logger.info('%s: per-stage batch handoff cost ~ %.1f usec per batch of %s records',
+                        topology, slope * 1_000_000, RECORDS_PER_BATCH)
+
+
+def _least_squares_slope(points):
+    """Slope of the least squares line through the (x, y) points, None unless there are at least two distinct x."""
+    if len({x for x, _ in points}) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    return (sum((x - mean_x) * (y - mean_y) for x, y in points)
+            / sum((x - mean_x) ** 2 for x, _ in points))
+
+
+@pytest.mark.parametrize('topology', ('chain', 'fan_out_fan_in'))
+@pytest.mark.parametrize('number_of_stages', (1, 5, 25, 100, 250))
+def test_pipeline_depth(sdc_builder, sdc_executor, benchmark, depth_table, topology, number_of_stages):
+    """Benchmark throughput and batch latency of a pipeline made of the given number of Dev Identity stages."""
+    if topology == 'fan_out_fan_in' and number_of_stages < 3:
+        pytest.skip('Fanning out to two lanes and merging them back takes at least 3 stages.')
+
+    pipeline = _build_pipeline(sdc_builder, topology, number_of_stages)
+    pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline, number_of_batches=NUMBER_OF_BATCHES)
+
+    depth_table.append([topology, number_of_stages,
+                        records_per_second(NUMBER_OF_BATCHES * RECORDS_PER_BATCH, pipeline_run.elapsed_sec),
+                        pipeline_run.mean_batch_processing_sec])
@@ -0,0 +1,204 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Pulsar Consumer and Pulsar Producer throughput benchmarks against a standalone Pulsar.
+
+The pipelines look like:
+
+    pulsar_consumer >> trash
+    dev_data_generator >> pulsar_producer
+
+The consumer's topics are written by a Pulsar client producer per topic with batching enabled and asynchronous sends,
+started once the pipeline is running, so that the origin reads the messages as they arrive. While it does, the
+consumer lag, i.e. messages acknowledged by Pulsar but not read by the pipeline yet, is sampled every
+:py:data:`LAG_SAMPLE_INTERVAL_SEC` seconds; its maximum and mean are reported next to messages/sec.
+"""
+
+import itertools
+import logging
+import string
+import threading
+
+import pytest
+from pulsar import Result
+from streamsets.testframework.markers import pulsar, sdc_min_version
+from streamsets.testframework.utils import get_random_string
+
+from stage.utils.utils_wait import get_pipeline_counter
+from .utils.utils_benchmark import benchmark_pipeline, log_report, records_per_second
+
+logger = logging.getLogger(__name__)
+
+NUMBER_OF_MESSAGES = 500_000
+NUMBER_OF_PRODUCER_RECORDS = 500_000
+# Number of topics read by the topics list and topics pattern variants.
+NUMBER_OF_TOPICS = 4
+MESSAGE = ('0123456789' * 10).encode()
+# Client side batching of the seeding producers.
+BATCHING_MAX_MESSAGES = 1_000
+BATCHING_MAX_PUBLISH_DELAY_MS = 10
+LAG_SAMPLE_INTERVAL_SEC = 1
+TOPIC_NAME_PREFIX = 'persistent://public/default/'
+
+
+@pytest.fixture(scope='module')
+def pulsar_table():
+    rows = []
+    yield rows
+    log_report('Pulsar stages', ['Stage', 'Variant', 'Messages/sec', 'Mean batch sec', 'Max lag', 'Mean lag'],
+               sorted(rows))
+
+
+@pulsar
+@sdc_min_version('3.5.0')
+@pytest.mark.parametrize('topics_selector', ('SINGLE_TOPIC', 'TOPICS_LIST', 'TOPICS_PATTERN'))
+def test_pulsar_consumer(sdc_builder, sdc_executor, pulsar, benchmark, pulsar_table, topics_selector):
+    """Benchmark consuming NUMBER_OF_MESSAGES messages from one topic, or spread over a list or pattern of topics.
+
+    Every round resumes the durable subscription, so that it only reads the messages sent during that round.
+    """
+    prefix = get_random_string(string.ascii_letters, 10)
+    if topics_selector == 'SINGLE_TOPIC':
+        topics = [prefix]
+    else:
+        topics = [f'{prefix}_{index}' for index in range(NUMBER_OF_TOPICS)]
+
+    builder = sdc_builder.get_pipeline_builder()
+    builder.add_error_stage('Discard')
+    pulsar_consumer = builder.add_stage('Pulsar Consumer', type='origin')
+    pulsar_consumer.set_attributes(subscription_name=get_random_string(string.ascii_letters, 10),
+                                   consumer_name='consumer',
+                                   subscription_type='EXCLUSIVE',
+                                   initial_offset='EARLIEST',
+                                   consumer_queue_size=10000,
+                                   data_format='TEXT',
+                                   topic=topics[0])
+    if topics_selector == 'TOPICS_LIST':
+        pulsar_consumer.set_attributes(topics_selector='TOPICS_LIST', topics_list=topics)
+    elif topics_selector == 'TOPICS_PATTERN':
+        pulsar_consumer.set_attributes(topics_selector='TOPICS_PATTERN',
+                                       topics_pattern=f'{TOPIC_NAME_PREFIX}{prefix}_.*')
+    trash = builder.add_stage('Trash')
+
+    pulsar_consumer >> trash
+    pipeline = builder.build(f'Pulsar Consumer benchmark - {topics_selector}').configure_for_environment(pulsar)
+
+    client = pulsar.client
+    # Creating the producers creates the topics, so that a pattern subscription finds them right away.
+    producers = [client.create_producer(topic,
+                                        batching_enabled=True,
+                                        batching_max_messages=BATCHING_MAX_MESSAGES,
+                                        batching_max_publish_delay_ms=BATCHING_MAX_PUBLISH_DELAY_MS,
+                                        block_if_queue_full=True)
+                 for topic in topics]
+    lag_samples = []
+    background_threads = []
+    stopped = threading.Event()
+
+    def start_sending(executor, pipeline):
+        acknowledged = _AcknowledgementCounter()
+        stopped.clear()
+
+        def sample_lag():
+            while not stopped.wait(LAG_SAMPLE_INTERVAL_SEC):
+                consumed = get_pipeline_counter(executor, pipeline, 'pipeline.batchInputRecords.counter')
+                lag_samples.append(max(acknowledged.count - consumed, 0))
+
+        background_threads[:] = [threading.Thread(target=_send_batched,
+                                                  args=(producers, NUMBER_OF_MESSAGES, acknowledged),
+                                                  daemon=True),
+                                 threading.Thread(target=sample_lag, daemon=True)]
+        for thread in background_threads:
+            thread.start()
+
+    def stop_sending(executor, pipeline):
+        stopped.set()
+        for thread in background_threads:
+            thread.join()
+
+    try:
+        pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline, number_of_records=NUMBER_OF_MESSAGES,
+                                          after_start=start_sending, before_stop=stop_sending)
+    finally:
+        # All producers and consumers need to be closed before a topic can be deleted without force.
+        for producer in producers:
+            producer.close()
+        client.close()
+        for topic in topics:
+            pulsar.admin.delete_topic(f'{TOPIC_NAME_PREFIX}{topic}')
+
+    max_lag = max(lag_samples, default=None)
+    mean_lag = sum(lag_samples) / len(lag_samples) if lag_samples else None
+    benchmark.extra_info.update(max_lag=max_lag, mean_lag=mean_lag)
+    pulsar_table.append(['Pulsar Consumer', f'{topics_selector}, {len(topics)} topics',
+                         records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                         pipeline_run.mean_batch_processing_sec, max_lag, mean_lag])
+
+
+@pulsar
+@sdc_min_version('3.5.0')
+@pytest.mark.parametrize('enable_tls', (False, True))
+def test_pulsar_producer(sdc_builder, sdc_executor, pulsar, benchmark, pulsar_table, enable_tls):
+    """Benchmark producing generated records with batching and asynchronous sends, with and without TLS."""
+    topic = get_random_string(string.ascii_letters, 10)
+
+    builder = sdc_builder.get_pipeline_builder()
+    builder.add_error_stage('Discard')
+    dev_data_generator = builder.add_stage('Dev Data Generator')
+    dev_data_generator.set_attributes(delay_between_batches=0,
+                                      fields_to_generate=[{'field': 'text', 'type': 'STRING'}])
+
+    pulsar_producer = builder.add_stage('Pulsar Producer', type='destination')
+    pulsar_producer.set_attributes(topic=topic,
+                                   data_format='TEXT',
+                                   text_field_path='/text',
+                                   enable_batching=True,
+                                   async_send=True,
+                                   enable_tls=enable_tls)
+
+    dev_data_generator >> pulsar_producer
+    pipeline = builder.build(f'Pulsar Producer benchmark - TLS {enable_tls}').configure_for_environment(pulsar)
+
+    try:
+        pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline,
+                                          number_of_records=NUMBER_OF_PRODUCER_RECORDS)
+    finally:
+        pulsar.admin.delete_topic(f'{TOPIC_NAME_PREFIX}{topic}')
+
+    pulsar_table.append(['Pulsar Producer', 'TLS' if enable_tls else 'plaintext',
+                         records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                         pipeline_run.mean_batch_processing_sec, None, None])
+
+
+class _AcknowledgementCounter:
+    """Number of messages Pulsar acknowledged, updated from the client's callback threads."""
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, result, message_id):
+        if result == Result.Ok:
+            with self._lock:
+                self.count += 1
+        else:
+            logger.warning('Sending message failed: %s', result)
+
+
+def _send_batched(producers, number_of_messages, acknowledged):
+    """Send number_of_messages messages round robin over the producers without waiting for each one."""
+    for producer in itertools.islice(itertools.cycle(producers), number_of_messages):
+        producer.send_async(MESSAGE, acknowledged)
+    for producer in producers:
+        producer.flush()
@@ -0,0 +1,223 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Redis stage benchmarks, reporting records per second for every stage of the Redis stage library.
+
+The pipelines look like:
+
+    dev_data_generator >> expression_evaluator >> redis_destination
+    redis_consumer >> trash
+    dev_raw_data_source >> redis_lookup_processor >> trash
+
+Test data is written to and removed from Redis with pipelined commands, :py:data:`PIPELINE_SIZE` commands per round
+trip, instead of one command per key. All keys of a test share a random prefix, so that cleanup only touches them.
+"""
+
+import itertools
+import json
+import logging
+import random
+import string
+import threading
+
+import pytest
+from streamsets.testframework.markers import redis
+from streamsets.testframework.utils import get_random_string
+
+from stage.utils.utils_wait import wait_until
+from .utils.utils_benchmark import benchmark_pipeline, log_report, records_per_second
+
+logger = logging.getLogger(__name__)
+
+# Number of commands sent per Redis round trip while seeding or cleaning up.
+PIPELINE_SIZE = 10_000
+NUMBER_OF_KEYS = 1_000_000
+NUMBER_OF_DESTINATION_RECORDS = 200_000
+NUMBER_OF_MESSAGES = 200_000
+NUMBER_OF_LOOKUP_RECORDS = 200_000
+# Number of lookup keys sampled up front; Dev Raw Data Source repeats them for as long as the pipeline runs.
+NUMBER_OF_SAMPLED_KEYS = 20_000
+# Exponent of the Zipf distribution used for skewed lookup keys.
+ZIPF_EXPONENT = 1.1
+
+
+@pytest.fixture(scope='module')
+def redis_keys(redis):
+    """Prefix of NUMBER_OF_KEYS string keys ``<prefix>:<n>`` holding ``value-<n>``."""
+    prefix = get_random_string(string.ascii_letters, 10)
+    logger.info('Seeding %s keys with prefix %s ...', NUMBER_OF_KEYS, prefix)
+    try:
+        _execute_pipelined(redis.client, (('set', _key(prefix, n), f'value-{n}') for n in range(NUMBER_OF_KEYS)))
+        yield prefix
+    finally:
+        _delete_keys(redis.client, prefix)
+
+
+@pytest.fixture(scope='module')
+def redis_table():
+    rows = []
+    yield rows
+    log_report('Redis stages', ['Stage', 'Variant', 'Records/sec', 'Mean batch sec'], sorted(rows))
+
+
+@redis
+@pytest.mark.parametrize('mode, data_type', [('BATCH', 'STRING'),
+                                             ('BATCH', 'LIST'),
+                                             ('BATCH', 'SET'),
+                                             ('BATCH', 'HASH'),
+                                             ('PUBLISH', None)])
+def test_redis_destination(sdc_builder, sdc_executor, redis, benchmark, redis_table, mode, data_type):
+    """Benchmark writing generated records with the given mode and, in batch mode, data type."""
+    prefix = get_random_string(string.ascii_letters, 10)
+
+    builder = sdc_builder.get_pipeline_builder()
+    dev_data_generator = builder.add_stage('Dev Data Generator')
+    dev_data_generator.set_attributes(delay_between_batches=0,
+                                      fields_to_generate=[{'field': 'key', 'type': 'LONG'},
+                                                          {'field': 'value', 'type': 'STRING'}])
+
+    expression_evaluator = builder.add_stage('Expression Evaluator')
+    expression_evaluator.field_expressions = [{'fieldToSet': '/key',
+                                               'expression': f"{prefix}:${{record:value('/key')}}"}]
+
+    redis_destination = builder.add_stage('Redis', type='destination')
+    if mode == 'BATCH':
+        # A hash is written from a map, which the record root is.
+        redis_destination.set_attributes(mode='BATCH', fields=[{'keyExpr': '/key',
+                                                                'valExpr': '/' if data_type == 'HASH' else '/value',
+                                                                'dataType': data_type}])
+    else:
+        redis_destination.set_attributes(mode='PUBLISH', data_format='JSON', channel=[prefix])
+
+    dev_data_generator >> expression_evaluator >> redis_destination
+    pipeline = builder.build(f'Redis destination benchmark - {mode} {data_type or ""}')
+    pipeline.configure_for_environment(redis)
+
+    try:
+        pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline,
+                                          number_of_records=NUMBER_OF_DESTINATION_RECORDS)
+    finally:
+        _delete_keys(redis.client, prefix)
+
+    redis_table.append(['Redis destination', f'{mode} {data_type}' if data_type else mode,
+                        records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                        pipeline_run.mean_batch_processing_sec])
+
+
+@redis
+def test_redis_consumer(sdc_builder, sdc_executor, redis, benchmark, redis_table):
+    """Benchmark consuming messages published with pipelined PUBLISH commands once the consumer subscribed."""
+    channel = get_random_string(string.ascii_letters, 10)
+    message = json.dumps(dict(name='Jane Smith', zip_code=27023))
+
+    builder = sdc_builder.get_pipeline_builder()
+    redis_consumer = builder.add_stage('Redis Consumer', type='origin')
+    redis_consumer.set_attributes(data_format='JSON', pattern=[channel])
+    trash = builder.add_stage('Trash')
+
+    redis_consumer >> trash
+    pipeline = builder.build('Redis Consumer benchmark').configure_for_environment(redis)
+
+    publishers = []
+
+    def publish():
+        # Messages published before the consumer subscribed would be lost.
+        wait_until(lambda: redis.client.pubsub_numpat() > 0, timeout_sec=60,
+                   description='Redis Consumer to subscribe', poll_interval_sec=0.1)
+        _execute_pipelined(redis.client, itertools.repeat(('publish', channel, message), NUMBER_OF_MESSAGES))
+
+    def start_publisher(executor, pipeline):
+        publisher = threading.Thread(target=publish, daemon=True)
+        publisher.start()
+        publishers.append(publisher)
+
+    pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline, number_of_records=NUMBER_OF_MESSAGES,
+                                      after_start=start_publisher)
+    for publisher in publishers:
+        publisher.join()
+
+    redis_table.append(['Redis Consumer', 'pub/sub',
+                        records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                        pipeline_run.mean_batch_processing_sec])
+
+
+@redis
+@pytest.mark.parametrize('key_distribution', ('uniform', 'zipf'))
+@pytest.mark.parametrize('enable_local_caching', (False, True))
+def test_redis_lookup_processor(sdc_builder, sdc_executor, redis, benchmark, redis_keys, redis_table,
+                                enable_local_caching, key_distribution):
+    """Benchmark string lookups of uniformly distributed or skewed keys, with and without the local cache.
+
+    The share of distinct keys among the sampled ones bounds the cache miss ratio and is reported with the results.
+    """
+    if key_distribution == 'uniform':
+        key_numbers = random.choices(range(NUMBER_OF_KEYS), k=NUMBER_OF_SAMPLED_KEYS)
+    else:
+        key_numbers = random.choices(range(NUMBER_OF_KEYS), k=NUMBER_OF_SAMPLED_KEYS,
+                                     cum_weights=list(itertools.accumulate(1 / (rank + 1) ** ZIPF_EXPONENT
+                                                                           for rank in range(NUMBER_OF_KEYS))))
+    distinct_share = len(set(key_numbers)) / len(key_numbers)
+
+    builder = sdc_builder.get_pipeline_builder()
+    dev_raw_data_source = builder.add_stage('Dev Raw Data Source')
+    dev_raw_data_source.set_attributes(data_format='DELIMITED',
+                                       header_line='WITH_HEADER',
+                                       raw_data='\n'.join(['key'] + [_key(redis_keys, n) for n in key_numbers]))
+
+    redis_lookup_processor = builder.add_stage('Redis Lookup Processor')
+    redis_lookup_processor.set_attributes(enable_local_caching=enable_local_caching,
+                                          mode='BATCH',
+                                          lookup_parameters=[{'dataType': 'STRING',
+                                                              'keyExpr': "${record:value('/key')}",
+                                                              'outputFieldPath': '/value'}])
+    if enable_local_caching:
+        redis_lookup_processor.eviction_policy_type = 'EXPIRE_AFTER_ACCESS'
+    trash = builder.add_stage('Trash')
+
+    dev_raw_data_source >> redis_lookup_processor >> trash
+    pipeline = builder.build(f'Redis Lookup benchmark - {key_distribution} keys, caching {enable_local_caching}')
+    pipeline.configure_for_environment(redis)
+
+    pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline, number_of_records=NUMBER_OF_LOOKUP_RECORDS)
+
+    benchmark.extra_info['distinct_key_share'] = distinct_share
+    redis_table.append(['Redis Lookup', f'{key_distribution} keys ({distinct_share:.0%} distinct), '
+                                        f'{"local cache" if enable_local_caching else "no cache"}',
+                        records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                        pipeline_run.mean_batch_processing_sec])
+
+
+def _key(prefix, number):
+    return f'{prefix}:{number}'
+
+
+def _execute_pipelined(client, commands):
+    """Send ``(command, *args)`` tuples, PIPELINE_SIZE per round trip, and return the number of commands sent."""
+    number_of_commands = 0
+    pipeline = client.pipeline(transaction=False)
+    for command, *args in commands:
+        getattr(pipeline, command)(*args)
+        number_of_commands += 1
+        if number_of_commands % PIPELINE_SIZE == 0:
+            pipeline.execute()
+    pipeline.execute()
+    return number_of_commands
+
+
+def _delete_keys(client, prefix):
+    logger.info('Deleting keys with prefix %s ...', prefix)
+    keys = client.scan_iter(match=f'{prefix}:*', count=PIPELINE_SIZE)
+    number_of_keys = _execute_pipelined(client, (('delete', key) for key in keys))
+    logger.info('Deleted %s keys', number_of_keys)
@@ -0,0 +1,104 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Data rule and data drift rule evaluation overhead benchmarks.
+
+The pipeline is built by the basic_rules_pipeline_builder fixture shared with pipeline/test_rules.py:
+
+    dev_data_generator >> trash_1
+    dev_data_generator >= trash_2
+
+without delay between batches and with the given number of active rules attached to the data lane. Besides
+throughput, the SDC heap usage sampled while the pipeline runs is reported as an approximation of the memory held by
+rule sampling.
+"""
+
+import logging
+
+import pytest
+from streamsets.sdk.sdc_models import DataDriftRule, DataRule
+
+from .utils.utils_benchmark import benchmark_pipeline, log_report, records_per_second
+
+logger = logging.getLogger(__name__)
+
+NUMBER_OF_BATCHES = 500
+# Dev Data Generator default batch size
+RECORDS_PER_BATCH = 1_000
+
+
+def _heap_used_mb(sdc_executor):
+    jmx_metrics = sdc_executor.api_client.get_jmx_metrics()
+    memory_bean = next(bean for bean in jmx_metrics['beans'] if bean['name'] == 'java.lang:type=Memory')
+    return memory_bean['HeapMemoryUsage']['used'] / (1024 * 1024)
+
+
+@pytest.fixture(scope='module')
+def rules_table():
+    rows = []
+    yield rows
+    log_report('Data rule and drift rule overhead',
+               ['Rule type', 'Rules', 'Sampling %', 'Records/sec', 'Mean batch sec', 'Heap used MB'],
+               sorted(rows))
+
+
+@pytest.mark.parametrize('sampling_percentage', (1, 10, 100))
+@pytest.mark.parametrize('number_of_rules', (0, 10, 50, 200))
+@pytest.mark.parametrize('rule_type', ('data', 'drift'))
+@pytest.mark.parametrize('basic_rules_pipeline_builder', [{'delay_between_batches': 0}], ids=['no_delay'],
+                         indirect=True)
+def test_rules_overhead(basic_rules_pipeline_builder, sdc_executor, benchmark, rules_table,
+                        rule_type, number_of_rules, sampling_percentage):
+    """Benchmark the basic rules pipeline with the given number of active rules on its data lane."""
+    if number_of_rules == 0 and (rule_type, sampling_percentage) != ('data', 1):
+        pytest.skip('The rule-less baseline only needs to run once.')
+
+    pipeline_builder = basic_rules_pipeline_builder.pipeline_builder
+    dev_data_generator = basic_rules_pipeline_builder.dev_data_generator
+
+    if rule_type == 'data':
+        rules = [DataRule(stream=dev_data_generator.output_lanes[0],
+                          label=f'data-rule-{i}',
+                          condition="${!record:exists('/a')}",
+                          sampling_percentage=sampling_percentage,
+                          alert_text=f'data-rule-{i}',
+                          active=True)
+                 for i in range(number_of_rules)]
+        pipeline_builder.add_data_rule(*rules)
+    else:
+        rules = [DataDriftRule(stream=dev_data_generator.output_lanes[0],
+                               label=f'drift-rule-{i}',
+                               condition="${drift:names('/', false)}",
+                               sampling_percentage=sampling_percentage,
+                               alert_text=f'drift-rule-{i}',
+                               active=True)
+                 for i in range(number_of_rules)]
+        pipeline_builder.add_data_drift_rule(*rules)
+
+    pipeline = pipeline_builder.build(f'Rules benchmark - {number_of_rules} {rule_type} rules')
+    pipeline.configuration['shouldRetry'] = False
+
+    heap_samples = []
+
+    def sample_heap(*args, **kwargs):
+        heap_samples.append(_heap_used_mb(sdc_executor))
+
+    pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline, number_of_batches=NUMBER_OF_BATCHES,
+                                      before_stop=sample_heap)
+
+    benchmark.extra_info['heap_used_mb'] = max(heap_samples)
+    rules_table.append([rule_type if number_of_rules else '-', number_of_rules, sampling_percentage,
+                        records_per_second(NUMBER_OF_BATCHES * RECORDS_PER_BATCH, pipeline_run.elapsed_sec),
+                        pipeline_run.mean_batch_processing_sec, max(heap_samples)])
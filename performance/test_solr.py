@@ -0,0 +1,123 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Solr destination indexing benchmarks, comparing automatic field mapping with explicit field mappings.
+
+The pipeline looks like:
+
+    dev_data_generator >> expression_evaluator >> solr_target
+
+Both mappings index the same two fields, so the difference of their mean batch processing times at equal batch size
+and commit strategy is the cost of looking up the Solr schema for automatic mapping. It is reported per batch and
+relative to the explicit mapping. See the functional tests in stage/test_solr_destination_apache.py for the mapping
+options.
+"""
+
+import logging
+import string
+
+import pytest
+from streamsets.testframework.markers import sdc_min_version, solr
+from streamsets.testframework.utils import get_random_string
+
+from .utils.utils_benchmark import benchmark_pipeline, log_report, records_per_second
+
+logger = logging.getLogger(__name__)
+
+NUMBER_OF_DOCUMENTS = 500_000
+BATCH_SIZES = (1_000, 10_000)
+# The Solr destination commits after every batch, with these options.
+COMMIT_STRATEGIES = {'hard commit': dict(wait_flush=True, wait_searcher=True, soft_commit=False),
+                     'hard commit, no wait': dict(wait_flush=False, wait_searcher=False, soft_commit=False),
+                     'soft commit': dict(wait_flush=True, wait_searcher=True, soft_commit=True)}
+
+
+@pytest.fixture(scope='module')
+def sdc_builder_hook():
+    def hook(data_collector):
+        # Let batch sizes above the default cap of 1000 records take effect.
+        data_collector.sdc_properties['production.maxBatchSize'] = str(max(BATCH_SIZES))
+    return hook
+
+
+@pytest.fixture(scope='module')
+def solr_runs():
+    """Fastest run per (batch size, commit strategy, mapping), reported with the schema introspection overhead."""
+    runs = {}
+    yield runs
+
+    rows = []
+    for (batch_size, commit_strategy, mapping), pipeline_run in runs.items():
+        manual_run = runs.get((batch_size, commit_strategy, 'manual'))
+        overhead_sec = overhead_percentage = None
+        if mapping == 'automatic' and manual_run and None not in (pipeline_run.mean_batch_processing_sec,
+                                                                  manual_run.mean_batch_processing_sec):
+            overhead_sec = pipeline_run.mean_batch_processing_sec - manual_run.mean_batch_processing_sec
+            overhead_percentage = 100 * overhead_sec / manual_run.mean_batch_processing_sec
+        rows.append([batch_size, commit_strategy, mapping,
+                     records_per_second(pipeline_run.input_records, pipeline_run.elapsed_sec),
+                     pipeline_run.mean_batch_processing_sec, overhead_sec, overhead_percentage])
+    log_report('Solr destination',
+               ['Batch size', 'Commit', 'Mapping', 'Docs/sec', 'Mean batch sec', 'Mapping overhead sec',
+                'Mapping overhead %'],
+               sorted(rows))
+
+
+@solr
+@sdc_min_version('3.8.0')
+@pytest.mark.parametrize('mapping', ('automatic', 'manual'))
+@pytest.mark.parametrize('commit_strategy', COMMIT_STRATEGIES)
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_solr_target(sdc_builder, sdc_executor, solr, benchmark, solr_runs, batch_size, commit_strategy, mapping):
+    """Benchmark indexing generated documents in batch mode with the given batch size, commit strategy and mapping.
+
+    Document ids share a random prefix, so that the documents of the test can be deleted by query afterwards.
+    """
+    prefix = get_random_string(string.ascii_letters, 10)
+
+    builder = sdc_builder.get_pipeline_builder()
+    dev_data_generator = builder.add_stage('Dev Data Generator')
+    dev_data_generator.set_attributes(batch_size=batch_size,
+                                      delay_between_batches=0,
+                                      fields_to_generate=[{'field': 'id', 'type': 'LONG'},
+                                                          {'field': 'title', 'type': 'STRING'}])
+
+    expression_evaluator = builder.add_stage('Expression Evaluator')
+    expression_evaluator.field_expressions = [{'fieldToSet': '/id',
+                                               'expression': f"{prefix}-${{record:value('/id')}}"}]
+
+    solr_target = builder.add_stage('Solr', type='destination')
+    solr_target.set_attributes(instance_type='SINGLE_NODE',
+                               record_indexing_mode='BATCH',
+                               map_fields_automatically=mapping == 'automatic',
+                               field_path_for_data='/',
+                               ignore_optional_fields=True,
+                               **COMMIT_STRATEGIES[commit_strategy])
+    if mapping == 'manual':
+        solr_target.fields = [{'field': '/id', 'solrFieldName': 'id'},
+                              {'field': '/title', 'solrFieldName': 'title'}]
+
+    dev_data_generator >> expression_evaluator >> solr_target
+    pipeline = builder.build(f'Solr destination benchmark - {mapping} mapping, {commit_strategy}, '
+                             f'{batch_size} records').configure_for_environment(solr)
+    pipeline.configuration['shouldRetry'] = False
+
+    try:
+        pipeline_run = benchmark_pipeline(benchmark, sdc_executor, pipeline, number_of_records=NUMBER_OF_DOCUMENTS)
+    finally:
+        logger.info('Deleting documents with id prefix %s ...', prefix)
+        solr.client.delete(q=f'id:{prefix}-*')
+
+    solr_runs[(batch_size, commit_strategy, mapping)] = pipeline_run
@@ -0,0 +1,149 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helpers shared by the benchmarks in the performance package.
+
+The pytest-benchmark fixture times the whole callable it is given, which includes importing, validating and removing
+the pipeline. The helpers below additionally time only the part of a run during which the pipeline moves data, and
+pull the batch metrics SDC recorded for it, so that benchmarks can report throughput and batch latency.
+"""
+
+import logging
+import time
+import uuid
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Result of a single benchmarked pipeline run.
+#   elapsed_sec: seconds between the pipeline reaching RUNNING and reaching the requested batch/record count.
+#   batch_count, input_records, output_records, error_records: pipeline counters at the time the batch/record count
+#       was reached, so that records processed while stopping do not inflate throughput.
+#   mean_batch_processing_sec: mean of the pipeline.batchProcessing.timer as reported by SDC.
+PipelineRun = namedtuple('PipelineRun', ['elapsed_sec',
+                                         'batch_count',
+                                         'input_records',
+                                         'output_records',
+                                         'error_records',
+                                         'mean_batch_processing_sec'])
+
+
+def run_pipeline(sdc_executor, pipeline, number_of_batches=None, number_of_records=None, timeout_sec=3600,
+                 before_stop=None, after_start=None):
+    """Import a fresh copy of the pipeline, run it until it reached the given volume, then stop and remove it.
+
+    Exactly one of ``number_of_batches`` and ``number_of_records`` has to be given. Waiting for a batch count is
+    preferred for pipelines whose processors change the number of records (e.g. Field Pivoter).
+
+    Args:
+        sdc_executor: The SDC instance to run the pipeline on.
+        pipeline (:py:class:`streamsets.sdk.sdc_models.Pipeline`): The pipeline to run.
+        number_of_batches (:obj:`int`, optional): Batch count to wait for. Default: ``None``
+        number_of_records (:obj:`int`, optional): Pipeline output record count to wait for. Default: ``None``
+        timeout_sec (:obj:`int`, optional): Timeout for reaching the volume. Default: ``3600``
+        before_stop (optional): Callable invoked as ``before_stop(sdc_executor, pipeline)`` once the volume was reached,
+            while the pipeline is still running. Default: ``None``
+        after_start (optional): Callable invoked as ``after_start(sdc_executor, pipeline)`` once the pipeline is
+            RUNNING, e.g. to start writing the data a tailing origin reads. It runs inside the timed section, so it
+            should return right away. Default: ``None``
+
+    Returns:
+        An instance of :py:class:`PipelineRun`.
+    """
+    if (number_of_batches is None) == (number_of_records is None):
+        raise ValueError('Exactly one of number_of_batches and number_of_records must be specified.')
+
+    pipeline.id = str(uuid.uuid4())
+    sdc_executor.add_pipeline(pipeline)
+    try:
+        start_command = sdc_executor.start_pipeline(pipeline)
+        start_time = time.perf_counter()
+        if after_start:
+            after_start(sdc_executor, pipeline)
+        if number_of_batches is not None:
+            start_command.wait_for_pipeline_batch_count(number_of_batches, timeout_sec=timeout_sec)
+        else:
+            start_command.wait_for_pipeline_output_records_count(number_of_records, timeout_sec=timeout_sec)
+        elapsed_sec = time.perf_counter() - start_time
+        counters = (sdc_executor.api_client.get_pipeline_metrics(pipeline.id) or {}).get('counters', {})
+        if before_stop:
+            before_stop(sdc_executor, pipeline)
+        sdc_executor.stop_pipeline(pipeline).wait_for_stopped()
+
+        metrics = sdc_executor.get_pipeline_history(pipeline).latest.metrics
+
+        def count(counter_name):
+            # The live metrics are empty if the pipeline stopped in the meantime, the history then has the final count.
+            return counters.get(counter_name, {}).get('count', metrics.counter(counter_name).count)
+
+        return PipelineRun(elapsed_sec=elapsed_sec,
+                           batch_count=count('pipeline.batchCount.counter'),
+                           input_records=count('pipeline.batchInputRecords.counter'),
+                           output_records=count('pipeline.batchOutputRecords.counter'),
+                           error_records=count('pipeline.batchErrorRecords.counter'),
+                           mean_batch_processing_sec=metrics.timer('pipeline.batchProcessing.timer')._data.get('mean'))
+    finally:
+        sdc_executor.remove_pipeline(pipeline)
+
+
+def benchmark_pipeline(benchmark, sdc_executor, pipeline, rounds=2, **kwargs):
+    """Run :py:func:`run_pipeline` under ``benchmark.pedantic`` and return the fastest :py:class:`PipelineRun`.
+
+    The fastest run's throughput and batch latency are also attached to the benchmark's ``extra_info`` so that they
+    end up in the pytest-benchmark JSON report next to the wall-clock statistics.
+
+    Args:
+        benchmark: The pytest-benchmark fixture.
+        sdc_executor: The SDC instance to run the pipeline on.
+        pipeline (:py:class:`streamsets.sdk.sdc_models.Pipeline`): The pipeline to run.
+        rounds (:obj:`int`, optional): Number of benchmark rounds. Default: ``2``
+        **kwargs: Passed on to :py:func:`run_pipeline`.
+
+    Returns:
+        An instance of :py:class:`PipelineRun`.
+    """
+    runs = []
+
+    def run(executor, pipeline):
+        runs.append(run_pipeline(executor, pipeline, **kwargs))
+
+    benchmark.pedantic(run, args=(sdc_executor, pipeline), rounds=rounds)
+
+    fastest_run = min(runs, key=lambda pipeline_run: pipeline_run.elapsed_sec)
+    benchmark.extra_info.update(elapsed_sec=fastest_run.elapsed_sec,
+                                records_per_sec=records_per_second(fastest_run.input_records,
+                                                                   fastest_run.elapsed_sec),
+                                mean_batch_processing_sec=fastest_run.mean_batch_processing_sec)
+    return fastest_run
+
+
+def records_per_second(number_of_records, elapsed_sec):
+    """Throughput helper that tolerates a zero duration."""
+    return number_of_records / elapsed_sec if elapsed_sec else float('inf')
+
+
+def log_report(title, columns, rows):
+    """Log ``rows`` as a left-aligned text table headed by ``columns``.
+
+    Floats are rendered with four significant digits, everything else with ``str``.
+    """
+    def format_cell(value):
+        return f'{value:.4g}' if isinstance(value, float) else str(value)
+
+    formatted_rows = [[format_cell(value) for value in row] for row in rows]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(columns, *formatted_rows)]
+    lines = ['  '.join(str(cell).ljust(width) for cell, width in zip(row, widths))
+             for row in [columns, ['-' * width for width in widths], *formatted_rows]]
+    logger.info('%s\n%s', title, '\n'.join(lines))
@@ -0,0 +1,92 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Batch size and batch wait time sweep harness.
+
+Origins expose their batching knobs under different names (``batch_size``, ``max_batch_size_in_records``,
+``batch_wait_time_in_ms``, ...), so the harness does not touch stages itself. It is given a pipeline factory, called as
+``pipeline_factory(batch_size, batch_wait_time_in_ms)``, and runs every pipeline it returns until the requested number
+of records made it through. Each run yields a throughput and a latency; the points on the Pareto front are the settings
+worth choosing between, every other point is beaten on both axes by one of them.
+"""
+
+import itertools
+import logging
+from collections import namedtuple
+
+from .utils_benchmark import log_report, records_per_second, run_pipeline
+
+logger = logging.getLogger(__name__)
+
+# One point of the sweep.
+#   latency_sec: mean time between batch commits over the run, i.e. the time a record can spend between its batch
+#                being opened (including the origin's batch wait) and being handed to the destinations.
+SweepPoint = namedtuple('SweepPoint', ['batch_size',
+                                       'batch_wait_time_in_ms',
+                                       'records_per_sec',
+                                       'latency_sec',
+                                       'mean_batch_processing_sec'])
+
+
+def sweep_batch_settings(sdc_executor, pipeline_factory, batch_sizes, batch_wait_times_in_ms, number_of_records,
+                         timeout_sec=600):
+    """Run the pipeline built for every (batch size, batch wait time) combination.
+
+    Args:
+        sdc_executor: The SDC instance to run the pipelines on.
+        pipeline_factory: Callable taking ``batch_size`` and ``batch_wait_time_in_ms`` and returning a pipeline. It is
+            called once per grid point and is responsible for giving the origin a fresh starting position
+            (e.g. a new consumer group) when the source data is shared between points.
+        batch_sizes (:obj:`list`): Batch sizes to try.
+        batch_wait_times_in_ms (:obj:`list`): Batch wait times to try. Use ``[None]`` for origins without one.
+        number_of_records (:obj:`int`): Output records each run has to reach.
+        timeout_sec (:obj:`int`, optional): Timeout of a single run. Default: ``600``
+
+    Returns:
+        A :obj:`list` of :py:class:`SweepPoint`, in grid order.
+    """
+    points = []
+    for batch_size, batch_wait_time_in_ms in itertools.product(batch_sizes, batch_wait_times_in_ms):
+        logger.info('Running sweep point batch_size=%s, batch_wait_time_in_ms=%s ...',
+                    batch_size, batch_wait_time_in_ms)
+        pipeline = pipeline_factory(batch_size, batch_wait_time_in_ms)
+        pipeline_run = run_pipeline(sdc_executor, pipeline, number_of_records=number_of_records,
+                                    timeout_sec=timeout_sec)
+        points.append(SweepPoint(batch_size=batch_size,
+                                 batch_wait_time_in_ms=batch_wait_time_in_ms,
+                                 records_per_sec=records_per_second(number_of_records, pipeline_run.elapsed_sec),
+                                 latency_sec=(pipeline_run.elapsed_sec / pipeline_run.batch_count
+                                              if pipeline_run.batch_count else pipeline_run.elapsed_sec),
+                                 mean_batch_processing_sec=pipeline_run.mean_batch_processing_sec))
+    return points
+
+
+def pareto_front(points):
+    """Return the points not beaten on both throughput and latency by another point, fastest first."""
+    front = []
+    for point in sorted(points, key=lambda point: (-point.records_per_sec, point.latency_sec)):
+        if not front or point.latency_sec < front[-1].latency_sec:
+            front.append(point)
+    return front
+
+
+def log_sweep_report(title, points):
+    """Log all sweep points, flagging the ones on the Pareto front."""
+    front = pareto_front(points)
+    log_report(title,
+               ['Batch size', 'Batch wait ms', 'Records/sec', 'Latency sec', 'Mean batch sec', 'Pareto'],
+               [[point.batch_size, point.batch_wait_time_in_ms, point.records_per_sec, point.latency_sec,
+                 point.mean_batch_processing_sec, '*' if point in front else '']
+                for point in sorted(points, key=lambda point: point.latency_sec)])
@@ -15,7 +15,6 @@
 import json
 import logging
 import string
-import time
 import uuid
 from collections import OrderedDict
 from datetime import datetime
@@ -29,6 +28,8 @@ import sqlalchemy
 from streamsets.testframework.markers import database, cluster, sdc_min_version
 from streamsets.testframework.utils import get_random_string, Version
 
+from stage.utils.utils_wait import wait_until
+
 logger = logging.getLogger(__name__)
 
 
@@ -1685,11 +1686,16 @@ def test_native_parquet_timestamps(sdc_builder, sdc_executor, cluster):
     hive_cursor = cluster.hive.client.cursor()
     try:
         sdc_executor.start_pipeline(pipeline).wait_for_finished()
-        # Need to wait for 45 seconds until mapreduce jobs are finished.
-        time.sleep(45)
-        hive_cursor.execute('RELOAD {0}'.format(_get_qualified_table_name(None, table_name)))
-        hive_cursor.execute('SELECT * from {0}'.format(_get_qualified_table_name(None, table_name)))
-        hive_values = [list(row) for row in hive_cursor.fetchall()]
+
+        # Wait until the MapReduce jobs converted all the data to Parquet.
+        def read_hive_values():
+            hive_cursor.execute('RELOAD {0}'.format(_get_qualified_table_name(None, table_name)))
+            hive_cursor.execute('SELECT * from {0}'.format(_get_qualified_table_name(None, table_name)))
+            hive_values = [list(row) for row in hive_cursor.fetchall()]
+            return hive_values if len(hive_values) >= len(raw_data) else None
+
+        hive_values = wait_until(read_hive_values, timeout_sec=300, max_poll_interval_sec=10,
+                                 description=f'{len(raw_data)} rows in Hive table {table_name}')
 
         def split_date_time_string(datetime_str):
             v = datetime.strptime(datetime_str, '%Y-%m-%d %H:%M:%S')
@@ -27,8 +27,6 @@ logger = logging.getLogger(__name__)
 ERROR_CODE_STAGE_REQUIRED_FIELDS = 'CONTAINER_0050'
 # Stage precondition: CONTAINER_0051 - Unsatisfied precondition.
 ERROR_CODE_UNSATISFIED_PRECONDITION = 'CONTAINER_0051'
-# Port for SDC RPC stages to exchange error records
-SDC_RPC_LISTENING_PORT = 20000
 
 
 def test_error_records_stop_pipeline_on_required_field(random_expression_pipeline_builder, sdc_executor):
@@ -122,7 +120,7 @@ def test_error_records_discard_on_record_precondition(random_expression_pipeline
 
 
 @pytest.fixture(scope='function')
-def policy_write_builder(sdc_builder, sdc_executor):
+def policy_write_builder(sdc_builder, sdc_executor, free_port):
     builder = sdc_builder.get_pipeline_builder()
 
     dev_data_generator = builder.add_stage('Dev Data Generator')
@@ -136,18 +134,18 @@ def policy_write_builder(sdc_builder, sdc_executor):
     dev_data_generator >> expression_evaluator >> to_error
 
     error = builder.add_error_stage('Write to Another Pipeline')
-    error.sdc_rpc_connection = ['{}:{}'.format(sdc_executor.server_host, SDC_RPC_LISTENING_PORT)]
+    error.sdc_rpc_connection = ['{}:{}'.format(sdc_executor.server_host, free_port)]
     error.sdc_rpc_id = 'error_policy'
 
     yield builder
 
 
 @pytest.fixture(scope='function')
-def policy_read_builder(sdc_builder):
+def policy_read_builder(sdc_builder, free_port):
     builder = sdc_builder.get_pipeline_builder()
 
     origin = builder.add_stage('SDC RPC', type='origin')
-    origin.sdc_rpc_listening_port = SDC_RPC_LISTENING_PORT
+    origin.sdc_rpc_listening_port = free_port
     origin.sdc_rpc_id = 'error_policy'
 
     trash = builder.add_stage('Trash')
@@ -25,6 +25,9 @@ from streamsets.sdk.utils import Version
 from streamsets.testframework.utils import get_random_string
 from streamsets.testframework.markers import database, sdc_min_version
 
+from stage.utils.utils_compare import assert_tables_match
+from stage.utils.utils_tables import create_tables, drop_tables
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,67 +48,51 @@ TableInfo = namedtuple('TableInfo', ['name', 'use_primary_key'])
 def assert_tables_replicated(database=None, src_tables=None):
     """Goes through all source tables and checks the corresponding mapping to a target table."""
     db_engine = database.engine
+    table_pairs = []
     for src_table_info in src_tables:
         target_table_name = re.sub(SRC_TABLE_PREFIX, TGT_TABLE_PREFIX, src_table_info.name, 1)
         logger.info('Comparing Source Table : %s and Target Table : %s', src_table_info.name, target_table_name)
 
         src_table = sqlalchemy.Table(src_table_info.name, sqlalchemy.MetaData(), autoload=True, autoload_with=db_engine)
-        src_result = db_engine.execute(src_table.select().order_by(src_table.c[FIRST_COLUMN]))
-        src_result_list = src_result.fetchall()
-        src_result.close()
-
         target_table = sqlalchemy.Table(target_table_name, sqlalchemy.MetaData(),
                                         autoload=True, autoload_with=db_engine)
-        target_result = db_engine.execute(target_table.select().order_by(target_table.c[FIRST_COLUMN]))
-        target_result_list = target_result.fetchall()
-        target_result.close()
+        table_pairs.append((src_table, target_table))
 
-        assert src_result_list == target_result_list
+    assert_tables_match(db_engine, table_pairs, FIRST_COLUMN)
 
-def setup_tables(database, src_tables, target_tables, event_table_name):
+def setup_tables(database, src_tables, target_tables, event_table_name, no_of_src_rows=NO_OF_SRC_ROWS):
     """Creates source, target and event tables, inserts rows to the source table and
     insert 0 for event table's event column.
     """
-    db_engine = database.engine
-
-    for src_table in src_tables:
-        first_col = sqlalchemy.Column(FIRST_COLUMN, sqlalchemy.Integer, primary_key=src_table.use_primary_key, autoincrement=False)
-        logger.info('Creating source table %s in %s database ...', src_table.name, database.type)
-        table = sqlalchemy.Table(src_table.name, sqlalchemy.MetaData(), first_col,
-                                 sqlalchemy.Column(OTHER_COLUMN, sqlalchemy.String(20)))
-        table.create(db_engine)
-        logger.info('Inserting data into source table %s in %s database ...', src_table.name, database.type)
-        row_ids = list(range(1, NO_OF_SRC_ROWS+1))
-        if not src_table.use_primary_key:
+    def create_table(table_info):
+        first_col = sqlalchemy.Column(FIRST_COLUMN, sqlalchemy.Integer, primary_key=table_info.use_primary_key,
+                                      autoincrement=False)
+        return sqlalchemy.Table(table_info.name, sqlalchemy.MetaData(), first_col,
+                                sqlalchemy.Column(OTHER_COLUMN, sqlalchemy.String(20)))
+
+    def src_rows(use_primary_key):
+        row_ids = list(range(1, no_of_src_rows+1))  # some databases (like MySQL) will start from 1
+        if not use_primary_key:
             # shuffle the first col values for non-incremental mode
             random.shuffle(row_ids)
-        for src_row_id in row_ids:  # some databases (like MySQL) will start from 1
-            insert_data = {FIRST_COLUMN: src_row_id,
-                           OTHER_COLUMN: get_random_string(string.ascii_lowercase, 20)}
-            db_engine.execute(table.insert(), [insert_data])
-
-    for target_table in target_tables:
-        first_col = sqlalchemy.Column(FIRST_COLUMN, sqlalchemy.Integer, primary_key=target_table.use_primary_key, autoincrement=False)
-        logger.info('Creating target table %s in %s database ...', target_table.name, database.type)
-        table = sqlalchemy.Table(target_table.name, sqlalchemy.MetaData(), first_col,
-                                 sqlalchemy.Column(OTHER_COLUMN, sqlalchemy.String(20)))
-        table.create(db_engine)
-
-    logger.info('Creating event table %s in %s database ...', event_table_name, database.type)
-    table = sqlalchemy.Table(event_table_name, sqlalchemy.MetaData(),
-                             sqlalchemy.Column(EVENT_COLUMN_NAME, sqlalchemy.Integer))
-    table.create(db_engine)
-    logger.info('Inserting data into event table %s in %s database ...', event_table_name, database.type)
-    db_engine.execute(table.insert(), [{EVENT_COLUMN_NAME: 0}])
+        return ({FIRST_COLUMN: src_row_id, OTHER_COLUMN: get_random_string(string.ascii_lowercase, 20)}
+                for src_row_id in row_ids)
+
+    event_table = sqlalchemy.Table(event_table_name, sqlalchemy.MetaData(),
+                                   sqlalchemy.Column(EVENT_COLUMN_NAME, sqlalchemy.Integer))
+    rows = {src_table.name: src_rows(src_table.use_primary_key) for src_table in src_tables}
+    rows[event_table_name] = [{EVENT_COLUMN_NAME: 0}]
+
+    logger.info('Creating source, target and event tables in %s database ...', database.type)
+    create_tables(database.engine,
+                  [create_table(table_info) for table_info in src_tables + target_tables] + [event_table],
+                  rows)
 
 
 def teardown_tables(database, table_names):
     """Drops both source, target tables and event table."""
-    db_engine = database.engine
-    for table_name in table_names:
-        logger.info('Dropping table %s in %s database ...', table_name, database.type)
-        table = sqlalchemy.Table(table_name, sqlalchemy.MetaData(), autoload=True, autoload_with=db_engine)
-        table.drop(db_engine)
+    logger.info('Dropping tables in %s database ...', database.type)
+    drop_tables(database.engine, table_names)
 
 
 @database
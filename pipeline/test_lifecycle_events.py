@@ -19,8 +19,6 @@ from streamsets.testframework.markers import sdc_min_version
 
 logger = logging.getLogger(__name__)
 
-# Port for SDC RPC stages to exchange error records
-SDC_RPC_LISTENING_PORT = 20000
 SDC_RPC_ID = 'lifecycle'
 
 
@@ -72,11 +70,11 @@ def generator_failure_builder(sdc_builder):
 
 
 @pytest.fixture(scope='function')
-def successful_receiver_pipeline(sdc_builder):
+def successful_receiver_pipeline(sdc_builder, free_port):
     builder = sdc_builder.get_pipeline_builder()
 
     origin = builder.add_stage('SDC RPC', type='origin')
-    origin.sdc_rpc_listening_port = SDC_RPC_LISTENING_PORT
+    origin.sdc_rpc_listening_port = free_port
     origin.sdc_rpc_id = SDC_RPC_ID
 
     trash = builder.add_stage('Trash')
@@ -87,11 +85,11 @@ def successful_receiver_pipeline(sdc_builder):
 
 
 @pytest.fixture(scope='function')
-def failing_receiver_pipeline(sdc_builder):
+def failing_receiver_pipeline(sdc_builder, free_port):
     builder = sdc_builder.get_pipeline_builder()
 
     origin = builder.add_stage('SDC RPC', type='origin')
-    origin.sdc_rpc_listening_port = SDC_RPC_LISTENING_PORT
+    origin.sdc_rpc_listening_port = free_port
     origin.sdc_rpc_id = SDC_RPC_ID
 
     jython = builder.add_stage('Jython Evaluator')
@@ -107,10 +105,10 @@ def failing_receiver_pipeline(sdc_builder):
 
 
 @sdc_min_version('2.7.0.0')
-def test_start_event(generator_trash_builder, successful_receiver_pipeline, sdc_executor):
+def test_start_event(generator_trash_builder, successful_receiver_pipeline, sdc_executor, free_port):
     """ Validate that we properly generate and process event on pipeline start."""
     start_stage = generator_trash_builder.add_start_event_stage('Write to Another Pipeline')
-    start_stage.sdc_rpc_connection = [f'{sdc_executor.server_host}:{SDC_RPC_LISTENING_PORT}']
+    start_stage.sdc_rpc_connection = [f'{sdc_executor.server_host}:{free_port}']
     start_stage.sdc_rpc_id = SDC_RPC_ID
 
     start_event_pipeline = generator_trash_builder.build('Start Event')
@@ -140,10 +138,10 @@ def test_start_event(generator_trash_builder, successful_receiver_pipeline, sdc_
 
 
 @sdc_min_version('2.7.0.0')
-def test_stop_event_user_action(generator_trash_builder, successful_receiver_pipeline, sdc_executor):
+def test_stop_event_user_action(generator_trash_builder, successful_receiver_pipeline, sdc_executor, free_port):
     """ Validate that we properly generate and process event when pipeline is stopped by user."""
     stop_stage = generator_trash_builder.add_stop_event_stage('Write to Another Pipeline')
-    stop_stage.sdc_rpc_connection = [f'{sdc_executor.server_host}:{SDC_RPC_LISTENING_PORT}']
+    stop_stage.sdc_rpc_connection = [f'{sdc_executor.server_host}:{free_port}']
     stop_stage.sdc_rpc_id = SDC_RPC_ID
 
     stop_event_pipeline = generator_trash_builder.build('Stop Event - User Action')
@@ -174,10 +172,10 @@ def test_stop_event_user_action(generator_trash_builder, successful_receiver_pip
 
 
 @sdc_min_version('2.7.0.0')
-def test_stop_event_finished(generator_finisher_builder, successful_receiver_pipeline, sdc_executor):
+def test_stop_event_finished(generator_finisher_builder, successful_receiver_pipeline, sdc_executor, free_port):
     """ Validate that we properly generate and process event when pipeline finishes."""
     stop_stage = generator_finisher_builder.add_stop_event_stage('Write to Another Pipeline')
-    stop_stage.sdc_rpc_connection = [f'{sdc_executor.server_host}:{SDC_RPC_LISTENING_PORT}']
+    stop_stage.sdc_rpc_connection = [f'{sdc_executor.server_host}:{free_port}']
     stop_stage.sdc_rpc_id = SDC_RPC_ID
 
     stop_event_pipeline = generator_finisher_builder.build('Stop Event - Finished')
@@ -207,10 +205,10 @@ def test_stop_event_finished(generator_finisher_builder, successful_receiver_pip
 
 
 @sdc_min_version('2.7.0.0')
-def test_stop_event_failure(generator_failure_builder, successful_receiver_pipeline, sdc_executor):
+def test_stop_event_failure(generator_failure_builder, successful_receiver_pipeline, sdc_executor, free_port):
     """ Validate that we properly generate and process event when pipeline crashes."""
     stop_stage = generator_failure_builder.add_stop_event_stage('Write to Another Pipeline')
-    stop_stage.sdc_rpc_connection = [f'{sdc_executor.server_host}:{SDC_RPC_LISTENING_PORT}']
+    stop_stage.sdc_rpc_connection = [f'{sdc_executor.server_host}:{free_port}']
     stop_stage.sdc_rpc_id = SDC_RPC_ID
 
     stop_event_pipeline = generator_failure_builder.build('Stop Event - Failure')
@@ -241,10 +239,10 @@ def test_stop_event_failure(generator_failure_builder, successful_receiver_pipel
 
 
 @sdc_min_version('2.7.0.0')
-def test_start_event_handler_failure(generator_trash_builder, failing_receiver_pipeline, sdc_executor):
+def test_start_event_handler_failure(generator_trash_builder, failing_receiver_pipeline, sdc_executor, free_port):
     """ Validate that failure to process start event will terminate the pipeline."""
     start_stage = generator_trash_builder.add_start_event_stage('Write to Another Pipeline')
-    start_stage.sdc_rpc_connection = [f'{sdc_executor.server_host}:{SDC_RPC_LISTENING_PORT}']
+    start_stage.sdc_rpc_connection = [f'{sdc_executor.server_host}:{free_port}']
     start_stage.sdc_rpc_id = SDC_RPC_ID
 
     start_event_pipeline = generator_trash_builder.build('Start Event: Handler Failure')
@@ -271,10 +269,10 @@ def test_start_event_handler_failure(generator_trash_builder, failing_receiver_p
 
 
 @sdc_min_version('2.7.0.0')
-def test_stop_event_handler_failure(generator_trash_builder, failing_receiver_pipeline, sdc_executor):
+def test_stop_event_handler_failure(generator_trash_builder, failing_receiver_pipeline, sdc_executor, free_port):
     """ Validate that failure to process stop event will terminate the pipeline."""
     stop_stage = generator_trash_builder.add_stop_event_stage('Write to Another Pipeline')
-    stop_stage.sdc_rpc_connection = [f'{sdc_executor.server_host}:{SDC_RPC_LISTENING_PORT}']
+    stop_stage.sdc_rpc_connection = [f'{sdc_executor.server_host}:{free_port}']
     stop_stage.sdc_rpc_id = SDC_RPC_ID
 
     stop_event_pipeline = generator_trash_builder.build('Stop Event: Handler Failure')
@@ -13,35 +13,12 @@
 # limitations under the License.
 
 import logging
-from collections import namedtuple
 
-import pytest
-import time
 from streamsets.sdk.sdc_models import DataDriftRule, DataRule, MetricRule
 
-logger = logging.getLogger(__name__)
-
-
-@pytest.fixture(scope='function')
-def basic_rules_pipeline_builder(sdc_builder):
-    pipeline_builder = sdc_builder.get_pipeline_builder()
-
-    dev_data_generator = pipeline_builder.add_stage('Dev Data Generator')
-    dev_data_generator.number_of_threads = 5
-    dev_data_generator.fields_to_generate = [{'type': 'STRING',
-                                              'precision': 10,
-                                              'scale': 2,
-                                              'field': 'random_string'}]
+from stage.utils.utils_wait import assert_holds_for
 
-    trash_1 = pipeline_builder.add_stage('Trash')
-
-    trash_2 = pipeline_builder.add_stage('Trash')
-
-    dev_data_generator >> trash_1
-    dev_data_generator >= trash_2
-
-    yield namedtuple('PipelineBuilder', ['pipeline_builder',
-                                         'dev_data_generator'])(pipeline_builder, dev_data_generator)
+logger = logging.getLogger(__name__)
 
 
 def test_basic_data_rules(basic_rules_pipeline_builder, sdc_executor):
@@ -145,8 +122,7 @@ def test_metric_rule_with_idle_pipeline(basic_rules_pipeline_builder, sdc_execut
     sdc_executor.start_pipeline(pipeline)
 
     # Sample with 1 second interval the alerts, there should not be one
-    for _ in range(5):
-        time.sleep(1)
-        assert 0 == len(sdc_executor.get_alerts().for_pipeline(pipeline))
+    assert_holds_for(lambda: len(sdc_executor.get_alerts().for_pipeline(pipeline)) == 0,
+                     duration_sec=5, poll_interval_sec=1, description='no alerts being raised')
 
     sdc_executor.stop_pipeline(pipeline)
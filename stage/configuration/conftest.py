@@ -1,21 +1,17 @@
 import csv
+import hashlib
 import io
-import textwrap
+import json
+import logging
 
 import pytest
 from streamsets.sdk.models import Configuration
 
-FILE_WRITER_SCRIPT = """
-    file_contents = '''{file_contents}'''
-    for record in records:
-        with open('{filepath}', 'w') as f:
-            f.write(file_contents.decode('utf8').encode('{encoding}'))
-"""
+from stage.utils.utils_files import (create_directories_with_pipeline, remove_files_with_pipeline,
+                                     write_file_with_pipeline, write_files_with_pipeline)
+
+logger = logging.getLogger(__name__)
 
-FILE_WRITER_SCRIPT_BINARY = """
-    with open('{filepath}', 'wb') as f:
-        f.write({file_contents})
-"""
 
 @pytest.fixture(scope='module')
 def sdc_common_hook():
@@ -24,6 +20,23 @@ def sdc_common_hook():
     return hook
 
 
+@pytest.fixture(scope='module')
+def module_pipeline_pool(sdc_executor):
+    pipeline_pool = PipelinePool(sdc_executor)
+    yield pipeline_pool
+    pipeline_pool.remove_all()
+
+
+@pytest.fixture
+def pipeline_pool(module_pipeline_pool):
+    """Drop-in replacement for ``sdc_executor.add_pipeline`` reusing the pipelines imported by earlier tests.
+
+    See :py:class:`PipelinePool`. Pipelines handed out during a test are stopped and returned to the pool after it.
+    """
+    yield module_pipeline_pool
+    module_pipeline_pool.release_all()
+
+
 @pytest.fixture
 def file_writer(sdc_executor):
     """Writes a file to SDC's local FS.
@@ -39,6 +52,47 @@ def file_writer(sdc_executor):
     return file_writer_
 
 
+@pytest.fixture
+def files_writer(sdc_executor):
+    """Writes many files to SDC's local FS using a single pipeline run.
+
+    Missing parent directories are created, so there is no need to ``mkdir`` them beforehand.
+
+    Args:
+        manifest (:obj:`list`): :py:class:`stage.utils.utils_files.FileEntry` instances, or tuples in the same order
+            (filepath, file_contents[, encoding[, file_data_type]]).
+    """
+    def files_writer_(manifest):
+        write_files_with_pipeline(sdc_executor, manifest)
+    return files_writer_
+
+
+@pytest.fixture
+def files_remover(sdc_executor):
+    """Removes many files or directories (recursively) from SDC's local FS using a single pipeline run.
+
+    Args:
+        paths (:obj:`list`): Absolute paths to remove. Paths that do not exist are ignored.
+    """
+    def files_remover_(paths):
+        remove_files_with_pipeline(sdc_executor, paths)
+    return files_remover_
+
+
+@pytest.fixture
+def directories_creator(sdc_executor):
+    """Creates many empty directories, including missing parents, on SDC's local FS using a single pipeline run.
+
+    Only needed for directories that no file is written to, as ``files_writer`` creates the parents of its files.
+
+    Args:
+        paths (:obj:`list`): Absolute paths of the directories. Paths that already exist are ignored.
+    """
+    def directories_creator_(paths):
+        create_directories_with_pipeline(sdc_executor, paths)
+    return directories_creator_
+
+
 @pytest.fixture
 def shell_executor(sdc_executor):
     def shell_executor_(script, environment_variables=None):
@@ -60,25 +114,6 @@ def shell_executor(sdc_executor):
     return shell_executor_
 
 
-def write_file_with_pipeline(sdc_executor, filepath, file_contents, encoding='utf8', file_data_type='NOT_BINARY'):
-    builder = sdc_executor.get_pipeline_builder()
-    dev_raw_data_source = builder.add_stage('Dev Raw Data Source')
-    dev_raw_data_source.set_attributes(data_format='TEXT', raw_data='noop', stop_after_first_batch=True)
-    jython_evaluator = builder.add_stage('Jython Evaluator')
-
-    file_writer_script = FILE_WRITER_SCRIPT_BINARY if file_data_type == 'BINARY' else FILE_WRITER_SCRIPT
-    jython_evaluator.script = textwrap.dedent(file_writer_script).format(filepath=str(filepath),
-                                                                         file_contents=file_contents,
-                                                                         encoding=encoding)
-    trash = builder.add_stage('Trash')
-    dev_raw_data_source >> jython_evaluator >> trash
-    pipeline = builder.build('File writer pipeline')
-
-    sdc_executor.add_pipeline(pipeline)
-    sdc_executor.start_pipeline(pipeline).wait_for_finished()
-    sdc_executor.remove_pipeline(pipeline)
-
-
 @pytest.fixture
 def delimited_file_writer(sdc_executor):
     def delimited_file_writer_(filepath, file_contents_list, delimiter_format, delimiter_character, encoding='utf8',
@@ -166,3 +201,93 @@ def compressed_file_writer(sdc_executor):
 
     return compressed_file_writer_
 
+
+class PipelinePool:
+    """Keeps imported pipelines around, keyed by topology, so that tests building the same pipeline over and over
+    (typically one per parametrization) do not pay for an import each time.
+
+    When :py:meth:`add_pipeline` is given a pipeline whose stages and wiring match a pooled pipeline that is not in use,
+    the pooled pipeline's id is assigned to the given one, its configuration is pushed to SDC only if it changed since
+    the previous use, and the origin offset is reset. Otherwise the pipeline is imported and joins the pool.
+
+    Args:
+        sdc_executor: The SDC instance the pipelines live on.
+    """
+    def __init__(self, sdc_executor):
+        self._sdc_executor = sdc_executor
+        # topology hash -> list of [pooled pipeline, configuration hash]
+        self._pipelines = {}
+        # pipeline id -> pipeline handed out since the last release_all
+        self._in_use = {}
+
+    def add_pipeline(self, pipeline):
+        topology = topology_hash(pipeline)
+        configuration = configuration_hash(pipeline)
+        pooled_pipelines = self._pipelines.setdefault(topology, [])
+        pooled_pipeline = next((pooled_pipeline for pooled_pipeline in pooled_pipelines
+                                if pooled_pipeline[0].id not in self._in_use), None)
+        if pooled_pipeline is None:
+            self._sdc_executor.add_pipeline(pipeline)
+            pooled_pipelines.append([pipeline, configuration])
+        else:
+            pooled, pooled_configuration = pooled_pipeline
+            logger.debug('Reusing pooled pipeline %s ...', pooled.id)
+            pipeline.id = pooled.id
+            if configuration != pooled_configuration:
+                pipeline_config = pipeline._data['pipelineConfig']
+                current_pipeline_config = self._sdc_executor.api_client.export_pipeline(pooled.id)['pipelineConfig']
+                for key in ('uuid', 'pipelineId', 'title', 'info', 'metadata'):
+                    if key in current_pipeline_config:
+                        pipeline_config[key] = current_pipeline_config[key]
+                self._sdc_executor.api_client.update_pipeline(pooled.id, pipeline_config)
+                pooled_pipeline[1] = configuration
+            self._sdc_executor.reset_origin(pipeline)
+        self._in_use[pipeline.id] = pipeline
+        return pipeline
+
+    def release_all(self):
+        """Stop the pipelines handed out since the last call and make them available again."""
+        for pipeline in self._in_use.values():
+            status = self._sdc_executor.get_pipeline_status(pipeline).response.json().get('status')
+            if status in ('RUNNING', 'STARTING', 'RETRY'):
+                self._sdc_executor.stop_pipeline(pipeline)
+        self._in_use.clear()
+
+    def remove_all(self):
+        self.release_all()
+        for pooled_pipelines in self._pipelines.values():
+            for pipeline, _ in pooled_pipelines:
+                self._sdc_executor.remove_pipeline(pipeline)
+        self._pipelines.clear()
+
+
+def topology_hash(pipeline):
+    """Hash of the stages of the pipeline and of how their lanes are wired, ignoring stage configuration.
+
+    Lane names carry a random suffix, so every lane is identified by the stage and position producing it instead.
+    """
+    pipeline_config = pipeline._data['pipelineConfig']
+    stages = pipeline_config['stages']
+    producers = {}
+    for stage in stages:
+        for lane_type in ('outputLanes', 'eventLanes'):
+            for index, lane in enumerate(stage.get(lane_type, [])):
+                producers[lane] = f"{stage['instanceName']}:{lane_type}:{index}"
+    topology = [[stage['instanceName'], stage['library'], stage['stageName'], stage['stageVersion'],
+                 [producers.get(lane, lane) for lane in stage.get('inputLanes', [])],
+                 len(stage.get('outputLanes', [])), len(stage.get('eventLanes', []))]
+                for stage in stages]
+    for stage_key in ('errorStage', 'statsAggregatorStage'):
+        stage = pipeline_config.get(stage_key) or {}
+        topology.append([stage_key, stage.get('library'), stage.get('stageName'), stage.get('stageVersion')])
+    return hashlib.sha1(json.dumps(topology, sort_keys=True).encode()).hexdigest()
+
+
+def configuration_hash(pipeline):
+    """Hash of the pipeline configuration and of every stage configuration."""
+    pipeline_config = pipeline._data['pipelineConfig']
+    configuration = [pipeline_config['configuration']]
+    configuration.extend([stage['instanceName'], stage['configuration']] for stage in pipeline_config['stages'])
+    for stage_key in ('errorStage', 'statsAggregatorStage'):
+        configuration.append((pipeline_config.get(stage_key) or {}).get('configuration'))
+    return hashlib.sha1(json.dumps(configuration, sort_keys=True, default=str).encode()).hexdigest()
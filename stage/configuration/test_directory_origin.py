@@ -33,8 +33,8 @@ logger = logging.getLogger(__file__)
 @pytest.mark.parametrize('header_line', ['WITH_HEADER'])
 @pytest.mark.parametrize('extra_columns_present', [False, True])
 @pytest.mark.parametrize('allow_extra_columns', [False, True])
-def test_directory_origin_configuration_allow_extra_columns(sdc_builder, sdc_executor,
-                                                            shell_executor, file_writer,
+def test_directory_origin_configuration_allow_extra_columns(sdc_builder, sdc_executor, pipeline_pool,
+                                                            files_remover, file_writer,
                                                             data_format, header_line,
                                                             extra_columns_present, allow_extra_columns):
     """Test for Allow Extra Columns configuration covering the following scenarios:
@@ -73,7 +73,7 @@ def test_directory_origin_configuration_allow_extra_columns(sdc_builder, sdc_exe
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True).snapshot
         records = [record.field for record in snapshot[directory].output]
         error_records = [error_record.field['columns'] for error_record in snapshot[directory].error_records]
@@ -85,15 +85,15 @@ def test_directory_origin_configuration_allow_extra_columns(sdc_builder, sdc_exe
         else:
             assert records == data
     finally:
-        shell_executor(f'rm file_path')
+        files_remover([file_path])
         if sdc_executor.get_pipeline_status(pipeline).response.json().get('status') == 'RUNNING':
             sdc_executor.stop_pipeline(pipeline)
 
 
 @pytest.mark.parametrize('create_directory_first', [True, False])
 @pytest.mark.parametrize('allow_late_directory', [False, True])
-def test_directory_origin_configuration_allow_late_directory(sdc_builder, sdc_executor,
-                                                             shell_executor, file_writer,
+def test_directory_origin_configuration_allow_late_directory(sdc_builder, sdc_executor, pipeline_pool,
+                                                             files_remover, file_writer,
                                                              create_directory_first, allow_late_directory):
     """Test for Allow Late Directory configuration covering the following scenarios:
 
@@ -110,7 +110,6 @@ def test_directory_origin_configuration_allow_late_directory(sdc_builder, sdc_ex
     FILE_CONTENTS = 'Sam is the Kid'
 
     def create_directory_and_file(files_directory, file_name, file_contents):
-        shell_executor(f'mkdir {files_directory}')
         file_writer(os.path.join(files_directory, file_name), file_contents)
 
     try:
@@ -127,7 +126,7 @@ def test_directory_origin_configuration_allow_late_directory(sdc_builder, sdc_ex
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         if not allow_late_directory and not create_directory_first:
             with pytest.raises(StartError):
                 sdc_executor.start_pipeline(pipeline)
@@ -141,14 +140,14 @@ def test_directory_origin_configuration_allow_late_directory(sdc_builder, sdc_ex
             record = snapshot[directory].output[0]
             assert record.field['text'] == FILE_CONTENTS
     finally:
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
         if sdc_executor.get_pipeline_status(pipeline).response.json().get('status') == 'RUNNING':
             sdc_executor.stop_pipeline(pipeline)
 
 
 @pytest.mark.parametrize('file_post_processing', ['ARCHIVE'])
-def test_directory_origin_configuration_archive_directory(sdc_builder, sdc_executor,
-                                                          shell_executor, file_writer,
+def test_directory_origin_configuration_archive_directory(sdc_builder, sdc_executor, pipeline_pool,
+                                                          files_remover, directories_creator, file_writer,
                                                           file_post_processing):
     """Verify that the Archive Directory configuration is used when archiving files as part of post-processing."""
     files_directory = os.path.join('/tmp', get_random_string())
@@ -158,11 +157,10 @@ def test_directory_origin_configuration_archive_directory(sdc_builder, sdc_execu
 
     try:
         logger.debug('Creating files directory %s ...', files_directory)
-        shell_executor(f'mkdir {files_directory}')
         file_writer(os.path.join(files_directory, FILE_NAME), FILE_CONTENTS)
 
         logger.debug('Creating archive directory %s ...', archive_directory)
-        shell_executor(f'mkdir {archive_directory}')
+        directories_creator([archive_directory])
 
         pipeline_builder = sdc_builder.get_pipeline_builder()
         directory = pipeline_builder.add_stage('Directory')
@@ -175,7 +173,7 @@ def test_directory_origin_configuration_archive_directory(sdc_builder, sdc_execu
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True).snapshot
         record = snapshot[directory].output[0]
         assert record.field['text'] == FILE_CONTENTS
@@ -195,13 +193,13 @@ def test_directory_origin_configuration_archive_directory(sdc_builder, sdc_execu
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True).snapshot
         record = snapshot[directory].output[0]
         assert record.field['text'] == FILE_CONTENTS
 
     finally:
-        shell_executor(f'rm -r {files_directory} {archive_directory}')
+        files_remover([files_directory, archive_directory])
         if sdc_executor.get_pipeline_status(pipeline).response.json().get('status') == 'RUNNING':
             sdc_executor.stop_pipeline(pipeline)
 
@@ -226,8 +224,8 @@ def test_directory_origin_configuration_avro_schema(sdc_builder, sdc_executor, d
 
 
 @pytest.mark.parametrize('batch_size_in_recs', [2, 3, 4])
-def test_directory_origin_configuration_batch_size_in_recs(sdc_builder, sdc_executor, shell_executor,
-                                                           file_writer, batch_size_in_recs):
+def test_directory_origin_configuration_batch_size_in_recs(sdc_builder, sdc_executor, pipeline_pool, files_remover,
+                                                           files_writer, batch_size_in_recs):
     """Verify batch size in records (batch_size_in_recs) configuration for various values
     which limits maximum number of records to pass through pipeline at time.
     e.g. For 2 files with each containing 3 records. Verify with batch_size_in_recs = 2
@@ -243,9 +241,8 @@ def test_directory_origin_configuration_batch_size_in_recs(sdc_builder, sdc_exec
 
     try:
         logger.debug('Creating files directory %s ...', files_directory)
-        shell_executor(f'mkdir {files_directory}')
-        file_writer(os.path.join(files_directory, FILE_NAME_1), FILE_CONTENTS_1)
-        file_writer(os.path.join(files_directory, FILE_NAME_2), FILE_CONTENTS_2)
+        files_writer([(os.path.join(files_directory, FILE_NAME_1), FILE_CONTENTS_1),
+                      (os.path.join(files_directory, FILE_NAME_2), FILE_CONTENTS_2)])
 
         pipeline_builder = sdc_builder.get_pipeline_builder()
         directory = pipeline_builder.add_stage('Directory')
@@ -257,7 +254,7 @@ def test_directory_origin_configuration_batch_size_in_recs(sdc_builder, sdc_exec
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batches=number_of_batches).snapshot
         sdc_executor.stop_pipeline(pipeline)
 
@@ -271,7 +268,7 @@ def test_directory_origin_configuration_batch_size_in_recs(sdc_builder, sdc_exec
         stage_output = '\n'.join(temp)
         assert raw_data == stage_output
     finally:
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.skip('Not yet implemented')
@@ -294,7 +291,7 @@ def test_directory_origin_configuration_buffer_size_in_bytes(sdc_builder, sdc_ex
 @pytest.mark.parametrize('data_format', ['TEXT', # 'DATAGRAM', 'DELIMITED', 'JSON', 'LOG', 'XML'
                                         ])
 @pytest.mark.parametrize('charset_correctly_set', [True, False])
-def test_directory_origin_configuration_charset(sdc_builder, sdc_executor, file_writer,
+def test_directory_origin_configuration_charset(sdc_builder, sdc_executor, pipeline_pool, file_writer,
                                                 data_format, charset_correctly_set):
     """Instead of iterating over every possible charset (which would be a huge waste of time to write
     and run), let's just take some random set of characters from the Big5 character set and ensure that,
@@ -318,7 +315,7 @@ def test_directory_origin_configuration_charset(sdc_builder, sdc_executor, file_
     directory >> trash
     pipeline = pipeline_builder.build()
 
-    sdc_executor.add_pipeline(pipeline)
+    pipeline_pool.add_pipeline(pipeline)
     snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True).snapshot
     record = snapshot[directory].output[0]
     sdc_executor.stop_pipeline(pipeline)
@@ -341,8 +338,9 @@ def test_directory_origin_configuration_comment_marker(sdc_builder, sdc_executor
 @pytest.mark.parametrize('data_format', ['TEXT', 'DELIMITED', 'JSON', 'SDC_JSON', 'XML', 'LOG'])
 @pytest.mark.parametrize('compression_format', ['COMPRESSED_FILE'])
 @pytest.mark.parametrize('compression_codec', ['GZIP', 'BZIP2'])
-def test_directory_origin_configuration_compression_format(sdc_builder, sdc_executor, data_format, compression_format,
-                                                           compressed_file_writer, compression_codec, shell_executor):
+def test_directory_origin_configuration_compression_format(sdc_builder, sdc_executor, pipeline_pool, data_format,
+                                                           compression_format, compressed_file_writer,
+                                                           compression_codec, files_remover):
     """Verify direcotry origin can read data from compressed files.
         Pattern is inside the compressed file.
         e.g. compression_format_test.txt is compressed as compression_format_test.txt.gz then
@@ -377,11 +375,11 @@ def test_directory_origin_configuration_compression_format(sdc_builder, sdc_exec
                       'log_format': 'LOG4J'}
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-        execute_pipeline_and_verify_output(sdc_executor, directory, pipeline, data_format,
+        execute_pipeline_and_verify_output(sdc_executor, pipeline_pool, directory, pipeline, data_format,
                                            actual_file_content, actual_file_content)
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {tmp_directory}')
+        files_remover([tmp_directory])
 
 
 @pytest.mark.parametrize('data_format', ['DATAGRAM'])
@@ -419,8 +417,8 @@ def test_directory_origin_configuration_custom_log_format(sdc_builder, sdc_execu
 
 @pytest.mark.parametrize('data_format', ['SDC_JSON'])
 # 'AVRO', 'DELIMITED', 'EXCEL', 'JSON', 'LOG', 'PROTOBUF',  'TEXT', 'WHOLE_FILE', 'XML'
-def test_directory_origin_configuration_data_format(sdc_builder, sdc_executor, data_format,
-                                                    shell_executor, compressed_file_writer):
+def test_directory_origin_configuration_data_format(sdc_builder, sdc_executor, pipeline_pool, data_format,
+                                                    files_remover, compressed_file_writer):
     """Test if Directory Origin can read data with different data format.
     We will be testing only SDC_JSON data formats now. Other data formats are covered in other TCs.
     Following is mapping of data format to respective TC.
@@ -449,7 +447,7 @@ def test_directory_origin_configuration_data_format(sdc_builder, sdc_executor, d
                       'json_content': 'MULTIPLE_OBJECTS'}
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True).snapshot
         output_records = snapshot[directory].output
         assert 2 == len(output_records)
@@ -457,7 +455,7 @@ def test_directory_origin_configuration_data_format(sdc_builder, sdc_executor, d
         assert output_records[1].field == json_data[1]
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('data_format', ['DATAGRAM'])
@@ -480,9 +478,9 @@ def test_directory_origin_configuration_delimited_messages(sdc_builder, sdc_exec
 @pytest.mark.parametrize('delimiter_character', [' ', '^'])
 @pytest.mark.parametrize('root_field_type', ['LIST_MAP'])
 @pytest.mark.parametrize('header_line', ['WITH_HEADER'])
-def test_directory_origin_configuration_delimiter_character(sdc_builder, sdc_executor,
+def test_directory_origin_configuration_delimiter_character(sdc_builder, sdc_executor, pipeline_pool,
                                                             delimiter_format_type, data_format,
-                                                            delimiter_character, shell_executor, delimited_file_writer,
+                                                            delimiter_character, files_remover, delimited_file_writer,
                                                             root_field_type, header_line):
     """Test for Directory origin can read delimited file with custom delimiter character format type.
     Here we will be creating delimited files with different delimiter character for testing. e.g. [' ', '^']
@@ -492,7 +490,6 @@ def test_directory_origin_configuration_delimiter_character(sdc_builder, sdc_exe
     FILE_CONTENTS = [['header1', 'header2', 'header3'], ['Field11', 'Field12', 'fält13'],['стол', 'Field22', 'Field23']]
     try:
         logger.debug('Creating files directory %s ...', files_directory)
-        shell_executor(f'mkdir {files_directory}')
         delimited_file_writer(os.path.join(files_directory, FILE_NAME),
                               FILE_CONTENTS, delimiter_format_type, delimiter_character)
 
@@ -510,7 +507,7 @@ def test_directory_origin_configuration_delimiter_character(sdc_builder, sdc_exe
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batch_size=3).snapshot
         output_records = snapshot[directory.instance_name].output
         assert 2 == len(output_records)
@@ -520,12 +517,12 @@ def test_directory_origin_configuration_delimiter_character(sdc_builder, sdc_exe
             [('header1', 'стол'), ('header2', 'Field22'), ('header3', 'Field23')]))
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('data_format', ['XML'])
-def test_directory_origin_configuration_delimiter_element(sdc_builder, sdc_executor, shell_executor, file_writer,
-                                                          data_format):
+def test_directory_origin_configuration_delimiter_element(sdc_builder, sdc_executor, pipeline_pool, files_remover,
+                                                          file_writer, data_format):
     """Test for Directory origin can read delimited file with different delimiter format type.
     Here we will be creating XML delimited files for testing.
     """
@@ -545,7 +542,6 @@ def test_directory_origin_configuration_delimiter_element(sdc_builder, sdc_execu
 
     try:
         logger.debug('Creating files directory %s ...', files_directory)
-        shell_executor(f'mkdir {files_directory}')
         file_writer(os.path.join(files_directory, FILE_NAME), FILE_CONTENTS)
 
         pipeline_builder = sdc_builder.get_pipeline_builder()
@@ -559,7 +555,7 @@ def test_directory_origin_configuration_delimiter_element(sdc_builder, sdc_execu
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batch_size=3).snapshot
         output_records = snapshot[directory.instance_name].output
         item_list = output_records[0].field['msg']
@@ -572,7 +568,7 @@ def test_directory_origin_configuration_delimiter_element(sdc_builder, sdc_execu
         assert rows_from_snapshot == expected_data
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('data_format', ['DELIMITED'])
@@ -580,9 +576,9 @@ def test_directory_origin_configuration_delimiter_element(sdc_builder, sdc_execu
                                                    'POSTGRES_TEXT', 'MYSQL'])
 @pytest.mark.parametrize('root_field_type', ['LIST_MAP'])
 @pytest.mark.parametrize('header_line', ['WITH_HEADER'])
-def test_directory_origin_configuration_delimiter_format_type(sdc_builder, sdc_executor, data_format,
+def test_directory_origin_configuration_delimiter_format_type(sdc_builder, sdc_executor, pipeline_pool, data_format,
                                                               delimiter_format_type, delimited_file_writer,
-                                                              shell_executor, root_field_type, header_line):
+                                                              files_remover, root_field_type, header_line):
     """Test for Directory origin can read delimited file with different delimiter format type.
     Here we will be creating delimited files in different formats for testing. e.g. POSTGRES_CSV, TDF, RFC4180, etc.,
     """
@@ -594,7 +590,6 @@ def test_directory_origin_configuration_delimiter_format_type(sdc_builder, sdc_e
 
     try:
         logger.debug('Creating files directory %s ...', files_directory)
-        shell_executor(f'mkdir {files_directory}')
         delimited_file_writer(os.path.join(files_directory, FILE_NAME),
                               FILE_CONTENTS, delimiter_format_type, delimiter_character)
 
@@ -612,7 +607,7 @@ def test_directory_origin_configuration_delimiter_format_type(sdc_builder, sdc_e
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batch_size=3).snapshot
         sdc_executor.stop_pipeline(pipeline)
         output_records = snapshot[directory.instance_name].output
@@ -624,15 +619,15 @@ def test_directory_origin_configuration_delimiter_format_type(sdc_builder, sdc_e
         assert output_records[1].field == OrderedDict(
             [('field1', 'стол'), ('field2', 'Field22'), ('field3', 'Field23')])
     finally:
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('delimiter_format_type', ['CUSTOM'])
 @pytest.mark.parametrize('data_format', ['DELIMITED'])
 @pytest.mark.parametrize('enable_comments', [False, True])
 @pytest.mark.parametrize('comment_marker', ['#'])
-def test_directory_origin_configuration_enable_comments(sdc_builder, sdc_executor,
-                                                        shell_executor, file_writer, delimiter_format_type, data_format,
+def test_directory_origin_configuration_enable_comments(sdc_builder, sdc_executor, pipeline_pool,
+                                                        files_remover, file_writer, delimiter_format_type, data_format,
                                                         enable_comments, comment_marker):
     """Test for Directory origin can read delimited files with comments.
     Here we will be creating delimited files with comments and verify if DC can skip comments or read comments as texts
@@ -643,8 +638,7 @@ def test_directory_origin_configuration_enable_comments(sdc_builder, sdc_executo
                    ['Field21', 'Field22', 'Field23']]
     FILE_CONTENTS = '\n'.join([','.join(t) for t in csv_content]).format(comment_marker=comment_marker)
     try:
-        files_directory = create_file_and_directory(FILE_NAME, FILE_CONTENTS, shell_executor,
-                                                                      file_writer)
+        files_directory = create_file_and_directory(FILE_NAME, FILE_CONTENTS, file_writer)
         attributes = {'data_format': data_format,
                       'files_directory': files_directory,
                       'file_name_pattern': '*.csv',
@@ -655,7 +649,7 @@ def test_directory_origin_configuration_enable_comments(sdc_builder, sdc_executo
                       'delimiter_character': ','}
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batch_size=3).snapshot
         output_records = snapshot[directory.instance_name].output
 
@@ -670,7 +664,7 @@ def test_directory_origin_configuration_enable_comments(sdc_builder, sdc_executo
             assert output_records[2].field == OrderedDict([('0', 'Field21'), ('1', 'Field22'), ('2', 'Field23')])
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.skip('Not yet implemented')
@@ -687,8 +681,8 @@ def test_directory_origin_configuration_escape_character(sdc_builder, sdc_execut
 
 @pytest.mark.parametrize('data_format', ['EXCEL'])
 @pytest.mark.parametrize('excel_header_option', ['IGNORE_HEADER', 'NO_HEADER', 'WITH_HEADER'])
-def test_directory_origin_configuration_excel_header_option(sdc_builder, sdc_executor,
-                                                            data_format, excel_header_option, shell_executor,
+def test_directory_origin_configuration_excel_header_option(sdc_builder, sdc_executor, pipeline_pool,
+                                                            data_format, excel_header_option, files_remover,
                                                             file_writer):
     """Indicates whether files include a header row and whether to ignore the header row.
     A header row must be the first row of a file.
@@ -697,7 +691,6 @@ def test_directory_origin_configuration_excel_header_option(sdc_builder, sdc_exe
     file_name = f'{get_random_string()}.xls'
     file_path = os.path.join(files_directory, file_name)
     try:
-        shell_executor(f'mkdir {files_directory}')
         file_writer(file_path, generate_excel_file().getvalue(), 'utf8', 'BINARY')
 
         pipeline_builder = sdc_builder.get_pipeline_builder()
@@ -710,7 +703,7 @@ def test_directory_origin_configuration_excel_header_option(sdc_builder, sdc_exe
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True).snapshot
         output_records = snapshot[directory.instance_name].output
 
@@ -722,7 +715,7 @@ def test_directory_origin_configuration_excel_header_option(sdc_builder, sdc_exe
             assert output_records[0].field == OrderedDict([('column1', 'Field11'), ('column2', 'ఫీల్డ్12'),
                                                            ('column3', 'fält13')])
     finally:
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
         sdc_executor.stop_pipeline(pipeline)
 
 
@@ -753,8 +746,8 @@ def test_directory_origin_configuration_field_path_to_regex_group_mapping(sdc_bu
 
 
 @pytest.mark.parametrize('file_name_pattern', ['pattern_check_processing_1.txt', '*.txt', 'pattern_*', '*_check_*'])
-def test_directory_origin_configuration_file_name_pattern(sdc_builder, sdc_executor, shell_executor,
-                                                          file_writer, file_name_pattern):
+def test_directory_origin_configuration_file_name_pattern(sdc_builder, sdc_executor, pipeline_pool, files_remover,
+                                                          files_writer, file_name_pattern):
     """Check Directory origin can read files with different patterns.
     Here we have two files pattern_check_processing_1.txt & pattern_check_processing_2.txt.
     Patterns '*.txt', 'pattern_*', '*_check_*' -> Should match both files and directory origin should
@@ -767,8 +760,9 @@ def test_directory_origin_configuration_file_name_pattern(sdc_builder, sdc_execu
                      get_text_file_content(2, 1)]
 
     try:
-        files_directory = create_file_and_directory(files_name[0], files_content[0], shell_executor, file_writer)
-        file_writer(os.path.join(files_directory, files_name[1]), files_content[1])
+        files_directory = os.path.join('/tmp', get_random_string())
+        files_writer([(os.path.join(files_directory, file_name), file_content)
+                      for file_name, file_content in zip(files_name, files_content)])
 
         attributes = {'data_format': 'TEXT',
                       'file_name_pattern': file_name_pattern,
@@ -776,7 +770,7 @@ def test_directory_origin_configuration_file_name_pattern(sdc_builder, sdc_execu
                       'files_directory': files_directory}
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batches=2).snapshot
         sdc_executor.stop_pipeline(pipeline)
 
@@ -787,12 +781,12 @@ def test_directory_origin_configuration_file_name_pattern(sdc_builder, sdc_execu
         else:
             assert raw_data == processed_data
     finally:
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('file_name_pattern_mode', ['GLOB', 'REGEX'])
-def test_directory_origin_configuration_file_name_pattern_mode(sdc_builder, sdc_executor, shell_executor,
-                                                               file_writer, file_name_pattern_mode):
+def test_directory_origin_configuration_file_name_pattern_mode(sdc_builder, sdc_executor, pipeline_pool, files_remover,
+                                                               files_writer, file_name_pattern_mode):
     """Check how DC process different file pattern mode. Here we will be creating 2 files:
     ``pattern_check_processing_1.txt`` and ``pattern_check_processing_2.txt``.
     with regex we match only 1st file and with glob both files.
@@ -804,8 +798,9 @@ def test_directory_origin_configuration_file_name_pattern_mode(sdc_builder, sdc_
     number_of_batches = 2 if file_name_pattern_mode == 'GLOB' else 1
 
     try:
-        files_directory = create_file_and_directory(files_name[0], files_content[0], shell_executor, file_writer)
-        file_writer(os.path.join(files_directory, files_name[1]), files_content[1])
+        files_directory = os.path.join('/tmp', get_random_string())
+        files_writer([(os.path.join(files_directory, file_name), file_content)
+                      for file_name, file_content in zip(files_name, files_content)])
 
         attributes = {'data_format':'TEXT',
                       'files_directory':files_directory,
@@ -813,7 +808,7 @@ def test_directory_origin_configuration_file_name_pattern_mode(sdc_builder, sdc_
                       'file_name_pattern':file_name_pattern}
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batches=number_of_batches).snapshot
 
         raw_data = '\n'.join(files_content)
@@ -824,14 +819,16 @@ def test_directory_origin_configuration_file_name_pattern_mode(sdc_builder, sdc_
             assert files_content[0] == processed_data
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('data_format', ['TEXT', 'DELIMITED', 'JSON', 'LOG', 'SDC_JSON', 'XML'])
 @pytest.mark.parametrize('compression_format', ['ARCHIVE', 'COMPRESSED_ARCHIVE'])
 def test_directory_origin_configuration_file_name_pattern_within_compressed_directory(sdc_builder, sdc_executor,
-                                                                                      data_format, compression_format,
-                                                                                      shell_executor, file_writer,
+                                                                                      pipeline_pool, data_format,
+                                                                                      compression_format,
+                                                                                      shell_executor, files_remover,
+                                                                                      file_writer,
                                                                                       delimited_file_writer,
                                                                                       compressed_file_writer):
     """Verify direcotry origin can read data from compressed files with GLOB pattern.
@@ -852,8 +849,7 @@ def test_directory_origin_configuration_file_name_pattern_within_compressed_dire
     try:
         json_data = None
         if data_format == 'DELIMITED':
-            files_directory = create_file_and_directory(file_name, file_content, shell_executor,
-                                                                          delimited_file_writer, 'CSV')
+            files_directory = create_file_and_directory(file_name, file_content, delimited_file_writer, 'CSV')
         elif data_format == 'SDC_JSON':
             files_directory = os.path.join('/tmp', get_random_string())
             file_name = file_name.replace('.json', '*.json')
@@ -862,8 +858,7 @@ def test_directory_origin_configuration_file_name_pattern_within_compressed_dire
             compressed_file_writer(files_directory, data_format, 'NONE', file_content, 'NONE',
                                    'compression_format_test')
         else:
-            files_directory = create_file_and_directory(file_name, file_content, shell_executor,
-                                                                          file_writer)
+            files_directory = create_file_and_directory(file_name, file_content, file_writer)
 
         if compression_format == 'ARCHIVE':
             shell_executor(f'cd {files_directory} '
@@ -887,11 +882,11 @@ def test_directory_origin_configuration_file_name_pattern_within_compressed_dire
                       'json_content': 'MULTIPLE_OBJECTS'}
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-        execute_pipeline_and_verify_output(sdc_executor, directory, pipeline, data_format, file_content,
+        execute_pipeline_and_verify_output(sdc_executor, pipeline_pool, directory, pipeline, data_format, file_content,
                                            json_data)
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('file_post_processing', ['ARCHIVE', 'DELETE', 'NONE'])
@@ -905,8 +900,8 @@ def test_directory_origin_configuration_files_directory(sdc_builder, sdc_executo
     pass
 
 
-def test_directory_origin_configuration_first_file_to_process(sdc_builder, sdc_executor,
-                                                              file_writer, shell_executor):
+def test_directory_origin_configuration_first_file_to_process(sdc_builder, sdc_executor, pipeline_pool,
+                                                              files_writer, files_remover):
     files_directory = os.path.join('/tmp', get_random_string())
     FIRST_FILE_NAME = 'b.txt'
     FIRST_FILE_CONTENTS = 'This is file b'
@@ -915,9 +910,8 @@ def test_directory_origin_configuration_first_file_to_process(sdc_builder, sdc_e
 
     try:
         logger.debug('Creating files directory %s ...', files_directory)
-        shell_executor(f'mkdir {files_directory}')
-        file_writer(os.path.join(files_directory, FIRST_FILE_NAME), FIRST_FILE_CONTENTS)
-        file_writer(os.path.join(files_directory, EARLIER_FILE_NAME), EARLIER_FILE_CONTENTS)
+        files_writer([(os.path.join(files_directory, FIRST_FILE_NAME), FIRST_FILE_CONTENTS),
+                      (os.path.join(files_directory, EARLIER_FILE_NAME), EARLIER_FILE_CONTENTS)])
 
         pipeline_builder = sdc_builder.get_pipeline_builder()
         directory = pipeline_builder.add_stage('Directory')
@@ -929,7 +923,7 @@ def test_directory_origin_configuration_first_file_to_process(sdc_builder, sdc_e
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batches=2).snapshot
         records = [record.field
                    for batch in snapshot.snapshot_batches
@@ -938,7 +932,7 @@ def test_directory_origin_configuration_first_file_to_process(sdc_builder, sdc_e
         assert records[0] == {'text': FIRST_FILE_CONTENTS}
         sdc_executor.stop_pipeline(pipeline)
     finally:
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
         if sdc_executor.get_pipeline_status(pipeline).response.json().get('status') == 'RUNNING':
             sdc_executor.stop_pipeline(pipeline)
 
@@ -965,8 +959,8 @@ def test_directory_origin_configuration_header_line(sdc_builder, sdc_executor, d
 
 
 @pytest.mark.parametrize('ignore_control_characters', [True, False])
-def test_directory_origin_configuration_ignore_control_characters_text(sdc_builder, sdc_executor,
-                                                                       ignore_control_characters, shell_executor,
+def test_directory_origin_configuration_ignore_control_characters_text(sdc_builder, sdc_executor, pipeline_pool,
+                                                                       ignore_control_characters, files_remover,
                                                                        file_writer):
     """Check if directory origin honours ignore_control_characters parameter.
     When set to true it should ignore all control characters.
@@ -975,12 +969,12 @@ def test_directory_origin_configuration_ignore_control_characters_text(sdc_build
     file_name = 'ignore_ctrl_chars.txt'
     file_content = 'File \0 with \a control characters with normal \v string to \f check the ignore control characters parameter.'
     try:
-        files_directory = create_file_and_directory(file_name, file_content, shell_executor, file_writer)
+        files_directory = create_file_and_directory(file_name, file_content, file_writer)
 
         attributes = get_control_characters_attributes('TEXT', files_directory, ignore_control_characters)
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True).snapshot
         record = snapshot[directory].output[0]
         if ignore_control_characters:
@@ -988,13 +982,13 @@ def test_directory_origin_configuration_ignore_control_characters_text(sdc_build
         else:
             assert record.field['text'] == 'File \x00 with \a control characters with normal \v string to \f check the ignore control characters parameter.'
     finally:
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
         sdc_executor.stop_pipeline(pipeline)
 
 
 @pytest.mark.parametrize('ignore_control_characters', [True, False])
-def test_directory_origin_configuration_ignore_control_characters_delimited(sdc_builder, sdc_executor,
-                                                                            ignore_control_characters, shell_executor,
+def test_directory_origin_configuration_ignore_control_characters_delimited(sdc_builder, sdc_executor, pipeline_pool,
+                                                                            ignore_control_characters, files_remover,
                                                                             delimited_file_writer):
     """Check if directory origin honours ignore_control_characters parameter.
     When set to true it should ignore all control characters.
@@ -1005,14 +999,14 @@ def test_directory_origin_configuration_ignore_control_characters_delimited(sdc_
     file_content = [['field1', 'field2', 'field3'], ['Field\0 11', 'Field\v12', 'Fie\fld\a13']]
 
     try:
-        files_directory = create_file_and_directory(file_name, file_content, shell_executor, delimited_file_writer,
+        files_directory = create_file_and_directory(file_name, file_content, delimited_file_writer,
                                                     'CSV')
 
         attributes = get_control_characters_attributes('DELIMITED', files_directory, ignore_control_characters)
         attributes['header_line'] = 'WITH_HEADER'
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batch_size=3).snapshot
         output_records = snapshot[directory.instance_name].output
 
@@ -1024,14 +1018,14 @@ def test_directory_origin_configuration_ignore_control_characters_delimited(sdc_
             assert output_records[0].field == OrderedDict([('field1', 'Field\x00 11'), ('field2', 'Field\v12'),
                                                            ('field3', 'Fie\fld\a13')])
     finally:
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
         sdc_executor.stop_pipeline(pipeline)
 
 
 @pytest.mark.parametrize('ignore_control_characters', [True, False])
 @pytest.mark.skip('Not yet implemented')
 def test_directory_origin_configuration_ignore_control_characters_json(sdc_builder, sdc_executor,
-                                                                       ignore_control_characters, shell_executor,
+                                                                       ignore_control_characters,
                                                                        file_writer):
     """Directory origin not able to read json data with control characters.
     Filed bug :- https://issues.streamsets.com/browse/SDC-11604.
@@ -1040,8 +1034,8 @@ def test_directory_origin_configuration_ignore_control_characters_json(sdc_build
 
 
 @pytest.mark.parametrize('ignore_control_characters', [True, False])
-def test_directory_origin_configuration_ignore_control_characters_log(sdc_builder, sdc_executor,
-                                                                      ignore_control_characters, shell_executor,
+def test_directory_origin_configuration_ignore_control_characters_log(sdc_builder, sdc_executor, pipeline_pool,
+                                                                      ignore_control_characters, files_remover,
                                                                       file_writer):
     """Check if directory origin honours ignore_control_characters parameter.
     When set to true it should ignore all control characters.
@@ -1050,13 +1044,13 @@ def test_directory_origin_configuration_ignore_control_characters_log(sdc_builde
     file_name = 'ignore_ctrl_chars.log'
     file_content = '200 [main] DEBUG org.StreamSets.Log4j unknown - Th\fis is sam\aple l\0og message\v'
     try:
-        files_directory = create_file_and_directory(file_name, file_content, shell_executor, file_writer)
+        files_directory = create_file_and_directory(file_name, file_content, file_writer)
 
         attributes = get_control_characters_attributes('LOG', files_directory, ignore_control_characters)
         attributes.update({'log_format': 'LOG4J'})
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True).snapshot
         record = snapshot[directory].output[0]
         if ignore_control_characters:
@@ -1064,14 +1058,14 @@ def test_directory_origin_configuration_ignore_control_characters_log(sdc_builde
         else:
             assert record.field['message'] == 'Th\fis is sam\aple l\x00og message\v'
     finally:
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
         sdc_executor.stop_pipeline(pipeline)
 
 
 @pytest.mark.parametrize('ignore_control_characters', [True, False])
 @pytest.mark.skip('Not yet implemented')
 def test_directory_origin_configuration_ignore_control_characters_xml(sdc_builder, sdc_executor,
-                                                                       ignore_control_characters, shell_executor,
+                                                                       ignore_control_characters,
                                                                        file_writer):
     """Directory origin not able to read XML data with control characters.
     Filed bug :- https://issues.streamsets.com/browse/SDC-11604.
@@ -1082,7 +1076,7 @@ def test_directory_origin_configuration_ignore_control_characters_xml(sdc_builde
 @pytest.mark.parametrize('ignore_control_characters', [True, False])
 @pytest.mark.skip('Not yet implemented')
 def test_directory_origin_configuration_ignore_control_characters_datagram(sdc_builder, sdc_executor,
-                                                                       ignore_control_characters, shell_executor,
+                                                                       ignore_control_characters,
                                                                        file_writer):
     """Directory origin does not support Datagram, NetFlow abd Binary data formats."""
     pass
@@ -1109,8 +1103,8 @@ def test_directory_origin_configuration_include_custom_delimiter(sdc_builder, sd
 
 @pytest.mark.parametrize('data_format', ['XML'])
 @pytest.mark.parametrize('include_field_xpaths', [True, False])
-def test_directory_origin_configuration_include_field_xpaths(sdc_builder, sdc_executor, shell_executor, file_writer,
-                                                             data_format, include_field_xpaths):
+def test_directory_origin_configuration_include_field_xpaths(sdc_builder, sdc_executor, pipeline_pool, files_remover,
+                                                             file_writer, data_format, include_field_xpaths):
     """Test for Directory origin can read XML file with include field xpath parameter as true or false.
     Here we will be creating XML file with namespaces .
 
@@ -1133,7 +1127,7 @@ def test_directory_origin_configuration_include_field_xpaths(sdc_builder, sdc_ex
                             </b:book>
                         </bookstore>"""
     try:
-        files_directory = create_file_and_directory(FILE_NAME, FILE_CONTENTS, shell_executor,file_writer)
+        files_directory = create_file_and_directory(FILE_NAME, FILE_CONTENTS, file_writer)
         attributes= {'data_format':data_format,
                                  'files_directory':files_directory,
                                  'file_name_pattern':'xml_include_xpath_file*',
@@ -1142,7 +1136,7 @@ def test_directory_origin_configuration_include_field_xpaths(sdc_builder, sdc_ex
                                  'include_field_xpaths':include_field_xpaths}
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batch_size=3).snapshot
         item_list = [output.field for output in snapshot[directory.instance_name].output]
         rows_from_snapshot = [{item['title'][0]['value'].value: item['prc:price'][0]['value'].value}
@@ -1179,7 +1173,7 @@ def test_directory_origin_configuration_include_field_xpaths(sdc_builder, sdc_ex
             assert 'attributes' not in field_info['prc:price']['value'][0]['value']['value']
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('data_format', ['JSON'])
@@ -1247,8 +1241,8 @@ def test_directory_origin_configuration_max_record_length_in_chars(sdc_builder,
 
 @pytest.mark.parametrize('data_format', ['XML'])
 @pytest.mark.parametrize('max_record_length_in_chars', [238, 240, 260])
-def test_directory_origin_configuration_max_record_length_in_chars_xml(sdc_builder, sdc_executor, shell_executor,
-                                                                       file_writer, data_format,
+def test_directory_origin_configuration_max_record_length_in_chars_xml(sdc_builder, sdc_executor, pipeline_pool,
+                                                                       files_remover, file_writer, data_format,
                                                                        max_record_length_in_chars):
     """Case 1:   Record length > max_record_length | Expected outcome --> Record to error
     Case 2:   Record length = max_record_length | Expected outcome --> Record processed
@@ -1266,7 +1260,6 @@ def test_directory_origin_configuration_max_record_length_in_chars_xml(sdc_build
 
     try:
         logger.debug('Creating files directory %s ...', files_directory)
-        shell_executor(f'mkdir {files_directory}')
         file_writer(os.path.join(files_directory, FILE_NAME), FILE_CONTENTS)
 
         pipeline_builder = sdc_builder.get_pipeline_builder()
@@ -1281,7 +1274,7 @@ def test_directory_origin_configuration_max_record_length_in_chars_xml(sdc_build
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batch_size=3).snapshot
         output_records = snapshot[directory.instance_name].output
 
@@ -1298,7 +1291,7 @@ def test_directory_origin_configuration_max_record_length_in_chars_xml(sdc_build
             assert rows_from_snapshot == expected_data
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('data_format', ['NETFLOW'])
@@ -1322,7 +1315,8 @@ def test_directory_origin_configuration_message_type(sdc_builder, sdc_executor,
 
 
 @pytest.mark.parametrize('data_format', ['XML'])
-def test_directory_origin_configuration_namespaces(sdc_builder, sdc_executor, shell_executor, file_writer, data_format):
+def test_directory_origin_configuration_namespaces(sdc_builder, sdc_executor, pipeline_pool, files_remover,
+                                                   file_writer, data_format):
     """Test for Directory origin can read XML files with namespaces.
     Here we will be creating XML file with namespaces and parsing the XML document using namespace prefix.
     """
@@ -1352,7 +1346,6 @@ def test_directory_origin_configuration_namespaces(sdc_builder, sdc_executor, sh
                       </root>"""
     try:
         logger.debug('Creating files directory %s ...', files_directory)
-        shell_executor(f'mkdir {files_directory}')
         file_writer(os.path.join(files_directory, FILE_NAME), FILE_CONTENTS)
 
         pipeline_builder = sdc_builder.get_pipeline_builder()
@@ -1367,7 +1360,7 @@ def test_directory_origin_configuration_namespaces(sdc_builder, sdc_executor, sh
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batch_size=3).snapshot
         item_list = [output.field for output in snapshot[directory.instance_name].output]
         rows_from_snapshot = [{item['time'][0]['value'].value: item['request'][0]['value'].value}
@@ -1379,7 +1372,7 @@ def test_directory_origin_configuration_namespaces(sdc_builder, sdc_executor, sh
         assert rows_from_snapshot == expected_data
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('data_format', ['DELIMITED'])
@@ -1411,8 +1404,9 @@ def test_directory_origin_configuration_on_record_error(sdc_builder, sdc_executo
 
 @pytest.mark.parametrize('data_format', ['XML'])
 @pytest.mark.parametrize('output_field_attributes', [False, True])
-def test_directory_origin_configuration_output_field_attributes(sdc_builder, sdc_executor, shell_executor, file_writer,
-                                                                data_format, output_field_attributes):
+def test_directory_origin_configuration_output_field_attributes(sdc_builder, sdc_executor, pipeline_pool,
+                                                                files_remover, file_writer, data_format,
+                                                                output_field_attributes):
     """Test for Directory origin can read XML file with Output field attributes parameter as true or false.
     Here we will be creating XML file with namespaces .
 
@@ -1436,7 +1430,6 @@ def test_directory_origin_configuration_output_field_attributes(sdc_builder, sdc
                             </bookstore>"""
     try:
         logger.debug('Creating files directory %s ...', files_directory)
-        shell_executor(f'mkdir {files_directory}')
         file_writer(os.path.join(files_directory, FILE_NAME), FILE_CONTENTS)
 
         pipeline_builder = sdc_builder.get_pipeline_builder()
@@ -1451,7 +1444,7 @@ def test_directory_origin_configuration_output_field_attributes(sdc_builder, sdc
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batch_size=3).snapshot
         item_list = [output.field for output in snapshot[directory.instance_name].output]
         rows_from_snapshot = [{item['title'][0]['value'].value: item['prc:price'][0]['value'].value}
@@ -1472,7 +1465,7 @@ def test_directory_origin_configuration_output_field_attributes(sdc_builder, sdc
             assert 'attributes' not in output_records[0]._data['value']
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('data_format', ['DELIMITED'])
@@ -1484,8 +1477,8 @@ def test_directory_origin_configuration_parse_nulls(sdc_builder, sdc_executor, d
 
 @pytest.mark.parametrize('read_order', ['TIMESTAMP'])
 @pytest.mark.parametrize('process_subdirectories', [False, True])
-def test_directory_origin_configuration_process_subdirectories(sdc_builder, sdc_executor, read_order,
-                                                               process_subdirectories, shell_executor, file_writer):
+def test_directory_origin_configuration_process_subdirectories(sdc_builder, sdc_executor, pipeline_pool, read_order,
+                                                               process_subdirectories, files_remover, files_writer):
     """Check if the process_subdirectories configuration works properly. Here we will create  two files one
     in root level (direcotry which we process) and one in nested directory.
     """
@@ -1494,11 +1487,11 @@ def test_directory_origin_configuration_process_subdirectories(sdc_builder, sdc_
     no_of_batches = 2 if process_subdirectories else 1
 
     try:
-        files_directory = create_file_and_directory(files_name[0], files_content[0], shell_executor, file_writer)
+        files_directory = os.path.join('/tmp', get_random_string())
         inner_directory = os.path.join(files_directory, get_random_string())
-        logger.debug('Creating nested direcotry within files directory %s ...', files_directory)
-        shell_executor(f'mkdir -p {inner_directory}')
-        file_writer(os.path.join(inner_directory, files_name[1]), files_content[1])
+        logger.debug('Creating files directory %s with nested directory %s ...', files_directory, inner_directory)
+        files_writer([(os.path.join(files_directory, files_name[0]), files_content[0]),
+                      (os.path.join(inner_directory, files_name[1]), files_content[1])])
 
         attributes = {'data_format': 'TEXT',
                       'files_directory': files_directory,
@@ -1509,10 +1502,11 @@ def test_directory_origin_configuration_process_subdirectories(sdc_builder, sdc_
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
         raw_data = "\n".join(files_content) if process_subdirectories else files_content[0]
-        execute_pipeline_and_verify_output(sdc_executor, directory, pipeline, 'TEXT', raw_data, None, no_of_batches)
+        execute_pipeline_and_verify_output(sdc_executor, pipeline_pool, directory, pipeline, 'TEXT', raw_data, None,
+                                           no_of_batches)
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('data_format', ['PROTOBUF'])
@@ -1525,9 +1519,9 @@ def test_directory_origin_configuration_protobuf_descriptor_file(sdc_builder, sd
 @pytest.mark.parametrize('data_format', ['DELIMITED'])
 @pytest.mark.parametrize('quote_character', ['\t', ';' , ' '])
 @pytest.mark.parametrize('delimiter_character', ['^'])
-def test_directory_origin_configuration_quote_character(sdc_builder, sdc_executor, delimiter_format_type, data_format,
-                                                        quote_character, shell_executor, delimited_file_writer,
-                                                        delimiter_character):
+def test_directory_origin_configuration_quote_character(sdc_builder, sdc_executor, pipeline_pool, delimiter_format_type,
+                                                        data_format, quote_character, files_remover,
+                                                        delimited_file_writer, delimiter_character):
     """Verify if directory origin can read delimited data with custom quote character.
     This TC check for different escape characters. Input data fields have delimiter characters.
     Directory origin should read this data and produce field without escape character.
@@ -1542,7 +1536,7 @@ def test_directory_origin_configuration_quote_character(sdc_builder, sdc_executo
             [f('{quote_character}Field{delimiter_character}21{quote_character}'), 'Field22', 'Field23']]
 
     try:
-        files_directory = create_file_and_directory(file_name, data, shell_executor, delimited_file_writer,
+        files_directory = create_file_and_directory(file_name, data, delimited_file_writer,
                                                     delimiter_format_type, delimiter_character)
 
         attributes = {'data_format': data_format,
@@ -1554,7 +1548,7 @@ def test_directory_origin_configuration_quote_character(sdc_builder, sdc_executo
                       'quote_character': quote_character}
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batch_size=3).snapshot
         output_records = snapshot[directory.instance_name].output
 
@@ -1562,25 +1556,24 @@ def test_directory_origin_configuration_quote_character(sdc_builder, sdc_executo
         verify_delimited_output(output_records, expected_output)
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('data_format', ['WHOLE_FILE'])
-def test_directory_origin_configuration_rate_per_second(sdc_builder, sdc_executor, data_format, shell_executor):
+def test_directory_origin_configuration_rate_per_second(sdc_builder, sdc_executor, pipeline_pool, data_format,
+                                                        files_remover):
     """Test if Directory origin honours rate_per_second attribute. Here we will run pipeline with its 2 values
     We will check number of records / files read is greater when rate is set to 1 MB as compare to 0.5 MB value.
     """
     files_directory = os.path.join('/tmp', get_random_string())
 
     try:
-        logger.debug('Creating files directory %s ...', files_directory)
-        shell_executor(f'mkdir {files_directory}')
         write_multiple_files(sdc_builder, sdc_executor, files_directory, 'rate_per')
 
         def run_pipeline(attributes):
             directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-            sdc_executor.add_pipeline(pipeline)
+            pipeline_pool.add_pipeline(pipeline)
             sdc_executor.start_pipeline(pipeline)
             time.sleep(1)
             sdc_executor.stop_pipeline(pipeline)
@@ -1603,11 +1596,11 @@ def test_directory_origin_configuration_rate_per_second(sdc_builder, sdc_executo
         # We can at least expect more number of records read when this value is increased.
         assert msgs_result_count2 > msgs_result_count1
     finally:
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('read_order', ['LEXICOGRAPHICAL', 'TIMESTAMP'])
-def test_directory_origin_configuration_read_order(sdc_builder, sdc_executor, shell_executor,
+def test_directory_origin_configuration_read_order(sdc_builder, sdc_executor, pipeline_pool, files_remover,
                                                    file_writer, read_order):
     """Check how Directory origin read files in order given. We will create two files b_read_order_check.txt
     and a_read_order_check.txt
@@ -1620,7 +1613,7 @@ def test_directory_origin_configuration_read_order(sdc_builder, sdc_executor, sh
     file_content_2 = get_text_file_content(1, 1)
 
     try:
-        files_directory = create_file_and_directory(file_name_1, file_content_1, shell_executor, file_writer)
+        files_directory = create_file_and_directory(file_name_1, file_content_1, file_writer)
         file_writer(os.path.join(files_directory, file_name_2), file_content_2)
 
         attributes = {'data_format': 'TEXT',
@@ -1630,7 +1623,7 @@ def test_directory_origin_configuration_read_order(sdc_builder, sdc_executor, sh
                       'read_order': read_order}
         directory, pipeline = get_directory_to_trash_pipeline(sdc_builder, attributes)
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batches=2).snapshot
         processed_data = snapshot_content(snapshot, directory)
 
@@ -1641,7 +1634,7 @@ def test_directory_origin_configuration_read_order(sdc_builder, sdc_executor, sh
         assert raw_data == '\n'.join(processed_data)
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('data_format', ['NETFLOW'])
@@ -1667,7 +1660,7 @@ def test_directory_origin_configuration_record_generation_mode(sdc_builder, sdc_
 @pytest.mark.parametrize('regular_expression',
                          [r'(\S+) (\S+) (\S+) (\S+) (\S+) (.*)', r'(\S+)(\W+)(\S+)\[(\W+)\](\S+)(\W+)'])
 def test_directory_origin_configuration_regular_expression(sdc_builder, sdc_executor, data_format,
-                                                           log_format, shell_executor, file_writer, regular_expression):
+                                                           log_format, files_remover, file_writer, regular_expression):
     """Check if the regular expression configuration works. Here we consider logs from DC as our test data.
     There are two interations of this test case. One with valid regex which should parse logs.
     Another with invalid regex which should produce null or no result.
@@ -1679,7 +1672,7 @@ def test_directory_origin_configuration_regular_expression(sdc_builder, sdc_exec
     field_path_to_regex_group_mapping = LOG_FIELD_MAPPING
 
     try:
-        files_directory = create_file_and_directory(file_name, file_content, shell_executor, file_writer)
+        files_directory = create_file_and_directory(file_name, file_content, file_writer)
 
         attributes = {'data_format': data_format,
                       'log_format': log_format,
@@ -1697,7 +1690,7 @@ def test_directory_origin_configuration_regular_expression(sdc_builder, sdc_exec
             execute_and_verify_log_regex_output(sdc_executor, directory, pipeline)
     finally:
         sdc_executor.stop_pipeline(pipeline)
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
 
 
 @pytest.mark.parametrize('data_format', ['LOG'])
@@ -1758,9 +1751,9 @@ def test_directory_origin_configuration_template_cache_timeout_in_ms(sdc_builder
 @pytest.mark.parametrize('log_format', ['LOG4J'])
 @pytest.mark.parametrize('on_parse_error', ['INCLUDE_AS_STACK_TRACE'])
 @pytest.mark.parametrize('trim_stack_trace_to_length', [2])
-def test_directory_origin_configuration_trim_stack_trace_to_length(sdc_builder, sdc_executor,
+def test_directory_origin_configuration_trim_stack_trace_to_length(sdc_builder, sdc_executor, pipeline_pool,
                                                                    data_format, log_format, on_parse_error,
-                                                                   trim_stack_trace_to_length, shell_executor,
+                                                                   trim_stack_trace_to_length, files_remover,
                                                                    file_writer):
     """The stack trace will be trimmed to the specified number of lines.
     """
@@ -1773,7 +1766,6 @@ def test_directory_origin_configuration_trim_stack_trace_to_length(sdc_builder,
                     'at com.example.myproject.Author.getBookTitles(Author.java:25)']
     file_contents = '\n'.join(input_content)
     try:
-        shell_executor(f'mkdir {files_directory}')
         file_writer(file_path, file_contents)
 
         pipeline_builder = sdc_builder.get_pipeline_builder()
@@ -1788,7 +1780,7 @@ def test_directory_origin_configuration_trim_stack_trace_to_length(sdc_builder,
         directory >> trash
         pipeline = pipeline_builder.build()
 
-        sdc_executor.add_pipeline(pipeline)
+        pipeline_pool.add_pipeline(pipeline)
         snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True).snapshot
         output_records = snapshot[directory.instance_name].output
 
@@ -1797,7 +1789,7 @@ def test_directory_origin_configuration_trim_stack_trace_to_length(sdc_builder,
         assert output_records[0].field['message'] == expected_output
 
     finally:
-        shell_executor(f'rm -r {files_directory}')
+        files_remover([files_directory])
         sdc_executor.stop_pipeline(pipeline)
 
 
@@ -1916,11 +1908,11 @@ def get_directory_to_trash_pipeline(sdc_builder, attributes):
     return directory, pipeline
 
 
-def create_file_and_directory(file_name, file_content, shell_executor, file_writer, delimiter_format_type=None,
-                          delimiter_character=None):
+def create_file_and_directory(file_name, file_content, file_writer, delimiter_format_type=None,
+                              delimiter_character=None):
+    """Writes the file into a new directory under /tmp, which the file writer creates along with the file."""
     files_directory = os.path.join('/tmp', get_random_string())
     logger.debug('Creating files directory %s ...', files_directory)
-    shell_executor(f'mkdir {files_directory}')
     file_path = os.path.join(files_directory, file_name)
     if delimiter_format_type:
         file_writer(file_path, file_content, delimiter_format_type, delimiter_character)
@@ -2017,9 +2009,9 @@ def get_data_format_content(data_format):
     return data_format_content[data_format]
 
 
-def execute_pipeline_and_verify_output(sdc_executor, directory, pipeline, data_format, file_content,
+def execute_pipeline_and_verify_output(sdc_executor, pipeline_pool, directory, pipeline, data_format, file_content,
                                        json_data=None, no_of_batches=1):
-    sdc_executor.add_pipeline(pipeline)
+    pipeline_pool.add_pipeline(pipeline)
     snapshot = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, batches=no_of_batches).snapshot
     output_records = snapshot[directory.instance_name].output
 
@@ -17,7 +17,6 @@ import logging
 import os
 import string
 import tempfile
-import time
 from zipfile import ZipFile
 
 import pytest
@@ -25,6 +24,9 @@ from streamsets.testframework.markers import aws, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 from xlwt import Workbook
 
+from .utils.utils_s3 import delete_s3_objects, upload_s3_objects
+from .utils.utils_wait import wait_for_pipeline_counter
+
 logger = logging.getLogger(__name__)
 
 # Sandbox prefix for S3 bucket
@@ -92,8 +94,8 @@ def test_s3_origin_multithread_start_stop(sdc_builder, sdc_executor, aws):
 
         for iteration in range(1, 4):
             # Insert objects into S3.
-            for i in range(s3_obj_count):
-                client.put_object(Bucket=aws.s3_bucket_name, Key=f'{s3_key}/{iteration}-{i}', Body=json.dumps(data))
+            upload_s3_objects(client, aws.s3_bucket_name,
+                              ((f'{s3_key}/{iteration}-{i}', json.dumps(data)) for i in range(s3_obj_count)))
 
             # In case of multithreaded pipeline we want to verify the amount of records.
             snapshot = sdc_executor.capture_snapshot(s3_origin_pipeline, start_pipeline=True).snapshot
@@ -124,10 +126,7 @@ def test_s3_origin_multithread_start_stop(sdc_builder, sdc_executor, aws):
 
     finally:
         # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in
-                                   client.list_objects_v2(Bucket=aws.s3_bucket_name, Prefix=s3_key)['Contents']]}
-        client.delete_objects(Bucket=aws.s3_bucket_name, Delete=delete_keys)
+        delete_s3_objects(client, aws.s3_bucket_name, s3_key)
 
 
 @aws('s3')
@@ -205,8 +204,7 @@ def base_s3_origin(sdc_builder, sdc_executor, aws, read_order, data_format, numb
     client = aws.s3
     try:
         # Insert objects into S3.
-        for i in range(s3_obj_count):
-            client.put_object(Bucket=s3_bucket, Key=f'{s3_key}/{i}', Body=json.dumps(json_data))
+        upload_s3_objects(client, s3_bucket, ((f'{s3_key}/{i}', json.dumps(json_data)) for i in range(s3_obj_count)))
 
         if number_of_threads == SINGLETHREADED:
             # Snapshot the pipeline and compare the records.
@@ -230,10 +228,7 @@ def base_s3_origin(sdc_builder, sdc_executor, aws, read_order, data_format, numb
     finally:
         if number_of_records > 0:
             # Clean up S3.
-            delete_keys = {'Objects': [{'Key': k['Key']}
-                                       for k in
-                                       client.list_objects_v2(Bucket=s3_bucket, Prefix=s3_key)['Contents']]}
-            client.delete_objects(Bucket=s3_bucket, Delete=delete_keys)
+            delete_s3_objects(client, s3_bucket, s3_key)
 
 
 def verify_data_formats(output_records, raw_str, data_format):
@@ -277,7 +272,8 @@ def test_s3_origin_empty_bucket(sdc_builder, sdc_executor, aws):
 
     sdc_executor.start_pipeline(s3_origin_pipeline)
 
-    time.sleep(10)
+    # An empty bucket still yields (empty) batches, wait for the first one to make sure the bucket was listed.
+    wait_for_pipeline_counter(sdc_executor, s3_origin_pipeline, 'pipeline.batchCount.counter', 1)
 
     sdc_executor.stop_pipeline(s3_origin_pipeline)
 
@@ -438,9 +434,7 @@ def test_s3_event_finisher(sdc_builder, sdc_executor, aws):
             logger.info('Stopping pipeline')
             sdc_executor.stop_pipeline(s3_origin_pipeline)
         # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in client.list_objects_v2(Bucket=s3_bucket, Prefix=s3_key)['Contents']]}
-        client.delete_objects(Bucket=s3_bucket, Delete=delete_keys)
+        delete_s3_objects(client, s3_bucket, s3_key)
 
 
 # SDC-11176 S3 Origin is only sending one no-more-data event, it should send one if there is some refill of data
@@ -531,9 +525,7 @@ if (state['record-count'] >= 2):
             sdc_executor.stop_pipeline(s3_origin_pipeline)
 
         # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in client.list_objects_v2(Bucket=s3_bucket, Prefix=s3_key)['Contents']]}
-        client.delete_objects(Bucket=s3_bucket, Delete=delete_keys)
+        delete_s3_objects(client, s3_bucket, s3_key)
 
 
 @aws('s3')
@@ -585,8 +577,7 @@ def test_s3_multiple_records_in_object(sdc_builder, sdc_executor, aws):
     client = aws.s3
     try:
         # Insert objects into S3.
-        for i in range(S3_OBJ_COUNT):
-            client.put_object(Bucket=s3_bucket, Key=f'{s3_key}{i}', Body=json.dumps(data))
+        upload_s3_objects(client, s3_bucket, ((f'{s3_key}{i}', json.dumps(data)) for i in range(S3_OBJ_COUNT)))
 
         # Snapshot the pipeline and compare the records.
         snapshot = sdc_executor.capture_snapshot(s3_origin_pipeline, start_pipeline=True).snapshot
@@ -605,10 +596,7 @@ def test_s3_multiple_records_in_object(sdc_builder, sdc_executor, aws):
 
     finally:
         # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in
-                                   client.list_objects_v2(Bucket=s3_bucket, Prefix=s3_key)['Contents']]}
-        client.delete_objects(Bucket=s3_bucket, Delete=delete_keys)
+        delete_s3_objects(client, s3_bucket, s3_key)
 
 
 # SDC-11163: Amazon S3 origin never removes POLL_OFFSET key on upgrade
@@ -677,10 +665,7 @@ def test_offset_upgrade(sdc_builder, sdc_executor, aws):
         assert history.latest.metrics.counter('pipeline.batchOutputRecords.counter').count == 2
     finally:
         # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in
-                                   client.list_objects_v2(Bucket=s3_bucket, Prefix=s3_key)['Contents']]}
-        client.delete_objects(Bucket=s3_bucket, Delete=delete_keys)
+        delete_s3_objects(client, s3_bucket, s3_key)
 
 
 # SDC-11410: S3 Origin reads excel files
@@ -767,9 +752,7 @@ def test_s3_excel_offset(sdc_builder, sdc_executor, aws):
             logger.info('Stopping pipeline')
             sdc_executor.stop_pipeline(s3_origin_pipeline)
         # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in client.list_objects_v2(Bucket=s3_bucket, Prefix=s3_key)['Contents']]}
-        client.delete_objects(Bucket=s3_bucket, Delete=delete_keys)
+        delete_s3_objects(client, s3_bucket, s3_key)
 
 
 @aws('s3')
@@ -857,9 +840,7 @@ def test_s3_compressed_file_offset(sdc_builder, sdc_executor, aws):
             logger.info('Stopping pipeline')
             sdc_executor.stop_pipeline(s3_origin_pipeline)
         # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in client.list_objects_v2(Bucket=s3_bucket)['Contents']]}
-        client.delete_objects(Bucket=s3_bucket, Delete=delete_keys)
+        delete_s3_objects(client, s3_bucket, s3_key)
 
 
 @aws('s3')
@@ -931,10 +912,7 @@ def test_s3_origin_timestamp_last_file_offset(sdc_builder, sdc_executor, aws, re
         if sdc_executor.get_pipeline_status(s3_origin_pipeline).response.json().get('status') == 'RUNNING':
             sdc_executor.stop_pipeline(s3_origin_pipeline, force=True)
         # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in
-                                   client.list_objects_v2(Bucket=aws.s3_bucket_name, Prefix=s3_key)['Contents']]}
-        client.delete_objects(Bucket=aws.s3_bucket_name, Delete=delete_keys)
+        delete_s3_objects(client, aws.s3_bucket_name, s3_key)
 
 
 @aws('s3')
@@ -998,10 +976,7 @@ def test_s3_restart_with_file_offset(sdc_builder, sdc_executor, aws, read_order)
         if sdc_executor.get_pipeline_status(s3_origin_pipeline).response.json().get('status') == 'RUNNING':
             sdc_executor.stop_pipeline(s3_origin_pipeline, force=True)
         # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in
-                                   client.list_objects_v2(Bucket=aws.s3_bucket_name, Prefix=s3_key)['Contents']]}
-        client.delete_objects(Bucket=aws.s3_bucket_name, Delete=delete_keys)
+        delete_s3_objects(client, aws.s3_bucket_name, s3_key)
 
 # SDC-11925: Allow specifying subset of sheets to import when reading Excel files
 @aws('s3')
@@ -1063,9 +1038,7 @@ def test_s3_excel_sheet_selection(sdc_builder, sdc_executor, aws, read_all_sheet
 
     finally:
         # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in client.list_objects_v2(Bucket=s3_bucket, Prefix=s3_key)['Contents']]}
-        client.delete_objects(Bucket=s3_bucket, Delete=delete_keys)
+        delete_s3_objects(client, s3_bucket, s3_key)
 
 
 # SDC-11926: Add ability to skip cells that have no associated header when reading from Excel
@@ -1126,9 +1099,7 @@ def test_s3_excel_skip_cells_missing_header(sdc_builder, sdc_executor, aws, skip
 
     finally:
         # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in client.list_objects_v2(Bucket=s3_bucket, Prefix=s3_key)['Contents']]}
-        client.delete_objects(Bucket=s3_bucket, Delete=delete_keys)
+        delete_s3_objects(client, s3_bucket, s3_key)
 
 # SDC-11924: Better handling of various error header states in Excel parser
 @aws('s3')
@@ -1183,6 +1154,4 @@ def test_s3_excel_parsing_incomplete_header(sdc_builder, sdc_executor, aws):
 
     finally:
         # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in client.list_objects_v2(Bucket=s3_bucket, Prefix=s3_key)['Contents']]}
-        client.delete_objects(Bucket=s3_bucket, Delete=delete_keys)
\ No newline at end of file
+        delete_s3_objects(client, s3_bucket, s3_key)
\ No newline at end of file
@@ -16,12 +16,13 @@ from datetime import datetime
 import json
 import logging
 import string
-import time
 
 from streamsets.sdk.models import Configuration
 from streamsets.testframework.markers import aws, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from .utils.utils_wait import wait_until
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
@@ -88,8 +89,8 @@ def test_kinesis_consumer(sdc_builder, sdc_executor, aws):
 def test_kinesis_consumer_at_timestamp(sdc_builder, sdc_executor, aws):
     """Test for Kinesis consumer origin stage, with AT_TIMESTAMP option. We do so by:
         - 1. Publishing data to a test stream
-        - 2. Wait some time and store current timestamp
-        - 3. Publishing new data
+        - 2. Publishing new data
+        - 3. Storing the arrival timestamp of the first new record
         - 4. Using Kinesis client to attempt reading from stored timestamp, passing it to the AT_TIMESTAMP option
         - 5. Assert that only the newest data has been read
 
@@ -112,14 +113,28 @@ def test_kinesis_consumer_at_timestamp(sdc_builder, sdc_executor, aws):
         put_records = [{'Data': f'First Message {i}', 'PartitionKey': '111'} for i in range(10)]
         client.put_records(Records=put_records, StreamName=stream_name)
 
-        # 2. Wait and store timestamp
-        time.sleep(10)
-        timestamp = int(time.time())*1000
-
-        # 3. Publish new data
+        # 2. Publish new data
         put_records = [{'Data': f'Second Message {i}', 'PartitionKey': '111'} for i in range(10)]
         client.put_records(Records=put_records, StreamName=stream_name)
 
+        # 3. Use the arrival time of the first new record, as recorded by Kinesis, as timestamp. GetRecords may return
+        # partial results, hence the wait.
+        shard_id = client.describe_stream(StreamName=stream_name)['StreamDescription']['Shards'][0]['ShardId']
+
+        def get_stream_records():
+            shard_iterator = client.get_shard_iterator(StreamName=stream_name, ShardId=shard_id,
+                                                       ShardIteratorType='TRIM_HORIZON')['ShardIterator']
+            records = client.get_records(ShardIterator=shard_iterator)['Records']
+            return records if len(records) == 2 * len(put_records) else None
+
+        stream_records = wait_until(get_stream_records, description=f'records to be readable from {stream_name}')
+        first_arrivals = [record['ApproximateArrivalTimestamp'] for record in stream_records
+                          if record['Data'].startswith(b'First')]
+        second_arrivals = [record['ApproximateArrivalTimestamp'] for record in stream_records
+                           if record['Data'].startswith(b'Second')]
+        assert max(first_arrivals) < min(second_arrivals)
+        timestamp = int(min(second_arrivals).timestamp() * 1000)
+
         # 4. Build consumer pipeline using timestamp
         builder = sdc_builder.get_pipeline_builder()
         builder.add_error_stage('Discard')
@@ -577,20 +592,31 @@ def test_firehose_destination_to_s3(sdc_builder, sdc_executor, aws):
         sdc_executor.start_pipeline(firehose_dest_pipeline).wait_for_pipeline_output_records_count(record_count)
         sdc_executor.stop_pipeline(firehose_dest_pipeline)
 
-        # wait till data is available in S3. We do so by querying for buffer wait time and sleep till then
+        # wait till data is available in S3. Firehose delivers after its buffer interval, so allow for that and
+        # then some.
         resp = firehose_client.describe_delivery_stream(DeliveryStreamName=stream_name)
         dests = resp['DeliveryStreamDescription']['Destinations'][0]
         wait_secs = dests['ExtendedS3DestinationDescription']['BufferingHints']['IntervalInSeconds']
-        time.sleep(wait_secs+15)  # few seconds more to wait to make sure S3 gets the data
 
         # Firehose S3 object naming http://docs.aws.amazon.com/firehose/latest/dev/basic-deliver.html#s3-object-name
         # read data to assert
-        list_s3_objs = s3_client.list_objects_v2(Bucket=s3_bucket, Prefix=datetime.utcnow().strftime("%Y/%m/%d"))
-        for s3_content in list_s3_objs['Contents']:
-            akey = s3_content['Key']
-            aobj = s3_client.get_object(Bucket=s3_bucket, Key=akey)
-            if aobj['Body'].read().decode().strip() == random_raw_str:
-                s3_put_keys.append(akey)
+        checked_keys = set()
+
+        def delivered_keys():
+            list_s3_objs = s3_client.list_objects_v2(Bucket=s3_bucket,
+                                                     Prefix=datetime.utcnow().strftime("%Y/%m/%d"))
+            for s3_content in list_s3_objs.get('Contents', []):
+                akey = s3_content['Key']
+                if akey not in checked_keys:
+                    checked_keys.add(akey)
+                    aobj = s3_client.get_object(Bucket=s3_bucket, Key=akey)
+                    if aobj['Body'].read().decode().strip() == random_raw_str:
+                        s3_put_keys.append(akey)
+            return len(s3_put_keys) >= record_count
+
+        wait_until(delivered_keys, timeout_sec=wait_secs + 120, poll_interval_sec=5,
+                   description=f'{record_count} Firehose objects in {s3_bucket}',
+                   diagnostics=lambda: f'found {len(s3_put_keys)} matching objects')
 
         assert len(s3_put_keys) == record_count
     finally:
@@ -28,7 +28,6 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 HDP_LIBRARY_NAME = 'streamsets-datacollector-hdp_2_6-lib'
-SDC_RPC_PORT = 20000 # Specify a port for SDC RPC stages to use.
 
 
 @pytest.fixture(scope='module')
@@ -41,7 +40,7 @@ def sdc_common_hook():
 
 @azure('wasb')
 @sdc_min_version('3.2.0.0')
-def test_hadoop_fs_standalone_origin_simple(sdc_builder, sdc_executor, azure):
+def test_hadoop_fs_standalone_origin_simple(sdc_builder, sdc_executor, azure, free_port):
     """Test for Hadoop FS standalone origin using Azure Storage Blob. Since the origin is multithreaded, we use
     SDC RPC destination and origin wiring to snapshot capture the single batch and assert. The pipeline looks like:
 
@@ -73,7 +72,7 @@ def test_hadoop_fs_standalone_origin_simple(sdc_builder, sdc_executor, azure):
     pipeline_finished_executor.set_attributes(stage_record_preconditions=["${record:eventType() == 'no-more-data'}"])
 
     sdc_rpc_destination = builder.add_stage('SDC RPC', type='destination')
-    sdc_rpc_destination.sdc_rpc_connection.append('{}:{}'.format(sdc_executor.server_host, SDC_RPC_PORT))
+    sdc_rpc_destination.sdc_rpc_connection.append('{}:{}'.format(sdc_executor.server_host, free_port))
     sdc_rpc_destination.sdc_rpc_id = get_random_string(string.ascii_letters, 10)
 
     hadoop_fs_standalone >= pipeline_finished_executor
@@ -84,7 +83,7 @@ def test_hadoop_fs_standalone_origin_simple(sdc_builder, sdc_executor, azure):
     builder = sdc_builder.get_pipeline_builder()
 
     sdc_rpc_origin = builder.add_stage('SDC RPC', type='origin')
-    sdc_rpc_origin.sdc_rpc_listening_port = SDC_RPC_PORT
+    sdc_rpc_origin.sdc_rpc_listening_port = free_port
     sdc_rpc_origin.sdc_rpc_id = sdc_rpc_destination.sdc_rpc_id
 
     trash = builder.add_stage('Trash')
@@ -30,8 +30,6 @@ logger.setLevel(logging.DEBUG)
 # Spark executor was renamed in SDC-10697, so we need to reference it by name.
 SPARK_EXECUTOR_STAGE_NAME = 'com_streamsets_datacollector_pipeline_executor_spark_SparkDExecutor'
 
-# Specify a port for SDC RPC stages to use.
-SDC_RPC_PORT = 20000
 SNAPSHOT_TIMEOUT_SEC = 120
 
 DEFAULT_IMPALA_DB = 'default'
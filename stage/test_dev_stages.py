@@ -13,7 +13,6 @@
 # limitations under the License.
 
 import logging
-from time import sleep
 
 import pytest
 from streamsets.sdk import sdc_api
@@ -21,6 +20,8 @@ from streamsets.sdk.exceptions import ValidationError
 from streamsets.testframework.markers import rpmpackaging, sdc_min_version
 from streamsets.testframework.utils import Version
 
+from .utils.utils_wait import wait_until
+
 logger = logging.getLogger(__name__)
 
 pytestmark = [rpmpackaging]
@@ -100,10 +101,8 @@ def test_pipeline_metrics(sdc_executor, pipeline):
 
     first_metrics_json = sdc_executor.api_client.get_pipeline_metrics(pipeline.id)
     assert first_metrics_json is not None
-    sleep(15)
-    second_metrics_json = sdc_executor.api_client.get_pipeline_metrics(pipeline.id)
-    assert second_metrics_json is not None
-    assert first_metrics_json != second_metrics_json
+    wait_until(lambda: sdc_executor.api_client.get_pipeline_metrics(pipeline.id) not in (None, first_metrics_json),
+               description='pipeline metrics to change')
 
     sdc_executor.stop_pipeline(pipeline)
     assert sdc_executor.api_client.get_pipeline_metrics(pipeline.id) == {}
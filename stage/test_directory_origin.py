@@ -19,11 +19,12 @@ import pytest
 import random
 import string
 import tempfile
-import time
 
 from streamsets.testframework.markers import sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from .utils.utils_wait import wait_for_pipeline_counter
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
@@ -135,15 +136,16 @@ def test_directory_origin_order_by_timestamp(sdc_builder, sdc_executor, no_of_th
     sdc_executor.start_pipeline(files_pipeline).wait_for_pipeline_batch_count(10)
     sdc_executor.stop_pipeline(files_pipeline)
 
-    # wait till 2nd pipeline reads all files
-    time.sleep(10)
-    sdc_executor.stop_pipeline(directory_pipeline)
-
-    # Validate history is as expected
     file_pipeline_history = sdc_executor.get_pipeline_history(files_pipeline)
     msgs_sent_count1 = file_pipeline_history.entries[4].metrics.counter('pipeline.batchOutputRecords.counter').count
     msgs_sent_count2 = file_pipeline_history.latest.metrics.counter('pipeline.batchOutputRecords.counter').count
 
+    # wait till 2nd pipeline reads all files
+    wait_for_pipeline_counter(sdc_executor, directory_pipeline, 'pipeline.batchOutputRecords.counter',
+                              msgs_sent_count1 + msgs_sent_count2)
+    sdc_executor.stop_pipeline(directory_pipeline)
+
+    # Validate history is as expected
     directory_pipeline_history = sdc_executor.get_pipeline_history(directory_pipeline)
     msgs_result_count = directory_pipeline_history.latest.metrics.counter('pipeline.batchOutputRecords.counter').count
 
@@ -15,16 +15,16 @@
 import base64
 import logging
 import math
-import time
 import uuid
 from datetime import datetime
 from string import ascii_letters, ascii_lowercase
-from time import sleep
 
 from google.cloud.bigquery import Dataset, SchemaField, Table
 from streamsets.testframework.markers import gcp, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from .utils.utils_wait import wait_until
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_COLUMN_FAMILY_NAME = 'cf'  # for Google Bigtable
@@ -392,11 +392,9 @@ def test_google_pubsub_publisher(sdc_builder, sdc_executor, gcp):
         # Open the subscription, passing the callback.
         future = pubsub_subscriber_client.subscribe(subscription_path, callback)
 
-        timeout = 5  # in seconds
-        start_time = time.time()
-        while time.time() < start_time + timeout and msgs_to_be_received > 0:
-            sleep(0.5)
-            logger.info('To be received messages %d...', msgs_to_be_received)
+        wait_until(lambda: msgs_to_be_received <= 0, timeout_sec=5,
+                   description=f'{msgs_sent_count} messages on {subscription_path}',
+                   diagnostics=lambda: f'{msgs_to_be_received} messages still to be received')
 
         future.cancel()  # cancel the feature there by stopping subscribers
 
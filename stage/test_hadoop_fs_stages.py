@@ -26,9 +26,6 @@ from streamsets.testframework.utils import get_random_string
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-# Specify a port for SDC RPC stages to use.
-SDC_RPC_LISTENING_PORT = 20000
-
 # Duration for which pipeline would run in case of long-running test/s.
 LARGE_TEST_DURATION_IN_SECS = 3600
 # Duration at which pipeline status will be checked for long-running test/s.
@@ -183,7 +180,7 @@ def test_hadoop_fs_destination_time_basis(sdc_builder, sdc_executor, cluster):
 
 
 @cluster('cdh', 'hdp')
-def test_hadoop_fs_origin_simple(sdc_builder, sdc_executor, cluster):
+def test_hadoop_fs_origin_simple(sdc_builder, sdc_executor, cluster, free_port):
     """Write a simple file into a Hadoop FS folder with a randomly-generated name and confirm that the Hadoop FS origin
     successfully reads it. Because cluster mode pipelines don't support snapshots, we do this verification using a
     second standalone pipeline whose origin is an SDC RPC written to by the Hadoop FS pipeline. Specifically, this would
@@ -204,8 +201,7 @@ def test_hadoop_fs_origin_simple(sdc_builder, sdc_executor, cluster):
     hadoop_fs.input_paths.append(hadoop_fs_folder)
 
     sdc_rpc_destination = builder.add_stage('SDC RPC', type='destination')
-    sdc_rpc_destination.sdc_rpc_connection.append('{}:{}'.format(sdc_executor.server_host,
-                                                                 SDC_RPC_LISTENING_PORT))
+    sdc_rpc_destination.sdc_rpc_connection.append('{}:{}'.format(sdc_executor.server_host, free_port))
     sdc_rpc_destination.sdc_rpc_id = get_random_string(string.ascii_letters, 10)
 
     hadoop_fs >> sdc_rpc_destination
@@ -217,7 +213,7 @@ def test_hadoop_fs_origin_simple(sdc_builder, sdc_executor, cluster):
     builder.add_error_stage('Discard')
 
     sdc_rpc_origin = builder.add_stage('SDC RPC', type='origin')
-    sdc_rpc_origin.sdc_rpc_listening_port = SDC_RPC_LISTENING_PORT
+    sdc_rpc_origin.sdc_rpc_listening_port = free_port
     sdc_rpc_origin.sdc_rpc_id = sdc_rpc_destination.sdc_rpc_id
     # Since YARN jobs take a while to get going, set RPC origin batch wait time to 5 min. to avoid
     # getting an empty batch in the snapshot.
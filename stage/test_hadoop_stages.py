@@ -18,13 +18,14 @@ another.
 """
 import logging
 import string
-import time
 
 import pytest
 import sqlalchemy
 from streamsets.testframework.markers import cluster, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from .utils.utils_wait import wait_until
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
@@ -85,22 +86,14 @@ def test_avro_orc_mapreduce_executor(sdc_builder, sdc_executor, cluster):
         snapshot = sdc_executor.start_pipeline(pipeline).wait_for_pipeline_output_records_count(total_records, timeout_sec=3600)
         sdc_executor.stop_pipeline(pipeline).wait_for_stopped()
 
-        hdfs_files = []
-        sleep_time = 10
-        max_wait_iters = 50
-        for wait_iter in range(max_wait_iters):
+        def orc_files_converted():
             hdfs_files = cluster.hdfs.client.list(hdfs_directory)
             logger.info('List of files in %s directory: %s', hdfs_directory, ",".join(hdfs_files))
-            total_orc_files = sum(1 for hdfs_file in hdfs_files if hdfs_file.endswith('orc'))
-            if total_orc_files == 3:
-                break
-            else:
-                logger.info('Waiting for %d seconds (up to %d more times) for all files in %s to be converted to ORC',
-                             sleep_time, max_wait_iters - wait_iter, hdfs_directory)
-                time.sleep(sleep_time)
-        else:
-            pytest.fail(f'Reached {max_wait_iters} iterations without reaching expected '
-                        f'number of orc files (saw {total_orc_files})')
+            return sum(1 for hdfs_file in hdfs_files if hdfs_file.endswith('orc')) == 3
+
+        wait_until(orc_files_converted, timeout_sec=500, max_poll_interval_sec=10,
+                   description=f'all files in {hdfs_directory} to be converted to ORC',
+                   diagnostics=lambda: f'files: {cluster.hdfs.client.list(hdfs_directory)}')
 
         #TODO: also check contents of ORC files once STF-439 is done
 
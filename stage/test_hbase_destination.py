@@ -24,9 +24,6 @@ from streamsets.testframework.utils import get_random_string
 
 logger = logging.getLogger(__name__)
 
-# Specify a port for SDC RPC stages to use.
-SDC_RPC_PORT = 20000
-
 
 @pytest.fixture(autouse=True)
 def version_check(sdc_builder, cluster):
@@ -109,9 +109,9 @@ def http_client_pipeline(sdc_builder, sdc_executor):
 
 
 @http
-def test_http(sdc_executor, http_server_pipeline, http_client_pipeline):
+def test_http(sdc_executor, http_server_pipeline, http_client_pipeline, free_port):
     # Start HTTP Server pipeline.
-    server_runtime_parameters = {'HTTP_PORT': 9999,
+    server_runtime_parameters = {'HTTP_PORT': free_port,
                                  'APPLICATION_ID': 'HTTP_APPLICATION_ID',
                                  'NEW_FIELD_NAME': 'javscriptField',
                                  'NEW_FIELD_VALUE': 5000}
@@ -123,7 +123,7 @@ def test_http(sdc_executor, http_server_pipeline, http_client_pipeline):
 
     # Start and capture snapshot for HTTP Client pipeline.
     client_runtime_parameters = {'RAW_DATA': '{"f1": "abc"}{"f1": "xyz"}',
-                                 'RESOURCE_URL': 'http://localhost:9999',
+                                 'RESOURCE_URL': f'http://localhost:{free_port}',
                                  'APPLICATION_ID': 'HTTP_APPLICATION_ID'}
 
     snapshot = sdc_executor.capture_snapshot(http_client_pipeline.pipeline, start_pipeline=True,
@@ -154,10 +154,10 @@ def test_http(sdc_executor, http_server_pipeline, http_client_pipeline):
 
 
 @http
-def test_http_client_target_wrong_host(sdc_executor, http_client_pipeline):
+def test_http_client_target_wrong_host(sdc_executor, http_client_pipeline, free_port):
     # Start HTTP Client pipeline with invalid resource URL.
     client_runtime_parameters = {'RAW_DATA': '{"f1": "abc"}{"f1": "xyz"}',
-                                 'RESOURCE_URL': 'http://localhost:9999',
+                                 'RESOURCE_URL': f'http://localhost:{free_port}',
                                  'APPLICATION_ID': 'HTTP_APPLICATION_ID'}
     snapshot = sdc_executor.capture_snapshot(http_client_pipeline.pipeline, start_pipeline=True,
                                              runtime_parameters=client_runtime_parameters).snapshot
@@ -382,9 +382,9 @@ def test_http_client_source_simple(sdc_builder, sdc_executor, http_client):
 
 @http
 @sdc_min_version("3.8.0")
-def test_http_server_method_restriction(sdc_executor, http_server_pipeline):
+def test_http_server_method_restriction(sdc_executor, http_server_pipeline, free_port):
     """HTTP Server Origin should actively disallow TRACE and TRACK HTTP request methods"""
-    server_runtime_parameters = {'HTTP_PORT': 9999,
+    server_runtime_parameters = {'HTTP_PORT': free_port,
                                  'APPLICATION_ID': 'HTTP_APPLICATION_ID',
                                  'NEW_FIELD_NAME': 'javscriptField',
                                  'NEW_FIELD_VALUE': 5000}
@@ -395,12 +395,12 @@ def test_http_server_method_restriction(sdc_executor, http_server_pipeline):
     assert attributes.get('RUNTIME_PARAMETERS').get('APPLICATION_ID') == 'HTTP_APPLICATION_ID'
 
     # Try to push records using prohibited HTTP methods. Expecting HTTP status: 405 Method Not Allowed
-    h1 = httpclient.HTTPConnection(sdc_executor.server_host, 9999)
+    h1 = httpclient.HTTPConnection(sdc_executor.server_host, free_port)
     h1.request('TRACE', '/', '{"f1": "abc"}{"f1": "xyz"}', {'X-SDC-APPLICATION-ID': 'HTTP_APPLICATION_ID'})
     resp = h1.getresponse()
     assert resp.status == 405
 
-    h2 = httpclient.HTTPConnection(sdc_executor.server_host, 9999)
+    h2 = httpclient.HTTPConnection(sdc_executor.server_host, free_port)
     h2.request('TRACK', '/', '{"f1": "abc"}{"f1": "xyz"}', {'X-SDC-APPLICATION-ID': 'HTTP_APPLICATION_ID'})
     resp = h2.getresponse()
     assert resp.status == 405
@@ -26,6 +26,9 @@ from streamsets.testframework.environments.databases import OracleDatabase, SQLS
 from streamsets.testframework.markers import credentialstore, database, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from .utils.utils_snapshot import SnapshotView
+from .utils.utils_wait import assert_holds_for, get_pipeline_counter, wait_for_pipeline_counter
+
 logger = logging.getLogger(__name__)
 
 ROWS_IN_DATABASE = [
@@ -300,8 +303,13 @@ def test_jdbc_multitable_consumer_with_no_more_data_event_generation_delay(sdc_b
         # We start the pipeline
         sdc_executor.start_pipeline(pipeline)
 
-        # We wait three seconds - one second for the no-more-data to be generated and then some buffer time
+        # We wait for the table's record to be processed. Stage counters are only updated once a batch is done, so
+        # the no-more-data event cannot be waited for directly: the delay stage holds its batch for 10 seconds.
+        wait_for_pipeline_counter(sdc_executor, pipeline, f'stage.{trash.instance_name}.inputRecords.counter', 1)
+        # The no-more-data event follows one second later; give it time to get into the delay stage, well before the
+        # delay stage is done with it.
         time.sleep(3)
+        assert get_pipeline_counter(sdc_executor, pipeline, f'stage.{delay.instance_name}.inputRecords.counter') == 0
 
         # Then we try to stop the pipeline, now the pipeline should not stop immediately and should in-fact wait
         sdc_executor.stop_pipeline(pipeline).wait_for_stopped()
@@ -359,60 +367,18 @@ def _create_table(table_name, database, schema_name=None):
         The new table as a sqlalchemy.Table object.
 
     """
-    metadata = sqlalchemy.MetaData()
-
-    if type(database) == SQLServerDatabase:
-        table = sqlalchemy.Table(table_name,
-                                 metadata,
-                                 sqlalchemy.Column('name', sqlalchemy.String(32)),
-                                 sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True,
-                                                   autoincrement=False),
-                                 schema=schema_name)
-    else:
-        table = sqlalchemy.Table(table_name,
-                                 metadata,
-                                 sqlalchemy.Column('name', sqlalchemy.String(32)),
-                                 sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
-                                 schema=schema_name)
+    table = sqlalchemy.Table(table_name, sqlalchemy.MetaData(), *_table_columns(database), schema=schema_name)
 
     logger.info('Creating table %s in %s database ...', table_name, database.type)
     table.create(database.engine)
     return table
 
 
-def _create_schema(schema_name, database):
-    """Create a new schema in the database.
-
-    For RDBMs with no distinction between schema and database (e.g. MySQL), it creates a new database. For Oracle, it
-    creates a new user. For databases with schema objects, it creates a new schema.
-
-    Use ``_drop_schema()`` to remove schemas created by this function, to handle properly each case.
-
-    Args:
-        schema_name: (:obj:`str`) the schema name.
-        database: a :obj:`streamsets.testframework.environment.Database` object.
-
-    """
-    if isinstance(database, OracleDatabase):
-        database.engine.execute('CREATE USER {user} IDENTIFIED BY {pwd}'.format(user=schema_name, pwd=schema_name))
-        database.engine.execute('GRANT UNLIMITED TABLESPACE TO {user}'.format(user=schema_name))
-    else:
-        schema = sqlalchemy.schema.CreateSchema(schema_name)
-        database.engine.execute(schema)
-
-
-def _drop_schema(schema_name, database):
-    """Remove a schema from the given database.
-
-    Args:
-        schema_name: (:obj:`str`) name of the schema to remove.
-        database: a :obj:`streamsets.testframework.environment.Database` object.
-
-    """
-    if isinstance(database, OracleDatabase):
-        database.engine.execute('DROP USER {user}'.format(user=schema_name))
-    else:
-        sqlalchemy.schema.DropSchema(schema_name)
+def _table_columns(database):
+    """Columns of the tables created by ``_create_table()``, for use with the ``table_factory`` fixture."""
+    return [sqlalchemy.Column('name', sqlalchemy.String(32)),
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True,
+                              autoincrement=False if type(database) == SQLServerDatabase else 'auto')]
 
 
 @credentialstore
@@ -921,8 +887,10 @@ def test_jdbc_multitable_consumer_initial_offset_at_the_end(sdc_builder, sdc_exe
         sdc_executor.add_pipeline(pipeline)
         sdc_executor.start_pipeline(pipeline)
 
-        # Since the pipeline is not meant to read anything, we 'simply' wait
-        time.sleep(5)
+        # Since the pipeline is not meant to read anything, we make sure nothing is read for a while
+        assert_holds_for(lambda: get_pipeline_counter(sdc_executor, pipeline,
+                                                      'pipeline.batchInputRecords.counter') == 0,
+                         duration_sec=5, description='no records being read')
 
         sdc_executor.stop_pipeline(pipeline)
 
@@ -995,7 +963,7 @@ def test_jdbc_producer_multirow_with_duplicates(sdc_builder, sdc_executor, datab
 
 
 @database
-def test_jdbc_producer_multitable(sdc_builder, sdc_executor, database):
+def test_jdbc_producer_multitable(sdc_builder, sdc_executor, database, table_factory):
     """Test for JDBC Producer with multiple destination table. We create 3 tables in the default schema and use an EL
     expression to insert records according to the /table record field.
 
@@ -1008,9 +976,8 @@ def test_jdbc_producer_multitable(sdc_builder, sdc_executor, database):
     table2_name = _get_random_name(database, prefix='stf_table_')
     table3_name = _get_random_name(database, prefix='stf_table_')
 
-    table1 = _create_table(table1_name, database)
-    table2 = _create_table(table2_name, database)
-    table3 = _create_table(table3_name, database)
+    table1, table2, table3 = table_factory.create([table_factory.table(table_name, *_table_columns(database))
+                                                   for table_name in (table1_name, table2_name, table3_name)])
 
     ROWS = [{'table': table1_name, 'id': 1, 'name': 'Roger Federer'},
             {'table': table2_name, 'id': 2, 'name': 'Rafael Nadal'},
@@ -1034,37 +1001,30 @@ def test_jdbc_producer_multitable(sdc_builder, sdc_executor, database):
 
     sdc_executor.add_pipeline(pipeline)
 
-    try:
-        sdc_executor.start_pipeline(pipeline).wait_for_pipeline_output_records_count(len(ROWS))
-        sdc_executor.stop_pipeline(pipeline)
-
-        result1 = database.engine.execute(table1.select())
-        result2 = database.engine.execute(table2.select())
-        result3 = database.engine.execute(table3.select())
+    sdc_executor.start_pipeline(pipeline).wait_for_pipeline_output_records_count(len(ROWS))
+    sdc_executor.stop_pipeline(pipeline)
 
-        data1 = result1.fetchall()
-        data2 = result2.fetchall()
-        data3 = result3.fetchall()
+    result1 = database.engine.execute(table1.select())
+    result2 = database.engine.execute(table2.select())
+    result3 = database.engine.execute(table3.select())
 
-        assert data1 == [(ROWS[0]['name'], ROWS[0]['id'])]
-        assert data2 == [(ROWS[1]['name'], ROWS[1]['id'])]
-        assert data3 == [(ROWS[2]['name'], ROWS[2]['id'])]
+    data1 = result1.fetchall()
+    data2 = result2.fetchall()
+    data3 = result3.fetchall()
 
-        result1.close()
-        result2.close()
-        result3.close()
+    assert data1 == [(ROWS[0]['name'], ROWS[0]['id'])]
+    assert data2 == [(ROWS[1]['name'], ROWS[1]['id'])]
+    assert data3 == [(ROWS[2]['name'], ROWS[2]['id'])]
 
-    finally:
-        logger.info('Dropping tables %s, %s, %s in %s database...', table1_name, table2_name, table3_name, database.type)
-        table1.drop(database.engine)
-        table2.drop(database.engine)
-        table3.drop(database.engine)
+    result1.close()
+    result2.close()
+    result3.close()
 
 
 # Test SDC-10719
 @database
 @sdc_min_version('3.8.0')
-def test_jdbc_producer_multischema(sdc_builder, sdc_executor, database):
+def test_jdbc_producer_multischema(sdc_builder, sdc_executor, database, table_factory):
     """Test for JDBC Producer in a multischema scenario with a single destination table for each schema. We create 3
     schemas with one table for each, with the same name. Then we use an EL expression to insert records according to
     the /schema record field.
@@ -1079,13 +1039,12 @@ def test_jdbc_producer_multischema(sdc_builder, sdc_executor, database):
     schema3_name = _get_random_name(database, prefix='stf_schema_')
     table_name = _get_random_name(database, prefix='stf_table_')
 
-    _create_schema(schema1_name, database)
-    _create_schema(schema2_name, database)
-    _create_schema(schema3_name, database)
+    for schema_name in (schema1_name, schema2_name, schema3_name):
+        table_factory.create_schema(schema_name)
 
-    table1 = _create_table(table_name, database, schema_name=schema1_name)
-    table2 = _create_table(table_name, database, schema_name=schema2_name)
-    table3 = _create_table(table_name, database, schema_name=schema3_name)
+    table1, table2, table3 = table_factory.create([table_factory.table(table_name, *_table_columns(database),
+                                                                       schema=schema_name)
+                                                   for schema_name in (schema1_name, schema2_name, schema3_name)])
 
     ROWS = [{'schema': schema1_name, 'id': 1, 'name': 'Roger Federer'},
             {'schema': schema2_name, 'id': 2, 'name': 'Rafael Nadal'},
@@ -1103,42 +1062,30 @@ def test_jdbc_producer_multischema(sdc_builder, sdc_executor, database):
 
     sdc_executor.add_pipeline(pipeline)
 
-    try:
-        sdc_executor.start_pipeline(pipeline).wait_for_pipeline_output_records_count(len(ROWS))
-        sdc_executor.stop_pipeline(pipeline)
-
-        result1 = database.engine.execute(table1.select())
-        result2 = database.engine.execute(table2.select())
-        result3 = database.engine.execute(table3.select())
+    sdc_executor.start_pipeline(pipeline).wait_for_pipeline_output_records_count(len(ROWS))
+    sdc_executor.stop_pipeline(pipeline)
 
-        data1 = result1.fetchall()
-        data2 = result2.fetchall()
-        data3 = result3.fetchall()
+    result1 = database.engine.execute(table1.select())
+    result2 = database.engine.execute(table2.select())
+    result3 = database.engine.execute(table3.select())
 
-        assert data1 == [(ROWS[0]['name'], ROWS[0]['id'])]
-        assert data2 == [(ROWS[1]['name'], ROWS[1]['id'])]
-        assert data3 == [(ROWS[2]['name'], ROWS[2]['id'])]
+    data1 = result1.fetchall()
+    data2 = result2.fetchall()
+    data3 = result3.fetchall()
 
-        result1.close()
-        result2.close()
-        result3.close()
+    assert data1 == [(ROWS[0]['name'], ROWS[0]['id'])]
+    assert data2 == [(ROWS[1]['name'], ROWS[1]['id'])]
+    assert data3 == [(ROWS[2]['name'], ROWS[2]['id'])]
 
-    finally:
-        logger.info('Dropping table %s in schemas...', table_name)
-        table1.drop(database.engine)
-        table2.drop(database.engine)
-        table3.drop(database.engine)
-
-        logger.info('Dropping schemas %s, %s, %s...', schema1_name, schema2_name, schema3_name)
-        _drop_schema(schema1_name, database)
-        _drop_schema(schema2_name, database)
-        _drop_schema(schema3_name, database)
+    result1.close()
+    result2.close()
+    result3.close()
 
 
 # Test SDC-10719
 @database
 @sdc_min_version('3.8.0')
-def test_jdbc_producer_multischema_multitable(sdc_builder, sdc_executor, database):
+def test_jdbc_producer_multischema_multitable(sdc_builder, sdc_executor, database, table_factory):
     """Test a JDBC Producer in a multischema scenario with different destination tables for each schema. We create 3
     schemas with one table for each, with different names. Then we use an EL expressions to insert records according to
     the /schema and /table record fields.
@@ -1160,13 +1107,14 @@ def test_jdbc_producer_multischema_multitable(sdc_builder, sdc_executor, databas
     table2_name = _get_random_name(database, prefix='stf_table_')
     table3_name = _get_random_name(database, prefix='stf_table_')
 
-    _create_schema(schema1_name, database)
-    _create_schema(schema2_name, database)
-    _create_schema(schema3_name, database)
+    for schema_name in (schema1_name, schema2_name, schema3_name):
+        table_factory.create_schema(schema_name)
 
-    table1 = _create_table(table1_name, database, schema_name=schema1_name)
-    table2 = _create_table(table2_name, database, schema_name=schema2_name)
-    table3 = _create_table(table3_name, database, schema_name=schema3_name)
+    table1, table2, table3 = table_factory.create([table_factory.table(table_name, *_table_columns(database),
+                                                                       schema=schema_name)
+                                                   for schema_name, table_name in ((schema1_name, table1_name),
+                                                                                   (schema2_name, table2_name),
+                                                                                   (schema3_name, table3_name))])
 
     ROWS = [{'schema': schema1_name, 'table': table1_name, 'id': 1, 'name': 'Roger Federer'},
             {'schema': schema2_name, 'table': table2_name, 'id': 2, 'name': 'Rafael Nadal'},
@@ -1189,36 +1137,24 @@ def test_jdbc_producer_multischema_multitable(sdc_builder, sdc_executor, databas
 
     sdc_executor.add_pipeline(pipeline)
 
-    try:
-        sdc_executor.start_pipeline(pipeline).wait_for_pipeline_output_records_count(len(ROWS))
-        sdc_executor.stop_pipeline(pipeline)
-
-        result1 = database.engine.execute(table1.select())
-        result2 = database.engine.execute(table2.select())
-        result3 = database.engine.execute(table3.select())
+    sdc_executor.start_pipeline(pipeline).wait_for_pipeline_output_records_count(len(ROWS))
+    sdc_executor.stop_pipeline(pipeline)
 
-        data1 = result1.fetchall()
-        data2 = result2.fetchall()
-        data3 = result3.fetchall()
+    result1 = database.engine.execute(table1.select())
+    result2 = database.engine.execute(table2.select())
+    result3 = database.engine.execute(table3.select())
 
-        assert data1 == [(ROWS[0]['name'], ROWS[0]['id'])]
-        assert data2 == [(ROWS[1]['name'], ROWS[1]['id'])]
-        assert data3 == [(ROWS[2]['name'], ROWS[2]['id'])]
+    data1 = result1.fetchall()
+    data2 = result2.fetchall()
+    data3 = result3.fetchall()
 
-        result1.close()
-        result2.close()
-        result3.close()
-
-    finally:
-        logger.info('Dropping tables %s, %s, %s...', table1_name, table2_name, table3_name)
-        table1.drop(database.engine)
-        table2.drop(database.engine)
-        table3.drop(database.engine)
+    assert data1 == [(ROWS[0]['name'], ROWS[0]['id'])]
+    assert data2 == [(ROWS[1]['name'], ROWS[1]['id'])]
+    assert data3 == [(ROWS[2]['name'], ROWS[2]['id'])]
 
-        logger.info('Dropping schemas %s, %s, %s...', schema1_name, schema2_name, schema3_name)
-        _drop_schema(schema1_name, database)
-        _drop_schema(schema2_name, database)
-        _drop_schema(schema3_name, database)
+    result1.close()
+    result2.close()
+    result3.close()
 
 
 # SDC-11063: Do not reoder update statements in JDBC destination
@@ -1744,7 +1680,9 @@ def test_jdbc_multitable_lost_nonincremental_offset(sdc_builder, sdc_executor, d
             sdc_executor.start_pipeline(pipeline)
 
             # Since the pipeline won't read anything, give it few seconds to "idle"
-            time.sleep(2)
+            assert_holds_for(lambda: get_pipeline_counter(sdc_executor, pipeline,
+                                                          'pipeline.batchInputRecords.counter') == 0,
+                             duration_sec=2, description='no records being read')
             sdc_executor.stop_pipeline(pipeline)
 
             # And it really should not have read anything!
@@ -1979,9 +1917,7 @@ def test_jdbc_multitable_consumer_partitioned_large_offset_gaps(sdc_builder, sdc
         sdc_executor.add_pipeline(pipeline)
         # need to capture two batches, one for row IDs 1-3, and one for the last row after the large gap
         snapshot = sdc_executor.capture_snapshot(pipeline=pipeline, batches=2, start_pipeline=True).snapshot
-        rows_from_snapshot = [(record.get_field_data('/name').value, record.get_field_data('/id').value)
-                               for batch in snapshot.snapshot_batches
-                               for record in batch.stage_outputs[jdbc_multitable_consumer.instance_name].output]
+        rows_from_snapshot = SnapshotView(snapshot)[jdbc_multitable_consumer].rows('/name', '/id')
 
         expected_data = [(row['name'], row['id']) for row in rows_with_gap]
         logger.info('Actual %s expected %s', rows_from_snapshot, expected_data)
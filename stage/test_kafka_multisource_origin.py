@@ -22,12 +22,13 @@ from streamsets.testframework.environments.cloudera import ClouderaManagerCluste
 from streamsets.testframework.markers import cluster, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from .utils.utils_kafka import produce_kafka_messages_batch
+from .utils.utils_wait import wait_until
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-# Specify a port for SDC RPC stages to use.
 SNAPSHOT_TIMEOUT_SEC = 120
-SDC_RPC_LISTENING_PORT = 21512
 
 
 @pytest.fixture(autouse=True)
@@ -46,7 +47,7 @@ def sdc_common_hook():
 
 @cluster('cdh', 'kafka')
 @sdc_min_version('3.6.0')
-def test_kafka_origin_timestamp_offset_strategy(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_timestamp_offset_strategy(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Check that accessing a topic for first time using TIMESTAMP offset strategy retrieves messages
     which timestamp >= Auto Offset Reset Timestamp configuration value.
 
@@ -68,7 +69,9 @@ def test_kafka_origin_timestamp_offset_strategy(sdc_builder, sdc_executor, clust
     builder = sdc_builder.get_pipeline_builder()
     kafka_multitopic_consumer = get_kafka_multitopic_consumer_stage(builder, cluster)
 
-    timestamp = produce_kafka_messages_in_different_timestamp(kafka_multitopic_consumer.topic_list[0], cluster, messages, 'TEXT', 2)
+    timestamp = produce_kafka_messages_in_different_timestamp(kafka_producer_pool,
+                                                              kafka_multitopic_consumer.topic_list[0], cluster,
+                                                              messages, 'TEXT', 2)
 
     kafka_multitopic_consumer.set_attributes(auto_offset_reset='TIMESTAMP',
                                   auto_offset_reset_timestamp_in_ms=int(timestamp),
@@ -93,7 +96,7 @@ def test_kafka_origin_timestamp_offset_strategy(sdc_builder, sdc_executor, clust
 # SDC-10501: Option to enable/disable Kafka auto commit Offsets
 @cluster('cdh', 'kafka')
 @sdc_min_version('3.6.0')
-def test_kafka_origin_not_saving_offset(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_not_saving_offset(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Ensure that we read all the data, even when a pipeline fails - thus no records are "auto committed". The test
        runs the same pipeline twice - once with failure and second time with success and ensures that the second run
        see all the records.
@@ -129,9 +132,7 @@ def test_kafka_origin_not_saving_offset(sdc_builder, sdc_executor, cluster):
     sdc_executor.add_pipeline(pipeline)
 
     # Produce one message
-    producer = cluster.kafka.producer()
-    producer.send(topic, 'Super Secret Message'.encode())
-    producer.flush()
+    produce_kafka_messages(kafka_producer_pool, topic, cluster, 'Super Secret Message'.encode(), 'TEXT')
 
     try:
         # Start our pipeline - it should fail
@@ -139,9 +140,7 @@ def test_kafka_origin_not_saving_offset(sdc_builder, sdc_executor, cluster):
 
         # Adding second message so that the topic have at least one new message, so that getting snapshot on older
         # versions wont't time out but returns immediately.
-        producer = cluster.kafka.producer()
-        producer.send(topic, 'Not So Super Secret Message'.encode())
-        producer.flush()
+        produce_kafka_messages(kafka_producer_pool, topic, cluster, 'Not So Super Secret Message'.encode(), 'TEXT')
 
         # Now run the pipeline second time and it should succeed
         snapshot = sdc_executor.capture_snapshot(pipeline, runtime_parameters={'DIVISOR': 1}, start_pipeline=True).snapshot
@@ -159,7 +158,7 @@ def test_kafka_origin_not_saving_offset(sdc_builder, sdc_executor, cluster):
 # SDC-10897: Kafka setting for Batch Wait Time and Max Batch Size not working in conjunction
 @cluster('cdh', 'kafka')
 @sdc_min_version('3.6.0')
-def test_kafka_origin_batch_max_size(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_batch_max_size(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Check that retrieving messages from Kafka using Kafka Multitopic Consumer respects both the Batch Max Wait Time
     and the Max Batch Size. Batches are sent when the first of the two conditions is met. This test is checking that
     the Max Batch Size condition is first met.
@@ -178,7 +177,7 @@ def test_kafka_origin_batch_max_size(sdc_builder, sdc_executor, cluster):
     builder = sdc_builder.get_pipeline_builder()
     kafka_multitopic_consumer = get_kafka_multitopic_consumer_stage(builder, cluster)
 
-    produce_kafka_messages_list(kafka_multitopic_consumer.topic_list[0], cluster, messages, 'TEXT')
+    produce_kafka_messages_list(kafka_producer_pool, kafka_multitopic_consumer.topic_list[0], cluster, messages, 'TEXT')
 
     kafka_multitopic_consumer.set_attributes(auto_offset_reset='EARLIEST',
                                              consumer_group=kafka_consumer_group,
@@ -218,7 +217,7 @@ def test_kafka_origin_batch_max_size(sdc_builder, sdc_executor, cluster):
 # SDC-10897: Kafka setting for Batch Wait Time and Max Batch Size not working in conjunction
 @cluster('cdh', 'kafka')
 @sdc_min_version('3.6.0')
-def test_kafka_origin_batch_max_wait_time(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_batch_max_wait_time(sdc_builder, sdc_executor, cluster, free_port, kafka_producer_pool):
     """Check that retrieving messages from Kafka using Kafka Multitopic Consumer respects both the Batch Max Wait Time
     and the Max Batch Size. Batches are sent when the first of the two conditions is met. This test is checking that
     the Batch Max Wait Time condition is first met.
@@ -240,7 +239,7 @@ def test_kafka_origin_batch_max_wait_time(sdc_builder, sdc_executor, cluster):
     builder = sdc_builder.get_pipeline_builder()
     kafka_multitopic_consumer = get_kafka_multitopic_consumer_stage(builder, cluster)
 
-    produce_kafka_messages_list(kafka_multitopic_consumer.topic_list[0], cluster, messages, 'TEXT')
+    produce_kafka_messages_list(kafka_producer_pool, kafka_multitopic_consumer.topic_list[0], cluster, messages, 'TEXT')
 
     kafka_multitopic_consumer.set_attributes(auto_offset_reset='EARLIEST',
                                              consumer_group=kafka_consumer_group,
@@ -248,7 +247,7 @@ def test_kafka_origin_batch_max_wait_time(sdc_builder, sdc_executor, cluster):
                                              batch_wait_time_in_ms=10)
 
     sdc_rpc_destination = builder.add_stage(name='com_streamsets_pipeline_stage_destination_sdcipc_SdcIpcDTarget')
-    sdc_rpc_destination.sdc_rpc_connection.append('{}:{}'.format(sdc_executor.server_host, SDC_RPC_LISTENING_PORT))
+    sdc_rpc_destination.sdc_rpc_connection.append('{}:{}'.format(sdc_executor.server_host, free_port))
     sdc_rpc_destination.sdc_rpc_id = sdc_rpc_id
 
     kafka_multitopic_consumer >> sdc_rpc_destination
@@ -261,7 +260,7 @@ def test_kafka_origin_batch_max_wait_time(sdc_builder, sdc_executor, cluster):
     # Build the rpc origin pipeline.
     builder = sdc_builder.get_pipeline_builder()
     sdc_rpc_origin = builder.add_stage(name='com_streamsets_pipeline_stage_origin_sdcipc_SdcIpcDSource')
-    sdc_rpc_origin.sdc_rpc_listening_port = SDC_RPC_LISTENING_PORT
+    sdc_rpc_origin.sdc_rpc_listening_port = free_port
     sdc_rpc_origin.sdc_rpc_id = sdc_rpc_id
 
     trash = builder.add_stage(label='Trash')
@@ -331,55 +330,35 @@ def get_kafka_multitopic_consumer_stage(pipeline_builder, cluster):
     return kafka_multitopic_consumer
 
 
-def produce_kafka_messages(topic, cluster, message, data_format):
+def produce_kafka_messages(producer_pool, topic, cluster, message, data_format):
     """Send basic messages to Kafka"""
-    # Get Kafka producer
-    producer = cluster.kafka.producer()
-
-    basic_data_formats = ['XML', 'CSV', 'SYSLOG', 'NETFLOW', 'COLLECTD', 'BINARY', 'LOG', 'TEXT', 'JSON']
-
-    # Write records into Kafka depending on the data_format.
-    if data_format in basic_data_formats:
-        producer.send(topic, message)
-
-    producer.flush()
+    produce_kafka_messages_batch(producer_pool, topic, cluster, [message], data_format)
 
 
-def produce_kafka_messages_list(topic, cluster, message_list, data_format):
+def produce_kafka_messages_list(producer_pool, topic, cluster, message_list, data_format):
     """Send basic messages from a list to Kafka"""
-    # Get Kafka producer
-    producer = cluster.kafka.producer()
-
-    basic_data_formats = ['XML', 'CSV', 'SYSLOG', 'NETFLOW', 'COLLECTD', 'BINARY', 'LOG', 'TEXT', 'JSON']
-
-    # Write records into Kafka depending on the data_format.
-    if data_format in basic_data_formats:
-        for message in message_list:
-            producer.send(topic, message.encode())
-
-    producer.flush()
+    produce_kafka_messages_batch(producer_pool, topic, cluster, [message.encode() for message in message_list],
+                                 data_format)
 
 
-def produce_kafka_messages_in_different_timestamp(topic, cluster, messages, data_format, num_messages_to_send_first):
-    """send num_messages_to_send_first messages, sleep 30 seconds, then send the rest of the messages and return the
-    timestamp value after the 30 seconds sleep (<= timestamp of first message in second batch and >= last message in
-    first batch)
+def produce_kafka_messages_in_different_timestamp(producer_pool, topic, cluster, messages, data_format,
+                                                  num_messages_to_send_first):
+    """send num_messages_to_send_first messages, wait for the clock to move on, then send the rest of the messages and
+    return a timestamp value that is <= timestamp of first message in second batch and > last message in first batch.
+    Message timestamps are set by the producer, i.e. by this host's clock.
     """
     timestamp = -1
     if num_messages_to_send_first < len(messages):
         # Send first batch of messages.
-        for i in range(0, num_messages_to_send_first):
-            message = messages[i]
-            produce_kafka_messages(topic, cluster, message.encode(), data_format)
+        produce_kafka_messages_list(producer_pool, topic, cluster, messages[:num_messages_to_send_first], data_format)
 
-        # Sleep for 30 seconds.
-        time.sleep(30)
-        timestamp = int(time.time() * 1000)
+        # Wait until the clock is past the timestamp of every message sent so far.
+        last_timestamp = int(time.time() * 1000)
+        timestamp = last_timestamp + 1
+        wait_until(lambda: int(time.time() * 1000) > last_timestamp, description='clock to move on')
 
         # Send second batch of messages.
-        for j in range(num_messages_to_send_first, len(messages)):
-            message = messages[j]
-            produce_kafka_messages(topic, cluster, message.encode(), data_format)
+        produce_kafka_messages_list(producer_pool, topic, cluster, messages[num_messages_to_send_first:], data_format)
 
     return timestamp
 
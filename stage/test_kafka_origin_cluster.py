@@ -13,24 +13,21 @@
 # limitations under the License.
 
 import base64
-import io
 import json
 import logging
 import string
 import random
 
-import avro
 import pytest
-from avro.datafile import DataFileWriter
 from streamsets.sdk.utils import Version
 from streamsets.testframework.environments.cloudera import ClouderaManagerCluster
 from streamsets.testframework.markers import cluster
 from streamsets.testframework.utils import get_random_string
 
+from .utils.utils_kafka import produce_kafka_messages_batch
+
 logger = logging.getLogger(__name__)
 
-# Specify a port for SDC RPC stages to use.
-SDC_RPC_PORT = 20000
 SNAPSHOT_TIMEOUT_SEC = 150
 MAX_BATCH_WAIT_TIME = 30
 
@@ -59,7 +56,7 @@ def kafka_check(cluster):
 
 
 @cluster('cdh')
-def test_kafka_origin_cluster(sdc_builder, sdc_executor, cluster, port):
+def test_kafka_origin_cluster(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write simple text messages into Kafka and confirm that Kafka successfully reads them.
     Because cluster mode pipelines don't support snapshots, we do this verification using a
     second standalone pipeline whose origin is an SDC RPC written to by the Kafka Consumer pipeline.
@@ -105,7 +102,7 @@ def test_kafka_origin_cluster(sdc_builder, sdc_executor, cluster, port):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'TEXT')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'TEXT')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, expected, 'TEXT')
     finally:
         sdc_executor.stop_pipeline(kafka_consumer_pipeline)
@@ -113,7 +110,7 @@ def test_kafka_origin_cluster(sdc_builder, sdc_executor, cluster, port):
 
 
 @cluster('cdh')
-def test_produce_string_records_multiple_partitions(sdc_builder, sdc_executor, cluster, port):
+def test_produce_string_records_multiple_partitions(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write simple text messages into Kafka multiple partitions and confirm that Kafka successfully reads them.
     Because cluster mode pipelines don't support snapshots, we do this verification using a
     second standalone pipeline whose origin is an SDC RPC written to by the Kafka Consumer pipeline.
@@ -158,7 +155,7 @@ def test_produce_string_records_multiple_partitions(sdc_builder, sdc_executor, c
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'WITH_KEY')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'WITH_KEY')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, expected, 'TEXT')
 
     finally:
@@ -167,7 +164,8 @@ def test_produce_string_records_multiple_partitions(sdc_builder, sdc_executor, c
 
 
 @cluster('cdh')
-def test_kafka_origin_multiple_json_objects_single_record_cluster(sdc_builder, sdc_executor, cluster, port):
+def test_kafka_origin_multiple_json_objects_single_record_cluster(sdc_builder, sdc_executor, cluster, port,
+                                                                  kafka_producer_pool):
     """Write json objects messages into Kafka and confirm that Kafka successfully reads them.
     Kafka Consumer Origin pipeline with cluster mode:
         kafka_consumer >> sdc_rpc_destination
@@ -178,11 +176,12 @@ def test_kafka_origin_multiple_json_objects_single_record_cluster(sdc_builder, s
     message = {'Alex': 'Developer', 'Xavi': 'Developer'}
     expected = '{\'Alex\': Developer, \'Xavi\': Developer}'
 
-    json_test(sdc_builder, sdc_executor, cluster, message, expected, port)
+    json_test(sdc_builder, sdc_executor, cluster, kafka_producer_pool, message, expected, port)
 
 
 @cluster('cdh')
-def test_kafka_origin_multiple_json_objects_multiple_records_cluster(sdc_builder, sdc_executor, cluster, port):
+def test_kafka_origin_multiple_json_objects_multiple_records_cluster(sdc_builder, sdc_executor, cluster, port,
+                                                                     kafka_producer_pool):
     """Write json objects messages into Kafka and confirm that Kafka successfully reads them.
     Kafka Consumer Origin pipeline with cluster mode:
         kafka_consumer >> sdc_rpc_destination
@@ -194,11 +193,11 @@ def test_kafka_origin_multiple_json_objects_multiple_records_cluster(sdc_builder
     message = [{'Alex': 'Developer'}, {'Xavi': 'Developer'}]
     expected = '[{\'Alex\': Developer}, {\'Xavi\': Developer}]'
 
-    json_test(sdc_builder, sdc_executor, cluster, message, expected, port)
+    json_test(sdc_builder, sdc_executor, cluster, kafka_producer_pool, message, expected, port)
 
 
 @cluster('cdh')
-def test_kafka_origin_json_array_cluster(sdc_builder, sdc_executor, cluster, port):
+def test_kafka_origin_json_array_cluster(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write json array messages into Kafka and confirm that Kafka successfully reads them.
     Kafka Consumer Origin pipeline with cluster mode:
         kafka_consumer >> sdc_rpc_destination
@@ -210,11 +209,11 @@ def test_kafka_origin_json_array_cluster(sdc_builder, sdc_executor, cluster, por
     message = ['Alex', 'Xavi']
     expected = '[Alex, Xavi]'
 
-    json_test(sdc_builder, sdc_executor, cluster, message, expected, port)
+    json_test(sdc_builder, sdc_executor, cluster, kafka_producer_pool, message, expected, port)
 
 
 @cluster('cdh')
-def test_kafka_xml_record_cluster(sdc_builder, sdc_executor, cluster, port):
+def test_kafka_xml_record_cluster(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write simple XML messages into Kafka and confirm that Kafka successfully reads them.
 
     Kafka Consumer Origin pipeline with cluster mode:
@@ -257,7 +256,7 @@ def test_kafka_xml_record_cluster(sdc_builder, sdc_executor, cluster, port):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'XML')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'XML')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, expected, 'XML')
     finally:
         sdc_executor.stop_pipeline(kafka_consumer_pipeline)
@@ -265,7 +264,7 @@ def test_kafka_xml_record_cluster(sdc_builder, sdc_executor, cluster, port):
 
 
 @cluster('cdh')
-def test_kafka_xml_record_delimiter_element_cluster(sdc_builder, sdc_executor, cluster, port):
+def test_kafka_xml_record_delimiter_element_cluster(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write simple XML messages into Kafka and confirm that Kafka successfully reads them.
 
     Kafka Consumer Origin pipeline with cluster mode:
@@ -308,7 +307,7 @@ def test_kafka_xml_record_delimiter_element_cluster(sdc_builder, sdc_executor, c
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'XML')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'XML')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, expected,
                                     'XML_MULTI_ELEMENT')
     finally:
@@ -317,7 +316,7 @@ def test_kafka_xml_record_delimiter_element_cluster(sdc_builder, sdc_executor, c
 
 
 @cluster('cdh')
-def test_kafka_csv_record_cluster(sdc_builder, sdc_executor, cluster, port):
+def test_kafka_csv_record_cluster(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write simple csv messages into Kafka and confirm that Kafka successfully reads them.
 
     Kafka Consumer Origin pipeline with cluster mode:
@@ -360,7 +359,7 @@ def test_kafka_csv_record_cluster(sdc_builder, sdc_executor, cluster, port):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'CSV')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'CSV')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, expected, 'CSV')
     finally:
         sdc_executor.stop_pipeline(kafka_consumer_pipeline)
@@ -368,7 +367,7 @@ def test_kafka_csv_record_cluster(sdc_builder, sdc_executor, cluster, port):
 
 
 @cluster('cdh')
-def test_kafka_binary_record_cluster(sdc_builder, sdc_executor, cluster, port):
+def test_kafka_binary_record_cluster(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write simple binary messages into Kafka and confirm that Kafka successfully reads them.
 
     Kafka Consumer Origin pipeline with cluster mode:
@@ -411,7 +410,7 @@ def test_kafka_binary_record_cluster(sdc_builder, sdc_executor, cluster, port):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'BINARY')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'BINARY')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, expected, 'BINARY')
     finally:
         sdc_executor.stop_pipeline(kafka_consumer_pipeline)
@@ -419,7 +418,7 @@ def test_kafka_binary_record_cluster(sdc_builder, sdc_executor, cluster, port):
 
 
 @cluster('cdh')
-def test_produce_avro_records_with_schema(sdc_builder, sdc_executor, cluster, port):
+def test_produce_avro_records_with_schema(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write avro text messages into Kafka multiple partitions and confirm that Kafka successfully reads them.
     Because cluster mode pipelines don't support snapshots, we do this verification using a
     second standalone pipeline whose origin is an SDC RPC written to by the Kafka Consumer pipeline.
@@ -466,7 +465,7 @@ def test_produce_avro_records_with_schema(sdc_builder, sdc_executor, cluster, po
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, msg, 'AVRO')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, msg, 'AVRO')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, expected, 'AVRO')
     finally:
         sdc_executor.stop_pipeline(kafka_consumer_pipeline)
@@ -474,7 +473,7 @@ def test_produce_avro_records_with_schema(sdc_builder, sdc_executor, cluster, po
 
 
 @cluster('cdh')
-def test_produce_avro_records_without_schema(sdc_builder, sdc_executor, cluster, port):
+def test_produce_avro_records_without_schema(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write avro text messages into Kafka multiple partitions with the schema in the records
     and confirm that Kafka successfully reads them.
     Because cluster mode pipelines don't support snapshots, we do this verification using a
@@ -523,7 +522,7 @@ def test_produce_avro_records_without_schema(sdc_builder, sdc_executor, cluster,
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, msg, 'AVRO_WITHOUT_SCHEMA')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, msg, 'AVRO_WITHOUT_SCHEMA')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, expected,
                                     'AVRO_WITHOUT_SCHEMA')
     finally:
@@ -532,7 +531,7 @@ def test_produce_avro_records_without_schema(sdc_builder, sdc_executor, cluster,
 
 
 @cluster('cdh')
-def test_kafka_origin_syslog_message(sdc_builder, sdc_executor, cluster, port):
+def test_kafka_origin_syslog_message(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write a text message using UDP datagram mode SYSLOG
     into Kafka multiple partitions with the schema in the records
     and confirm that Kafka successfully reads them.
@@ -588,7 +587,8 @@ def test_kafka_origin_syslog_message(sdc_builder, sdc_executor, cluster, port):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, base64.b64decode(msg64packet), 'SYSLOG')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, base64.b64decode(msg64packet),
+                               'SYSLOG')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, expected, 'SYSLOG')
 
     finally:
@@ -597,7 +597,7 @@ def test_kafka_origin_syslog_message(sdc_builder, sdc_executor, cluster, port):
 
 
 @cluster('cdh')
-def test_kafka_origin_netflow_message(sdc_builder, sdc_executor, cluster, port):
+def test_kafka_origin_netflow_message(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write a text message using UDP datagram mode NETFLOW
     into Kafka multiple partitions with the schema in the records
     and confirm that Kafka successfully reads them.
@@ -655,7 +655,8 @@ def test_kafka_origin_netflow_message(sdc_builder, sdc_executor, cluster, port):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, base64.b64decode(msg64packet), 'NETFLOW')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, base64.b64decode(msg64packet),
+                               'NETFLOW')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, expected, 'NETFLOW')
 
     finally:
@@ -664,7 +665,7 @@ def test_kafka_origin_netflow_message(sdc_builder, sdc_executor, cluster, port):
 
 
 @cluster('cdh')
-def test_kafka_origin_collecd_message(sdc_builder, sdc_executor, cluster, port):
+def test_kafka_origin_collecd_message(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write a text message using UDP datagram mode COLLECTD
     into Kafka multiple partitions with the schema in the records
     and confirm that Kafka successfully reads them.
@@ -735,7 +736,8 @@ def test_kafka_origin_collecd_message(sdc_builder, sdc_executor, cluster, port):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, base64.b64decode(msg64packet), 'COLLECTD')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, base64.b64decode(msg64packet),
+                               'COLLECTD')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, expected, 'COLLECTD')
 
     finally:
@@ -744,7 +746,7 @@ def test_kafka_origin_collecd_message(sdc_builder, sdc_executor, cluster, port):
 
 
 @cluster('cdh')
-def test_kafka_log_record_cluster(sdc_builder, sdc_executor, cluster, port):
+def test_kafka_log_record_cluster(sdc_builder, sdc_executor, cluster, port, kafka_producer_pool):
     """Write simple log messages into Kafka and confirm that Kafka successfully reads them.
 
     Kafka Consumer Origin pipeline with cluster mode:
@@ -792,7 +794,7 @@ def test_kafka_log_record_cluster(sdc_builder, sdc_executor, cluster, port):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'LOG')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'LOG')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, message, 'LOG')
     finally:
         sdc_executor.stop_pipeline(kafka_consumer_pipeline)
@@ -842,39 +844,9 @@ def get_rpc_destination(builder, sdc_executor, port):
     return sdc_rpc_destination
 
 
-def produce_kafka_messages(topic, cluster, message, data_format):
+def produce_kafka_messages(producer_pool, topic, cluster, message, data_format):
     """Send basic messages to Kafka"""
-    producer = cluster.kafka.producer()
-
-    basic_data_formats = ['XML', 'CSV', 'SYSLOG', 'NETFLOW', 'COLLECTD', 'BINARY', 'LOG', 'PROTOBUF', 'TEXT', 'JSON']
-
-    # Write records into Kafka depending on the data_format.
-    if data_format in basic_data_formats:
-        producer.send(topic, message)
-
-    elif data_format == 'WITH_KEY':
-        producer.send(topic, message, key=get_random_string(string.ascii_letters, 10).encode())
-
-    elif data_format == 'AVRO':
-        writer = avro.io.DatumWriter(avro.schema.Parse(json.dumps(SCHEMA)))
-        bytes_writer = io.BytesIO()
-        encoder = avro.io.BinaryEncoder(bytes_writer)
-        writer.write(message, encoder)
-        raw_bytes = bytes_writer.getvalue()
-        producer.send(topic, raw_bytes)
-
-    elif data_format == 'AVRO_WITHOUT_SCHEMA':
-        bytes_writer = io.BytesIO()
-        datum_writer = avro.io.DatumWriter(avro.schema.Parse(json.dumps(SCHEMA)))
-        data_file_writer = DataFileWriter(writer=bytes_writer, datum_writer=datum_writer,
-                                          writer_schema=avro.schema.Parse(json.dumps(SCHEMA)))
-        data_file_writer.append(message)
-        data_file_writer.flush()
-        raw_bytes = bytes_writer.getvalue()
-        data_file_writer.close()
-        producer.send(topic, raw_bytes)
-
-    producer.flush()
+    produce_kafka_messages_batch(producer_pool, topic, cluster, [message], data_format, SCHEMA)
 
 
 def verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, message, data_format):
@@ -917,7 +889,7 @@ def verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_
         assert message[1] in str(record_field)
 
 
-def json_test(sdc_builder, sdc_executor, cluster, message, expected, port):
+def json_test(sdc_builder, sdc_executor, cluster, producer_pool, message, expected, port):
     """Generic method to tests using JSON format"""
 
     if (Version(sdc_builder.version) < MIN_SDC_VERSION_WITH_SPARK_2_LIB and
@@ -950,7 +922,7 @@ def json_test(sdc_builder, sdc_executor, cluster, message, expected, port):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, json.dumps(message).encode(), 'JSON')
+        produce_kafka_messages(producer_pool, kafka_consumer.topic, cluster, json.dumps(message).encode(), 'JSON')
         verify_kafka_origin_results(kafka_consumer_pipeline, snapshot_pipeline, sdc_executor, expected, 'JSON')
     finally:
         sdc_executor.stop_pipeline(kafka_consumer_pipeline)
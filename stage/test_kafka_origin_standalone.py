@@ -13,24 +13,23 @@
 # limitations under the License.
 
 import base64
-import io
 import json
 import logging
 import string
 import time
 
-import avro
 import pytest
-from avro.datafile import DataFileWriter
 
 from streamsets.testframework.environments.cloudera import ClouderaManagerCluster
 from streamsets.testframework.markers import cluster, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from .utils.utils_kafka import produce_kafka_messages_batch
+from .utils.utils_snapshot import SnapshotView
+from .utils.utils_wait import wait_until
+
 logger = logging.getLogger(__name__)
 
-# Specify a port for SDC RPC stages to use.
-SDC_RPC_PORT = 20000
 SNAPSHOT_TIMEOUT_SEC = 120
 
 # Protobuf file path relative to $SDC_RESOURCES.
@@ -56,7 +55,7 @@ def kafka_check(cluster):
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_standalone(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_standalone(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write simple text messages into Kafka and confirm that Kafka successfully reads them.
     Specifically, this would look like:
 
@@ -81,7 +80,7 @@ def test_kafka_origin_standalone(sdc_builder, sdc_executor, cluster):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'TEXT')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'TEXT')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'TEXT')
 
     finally:
@@ -90,7 +89,7 @@ def test_kafka_origin_standalone(sdc_builder, sdc_executor, cluster):
 
 @cluster('cdh', 'kafka')
 @sdc_min_version('3.6.0')
-def test_kafka_origin_including_timestamps(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_including_timestamps(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Check that timestamp and timestamp type are included in record header. Verifies that for previous versions of
     kafka (< 0.10), a validation issue is thrown.
 
@@ -125,7 +124,7 @@ def test_kafka_origin_including_timestamps(sdc_builder, sdc_executor, cluster):
     else:
         try:
             # Publish messages to Kafka and verify using snapshot if the same messages are received.
-            produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'TEXT')
+            produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'TEXT')
             verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'TEXT_TIMESTAMP')
         finally:
             sdc_executor.stop_pipeline(kafka_consumer_pipeline)
@@ -133,7 +132,7 @@ def test_kafka_origin_including_timestamps(sdc_builder, sdc_executor, cluster):
 
 @cluster('cdh', 'kafka')
 @sdc_min_version('3.6.0')
-def test_kafka_origin_timestamp_offset_strategy(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_timestamp_offset_strategy(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Check that accessing a topic for first time using TIMESTAMP offset strategy retrieves messages
     which timestamp >= Auto Offset Reset Timestamp configuration value.
 
@@ -149,7 +148,8 @@ def test_kafka_origin_timestamp_offset_strategy(sdc_builder, sdc_executor, clust
     builder = sdc_builder.get_pipeline_builder()
     kafka_consumer = get_kafka_consumer_stage_since_sdc_3_6_0(builder, cluster)
 
-    timestamp = produce_kafka_messages_in_different_timestamp(kafka_consumer.topic, cluster, messages, 'TEXT', 2)
+    timestamp = produce_kafka_messages_in_different_timestamp(kafka_producer_pool, kafka_consumer.topic, cluster,
+                                                              messages, 'TEXT', 2)
 
     kafka_consumer.set_attributes(auto_offset_reset='TIMESTAMP',
                                   auto_offset_reset_timestamp_in_ms=int(timestamp),
@@ -182,7 +182,7 @@ def test_kafka_origin_timestamp_offset_strategy(sdc_builder, sdc_executor, clust
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_multiple_partitions(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_multiple_partitions(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write simple text messages into Kafka and confirm that Kafka successfully reads them using different partitions.
     Specifically, this would look like:
 
@@ -207,7 +207,7 @@ def test_kafka_origin_multiple_partitions(sdc_builder, sdc_executor, cluster):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'WITH_KEY')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'WITH_KEY')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'TEXT')
 
     finally:
@@ -216,7 +216,7 @@ def test_kafka_origin_multiple_partitions(sdc_builder, sdc_executor, cluster):
 
 @cluster('cdh', 'kafka')
 @sdc_min_version('3.0.0.0')
-def test_kafka_multi_origin_standalone(sdc_builder, sdc_executor, cluster):
+def test_kafka_multi_origin_standalone(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write simple text messages into Kafka and confirm that MultiTopic origin can read them.
     Specifically, this would look like:
 
@@ -248,14 +248,14 @@ def test_kafka_multi_origin_standalone(sdc_builder, sdc_executor, cluster):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(topic_name, cluster, message.encode(), 'TEXT')
+        produce_kafka_messages(kafka_producer_pool, topic_name, cluster, message.encode(), 'TEXT')
         verify_kafka_origin_results(kafka_multitopic_consumer_pipeline, sdc_executor, expected, 'TEXT')
     finally:
         sdc_executor.stop_pipeline(kafka_multitopic_consumer_pipeline)
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_string_records(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_string_records(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write simple text messages into Kafka and confirm that Kafka successfully reads them.
     Specifically, this would look like:
 
@@ -280,7 +280,7 @@ def test_kafka_origin_string_records(sdc_builder, sdc_executor, cluster):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'TEXT')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'TEXT')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'TEXT')
 
     finally:
@@ -288,7 +288,7 @@ def test_kafka_origin_string_records(sdc_builder, sdc_executor, cluster):
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_multiple_json_objects_single_record(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_multiple_json_objects_single_record(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write json objects messages into Kafka and confirm that Kafka successfully reads them.
     Kafka Consumer Origin pipeline with standalone mode:
         kafka_consumer >> trash
@@ -297,11 +297,11 @@ def test_kafka_origin_multiple_json_objects_single_record(sdc_builder, sdc_execu
     message = {'Alex': 'Developer', 'Xavi': 'Developer'}
     expected = '{\'Alex\': Developer, \'Xavi\': Developer}'
 
-    json_test_basic_structure(sdc_builder, sdc_executor, cluster, message, expected)
+    json_test_basic_structure(sdc_builder, sdc_executor, cluster, kafka_producer_pool, message, expected)
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_multiple_json_objects_multiple_records(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_multiple_json_objects_multiple_records(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write json objects messages into Kafka and confirm that Kafka successfully reads them.
     Kafka Consumer Origin pipeline with standalone mode:
         kafka_consumer >> trash
@@ -310,11 +310,11 @@ def test_kafka_origin_multiple_json_objects_multiple_records(sdc_builder, sdc_ex
     message = [{'Alex': 'Developer'}, {'Xavi': 'Developer'}]
     expected = '[{\'Alex\': Developer}, {\'Xavi\': Developer}]'
 
-    json_test_basic_structure(sdc_builder, sdc_executor, cluster, message, expected)
+    json_test_basic_structure(sdc_builder, sdc_executor, cluster, kafka_producer_pool, message, expected)
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_json_array(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_json_array(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write json array messages into Kafka and confirm that Kafka successfully reads them.
     Kafka Consumer Origin pipeline with standalone mode:
         kafka_consumer >> trash
@@ -323,10 +323,10 @@ def test_kafka_origin_json_array(sdc_builder, sdc_executor, cluster):
     message = ['Alex', 'Xavi']
     expected = '[Alex, Xavi]'
 
-    json_test_basic_structure(sdc_builder, sdc_executor, cluster, message, expected)
+    json_test_basic_structure(sdc_builder, sdc_executor, cluster, kafka_producer_pool, message, expected)
 
 
-def json_test_basic_structure(sdc_builder, sdc_executor, cluster, message, expected):
+def json_test_basic_structure(sdc_builder, sdc_executor, cluster, producer_pool, message, expected):
     # Build the Kafka consumer pipeline.
     builder = sdc_builder.get_pipeline_builder()
 
@@ -346,7 +346,7 @@ def json_test_basic_structure(sdc_builder, sdc_executor, cluster, message, expec
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, json.dumps(message).encode(), 'JSON')
+        produce_kafka_messages(producer_pool, kafka_consumer.topic, cluster, json.dumps(message).encode(), 'JSON')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'JSON')
 
     finally:
@@ -354,7 +354,7 @@ def json_test_basic_structure(sdc_builder, sdc_executor, cluster, message, expec
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_xml_record(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_xml_record(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write xml messages into Kafka and confirm that Kafka successfully reads them.
     Kafka Consumer Origin pipeline with standalone mode:
         kafka_consumer >> trash
@@ -382,7 +382,7 @@ def test_kafka_origin_xml_record(sdc_builder, sdc_executor, cluster):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'XML')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'XML')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'XML')
 
     finally:
@@ -390,7 +390,7 @@ def test_kafka_origin_xml_record(sdc_builder, sdc_executor, cluster):
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_xml_record_delimiter_element(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_xml_record_delimiter_element(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write xml messages into Kafka and confirm that Kafka successfully reads them. Delimiter element
     Kafka Consumer Origin pipeline with standalone mode:
         kafka_consumer >> trash
@@ -418,7 +418,7 @@ def test_kafka_origin_xml_record_delimiter_element(sdc_builder, sdc_executor, cl
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'XML')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'XML')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'XML_MULTI_ELEMENT')
 
     finally:
@@ -426,7 +426,7 @@ def test_kafka_origin_xml_record_delimiter_element(sdc_builder, sdc_executor, cl
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_csv_record(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_csv_record(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write csv messages into Kafka and confirm that Kafka successfully reads them.
     Kafka Consumer Origin pipeline with standalone mode:
         kafka_consumer >> trash
@@ -454,7 +454,7 @@ def test_kafka_origin_csv_record(sdc_builder, sdc_executor, cluster):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'CSV')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'CSV')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'CSV')
 
     finally:
@@ -462,7 +462,7 @@ def test_kafka_origin_csv_record(sdc_builder, sdc_executor, cluster):
 
 
 @cluster('cdh', 'kafka')
-def test_produce_avro_records_with_schema(sdc_builder, sdc_executor, cluster):
+def test_produce_avro_records_with_schema(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write avro text messages into Kafka standalone and confirm that Kafka successfully reads them.
     Specifically, this would look like:
 
@@ -495,14 +495,14 @@ def test_produce_avro_records_with_schema(sdc_builder, sdc_executor, cluster):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, msg, 'AVRO')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, msg, 'AVRO')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'AVRO')
     finally:
         sdc_executor.stop_pipeline(kafka_consumer_pipeline)
 
 
 @cluster('cdh', 'kafka')
-def test_produce_avro_records_without_schema(sdc_builder, sdc_executor, cluster):
+def test_produce_avro_records_without_schema(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write avro text messages into Kafka standalone configuring the producer without a schema
     and confirm that Kafka successfully reads them.
     Specifically, this would look like:
@@ -535,14 +535,14 @@ def test_produce_avro_records_without_schema(sdc_builder, sdc_executor, cluster)
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, msg, 'AVRO_WITHOUT_SCHEMA')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, msg, 'AVRO_WITHOUT_SCHEMA')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'AVRO_WITHOUT_SCHEMA')
     finally:
         sdc_executor.stop_pipeline(kafka_consumer_pipeline)
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_syslog_message(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_syslog_message(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write a text message using UDP datagram mode SYSLOG.
     Specifically, this would look like:
 
@@ -578,14 +578,14 @@ def test_kafka_origin_syslog_message(sdc_builder, sdc_executor, cluster):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, base64.b64decode(message), 'SYSLOG')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, base64.b64decode(message), 'SYSLOG')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'SYSLOG')
     finally:
         sdc_executor.stop_pipeline(kafka_consumer_pipeline)
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_binary_record(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_binary_record(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write binary messages into Kafka and confirm that Kafka successfully reads them.
     Kafka Consumer Origin pipeline with standalone mode:
         kafka_consumer >> trash
@@ -613,7 +613,7 @@ def test_kafka_origin_binary_record(sdc_builder, sdc_executor, cluster):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'BINARY')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'BINARY')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'BINARY')
 
     finally:
@@ -621,7 +621,7 @@ def test_kafka_origin_binary_record(sdc_builder, sdc_executor, cluster):
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_netflow_message(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_netflow_message(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write a text message using UDP datagram mode NETFLOW.
     Specifically, this would look like:
 
@@ -660,14 +660,15 @@ def test_kafka_origin_netflow_message(sdc_builder, sdc_executor, cluster):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, base64.b64decode(msg64packet), 'NETFLOW')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, base64.b64decode(msg64packet),
+                               'NETFLOW')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'NETFLOW')
     finally:
         sdc_executor.stop_pipeline(kafka_consumer_pipeline)
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_collectd_message(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_collectd_message(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write a text message using UDP datagram mode COLLECTD.
     Specifically, this would look like:
 
@@ -719,14 +720,15 @@ def test_kafka_origin_collectd_message(sdc_builder, sdc_executor, cluster):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, base64.b64decode(msg64packet), 'COLLECTD')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, base64.b64decode(msg64packet),
+                               'COLLECTD')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, expected, 'COLLECTD')
     finally:
         sdc_executor.stop_pipeline(kafka_consumer_pipeline)
 
 
 @cluster('cdh', 'kafka')
-def test_kafka_origin_log_record(sdc_builder, sdc_executor, cluster):
+def test_kafka_origin_log_record(sdc_builder, sdc_executor, cluster, kafka_producer_pool):
     """Write log messages into Kafka and confirm that Kafka successfully reads them.
     Kafka Consumer Origin pipeline with standalone mode:
         kafka_consumer >> trash
@@ -757,7 +759,7 @@ def test_kafka_origin_log_record(sdc_builder, sdc_executor, cluster):
 
     try:
         # Publish messages to Kafka and verify using snapshot if the same messages are received.
-        produce_kafka_messages(kafka_consumer.topic, cluster, message.encode(), 'LOG')
+        produce_kafka_messages(kafka_producer_pool, kafka_consumer.topic, cluster, message.encode(), 'LOG')
         verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, message, 'LOG')
 
     finally:
@@ -870,62 +872,33 @@ def get_kafka_consumer_stage_since_sdc_3_6_0(pipeline_builder, cluster):
     return kafka_consumer
 
 
-def produce_kafka_messages(topic, cluster, message, data_format):
+def produce_kafka_messages(producer_pool, topic, cluster, message, data_format):
     """Send basic messages to Kafka"""
-    # Get Kafka producer
-    producer = cluster.kafka.producer()
+    produce_kafka_messages_batch(producer_pool, topic, cluster, [message], data_format, SCHEMA)
 
-    basic_data_formats = ['XML', 'CSV', 'SYSLOG', 'NETFLOW', 'COLLECTD', 'BINARY', 'LOG', 'TEXT', 'JSON']
 
-    # Write records into Kafka depending on the data_format.
-    if data_format in basic_data_formats:
-        producer.send(topic, message)
-
-    elif data_format == 'WITH_KEY':
-        producer.send(topic, message, key=get_random_string(string.ascii_letters, 10).encode())
-
-    elif data_format == 'AVRO':
-        writer = avro.io.DatumWriter(avro.schema.Parse(json.dumps(SCHEMA)))
-        bytes_writer = io.BytesIO()
-        encoder = avro.io.BinaryEncoder(bytes_writer)
-        writer.write(message, encoder)
-        raw_bytes = bytes_writer.getvalue()
-        producer.send(topic, raw_bytes)
-
-    elif data_format == 'AVRO_WITHOUT_SCHEMA':
-        bytes_writer = io.BytesIO()
-        datum_writer = avro.io.DatumWriter(avro.schema.Parse(json.dumps(SCHEMA)))
-        data_file_writer = DataFileWriter(writer=bytes_writer, datum_writer=datum_writer,
-                                          writer_schema=avro.schema.Parse(json.dumps(SCHEMA)))
-        data_file_writer.append(message)
-        data_file_writer.flush()
-        raw_bytes = bytes_writer.getvalue()
-        data_file_writer.close()
-        producer.send(topic, raw_bytes)
-
-    producer.flush()
-
-
-def produce_kafka_messages_in_different_timestamp(topic, cluster, messages, data_format, num_messages_to_send_first):
-    """send num_messages_to_send_first messages, sleep 30 seconds, then send the rest of the messages and return the
-    timestamp value after the 30 seconds sleep (<= timestamp of first message in second batch and >= last message in
-    first batch)
+def produce_kafka_messages_in_different_timestamp(producer_pool, topic, cluster, messages, data_format,
+                                                  num_messages_to_send_first):
+    """send num_messages_to_send_first messages, wait for the clock to move on, then send the rest of the messages and
+    return a timestamp value that is <= timestamp of first message in second batch and > last message in first batch.
+    Message timestamps are set by the producer, i.e. by this host's clock.
     """
     timestamp = -1
     if num_messages_to_send_first < len(messages):
         # Send first batch of messages.
-        for i in range(0, num_messages_to_send_first):
-            message = messages[i]
-            produce_kafka_messages(topic, cluster, message.encode(), data_format)
+        first_messages = messages[:num_messages_to_send_first]
+        produce_kafka_messages_batch(producer_pool, topic, cluster, [message.encode() for message in first_messages],
+                                     data_format, SCHEMA)
 
-        # Sleep for 30 seconds.
-        time.sleep(30)
-        timestamp = int(time.time() * 1000)
+        # Wait until the clock is past the timestamp of every message sent so far.
+        last_timestamp = int(time.time() * 1000)
+        timestamp = last_timestamp + 1
+        wait_until(lambda: int(time.time() * 1000) > last_timestamp, description='clock to move on')
 
         # Send second batch of messages.
-        for j in range(num_messages_to_send_first, len(messages)):
-            message = messages[j]
-            produce_kafka_messages(topic, cluster, message.encode(), data_format)
+        rest_messages = messages[num_messages_to_send_first:]
+        produce_kafka_messages_batch(producer_pool, topic, cluster, [message.encode() for message in rest_messages],
+                                     data_format, SCHEMA)
 
     return timestamp
 
@@ -966,14 +939,12 @@ def verify_kafka_origin_results(kafka_consumer_pipeline, sdc_executor, message,
         assert message == str(record_field[0])
 
     elif data_format == 'LOG':
-        stage = snapshot[kafka_consumer_pipeline[0].instance_name]
-        assert 0 == len(stage.error_records)
-        record_field = [record.field for record in snapshot[kafka_consumer_pipeline[0].instance_name].output]
-        assert message == str(record_field[0]['originalLine'])
+        stage_output = SnapshotView(snapshot)[kafka_consumer_pipeline[0].instance_name]
+        assert 0 == len(stage_output.error_records)
+        assert message == stage_output.column('/originalLine')[0]
 
     elif data_format == 'BINARY':
-        record_field = [record.field for record in snapshot[kafka_consumer_pipeline[0].instance_name].output]
-        assert message == record_field[0]
+        assert message == SnapshotView(snapshot)[kafka_consumer_pipeline[0].instance_name].column('/')[0]
 
     elif data_format == 'PROTOBUF':
         record_field = [record.field for record in snapshot[kafka_consumer_pipeline[0].instance_name].output]
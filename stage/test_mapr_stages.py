@@ -27,9 +27,6 @@ from streamsets.testframework.utils import get_random_string
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-# Specify a port for SDC RPC stages to use.
-SDC_RPC_LISTENING_PORT = 20000
-
 
 @cluster('mapr')
 @sdc_min_version('3.0.0.0')
@@ -220,7 +217,7 @@ def test_mapr_db_destination(sdc_builder, sdc_executor, cluster):
 
 
 @cluster('mapr')
-def test_mapr_fs_origin(sdc_builder, sdc_executor, cluster):
+def test_mapr_fs_origin(sdc_builder, sdc_executor, cluster, free_port):
     """Write a simple file into a MapR FS folder with a randomly-generated name and confirm that the MapR FS origin
     successfully reads it. Because cluster mode pipelines don't support snapshots, we do this verification using a
     second standalone pipeline whose origin is an SDC RPC written to by the MapR FS pipeline. Specifically, this would
@@ -243,8 +240,7 @@ def test_mapr_fs_origin(sdc_builder, sdc_executor, cluster):
     mapr_fs_origin.input_paths.append(mapr_fs_folder)
 
     sdc_rpc_destination = builder.add_stage(name='com_streamsets_pipeline_stage_destination_sdcipc_SdcIpcDTarget')
-    sdc_rpc_destination.sdc_rpc_connection.append('{}:{}'.format(sdc_executor.server_host,
-                                                                 SDC_RPC_LISTENING_PORT))
+    sdc_rpc_destination.sdc_rpc_connection.append('{}:{}'.format(sdc_executor.server_host, free_port))
     sdc_rpc_destination.sdc_rpc_id = get_random_string(string.ascii_letters, 10)
 
     mapr_fs_origin >> sdc_rpc_destination
@@ -256,7 +252,7 @@ def test_mapr_fs_origin(sdc_builder, sdc_executor, cluster):
     builder.add_error_stage('Discard')
 
     sdc_rpc_origin = builder.add_stage(name='com_streamsets_pipeline_stage_origin_sdcipc_SdcIpcDSource')
-    sdc_rpc_origin.sdc_rpc_listening_port = SDC_RPC_LISTENING_PORT
+    sdc_rpc_origin.sdc_rpc_listening_port = free_port
     sdc_rpc_origin.sdc_rpc_id = sdc_rpc_destination.sdc_rpc_id
     # Since YARN jobs take a while to get going, set RPC origin batch wait time to 5 min. to avoid
     # getting an empty batch in the snapshot.
@@ -579,7 +575,7 @@ def generate_streams_producer(sdc_builder, topic_name, value, cluster):
 
 
 @cluster('mapr')
-def test_mapr_cluster_streams(sdc_builder, sdc_executor, cluster):
+def test_mapr_cluster_streams(sdc_builder, sdc_executor, cluster, free_port):
     """This test will start MapR Streams producer and consumer pipelines which check for integrity of data flow
     from a MapR Streams producer to MapR Streams consumer. Producer pipeline runs as standalone while the consumer
     one runs on cluster. Since cluster pipeline cannot be snapshot, we use RPC stage to snapshot the data.
@@ -627,7 +623,7 @@ def test_mapr_cluster_streams(sdc_builder, sdc_executor, cluster):
     mapr_streams_consumer.data_format = 'TEXT'
 
     sdc_rpc_destination = builder.add_stage(name='com_streamsets_pipeline_stage_destination_sdcipc_SdcIpcDTarget')
-    sdc_rpc_destination.sdc_rpc_connection.append('{}:{}'.format(sdc_executor.server_host, SDC_RPC_LISTENING_PORT))
+    sdc_rpc_destination.sdc_rpc_connection.append('{}:{}'.format(sdc_executor.server_host, free_port))
     sdc_rpc_destination.sdc_rpc_id = sdc_rpc_id
 
     mapr_streams_consumer >> sdc_rpc_destination
@@ -639,7 +635,7 @@ def test_mapr_cluster_streams(sdc_builder, sdc_executor, cluster):
     builder = sdc_builder.get_pipeline_builder()
 
     sdc_rpc_origin = builder.add_stage(name='com_streamsets_pipeline_stage_origin_sdcipc_SdcIpcDSource')
-    sdc_rpc_origin.sdc_rpc_listening_port = SDC_RPC_LISTENING_PORT
+    sdc_rpc_origin.sdc_rpc_listening_port = free_port
     sdc_rpc_origin.sdc_rpc_id = sdc_rpc_id
     # Since YARN jobs take a while to get going, set RPC origin batch wait time to 5 min. to avoid
     # getting an empty batch in the snapshot.
@@ -16,7 +16,6 @@ import logging
 import string
 from collections import namedtuple
 from datetime import datetime, timedelta
-from time import sleep
 
 import pytest
 import sqlalchemy
@@ -25,6 +24,8 @@ from streamsets.sdk.utils import Version
 from streamsets.testframework.markers import database, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from .utils.utils_wait import wait_until
+
 logger = logging.getLogger(__name__)
 
 # SQL Parser processor was renamed in SDC-10697, so we need to reference it by name.
@@ -41,23 +42,20 @@ Operations = namedtuple('Operations', ['rows', 'cdc_op_types', 'sdc_op_types', '
 
 @sdc_min_version('3.6.0')
 @database('oracle')
-def test_decimal_attributes(sdc_builder, sdc_executor, database):
+def test_decimal_attributes(sdc_builder, sdc_executor, database, table_factory):
     """Validates that Field attributes for decimal types will get properly generated
     Runs oracle_cdc_client >> trash
     """
-    db_engine = database.engine
     pipeline = None
-    table = None
 
     try:
         src_table_name = get_random_string(string.ascii_uppercase, 9)
         logger.info('Using table pattern %s', src_table_name)
 
         connection = database.engine.connect()
-        table = sqlalchemy.Table(src_table_name, sqlalchemy.MetaData(),
-                                 sqlalchemy.Column(PRIMARY_KEY, sqlalchemy.Integer, primary_key=True),
-                                 sqlalchemy.Column(OTHER_COLUMN, sqlalchemy.Numeric(20, 2)))
-        table.create(db_engine)
+        table_factory.create_table(src_table_name,
+                                   sqlalchemy.Column(PRIMARY_KEY, sqlalchemy.Integer, primary_key=True),
+                                   sqlalchemy.Column(OTHER_COLUMN, sqlalchemy.Numeric(20, 2)))
         pipeline_builder = sdc_builder.get_pipeline_builder()
         oracle_cdc_client = _get_oracle_cdc_client_origin(connection=connection,
                                                           database=database,
@@ -98,9 +96,6 @@ def test_decimal_attributes(sdc_builder, sdc_executor, database):
         if pipeline is not None:
             sdc_executor.stop_pipeline(pipeline=pipeline,
                                        force=True)
-        if table is not None:
-            table.drop(db_engine)
-            logger.info('Table: %s dropped.', src_table_name)
 
 
 @sdc_min_version('3.9.0')
@@ -212,14 +207,12 @@ def test_date_type_conversions(sdc_builder, sdc_executor, database, parse_sql):
 @database('oracle')
 @pytest.mark.parametrize('buffer_locally', [True, False])
 @pytest.mark.parametrize('use_pattern', [True, False])
-def test_oracle_cdc_client_basic(sdc_builder, sdc_executor, database, buffer_locally, use_pattern):
+def test_oracle_cdc_client_basic(sdc_builder, sdc_executor, database, table_factory, buffer_locally, use_pattern):
     """Basic test that reads inserts/updates/deletes to an Oracle table,
     and validates that they are read in the same order.
     Runs oracle_cdc_client >> trash
     """
-    db_engine = database.engine
     pipeline = None
-    table = None
 
     try:
         src_table_name = get_random_string(string.ascii_uppercase, 9)
@@ -234,7 +227,7 @@ def test_oracle_cdc_client_basic(sdc_builder, sdc_executor, database, buffer_loc
             src_table_pattern = src_table_name
 
         connection = database.engine.connect()
-        table = _setup_table(database=database,
+        table = _setup_table(table_factory=table_factory,
                             table_name=src_table_name)
 
         logger.info('Using table pattern %s', src_table_pattern)
@@ -303,26 +296,23 @@ def test_oracle_cdc_client_basic(sdc_builder, sdc_executor, database, buffer_loc
         if pipeline is not None:
             sdc_executor.stop_pipeline(pipeline=pipeline,
                                        force=True)
-        if table is not None:
-            table.drop(db_engine)
-            logger.info('Table: %s dropped.', src_table_name)
 
 
 @database('oracle')
 @sdc_min_version('3.5.1')
 @pytest.mark.parametrize('buffer_locally', [True])
 @pytest.mark.parametrize('use_pattern', [False])
-def test_oracle_cdc_client_stop_pipeline_when_no_archived_logs(sdc_builder, sdc_executor, database, buffer_locally, use_pattern):
+def test_oracle_cdc_client_stop_pipeline_when_no_archived_logs(sdc_builder, sdc_executor, database, table_factory,
+                                                               buffer_locally, use_pattern):
     """
     Test for SDC-8418.  Pipeline should stop with RUN ERROR when there is no archived log files.
     Runs oracle_cdc_client >> trash
     """
-    db_engine = database.engine
     src_table_name = get_random_string(string.ascii_uppercase, 9)
 
     try:
         connection = database.engine.connect()
-        table = _setup_table(database=database, table_name=src_table_name)
+        _setup_table(table_factory=table_factory, table_name=src_table_name)
 
         logger.info('Using table pattern: %s', src_table_name)
         pipeline_builder = sdc_builder.get_pipeline_builder()
@@ -358,22 +348,19 @@ def test_oracle_cdc_client_stop_pipeline_when_no_archived_logs(sdc_builder, sdc_
         status = sdc_executor.get_pipeline_status(pipeline).response.json().get('status')
         assert 'RUN_ERROR' == status
     finally:
-        if table is not None:
-            table.drop(db_engine)
-            logger.info('Table: %s dropped.', src_table_name)
+        connection.close()
 
 
 @database('oracle')
 @pytest.mark.parametrize('buffer_locally', [True, False])
 @pytest.mark.parametrize('use_pattern', [True, False])
-def test_oracle_cdc_client_string_null_values(sdc_builder, sdc_executor, database, buffer_locally, use_pattern):
+def test_oracle_cdc_client_string_null_values(sdc_builder, sdc_executor, database, table_factory, buffer_locally,
+                                              use_pattern):
     """Basic test that tests for SDC-8340. This test ensures that Strings with value 'NULL'/'null' is treated correctly,
     and null is not returned.
     Runs oracle_cdc_client >> trash
     """
-    db_engine = database.engine
     pipeline = None
-    table = None
 
     try:
         src_table_name = get_random_string(string.ascii_uppercase, 9)
@@ -388,7 +375,7 @@ def test_oracle_cdc_client_string_null_values(sdc_builder, sdc_executor, databas
             src_table_pattern = src_table_name
 
         connection = database.engine.connect()
-        table = _setup_table(database=database,
+        table = _setup_table(table_factory=table_factory,
                              table_name=src_table_name,
                              create_primary_key=False)
 
@@ -465,14 +452,11 @@ def test_oracle_cdc_client_string_null_values(sdc_builder, sdc_executor, databas
         if pipeline is not None:
             sdc_executor.stop_pipeline(pipeline=pipeline,
                                        force=True)
-        if table is not None:
-            table.drop(db_engine)
-            logger.info('Table: %s dropped.', src_table_name)
 
 
 @database('oracle')
 @pytest.mark.parametrize('buffer_locally', [True])
-def test_overlapping_transactions(sdc_builder, sdc_executor, database, buffer_locally):
+def test_overlapping_transactions(sdc_builder, sdc_executor, database, table_factory, buffer_locally):
     """Tests SDC-8359. The basic premise of the test:
     - Start a transaction, and insert some data
     - Wait for 1 second so timestamp of next transaction is different
@@ -487,16 +471,14 @@ def test_overlapping_transactions(sdc_builder, sdc_executor, database, buffer_lo
     Runs oracle_cdc_client >> trash
     """
 
-    db_engine = database.engine
     pipeline = None
-    table = None
 
     try:
         src_table_name = get_random_string(string.ascii_uppercase, 9)
 
         connection = database.engine.connect()
         connection2 = database.engine.connect()
-        table = _setup_table(database=database,
+        table = _setup_table(table_factory=table_factory,
                              table_name=src_table_name,
                              create_primary_key=False)
 
@@ -519,7 +501,9 @@ def test_overlapping_transactions(sdc_builder, sdc_executor, database, buffer_lo
         connection2.execute(table.insert(), rows_c2)
 
         # Ensure timestamp changes
-        sleep(5)
+        long_txn_time = _get_current_oracle_time(connection=connection)
+        wait_until(lambda: _get_current_oracle_time(connection=connection) > long_txn_time,
+                   description='Oracle SYSDATE to change')
 
         # Insert data into txn 2, and commit immediately
         rows_c1 = [{'ID': 200, 'NAME': 'TEST_SHORT_TXN'} for _ in range(0, 10)]
@@ -564,19 +548,17 @@ def test_overlapping_transactions(sdc_builder, sdc_executor, database, buffer_lo
         compare_output(output, rows_c2)
 
     finally:
-        if table is not None:
-            table.drop(db_engine)
-            logger.info('Table: %s dropped.', src_table_name)
+        # An open transaction would block dropping the table.
+        connection2.close()
+        connection.close()
 
 
 @database('oracle')
 @pytest.mark.parametrize('buffer_locally', [True, False])
 @pytest.mark.parametrize('use_pattern', [True, False])
-def test_oracle_cdc_to_jdbc_producer(sdc_builder, sdc_executor, database, buffer_locally, use_pattern):
+def test_oracle_cdc_to_jdbc_producer(sdc_builder, sdc_executor, database, table_factory, buffer_locally, use_pattern):
     db_engine = database.engine
     pipeline = None
-    src_table = None
-    dest_table = None
 
     try:
         src_table_name = get_random_string(string.ascii_uppercase, 9)
@@ -590,7 +572,7 @@ def test_oracle_cdc_to_jdbc_producer(sdc_builder, sdc_executor, database, buffer
             src_table_pattern = src_table_name
 
         connection = database.engine.connect()
-        src_table = _setup_table(database, src_table_name)
+        src_table = _setup_table(table_factory, src_table_name)
 
         pipeline_builder = sdc_builder.get_pipeline_builder()
 
@@ -607,7 +589,7 @@ def test_oracle_cdc_to_jdbc_producer(sdc_builder, sdc_executor, database, buffer
 
         dest_table_name = get_random_string(string.ascii_uppercase, 9)
 
-        dest_table = _setup_table(database, dest_table_name)
+        dest_table = _setup_table(table_factory, dest_table_name)
         jdbc_producer = pipeline_builder.add_stage('JDBC Producer')
 
         jdbc_producer.set_attributes(table_name=dest_table_name,
@@ -641,23 +623,17 @@ def test_oracle_cdc_to_jdbc_producer(sdc_builder, sdc_executor, database, buffer
         if pipeline is not None:
             sdc_executor.stop_pipeline(pipeline=pipeline,
                                        force=True)
-        if src_table is not None:
-            src_table.drop(db_engine)
-        if dest_table is not None:
-            dest_table.drop(db_engine)
 
 
 @database('oracle')
 @pytest.mark.parametrize('buffer_locally', [True, False])
 @pytest.mark.parametrize('use_pattern', [True, False])
-def test_rollback_to_savepoint(sdc_builder, sdc_executor, database, buffer_locally, use_pattern):
+def test_rollback_to_savepoint(sdc_builder, sdc_executor, database, table_factory, buffer_locally, use_pattern):
     """Test that writes some data, then creates a save point, writes some more data and then rolls back to savepoint,
     and validates that only the data that is before the save point and after the rollback is read
     Runs oracle_cdc_client >> trash
     """
-    db_engine = database.engine
     pipeline = None
-    table = None
 
     try:
         src_table_name = get_random_string(string.ascii_uppercase, 9)
@@ -672,8 +648,8 @@ def test_rollback_to_savepoint(sdc_builder, sdc_executor, database, buffer_local
             src_table_pattern = src_table_name
 
         connection = database.engine.connect()
-        table = _setup_table(database=database,
-                             table_name=src_table_name)
+        _setup_table(table_factory=table_factory,
+                     table_name=src_table_name)
 
         logger.info('Using table pattern %s', src_table_pattern)
 
@@ -739,20 +715,13 @@ def test_rollback_to_savepoint(sdc_builder, sdc_executor, database, buffer_local
         if pipeline is not None:
             sdc_executor.stop_pipeline(pipeline=pipeline,
                                        force=True)
-        if table is not None:
-            table.drop(db_engine)
-            logger.info('Table: %s dropped.', src_table_name)
 
 
-def _setup_table(database, table_name, create_primary_key=True):
-    db_engine = database.engine
-    logger.info('Creating source table %s in %s database ...', table_name, database.type)
-
-    table = sqlalchemy.Table(table_name, sqlalchemy.MetaData(),
-                             sqlalchemy.Column(PRIMARY_KEY, sqlalchemy.Integer, primary_key=create_primary_key),
-                             sqlalchemy.Column(OTHER_COLUMN, sqlalchemy.String(20)))
-    table.create(db_engine)
-    return table
+def _setup_table(table_factory, table_name, create_primary_key=True):
+    return table_factory.create_table(table_name,
+                                      sqlalchemy.Column(PRIMARY_KEY, sqlalchemy.Integer,
+                                                        primary_key=create_primary_key),
+                                      sqlalchemy.Column(OTHER_COLUMN, sqlalchemy.String(20)))
 
 
 def _get_oracle_cdc_client_origin(connection, database, sdc_builder, pipeline_builder,
@@ -794,7 +763,10 @@ def _get_current_oracle_time(connection):
 def _wait_until_time(time):
     current_time = datetime.utcnow()
     if current_time < time:
-        sleep((time - current_time).total_seconds() + 1)
+        # However far the Oracle clock is ahead, plus a margin for the one second and polling.
+        wait_until(lambda: datetime.utcnow() > time + timedelta(seconds=1),
+                   timeout_sec=(time - current_time).total_seconds() + 30,
+                   description=f'clock to pass {time}')
 
 
 def _get_table_pattern(src_table_name):
@@ -48,17 +48,10 @@ CHECK_REP_SLOT_QUERY = 'select slot_name from pg_replication_slots;'
 
 POLL_INTERVAL = "${1 * SECONDS}"
 
-def _create_table_in_database(table_name, database):
-    metadata = sqlalchemy.MetaData()
-    table = sqlalchemy.Table(
-        table_name,
-        metadata,
-        sqlalchemy.Column(PRIMARY_KEY, sqlalchemy.Integer, primary_key=True),
-        sqlalchemy.Column(NAME_COLUMN, sqlalchemy.String(20))
-    )
-    logger.info('Creating table %s in %s database ...', table_name, database.type)
-    table.create(database.engine)
-    return table
+def _create_table_in_database(table_name, table_factory):
+    return table_factory.create_table(table_name,
+                                      sqlalchemy.Column(PRIMARY_KEY, sqlalchemy.Integer, primary_key=True),
+                                      sqlalchemy.Column(NAME_COLUMN, sqlalchemy.String(20)))
 
 
 def _insert(connection, table):
@@ -119,7 +112,7 @@ def _delete(connection, table):
 
 @database('postgresql')
 @sdc_min_version('3.4.0')
-def test_postgres_cdc_client_basic(sdc_builder, sdc_executor, database):
+def test_postgres_cdc_client_basic(sdc_builder, sdc_executor, database, table_factory):
     """Basic test that inserts/updates/deletes to a Postgres table,
     and validates that they are read in the same order.
     Here `Initial Change` config. is at default value = `From the latest change`.
@@ -152,7 +145,7 @@ def test_postgres_cdc_client_basic(sdc_builder, sdc_executor, database):
         snapshot_command = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, wait=False)
 
         # Create table and then perform insert, update and delete operations.
-        table = _create_table_in_database(table_name, database)
+        table = _create_table_in_database(table_name, table_factory)
         connection = database.engine.connect()
         expected_operations_data = _insert(connection=connection, table=table)
         expected_operations_data += _update(connection=connection, table=table)
@@ -185,14 +178,11 @@ def test_postgres_cdc_client_basic(sdc_builder, sdc_executor, database):
         if pipeline:
             sdc_executor.stop_pipeline(pipeline=pipeline, force=True)
         database.deactivate_and_drop_replication_slot(replication_slot_name)
-        if table is not None:
-            table.drop(database.engine)
-            logger.info('Table: %s dropped.', table_name)
 
 
 @database('postgresql')
 @sdc_min_version('3.8.1')
-def test_postgres_cdc_client_filtering_table(sdc_builder, sdc_executor, database):
+def test_postgres_cdc_client_filtering_table(sdc_builder, sdc_executor, database, table_factory):
     """
         Test filtering for inserts/updates/deletes to a Postgres table
 
@@ -233,8 +223,8 @@ def test_postgres_cdc_client_filtering_table(sdc_builder, sdc_executor, database
         snapshot_command = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, wait=False)
 
         # Create table and then perform insert, update and delete operations.
-        table_allow = _create_table_in_database(table_name_allow, database)
-        table_deny = _create_table_in_database(table_name_deny, database)
+        table_allow = _create_table_in_database(table_name_allow, table_factory)
+        table_deny = _create_table_in_database(table_name_deny, table_factory)
         connection = database.engine.connect()
 
         expected_operations_data = _insert(connection=connection, table=table_allow)
@@ -277,17 +267,11 @@ def test_postgres_cdc_client_filtering_table(sdc_builder, sdc_executor, database
         if pipeline:
             sdc_executor.stop_pipeline(pipeline=pipeline, force=True)
         database.deactivate_and_drop_replication_slot(replication_slot_name)
-        if table_allow is not None:
-            table_allow.drop(database.engine)
-            logger.info('Table: %s dropped.', table_name_allow)
-        if table_deny is not None:
-            table_deny.drop(database.engine)
-            logger.info('Table: %s dropped.', table_name_deny)
 
 
 @database('postgresql')
 @sdc_min_version('3.4.0')
-def test_postgres_cdc_client_remove_replication_slot(sdc_builder, sdc_executor, database):
+def test_postgres_cdc_client_remove_replication_slot(sdc_builder, sdc_executor, database, table_factory):
     """
         Test the 'Remove replication slot on close' functionality
 
@@ -318,32 +302,26 @@ def test_postgres_cdc_client_remove_replication_slot(sdc_builder, sdc_executor,
     pipeline = pipeline_builder.build().configure_for_environment(database)
     sdc_executor.add_pipeline(pipeline)
 
-    try:
-        # Database operations done after pipeline start will be captured by CDC.
-        # Hence start the pipeline but do not wait for the capture to be finished.
-        snapshot_command = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, wait=False)
+    # Database operations done after pipeline start will be captured by CDC.
+    # Hence start the pipeline but do not wait for the capture to be finished.
+    snapshot_command = sdc_executor.capture_snapshot(pipeline, start_pipeline=True, wait=False)
 
-        # Create table and then perform some operations to simulate activity
-        table = _create_table_in_database(table_name, database)
-        connection = database.engine.connect()
-        expected_operations_data = _insert(connection=connection, table=table)
-        expected_operations_data += _update(connection=connection, table=table)
-        expected_operations_data += _delete(connection=connection, table=table)
+    # Create table and then perform some operations to simulate activity
+    table = _create_table_in_database(table_name, table_factory)
+    connection = database.engine.connect()
+    expected_operations_data = _insert(connection=connection, table=table)
+    expected_operations_data += _update(connection=connection, table=table)
+    expected_operations_data += _delete(connection=connection, table=table)
 
-        snapshot = snapshot_command.wait_for_finished().snapshot
+    snapshot = snapshot_command.wait_for_finished().snapshot
 
-        # Timeout is set as without SDC-11252, pipeline will get stuck in 'STOPPING' state forever
-        sdc_executor.stop_pipeline(pipeline=pipeline).wait_for_stopped(timeout_sec=60)
+    # Timeout is set as without SDC-11252, pipeline will get stuck in 'STOPPING' state forever
+    sdc_executor.stop_pipeline(pipeline=pipeline).wait_for_stopped(timeout_sec=60)
 
-        # After pipeline stoppage, check on the replication slots remaining
-        listed_slots = connection.execute(CHECK_REP_SLOT_QUERY).fetchall()
+    # After pipeline stoppage, check on the replication slots remaining
+    listed_slots = connection.execute(CHECK_REP_SLOT_QUERY).fetchall()
 
-        # Check that replication_slot is not in listed_slots
-        logger.info('Replication slot:  ' + replication_slot)
-        logger.info('List of current slots: ' + str(listed_slots))
-        assert (replication_slot,) not in listed_slots
-
-    finally:
-        if table is not None:
-            table.drop(database.engine)
-            logger.info('Table: %s dropped.', table_name)
+    # Check that replication_slot is not in listed_slots
+    logger.info('Replication slot:  ' + replication_slot)
+    logger.info('List of current slots: ' + str(listed_slots))
+    assert (replication_slot,) not in listed_slots
@@ -17,10 +17,11 @@ import string
 
 import pika
 import pytest
-import time
 from streamsets.testframework.markers import rabbitmq, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from .utils.utils_wait import assert_holds_for, wait_until
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
@@ -192,12 +193,22 @@ def test_rabbitmq_producer_msg_expiration(sdc_builder, sdc_executor, rabbitmq, s
         msg_read = channel.basic_get(queue_name, False)[2].decode().replace('\n', '')
         assert msg_read == input_str
 
-        # Send a message, wait `expiration_ms` milliseconds, and consume RabbitMQ queue. If the "Set Expiration"
-        # option is enabled, the queue will be empty and no message will be consumed.
+        # Send a message, wait for it to expire, and consume RabbitMQ queue. If the "Set Expiration" option is enabled,
+        # the queue will be empty and no message will be consumed.
         sdc_executor.start_pipeline(pipeline).wait_for_pipeline_batch_count(1)
         sdc_executor.stop_pipeline(pipeline)
 
-        time.sleep(expiration_ms * 0.001)
+        def message_count():
+            return channel.queue_declare(queue=queue_name, passive=True).method.message_count
+
+        if set_expiration:
+            wait_until(lambda: message_count() == 0,
+                       timeout_sec=expiration_ms * 0.001 + 30,
+                       description=f'message in {queue_name} to expire')
+        else:
+            assert_holds_for(lambda: message_count() == 1,
+                             expiration_ms * 0.001 + 1,
+                             description=f'message in {queue_name} to outlive {expiration_ms} ms')
         msg_read = channel.basic_get(queue_name, False)[2]
         if set_expiration:
             assert msg_read == None
@@ -22,11 +22,7 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 
-# Specify a port for SDC RPC stages to use.
-SDC_RPC_LISTENING_PORT = 20000
-
-
-def test_sdcrpc_with_buffering_origin_target(sdc_builder, sdc_executor):
+def test_sdcrpc_with_buffering_origin_target(sdc_builder, sdc_executor, free_port):
     """This test will test SDC RPC with buffering origin and SDC RPC target. The way we do that is to create 2 pipelines - one which creates
     RPC listener (SDC RPC with buffering origin pipeline) and another which writes to RPC (SDC RPC target pipeline). We then assert
     what we ingest at RPC target pipeline to what we find at snapshot of RPC origin pipeline. The pipelines would look
@@ -46,7 +42,7 @@ def test_sdcrpc_with_buffering_origin_target(sdc_builder, sdc_executor):
     builder = sdc_builder.get_pipeline_builder()
 
     sdc_rpc_origin = builder.add_stage('Dev SDC RPC with Buffering')
-    sdc_rpc_origin.sdc_rpc_listening_port = SDC_RPC_LISTENING_PORT
+    sdc_rpc_origin.sdc_rpc_listening_port = free_port
     sdc_rpc_origin.sdc_rpc_id = sdc_rpc_id
 
     sdc_rpc_origin >> (builder.add_stage(label='Trash'))
@@ -60,7 +56,7 @@ def test_sdcrpc_with_buffering_origin_target(sdc_builder, sdc_executor):
     dev_raw_data_source.raw_data = raw_str
 
     sdc_rpc_destination = builder.add_stage(name='com_streamsets_pipeline_stage_destination_sdcipc_SdcIpcDTarget')
-    sdc_rpc_destination.sdc_rpc_connection.append('{}:{}'.format(sdc_executor.server_host, SDC_RPC_LISTENING_PORT))
+    sdc_rpc_destination.sdc_rpc_connection.append('{}:{}'.format(sdc_executor.server_host, free_port))
     sdc_rpc_destination.sdc_rpc_id = sdc_rpc_id
 
     dev_raw_data_source >> sdc_rpc_destination
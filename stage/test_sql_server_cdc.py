@@ -16,21 +16,23 @@ import binascii
 import json
 import logging
 import string
-from time import sleep, time
 
 import pytest
 import sqlalchemy
 from streamsets.testframework.markers import database, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from .utils.utils_cdc import wait_for_data_in_ct_table
+from .utils.utils_compare import compare_rows
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_SCHEMA_NAME = 'dbo'
 
 
-def setup_table(connection, schema_name, table_name, sample_data=None):
-    """Create table and insert the sample data into the table"""
-    table = create_table(connection, schema_name, table_name)
+def setup_table(connection, table_factory, schema_name, table_name, sample_data=None):
+    """Create table, enable CDC on it and insert the sample data into the table"""
+    table = create_table(table_factory, schema_name, table_name)
 
     logger.info('Enabling CDC on %s.%s...', schema_name, table_name)
     connection.execute(f'exec sys.sp_cdc_enable_table @source_schema=\'{schema_name}\', '
@@ -46,18 +48,14 @@ def add_data_to_table(connection, table, sample_data):
     connection.execute(table.insert(), sample_data)
 
 
-def create_table(database, schema_name, table_name):
+def create_table(table_factory, schema_name, table_name):
     """Create table with the folloiwng scheam: id int primary key, name varchar(25), dt datetime"""
-    logger.info('Creating table %s.%s...', schema_name, table_name)
-    table = sqlalchemy.Table(table_name, sqlalchemy.MetaData(),
-                             sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True, autoincrement=False),
-                             sqlalchemy.Column('name', sqlalchemy.String(25)),
-                             sqlalchemy.Column('dt', sqlalchemy.String(25)),
-                             schema=schema_name)
-
-    table.create(database.engine)
-
-    return table
+    return table_factory.create_table(table_name,
+                                      sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True,
+                                                        autoincrement=False),
+                                      sqlalchemy.Column('name', sqlalchemy.String(25)),
+                                      sqlalchemy.Column('dt', sqlalchemy.String(25)),
+                                      schema=schema_name)
 
 
 def assert_table_replicated(database, sample_data, schema_name, table_name):
@@ -67,13 +65,8 @@ def assert_table_replicated(database, sample_data, schema_name, table_name):
     target_table = sqlalchemy.Table(table_name, sqlalchemy.MetaData(),
                                     autoload=True, autoload_with=db_engine,
                                     schema=schema_name)
-    target_result = db_engine.execute(target_table.select().order_by(target_table.c['id']))
-    target_result_list = target_result.fetchall()
-    target_result.close()
-
-    input_values = [tuple(data.values()) for data in sample_data]
-
-    assert sorted(input_values) == sorted(target_result_list)
+    comparison = compare_rows(db_engine, sample_data, target_table, 'id')
+    assert comparison.matches, str(comparison)
 
 
 def setup_sample_data(no_of_records):
@@ -83,34 +76,11 @@ def setup_sample_data(no_of_records):
     return rows_in_database
 
 
-def wait_for_data_in_ct_table(ct_table_name, no_of_records, database=None, timeout_sec=50):
-    """Wait for data is captured by CDC jobs in SQL Server
-    (i.e, number of records in CT table is equal to the total number of records).
-    """
-    logger.info('Waiting for no_data_event to be updated in %s seconds ...', timeout_sec)
-    start_waiting_time = time()
-    stop_waiting_time = start_waiting_time + timeout_sec
-    db_engine = database.engine
-
-    while time() < stop_waiting_time:
-        event_table = sqlalchemy.Table(ct_table_name, sqlalchemy.MetaData(), autoload=True,
-                                       autoload_with=db_engine, schema='cdc')
-        event_result = db_engine.execute(event_table.select())
-        event_result_list = event_result.fetchall()
-        event_result.close()
-
-        if len(event_result_list) >= no_of_records:
-            logger.info('%s of data is captured in CT Table %s', no_of_records, ct_table_name)
-            return
-        sleep(5)
-
-    raise Exception('Timed out after %s seconds while waiting for captured data.', timeout_sec)
-
-
 @database('sqlserver')
 @pytest.mark.parametrize('no_of_threads', [1, 5])
 @sdc_min_version('3.0.1.0')
-def test_sql_server_cdc_with_specific_capture_instance_name(sdc_builder, sdc_executor, database, no_of_threads):
+def test_sql_server_cdc_with_specific_capture_instance_name(sdc_builder, sdc_executor, database, table_factory,
+                                                            no_of_threads):
     """Test for SQL Server CDC origin stage when capture instance is configured.
     We do so by capturing Insert Operation on CDC enabled table
     using SQL Server CDC Origin and having a pipeline which reads that data using SQL Server CDC origin stage.
@@ -139,7 +109,7 @@ def test_sql_server_cdc_with_specific_capture_instance_name(sdc_builder, sdc_exe
             # split the rows_in_database into no_of_records for each table
             # e.g. for no_of_records=5, the first table inserts rows_in_database[0:5]
             # and the secord table inserts rows_in_database[5:10]
-            table = setup_table(connection, schema_name, table_name,
+            table = setup_table(connection, table_factory, schema_name, table_name,
                                 rows_in_database[(index*no_of_records): ((index+1)*no_of_records)])
             tables.append(table)
             table_configs.append({'capture_instance': f'{schema_name}_{table_name}'})
@@ -154,8 +124,7 @@ def test_sql_server_cdc_with_specific_capture_instance_name(sdc_builder, sdc_exe
 
         dest_table_name = get_random_string(string.ascii_uppercase, 9)
 
-        dest_table = create_table(database, DEFAULT_SCHEMA_NAME, dest_table_name)
-        tables.append(dest_table)
+        create_table(table_factory, DEFAULT_SCHEMA_NAME, dest_table_name)
         jdbc_producer = pipeline_builder.add_stage('JDBC Producer')
 
         jdbc_producer.set_attributes(schema_name=DEFAULT_SCHEMA_NAME,
@@ -178,15 +147,13 @@ def test_sql_server_cdc_with_specific_capture_instance_name(sdc_builder, sdc_exe
         assert_table_replicated(database, rows_in_database, DEFAULT_SCHEMA_NAME, dest_table_name)
 
     finally:
-        for table in tables:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
+        connection.close()
 
 
 @database('sqlserver')
 @sdc_min_version('3.6.0')
 @pytest.mark.parametrize('use_table', [True, False])
-def test_sql_server_cdc_with_empty_initial_offset(sdc_builder, sdc_executor, database, use_table):
+def test_sql_server_cdc_with_empty_initial_offset(sdc_builder, sdc_executor, database, table_factory, use_table):
     """Test for SQL Server CDC origin stage with the empty initial offset (fetch all changes)
     on both use table config is true and false
 
@@ -204,7 +171,7 @@ def test_sql_server_cdc_with_empty_initial_offset(sdc_builder, sdc_executor, dat
 
         # create the table with the above sample data
         table_name = get_random_string(string.ascii_lowercase, 20)
-        table = setup_table(connection, schema_name, table_name, rows_in_database)
+        setup_table(connection, table_factory, schema_name, table_name, rows_in_database)
 
         # get the capture_instance_name
         capture_instance_name = f'{schema_name}_{table_name}'
@@ -217,7 +184,7 @@ def test_sql_server_cdc_with_empty_initial_offset(sdc_builder, sdc_executor, dat
 
         # create the destination table
         dest_table_name = get_random_string(string.ascii_uppercase, 9)
-        dest_table = create_table(database, DEFAULT_SCHEMA_NAME, dest_table_name)
+        create_table(table_factory, DEFAULT_SCHEMA_NAME, dest_table_name)
 
         jdbc_producer = pipeline_builder.add_stage('JDBC Producer')
 
@@ -240,19 +207,13 @@ def test_sql_server_cdc_with_empty_initial_offset(sdc_builder, sdc_executor, dat
         assert_table_replicated(database, rows_in_database, DEFAULT_SCHEMA_NAME, dest_table_name)
 
     finally:
-        if table is not None:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
-
-        if dest_table is not None:
-            logger.info('Dropping table %s in %s database...', dest_table, database.type)
-            dest_table.drop(database.engine)
+        connection.close()
 
 
 @database('sqlserver')
 @sdc_min_version('3.6.0')
 @pytest.mark.parametrize('use_table', [True, False])
-def test_sql_server_cdc_with_nonempty_initial_offset(sdc_builder, sdc_executor, database, use_table):
+def test_sql_server_cdc_with_nonempty_initial_offset(sdc_builder, sdc_executor, database, table_factory, use_table):
     """Test for SQL Server CDC origin stage with non-empty initial offset (fetch the data from the given LSN)
     on both use table config is true and false
 
@@ -273,7 +234,7 @@ def test_sql_server_cdc_with_nonempty_initial_offset(sdc_builder, sdc_executor,
         # create the table and insert the first half of the rows
         table_name = get_random_string(string.ascii_lowercase, 20)
         capture_instance_name = f'{schema_name}_{table_name}'
-        table = setup_table(connection, schema_name, table_name, rows_in_database[0:first_no_of_records])
+        table = setup_table(connection, table_factory, schema_name, table_name, rows_in_database[0:first_no_of_records])
         ct_table_name = f'{capture_instance_name}_CT'
         wait_for_data_in_ct_table(ct_table_name, first_no_of_records, database)
 
@@ -296,7 +257,7 @@ def test_sql_server_cdc_with_nonempty_initial_offset(sdc_builder, sdc_executor,
 
         # create the destination table
         dest_table_name = get_random_string(string.ascii_uppercase, 9)
-        dest_table = create_table(database, DEFAULT_SCHEMA_NAME, dest_table_name)
+        create_table(table_factory, DEFAULT_SCHEMA_NAME, dest_table_name)
 
         jdbc_producer = pipeline_builder.add_stage('JDBC Producer')
 
@@ -318,14 +279,6 @@ def test_sql_server_cdc_with_nonempty_initial_offset(sdc_builder, sdc_executor,
         assert_table_replicated(database, rows_in_database[first_no_of_records:total_no_of_records], DEFAULT_SCHEMA_NAME, dest_table_name)
 
     finally:
-        if table is not None:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
-
-        if dest_table is not None:
-            logger.info('Dropping table %s in %s database...', dest_table, database.type)
-            dest_table.drop(database.engine)
-
         if connection is not None:
             connection.close()
 
@@ -333,7 +286,7 @@ def test_sql_server_cdc_with_nonempty_initial_offset(sdc_builder, sdc_executor,
 @database('sqlserver')
 @sdc_min_version('3.6.0')
 @pytest.mark.parametrize('use_table', [True, False])
-def test_sql_server_cdc_with_last_committed_offset(sdc_builder, sdc_executor, database, use_table):
+def test_sql_server_cdc_with_last_committed_offset(sdc_builder, sdc_executor, database, table_factory, use_table):
     """Test for SQL Server CDC origin stage with nonempty last committed offset by restarting the pipeline
 
     The pipeline looks like:
@@ -353,7 +306,7 @@ def test_sql_server_cdc_with_last_committed_offset(sdc_builder, sdc_executor, da
 
         # create the table and insert the first half of the rows
         table_name = get_random_string(string.ascii_lowercase, 20)
-        table = setup_table(connection, schema_name, table_name, rows_in_database[0:first_no_of_records])
+        table = setup_table(connection, table_factory, schema_name, table_name, rows_in_database[0:first_no_of_records])
 
         # get the capture_instance_name
         capture_instance_name = f'{schema_name}_{table_name}'
@@ -366,7 +319,7 @@ def test_sql_server_cdc_with_last_committed_offset(sdc_builder, sdc_executor, da
 
         # create the destination table
         dest_table_name = get_random_string(string.ascii_uppercase, 9)
-        dest_table = create_table(database, DEFAULT_SCHEMA_NAME, dest_table_name)
+        create_table(table_factory, DEFAULT_SCHEMA_NAME, dest_table_name)
 
         jdbc_producer = pipeline_builder.add_stage('JDBC Producer')
 
@@ -397,14 +350,6 @@ def test_sql_server_cdc_with_last_committed_offset(sdc_builder, sdc_executor, da
         assert_table_replicated(database, rows_in_database, DEFAULT_SCHEMA_NAME, dest_table_name)
 
     finally:
-        if table is not None:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
-
-        if dest_table is not None:
-            logger.info('Dropping table %s in %s database...', dest_table, database.type)
-            dest_table.drop(database.engine)
-
         if connection is not None:
             connection.close()
 
@@ -412,7 +357,7 @@ def test_sql_server_cdc_with_last_committed_offset(sdc_builder, sdc_executor, da
 @sdc_min_version('3.6.0')
 @pytest.mark.parametrize('use_table', [True, False])
 @pytest.mark.timeout(180)
-def test_sql_server_cdc_insert_and_update(sdc_builder, sdc_executor, database, use_table):
+def test_sql_server_cdc_insert_and_update(sdc_builder, sdc_executor, database, table_factory, use_table):
     """Test for SQL Server CDC origin stage with insert and update ops
 
     The pipeline looks like:
@@ -429,7 +374,7 @@ def test_sql_server_cdc_insert_and_update(sdc_builder, sdc_executor, database, u
 
         # create the table and insert 1 row
         table_name = get_random_string(string.ascii_lowercase, 20)
-        table = setup_table(connection, schema_name, table_name, rows_in_database)
+        table = setup_table(connection, table_factory, schema_name, table_name, rows_in_database)
 
         # update the row
         updated_name = 'jisun'
@@ -451,7 +396,7 @@ def test_sql_server_cdc_insert_and_update(sdc_builder, sdc_executor, database, u
 
         # create the destination table
         dest_table_name = get_random_string(string.ascii_uppercase, 9)
-        dest_table = create_table(database, DEFAULT_SCHEMA_NAME, dest_table_name)
+        create_table(table_factory, DEFAULT_SCHEMA_NAME, dest_table_name)
 
         jdbc_producer = pipeline_builder.add_stage('JDBC Producer')
 
@@ -474,14 +419,6 @@ def test_sql_server_cdc_insert_and_update(sdc_builder, sdc_executor, database, u
         assert_table_replicated(database, expected_rows_in_database, DEFAULT_SCHEMA_NAME, dest_table_name)
 
     finally:
-        if table is not None:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
-
-        if dest_table is not None:
-            logger.info('Dropping table %s in %s database...', dest_table, database.type)
-            dest_table.drop(database.engine)
-
         if connection is not None:
             connection.close()
 
@@ -489,7 +426,7 @@ def test_sql_server_cdc_insert_and_update(sdc_builder, sdc_executor, database, u
 @sdc_min_version('3.6.0')
 @pytest.mark.parametrize('use_table', [True, False])
 @pytest.mark.timeout(180)
-def test_sql_server_cdc_insert_update_delete(sdc_builder, sdc_executor, database, use_table):
+def test_sql_server_cdc_insert_update_delete(sdc_builder, sdc_executor, database, table_factory, use_table):
     """Test for SQL Server CDC origin stage with insert, update, and delete ops
 
     The pipeline looks like:
@@ -506,7 +443,7 @@ def test_sql_server_cdc_insert_update_delete(sdc_builder, sdc_executor, database
 
         # create the table and insert 1 row
         table_name = get_random_string(string.ascii_lowercase, 20)
-        table = setup_table(connection, schema_name, table_name, rows_in_database)
+        table = setup_table(connection, table_factory, schema_name, table_name, rows_in_database)
 
         # update the row
         updated_name = 'jisun'
@@ -531,7 +468,7 @@ def test_sql_server_cdc_insert_update_delete(sdc_builder, sdc_executor, database
 
         # create the destination table
         dest_table_name = get_random_string(string.ascii_uppercase, 9)
-        dest_table = create_table(database, DEFAULT_SCHEMA_NAME, dest_table_name)
+        create_table(table_factory, DEFAULT_SCHEMA_NAME, dest_table_name)
 
         jdbc_producer = pipeline_builder.add_stage('JDBC Producer')
 
@@ -554,14 +491,6 @@ def test_sql_server_cdc_insert_update_delete(sdc_builder, sdc_executor, database
         assert_table_replicated(database, expected_rows_in_database, DEFAULT_SCHEMA_NAME, dest_table_name)
 
     finally:
-        if table is not None:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
-
-        if dest_table is not None:
-            logger.info('Dropping table %s in %s database...', dest_table, database.type)
-            dest_table.drop(database.engine)
-
         if connection is not None:
             connection.close()
 
@@ -570,7 +499,7 @@ def test_sql_server_cdc_insert_update_delete(sdc_builder, sdc_executor, database
 @sdc_min_version('3.6.0')
 @pytest.mark.parametrize('use_table', [True, False])
 @pytest.mark.timeout(180)
-def test_sql_server_cdc_multiple_tables(sdc_builder, sdc_executor, database, use_table):
+def test_sql_server_cdc_multiple_tables(sdc_builder, sdc_executor, database, table_factory, use_table):
     """Test for SQL Server CDC origin stage with multiple transactions on multiple CDC tables (SDC-10926)
 
     The pipeline looks like:
@@ -590,7 +519,8 @@ def test_sql_server_cdc_multiple_tables(sdc_builder, sdc_executor, database, use
         for index in range(0, no_of_tables):
             # create the table and insert 1 row and update the row
             table_name = get_random_string(string.ascii_lowercase, 20)
-            table = setup_table(connection, DEFAULT_SCHEMA_NAME, table_name, rows_in_database[index:index+1])
+            table = setup_table(connection, table_factory, DEFAULT_SCHEMA_NAME, table_name,
+                                rows_in_database[index:index+1])
 
             updated_name = 'jisun'
             connection.execute(table.update()
@@ -612,7 +542,7 @@ def test_sql_server_cdc_multiple_tables(sdc_builder, sdc_executor, database, use
 
         # create the destination table
         dest_table_name = get_random_string(string.ascii_uppercase, 9)
-        dest_table = create_table(database, DEFAULT_SCHEMA_NAME, dest_table_name)
+        create_table(table_factory, DEFAULT_SCHEMA_NAME, dest_table_name)
 
         jdbc_producer = pipeline_builder.add_stage('JDBC Producer')
 
@@ -638,20 +568,13 @@ def test_sql_server_cdc_multiple_tables(sdc_builder, sdc_executor, database, use
         msgs_sent_count = sqlserver_cdc_pipeline_history.latest.metrics.counter('pipeline.batchOutputRecords.counter').count
         assert msgs_sent_count == total_no_of_records
     finally:
-        for index in range(0, no_of_tables):
-            logger.info('Dropping table %s in %s database...', tables[index], database.type)
-            tables[index].drop(database.engine)
-
-        logger.info('Dropping table %s in %s database...', dest_table, database.type)
-        dest_table.drop(database.engine)
-
         if connection is not None:
             connection.close()
 
 
 @database('sqlserver')
 @pytest.mark.timeout(180)
-def test_sql_server_cdc_no_more_events(sdc_builder, sdc_executor, database):
+def test_sql_server_cdc_no_more_events(sdc_builder, sdc_executor, database, table_factory):
     """Test for SQL Server CDC origin stage on producing no-more-data events.
     insert 1 record to the table and running the pipeline should produce 1 no-more-data event
     insert 1 more record to the table should produce 1 no-more-data event
@@ -661,7 +584,6 @@ def test_sql_server_cdc_no_more_events(sdc_builder, sdc_executor, database):
         sql_server_cdc_origin >> trash
                               >= trash
     """
-    table = None
     connection = None
     if not database.is_cdc_enabled:
         pytest.skip('Test only runs against SQL Server with CDC enabled.')
@@ -677,7 +599,7 @@ def test_sql_server_cdc_no_more_events(sdc_builder, sdc_executor, database):
         logger.info(rows_in_database)
 
         table_name = get_random_string(string.ascii_lowercase, 20)
-        table = setup_table(connection, DEFAULT_SCHEMA_NAME, table_name, rows_in_database[0:1])
+        table = setup_table(connection, table_factory, DEFAULT_SCHEMA_NAME, table_name, rows_in_database[0:1])
 
         # get the capture_instance_name
         capture_instance_name = f'{DEFAULT_SCHEMA_NAME}_{table_name}'
@@ -691,7 +613,7 @@ def test_sql_server_cdc_no_more_events(sdc_builder, sdc_executor, database):
 
         # create the destination table
         dest_table_name = get_random_string(string.ascii_uppercase, 9)
-        dest_table = create_table(database, DEFAULT_SCHEMA_NAME, dest_table_name)
+        create_table(table_factory, DEFAULT_SCHEMA_NAME, dest_table_name)
 
         trash = pipeline_builder.add_stage('Trash')
 
@@ -729,9 +651,5 @@ def test_sql_server_cdc_no_more_events(sdc_builder, sdc_executor, database):
         msgs_sent_count = history.latest.metrics.counter('stage.Trash_02.outputRecords.counter').count
         assert msgs_sent_count == 2
     finally:
-        if table is not None:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
-
         if connection is not None:
             connection.close()
@@ -23,17 +23,24 @@ import pytest
 from streamsets.testframework.environment import TCPClient
 from streamsets.testframework.markers import sdc_min_version
 
+from .utils.utils_snapshot import SnapshotView
+
 logger = logging.getLogger(__name__)
 
-# TODO: convert to pipeline param. seems to not work (see below)
-TCP_PORT = 17892
 TCP_SSL_FILE_PATH = './resources/tcp_server/file.txt'
 # TCP keystore file path relative to $SDC_RESOURCES.
 TCP_KEYSTORE_FILE_PATH = 'resources/tcp_server/keystore.jks'
 
 
 @pytest.fixture(scope='module')
-def tcp_server_pipeline(sdc_builder, sdc_executor):
+def tcp_port(port_allocator):
+    port = port_allocator.allocate()
+    yield port
+    port_allocator.release(port)
+
+
+@pytest.fixture(scope='module')
+def tcp_server_pipeline(sdc_builder, sdc_executor, tcp_port):
     """Creates a pipeline with a TCP server origin using TEXT data with default separated records."""
     pipeline_builder = sdc_builder.get_pipeline_builder()
 
@@ -41,7 +48,7 @@ def tcp_server_pipeline(sdc_builder, sdc_executor):
     tcp_server.configuration.update({'conf.dataFormat': 'TEXT',
                                      # TODO: convert to param; this doesn't work
                                      # 'conf.ports': ['${TCP_LISTEN_PORT}'],
-                                     'conf.ports': [str(TCP_PORT)],
+                                     'conf.ports': [str(tcp_port)],
                                      'conf.tcpMode': 'DELIMITED_RECORDS',
                                      'conf.recordProcessedAckMessage': 'record_${record:value(\'/text\')}'})
 
@@ -56,7 +63,7 @@ def tcp_server_pipeline(sdc_builder, sdc_executor):
     yield namedtuple('Pipeline', ['pipeline', 'tcp_server'])(pipeline, tcp_server)
 
 
-def test_tcp_server_simple(sdc_executor, tcp_server_pipeline):
+def test_tcp_server_simple(sdc_executor, tcp_server_pipeline, tcp_port):
     """Runs a test using the TCP server origin pipeline and asserts that the test record is created, with ack."""
     # Start TCP Server pipeline.
     expected_msg = 'hello_world'
@@ -65,7 +72,7 @@ def test_tcp_server_simple(sdc_executor, tcp_server_pipeline):
     snapshot_cmd = sdc_executor.capture_snapshot(tcp_server_pipeline.pipeline, start_pipeline=True, batches=1,
                                                  batch_size=1, wait=False)
     # create TCP client and send the data
-    tcp_client = TCPClient(sdc_executor.server_host, TCP_PORT)
+    tcp_client = TCPClient(sdc_executor.server_host, tcp_port)
     # default separator is newline
     record_ack1 = tcp_client.send_str_and_ack(f'{expected_msg}\n')
 
@@ -81,13 +88,13 @@ def test_tcp_server_simple(sdc_executor, tcp_server_pipeline):
 
 # SDC-10425
 @sdc_min_version('3.0.0.0') # Need the delay processor
-def test_stop_tcp_with_delay(sdc_builder, sdc_executor):
+def test_stop_tcp_with_delay(sdc_builder, sdc_executor, tcp_port):
     """Make sure that the origin can properly be started after stopping it with long batch times."""
     builder = sdc_builder.get_pipeline_builder()
 
     tcp_server = builder.add_stage('TCP Server')
     tcp_server.configuration.update({'conf.dataFormat': 'TEXT',
-                                     'conf.ports': [str(TCP_PORT)],
+                                     'conf.ports': [str(tcp_port)],
                                      'conf.tcpMode': 'DELIMITED_RECORDS',
                                      'conf.recordProcessedAckMessage': 'record_${record:value(\'/text\')}'})
 
@@ -109,7 +116,7 @@ def test_stop_tcp_with_delay(sdc_builder, sdc_executor):
         sdc_executor.start_pipeline(pipeline)
 
         # Send exactly one record
-        tcp_client = TCPClient(sdc_executor.server_host, TCP_PORT)
+        tcp_client = TCPClient(sdc_executor.server_host, tcp_port)
         tcp_client.send_str_and_ack('Something not important\n')
 
         # Wait one second to make sure that the batch is 'processing' (it should take ~5 seconds to process that batch)
@@ -130,7 +137,7 @@ def test_stop_tcp_with_delay(sdc_builder, sdc_executor):
 
 
 @sdc_min_version('3.7.0')
-def test_tcp_server_read_timeout(sdc_builder, sdc_executor):
+def test_tcp_server_read_timeout(sdc_builder, sdc_executor, tcp_port):
     """Runs a test using TCP Server Origin and setting Read Timeout to 20 seconds.
     Then checks connection is automatically closed after 20 seconds as the timeout is triggered.
 
@@ -142,7 +149,7 @@ def test_tcp_server_read_timeout(sdc_builder, sdc_executor):
 
     pipeline_builder = sdc_builder.get_pipeline_builder()
 
-    tcp_server_stage = pipeline_builder.add_stage('TCP Server').set_attributes(port=[str(TCP_PORT)],
+    tcp_server_stage = pipeline_builder.add_stage('TCP Server').set_attributes(port=[str(tcp_port)],
                                                                                tcp_mode='DELIMITED_RECORDS',
                                                                                data_format='TEXT',
                                                                                read_timeout_in_seconds=20)
@@ -159,7 +166,7 @@ def test_tcp_server_read_timeout(sdc_builder, sdc_executor):
 
         # Send message to test connection is open.
         tcp_client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        tcp_client_socket.connect((sdc_executor.server_host, TCP_PORT))
+        tcp_client_socket.connect((sdc_executor.server_host, tcp_port))
         messages_sent = 0
         while messages_sent < 1:
             messages_sent = tcp_client_socket.send(bytes(expected_message, 'utf-8'))
@@ -178,7 +185,7 @@ def test_tcp_server_read_timeout(sdc_builder, sdc_executor):
         sdc_executor.stop_pipeline(tcp_server_pipeline, wait=True, force=True)
 
 
-def test_tcp_server_multiple_messages(sdc_builder, sdc_executor):
+def test_tcp_server_multiple_messages(sdc_builder, sdc_executor, tcp_port):
     """Runs a test using 4 pipelines with the TCP Server Origin writing to trash and checking all records sent by the
     client are correctly received by the TCP Server Origin. Pipeline configurations are:
 
@@ -194,41 +201,42 @@ def test_tcp_server_multiple_messages(sdc_builder, sdc_executor):
     expected_message = ' hello_world\n'
 
     # Build and test pipeline number 1.
-    tcp_server_pipeline_1, tcp_server_stage_1 = add_tcp_pipeline_multiple_messages(sdc_builder, sdc_executor,
+    tcp_server_pipeline_1, tcp_server_stage_1 = add_tcp_pipeline_multiple_messages(sdc_builder, sdc_executor, tcp_port,
                                                                                    record_ack=False, batch_ack=False,
                                                                                    batch_timeout=1000, batch_size=10)
-    run_pipeline_send_tcp_messages(sdc_executor, tcp_server_pipeline_1, tcp_server_stage_1, expected_message, 3,
-                                   [26, 25, 5], [0, 0, 5])
+    run_pipeline_send_tcp_messages(sdc_executor, tcp_port, tcp_server_pipeline_1, tcp_server_stage_1, expected_message,
+                                   3, [26, 25, 5], [0, 0, 5])
 
     # Build and test pipeline number 2.
-    tcp_server_pipeline_2, tcp_server_stage_2 = add_tcp_pipeline_multiple_messages(sdc_builder, sdc_executor,
+    tcp_server_pipeline_2, tcp_server_stage_2 = add_tcp_pipeline_multiple_messages(sdc_builder, sdc_executor, tcp_port,
                                                                                    record_ack=True, batch_ack=False,
                                                                                    batch_timeout=1000, batch_size=10)
-    run_pipeline_send_tcp_messages(sdc_executor, tcp_server_pipeline_2, tcp_server_stage_2, expected_message, 3,
-                                   [26, 25, 5], [0, 0, 5])
+    run_pipeline_send_tcp_messages(sdc_executor, tcp_port, tcp_server_pipeline_2, tcp_server_stage_2, expected_message,
+                                   3, [26, 25, 5], [0, 0, 5])
 
     # Build and test pipeline number 3.
-    tcp_server_pipeline_3, tcp_server_stage_3 = add_tcp_pipeline_multiple_messages(sdc_builder, sdc_executor,
+    tcp_server_pipeline_3, tcp_server_stage_3 = add_tcp_pipeline_multiple_messages(sdc_builder, sdc_executor, tcp_port,
                                                                                    record_ack=False, batch_ack=True,
                                                                                    batch_timeout=1000, batch_size=10)
-    run_pipeline_send_tcp_messages(sdc_executor, tcp_server_pipeline_3, tcp_server_stage_3, expected_message, 3,
-                                   [26, 25, 5], [0, 0, 5])
+    run_pipeline_send_tcp_messages(sdc_executor, tcp_port, tcp_server_pipeline_3, tcp_server_stage_3, expected_message,
+                                   3, [26, 25, 5], [0, 0, 5])
 
     # Build and test pipeline number 4.
-    tcp_server_pipeline_4, tcp_server_stage_4 = add_tcp_pipeline_multiple_messages(sdc_builder, sdc_executor,
+    tcp_server_pipeline_4, tcp_server_stage_4 = add_tcp_pipeline_multiple_messages(sdc_builder, sdc_executor, tcp_port,
                                                                                    record_ack=True, batch_ack=True,
                                                                                    batch_timeout=1000, batch_size=10)
-    run_pipeline_send_tcp_messages(sdc_executor, tcp_server_pipeline_4, tcp_server_stage_4, expected_message, 3,
-                                   [26, 25, 5], [0, 0, 5])
+    run_pipeline_send_tcp_messages(sdc_executor, tcp_port, tcp_server_pipeline_4, tcp_server_stage_4, expected_message,
+                                   3, [26, 25, 5], [0, 0, 5])
 
 
-def add_tcp_pipeline_multiple_messages(sdc_builder, sdc_executor, record_ack, batch_ack, batch_timeout, batch_size):
+def add_tcp_pipeline_multiple_messages(sdc_builder, sdc_executor, tcp_port, record_ack, batch_ack, batch_timeout,
+                                       batch_size):
     """Add a TCP Server to Trash pipeline to the given sdc_executor setting a record ack if record_ack is true or
     setting a batch ack batch_ack is true.
     """
     pipeline_builder = sdc_builder.get_pipeline_builder()
 
-    tcp_server_stage = pipeline_builder.add_stage('TCP Server').set_attributes(port=[str(TCP_PORT)],
+    tcp_server_stage = pipeline_builder.add_stage('TCP Server').set_attributes(port=[str(tcp_port)],
                                                                                tcp_mode='DELIMITED_RECORDS',
                                                                                data_format='TEXT',
                                                                                batch_wait_time_in_ms=batch_timeout,
@@ -252,8 +260,8 @@ def add_tcp_pipeline_multiple_messages(sdc_builder, sdc_executor, record_ack, ba
     return [tcp_server_pipeline, tcp_server_stage]
 
 
-def run_pipeline_send_tcp_messages(sdc_executor, tcp_server_pipeline, tcp_server_stage, expected_message, num_clients,
-                                   num_messages_by_client, seconds_to_wait_before_close):
+def run_pipeline_send_tcp_messages(sdc_executor, tcp_port, tcp_server_pipeline, tcp_server_stage, expected_message,
+                                   num_clients, num_messages_by_client, seconds_to_wait_before_close):
     """ Runs the given tcp_server_pipeline and sends num_messages_by_client messages for each client where each
     position in num_messages_by_client indicates the number of messages to send for the next client, for example: first
     client will send num_messages_by_client[0] messages and so on. The number of clients is num_clients, therefore
@@ -276,7 +284,7 @@ def run_pipeline_send_tcp_messages(sdc_executor, tcp_server_pipeline, tcp_server
         for i in range(0, num_clients):
             # Create tcp client.
             tcp_client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            tcp_client_socket.connect((sdc_executor.server_host, TCP_PORT))
+            tcp_client_socket.connect((sdc_executor.server_host, tcp_port))
 
             # Send messages for this tcp client.
             for j in range(0, num_messages_by_client[i]):
@@ -293,9 +301,7 @@ def run_pipeline_send_tcp_messages(sdc_executor, tcp_server_pipeline, tcp_server
             tcp_client_socket.close()
 
         snapshot = snapshot_cmd.wait_for_finished().snapshot
-        output_records_values = [str(record.field['text'])
-                                 for batch in snapshot.snapshot_batches
-                                 for record in batch.stage_outputs[tcp_server_stage.instance_name].output]
+        output_records_values = SnapshotView(snapshot)[tcp_server_stage].column('/text')
         assert len(output_records_values) == total_num_messages
         assert sorted(output_records_values) == sorted(expected_messages_list)
     finally:
@@ -303,7 +309,7 @@ def run_pipeline_send_tcp_messages(sdc_executor, tcp_server_pipeline, tcp_server
 
 
 @sdc_min_version('3.4.2')
-def test_tcp_server_ssl(sdc_builder, sdc_executor):
+def test_tcp_server_ssl(sdc_builder, sdc_executor, tcp_port):
     """Runs a test using the TCP server origin pipeline with Enable TLS set and asserts that the file is received"""
     expected_msg = get_expected_message(TCP_SSL_FILE_PATH)
 
@@ -312,7 +318,7 @@ def test_tcp_server_ssl(sdc_builder, sdc_executor):
 
     tcp_server = pipeline_builder.add_stage('TCP Server')
     tcp_server.set_attributes(data_format='TEXT',
-                              port=[str(TCP_PORT)],
+                              port=[str(tcp_port)],
                               tcp_mode='DELIMITED_RECORDS',
                               use_tls=True,
                               keystore_file=TCP_KEYSTORE_FILE_PATH,
@@ -335,8 +341,8 @@ def test_tcp_server_ssl(sdc_builder, sdc_executor):
                                                      batch_size=2, wait=False)
 
         # Send twice the data. Even though batch_size = 2, 2 batches are sent (1 for each connection).
-        send_tcp_ssl_file(sdc_executor)
-        send_tcp_ssl_file(sdc_executor)
+        send_tcp_ssl_file(sdc_executor, tcp_port)
+        send_tcp_ssl_file(sdc_executor, tcp_port)
 
         # Wait for snapshot to finish then stop the pipeline in order to get the summary later.
         snapshot = snapshot_cmd.wait_for_finished().snapshot
@@ -355,14 +361,14 @@ def test_tcp_server_ssl(sdc_builder, sdc_executor):
             sdc_executor.stop_pipeline(tcp_server_ssl_pipeline)
 
 
-def send_tcp_ssl_file(sdc_executor):
+def send_tcp_ssl_file(sdc_executor, tcp_port):
     """Sends a file through tcp using ssl"""
     hostname = sdc_executor.server_host
     context = ssl.create_default_context()
     context.check_hostname = False
     context.verify_mode = ssl.CERT_NONE
 
-    with socket.create_connection((hostname, TCP_PORT)) as sock:
+    with socket.create_connection((hostname, tcp_port)) as sock:
         with context.wrap_socket(sock, server_hostname=hostname) as ssock:
             file_to_send = open(TCP_SSL_FILE_PATH, 'rb')
             ssock.sendfile(file_to_send)
@@ -377,9 +383,9 @@ def get_expected_message(file_path):
     return message
 
 
-def test_tcp_multiple_ports(sdc_builder, sdc_executor):
-    """ Runs a test using TCP Server as Origin and Trash as destination. TCP Server will be listening to ports 55555 and
-    44444. Two clients will be writing in parallel to one of these ports (each client to a different port). While
+def test_tcp_multiple_ports(sdc_builder, sdc_executor, port_factory):
+    """ Runs a test using TCP Server as Origin and Trash as destination. TCP Server will be listening to two ports. Two
+    clients will be writing in parallel to one of these ports (each client to a different port). While
     clients are writing it will be checked no exception is thrown due to TCP Server pool exhausted.
 
     Pipeline looks like:
@@ -387,9 +393,10 @@ def test_tcp_multiple_ports(sdc_builder, sdc_executor):
     TCP Server >> trash
     """
 
+    first_port, second_port = port_factory(), port_factory()
     pipeline_builder = sdc_builder.get_pipeline_builder()
 
-    tcp_server_stage = pipeline_builder.add_stage('TCP Server').set_attributes(port=[str(55555), str(44444)],
+    tcp_server_stage = pipeline_builder.add_stage('TCP Server').set_attributes(port=[str(first_port), str(second_port)],
                                                                                number_of_receiver_threads=5,
                                                                                tcp_mode='DELIMITED_RECORDS',
                                                                                max_batch_size_in_messages=10000,
@@ -415,18 +422,18 @@ def test_tcp_multiple_ports(sdc_builder, sdc_executor):
         message_counter = 0
         expected_messages_list = []
 
-        # Create tcp client listening to port 55555.
-        tcp_client_socket_port_55555 = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        tcp_client_socket_port_55555.connect((sdc_executor.server_host, 55555))
+        # Create tcp client listening to the first port.
+        tcp_client_socket_first_port = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        tcp_client_socket_first_port.connect((sdc_executor.server_host, first_port))
 
-        # Create tcp client listening to port 44444.
-        tcp_client_socket_port_44444 = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        tcp_client_socket_port_44444.connect((sdc_executor.server_host, 44444))
+        # Create tcp client listening to the second port.
+        tcp_client_socket_second_port = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        tcp_client_socket_second_port.connect((sdc_executor.server_host, second_port))
 
         # Send messages for both tcp clients.
         for i in range(0, 100000):
             expected_message_bytes = bytes(f'{message_counter}{expected_message}', 'utf-8')
-            send_asynchronous_message_multiple_clients([tcp_client_socket_port_55555, tcp_client_socket_port_44444],
+            send_asynchronous_message_multiple_clients([tcp_client_socket_first_port, tcp_client_socket_second_port],
                                                        expected_message_bytes)
             new_line_char = '\n'
             # Append twice the message to the list as two clients sending send message.
@@ -436,13 +443,11 @@ def test_tcp_multiple_ports(sdc_builder, sdc_executor):
             total_num_messages += 2
 
         # Close clients.
-        tcp_client_socket_port_55555.close()
-        tcp_client_socket_port_44444.close()
+        tcp_client_socket_first_port.close()
+        tcp_client_socket_second_port.close()
 
         snapshot = snapshot_cmd.wait_for_finished().snapshot
-        output_records_values = [str(record.field['text'])
-                                 for batch in snapshot.snapshot_batches
-                                 for record in batch.stage_outputs[tcp_server_stage.instance_name].output]
+        output_records_values = SnapshotView(snapshot)[tcp_server_stage].column('/text')
         assert len(output_records_values) == total_num_messages
         assert sorted(output_records_values) == sorted(expected_messages_list)
 
@@ -470,7 +475,7 @@ def send_synchronous_message(client_socket, message_bytes):
     client_socket.sendall(message_bytes)
 
 
-def test_tcp_epoll_enabled(sdc_builder, sdc_executor):
+def test_tcp_epoll_enabled(sdc_builder, sdc_executor, tcp_port):
     """ Run a pipeline with TCP Server Origin having Epoll Enabled as well as setting number of threads to 5 and
     validate it correctly starts and receives data from a client.
 
@@ -480,7 +485,7 @@ def test_tcp_epoll_enabled(sdc_builder, sdc_executor):
     """
     pipeline_builder = sdc_builder.get_pipeline_builder()
 
-    tcp_server_stage = pipeline_builder.add_stage('TCP Server').set_attributes(port=[str(TCP_PORT)],
+    tcp_server_stage = pipeline_builder.add_stage('TCP Server').set_attributes(port=[str(tcp_port)],
                                                                                number_of_receiver_threads=5,
                                                                                enable_native_transports_in_epoll=True,
                                                                                tcp_mode='DELIMITED_RECORDS',
@@ -508,7 +513,7 @@ def test_tcp_epoll_enabled(sdc_builder, sdc_executor):
 
         # Create tcp client.
         tcp_client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        tcp_client_socket.connect((sdc_executor.server_host, TCP_PORT))
+        tcp_client_socket.connect((sdc_executor.server_host, tcp_port))
 
         # Send messages for this tcp client.
         for j in range(0, 50000):
@@ -521,9 +526,7 @@ def test_tcp_epoll_enabled(sdc_builder, sdc_executor):
         tcp_client_socket.close()
 
         snapshot = snapshot_cmd.wait_for_finished(timeout_sec=60).snapshot
-        output_records_values = [str(record.field['text'])
-                                 for batch in snapshot.snapshot_batches
-                                 for record in batch.stage_outputs[tcp_server_stage.instance_name].output]
+        output_records_values = SnapshotView(snapshot)[tcp_server_stage].column('/text')
         assert len(output_records_values) == total_num_messages
         assert sorted(output_records_values) == sorted(expected_messages_list)
     finally:
@@ -75,8 +75,8 @@ def websocket_client_pipeline(sdc_builder, sdc_executor):
                                                            javascript_evaluator)
 
 
-def test_websocket(sdc_executor, websocket_server_pipeline, websocket_client_pipeline):
-    runtime_parameters = {'port': 9999, 'appId': 'APPLICATION_ID'}
+def test_websocket(sdc_executor, websocket_server_pipeline, websocket_client_pipeline, free_port):
+    runtime_parameters = {'port': free_port, 'appId': 'APPLICATION_ID'}
 
     # Start WebSocket Server pipeline.
     sdc_executor.start_pipeline(websocket_server_pipeline.pipeline, runtime_parameters)
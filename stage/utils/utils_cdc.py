@@ -0,0 +1,91 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Waiting for SQL Server CDC capture jobs.
+
+The capture job copies changes from the transaction log into the capture (CT) tables asynchronously, so tests have to
+wait for it before starting a CDC pipeline. The capture table is reflected once it exists, and every poll is a single
+``SELECT COUNT(*), MAX(__$start_lsn)`` so that its cost does not grow with the number of captured changes. Polling
+starts fast and backs off, see :py:func:`stage.utils.utils_wait.wait_until`.
+"""
+
+import logging
+
+import sqlalchemy
+
+from .utils_wait import wait_until
+
+logger = logging.getLogger(__name__)
+
+CDC_SCHEMA_NAME = 'cdc'
+
+
+class CaptureTableProgress:
+    """Progress of the capture job for one capture table.
+
+    Args:
+        database: SQL Server database of the test framework.
+        ct_table_name (:obj:`str`): Name of the capture table, e.g. ``dbo_mytable_CT``.
+        schema (:obj:`str`, optional): Schema of the capture table. Default: ``cdc``
+    """
+    def __init__(self, database, ct_table_name, schema=CDC_SCHEMA_NAME):
+        self.db_engine = database.engine
+        self.ct_table_name = ct_table_name
+        self.schema = schema
+        self._progress_query = None
+        self.captured_changes = None
+        self.max_lsn = None
+
+    def refresh(self):
+        """Query the number of captured changes and the highest captured LSN, and return the former.
+
+        Enabling CDC creates the capture table asynchronously, so until it exists no change counts as captured.
+        """
+        if self._progress_query is None:
+            try:
+                ct_table = sqlalchemy.Table(self.ct_table_name, sqlalchemy.MetaData(), autoload=True,
+                                            autoload_with=self.db_engine, schema=self.schema)
+            except sqlalchemy.exc.NoSuchTableError:
+                logger.debug('Capture table %s does not exist yet', self.ct_table_name)
+                return 0
+            self._progress_query = sqlalchemy.select([sqlalchemy.func.count(),
+                                                      sqlalchemy.func.max(ct_table.c['__$start_lsn'])])
+            self._progress_query = self._progress_query.select_from(ct_table)
+        self.captured_changes, max_lsn = self.db_engine.execute(self._progress_query).first()
+        self.max_lsn = max_lsn.hex() if isinstance(max_lsn, (bytes, bytearray)) else max_lsn
+        return self.captured_changes
+
+    def __str__(self):
+        if self._progress_query is None:
+            return f'Capture table {self.ct_table_name} not created yet'
+        return f'{self.captured_changes} changes captured in {self.ct_table_name} up to LSN {self.max_lsn}'
+
+
+def wait_for_data_in_ct_table(ct_table_name, no_of_records, database=None, timeout_sec=50, schema=CDC_SCHEMA_NAME):
+    """Wait for data is captured by CDC jobs in SQL Server
+    (i.e, number of records in CT table is equal to the total number of records).
+
+    Returns:
+        The :py:class:`CaptureTableProgress` of the capture table, holding the captured change count and max LSN.
+    """
+    logger.info('Waiting up to %s seconds for %s changes in CT table %s ...', timeout_sec, no_of_records, ct_table_name)
+    progress = CaptureTableProgress(database, ct_table_name, schema)
+    wait_until(lambda: progress.refresh() >= no_of_records,
+               timeout_sec=timeout_sec,
+               description=f'{no_of_records} changes captured in CT table {ct_table_name}',
+               poll_interval_sec=0.25,
+               diagnostics=lambda: str(progress))
+    logger.info('%s', progress)
+    return progress
@@ -0,0 +1,249 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Comparing the content of replicated tables without loading them into memory.
+
+The source is split into key ranges of :py:data:`DEFAULT_CHUNK_SIZE` rows by paging through its key column. For every
+range, the rows of both sides are streamed in key order and hashed; only when the digests (or row counts) of a range
+differ are its rows read again, grouped by key, to find the exact keys that are missing, unexpected or changed in the
+target. Memory use is therefore bounded by the chunk size rather than by the table size, and matching ranges are never
+held in memory at all.
+
+The source can be a table (:py:func:`compare_tables`) or the rows a test expects (:py:func:`compare_rows`), and
+:py:func:`assert_tables_match` compares many table pairs concurrently.
+
+The key column does not have to be unique: rows sharing a key always fall into the same range, and duplicates in the
+target are reported as changed keys.
+"""
+
+import bisect
+import collections
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlalchemy
+
+logger = logging.getLogger(__name__)
+
+# Number of source rows per compared key range.
+DEFAULT_CHUNK_SIZE = 10_000
+# Number of table pairs compared at the same time. Kept below the default SQLAlchemy pool size plus overflow (5 + 10).
+DEFAULT_MAX_WORKERS = 8
+# Number of differing keys kept per kind of difference, for reporting.
+MAX_REPORTED_KEYS = 20
+
+
+class TableComparison:
+    """Outcome of comparing a source with a target table.
+
+    Every kind of difference holds at most :py:data:`MAX_REPORTED_KEYS` keys, while the ``number_of_*`` attributes
+    count all of them.
+    """
+    def __init__(self, source, target):
+        self.source = source
+        self.target = target
+        self.compared_rows = 0
+        self.compared_ranges = 0
+        self.mismatched_ranges = 0
+        self.missing_keys = []
+        self.unexpected_keys = []
+        self.changed_keys = []
+        self.number_of_missing_keys = 0
+        self.number_of_unexpected_keys = 0
+        self.number_of_changed_keys = 0
+
+    @property
+    def matches(self):
+        return not (self.number_of_missing_keys or self.number_of_unexpected_keys or self.number_of_changed_keys)
+
+    def __str__(self):
+        if self.matches:
+            return f'{self.target} matches {self.source} ({self.compared_rows} rows)'
+        differences = [f'{count} {kind} (e.g. keys {keys})'
+                       for kind, count, keys in (('missing', self.number_of_missing_keys, self.missing_keys),
+                                                 ('unexpected', self.number_of_unexpected_keys, self.unexpected_keys),
+                                                 ('changed', self.number_of_changed_keys, self.changed_keys))
+                       if count]
+        return (f'{self.target} differs from {self.source} in {self.mismatched_ranges} of {self.compared_ranges} '
+                f'key ranges: {", ".join(differences)}')
+
+    def _add(self, kind, key):
+        count_attribute = f'number_of_{kind}_keys'
+        setattr(self, count_attribute, getattr(self, count_attribute) + 1)
+        keys = getattr(self, f'{kind}_keys')
+        if len(keys) < MAX_REPORTED_KEYS:
+            keys.append(key)
+
+
+def compare_tables(db_engine, source_table, target_table, key_column, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Compare the rows of two tables with the same columns.
+
+    Args:
+        db_engine (:py:class:`sqlalchemy.engine.Engine`): Engine of the database holding both tables.
+        source_table (:py:class:`sqlalchemy.Table`): Table the target is expected to match.
+        target_table (:py:class:`sqlalchemy.Table`): Table to check.
+        key_column (:obj:`str`): Name of the column to range over, usually the primary key.
+        chunk_size (:obj:`int`, optional): Number of source rows per key range. Default: ``10000``
+
+    Returns:
+        A :py:class:`TableComparison`.
+    """
+    return _compare(_TableSide(db_engine, source_table, key_column),
+                    _TableSide(db_engine, target_table, key_column),
+                    chunk_size)
+
+
+def compare_rows(db_engine, expected_rows, target_table, key_column, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Compare the rows of a table with the rows a test expects in it.
+
+    Args:
+        db_engine (:py:class:`sqlalchemy.engine.Engine`): Engine of the database holding the table.
+        expected_rows (:obj:`list` of :obj:`dict`): Expected rows, keyed by column name, in any order.
+        target_table (:py:class:`sqlalchemy.Table`): Table to check.
+        key_column (:obj:`str`): Name of the column to range over, usually the primary key.
+        chunk_size (:obj:`int`, optional): Number of expected rows per key range. Default: ``10000``
+
+    Returns:
+        A :py:class:`TableComparison`.
+    """
+    return _compare(_RowsSide(expected_rows, target_table, key_column),
+                    _TableSide(db_engine, target_table, key_column),
+                    chunk_size)
+
+
+def assert_tables_match(db_engine, table_pairs, key_column, chunk_size=DEFAULT_CHUNK_SIZE,
+                        max_workers=DEFAULT_MAX_WORKERS):
+    """Compare ``(source table, target table)`` pairs concurrently and fail listing every pair that differs."""
+    table_pairs = list(table_pairs)
+    if not table_pairs:
+        return
+
+    def compare(table_pair):
+        source_table, target_table = table_pair
+        return compare_tables(db_engine, source_table, target_table, key_column, chunk_size)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(table_pairs))) as executor:
+        comparisons = list(executor.map(compare, table_pairs))
+
+    for comparison in comparisons:
+        logger.info('%s', comparison)
+    mismatches = [str(comparison) for comparison in comparisons if not comparison.matches]
+    assert not mismatches, '\n'.join(mismatches)
+
+
+class _TableSide:
+    def __init__(self, db_engine, table, key_column):
+        self.db_engine = db_engine
+        self.table = table
+        self.key = table.c[key_column]
+        self.key_index = list(table.columns).index(self.key)
+
+    def __str__(self):
+        return f'table {self.table}'
+
+    def keys_after(self, lower, limit):
+        query = sqlalchemy.select([self.key])
+        if lower is not None:
+            query = query.where(self.key > lower)
+        result = self.db_engine.execute(query.order_by(self.key).limit(limit))
+        try:
+            return [row[0] for row in result]
+        finally:
+            result.close()
+
+    def rows(self, lower, upper):
+        query = self.table.select()
+        if lower is not None:
+            query = query.where(self.key > lower)
+        if upper is not None:
+            query = query.where(self.key <= upper)
+        with self.db_engine.connect() as connection:
+            result = connection.execution_options(stream_results=True).execute(query.order_by(self.key))
+            for row in result:
+                yield tuple(row)
+
+
+class _RowsSide:
+    def __init__(self, rows, table, key_column):
+        columns = [column.name for column in table.columns]
+        self.key_index = columns.index(key_column)
+        self.rows_in_order = sorted((tuple(row[column] for column in columns) for row in rows),
+                                    key=lambda row: row[self.key_index])
+        self.keys = [row[self.key_index] for row in self.rows_in_order]
+
+    def __str__(self):
+        return f'{len(self.rows_in_order)} expected rows'
+
+    def keys_after(self, lower, limit):
+        start = 0 if lower is None else bisect.bisect_right(self.keys, lower)
+        return self.keys[start:start + limit]
+
+    def rows(self, lower, upper):
+        start = 0 if lower is None else bisect.bisect_right(self.keys, lower)
+        end = len(self.keys) if upper is None else bisect.bisect_right(self.keys, upper)
+        return iter(self.rows_in_order[start:end])
+
+
+def _compare(source, target, chunk_size):
+    comparison = TableComparison(source, target)
+    lower = None
+    while True:
+        keys = source.keys_after(lower, chunk_size)
+        # The last range is open-ended, so that target rows beyond the highest source key are found too.
+        upper = keys[-1] if len(keys) == chunk_size else None
+
+        source_digest, source_count = _digest(source.rows(lower, upper))
+        target_digest, target_count = _digest(target.rows(lower, upper))
+        comparison.compared_ranges += 1
+        comparison.compared_rows += source_count
+        if (source_digest, source_count) != (target_digest, target_count):
+            comparison.mismatched_ranges += 1
+            _drill_down(comparison, source, target, lower, upper)
+
+        if upper is None:
+            return comparison
+        lower = upper
+
+
+def _digest(rows):
+    digest = hashlib.sha256()
+    count = 0
+    for row in rows:
+        digest.update(repr(row).encode())
+        digest.update(b'\n')
+        count += 1
+    return digest.digest(), count
+
+
+def _drill_down(comparison, source, target, lower, upper):
+    logger.debug('Rows of %s differ from %s for keys in (%s, %s]', target, source, lower, upper)
+    source_rows = _rows_by_key(source, lower, upper)
+    target_rows = _rows_by_key(target, lower, upper)
+    for key, rows in source_rows.items():
+        if key not in target_rows:
+            comparison._add('missing', key)
+        elif target_rows[key] != rows:
+            comparison._add('changed', key)
+    for key in target_rows.keys() - source_rows.keys():
+        comparison._add('unexpected', key)
+
+
+def _rows_by_key(side, lower, upper):
+    # Rows sharing a key are compared as a multiset, as their order is not defined by the key.
+    rows_by_key = collections.defaultdict(collections.Counter)
+    for row in side.rows(lower, upper):
+        rows_by_key[row[side.key_index]][row] += 1
+    return rows_by_key
@@ -0,0 +1,112 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Writing and removing files on SDC's local file system.
+
+Tests run on another host than SDC, e.g. with SDC in a Docker container, so files are written and removed by a
+pipeline with a Jython Evaluator running on SDC. Every call runs a single pipeline whatever the number of files, and
+the SDC instance needs the ``streamsets-datacollector-jython_2_7-lib`` stage library.
+"""
+
+import base64
+import textwrap
+from collections import namedtuple
+
+# Writes every entry of the manifest, creating missing parent directories. Contents are passed base64-encoded so that
+# quotes, backslashes and control characters reach the file unchanged.
+FILES_WRITER_SCRIPT = """
+    import base64
+    import os
+
+    manifest = {manifest}
+    for record in records:
+        for filepath, file_contents, encoding, file_data_type in manifest:
+            directory = os.path.dirname(filepath)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            file_contents = base64.b64decode(file_contents)
+            if file_data_type != 'BINARY':
+                file_contents = file_contents.decode('utf8').encode(encoding)
+            with open(filepath, 'wb') as f:
+                f.write(file_contents)
+"""
+
+FILES_REMOVER_SCRIPT = """
+    import os
+    import shutil
+
+    paths = {paths}
+    for record in records:
+        for path in paths:
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            elif os.path.lexists(path):
+                os.remove(path)
+"""
+
+DIRECTORIES_CREATOR_SCRIPT = """
+    import os
+
+    paths = {paths}
+    for record in records:
+        for path in paths:
+            if not os.path.isdir(path):
+                os.makedirs(path)
+"""
+
+# One entry of the manifest taken by files_writer. Only filepath and file_contents are mandatory.
+FileEntry = namedtuple('FileEntry', ['filepath', 'file_contents', 'encoding', 'file_data_type'])
+FileEntry.__new__.__defaults__ = ('utf8', 'NOT_BINARY')
+
+
+def write_file_with_pipeline(sdc_executor, filepath, file_contents, encoding='utf8', file_data_type='NOT_BINARY'):
+    write_files_with_pipeline(sdc_executor, [FileEntry(filepath, file_contents, encoding, file_data_type)])
+
+
+def write_files_with_pipeline(sdc_executor, manifest):
+    entries = []
+    for entry in manifest:
+        filepath, file_contents, encoding, file_data_type = FileEntry(*entry)
+        if isinstance(file_contents, str):
+            file_contents = file_contents.encode('utf8')
+        entries.append((str(filepath), base64.b64encode(file_contents).decode('ascii'), encoding, file_data_type))
+    run_jython_script_with_pipeline(sdc_executor, FILES_WRITER_SCRIPT.format(manifest=repr(entries)),
+                                    'File writer pipeline')
+
+
+def remove_files_with_pipeline(sdc_executor, paths):
+    script = FILES_REMOVER_SCRIPT.format(paths=repr([str(path) for path in paths]))
+    run_jython_script_with_pipeline(sdc_executor, script, 'File remover pipeline')
+
+
+def create_directories_with_pipeline(sdc_executor, paths):
+    script = DIRECTORIES_CREATOR_SCRIPT.format(paths=repr([str(path) for path in paths]))
+    run_jython_script_with_pipeline(sdc_executor, script, 'Directory creator pipeline')
+
+
+def run_jython_script_with_pipeline(sdc_executor, script, title):
+    builder = sdc_executor.get_pipeline_builder()
+    dev_raw_data_source = builder.add_stage('Dev Raw Data Source')
+    dev_raw_data_source.set_attributes(data_format='TEXT', raw_data='noop', stop_after_first_batch=True)
+    jython_evaluator = builder.add_stage('Jython Evaluator')
+    jython_evaluator.script = textwrap.dedent(script)
+    trash = builder.add_stage('Trash')
+    dev_raw_data_source >> jython_evaluator >> trash
+    pipeline = builder.build(title)
+
+    sdc_executor.add_pipeline(pipeline)
+    sdc_executor.start_pipeline(pipeline).wait_for_finished()
+    sdc_executor.remove_pipeline(pipeline)
+
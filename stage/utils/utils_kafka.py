@@ -0,0 +1,119 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Producing test messages to Kafka.
+
+Creating a Kafka producer means bootstrapping a connection to the brokers and fetching cluster metadata, and flushing
+waits for every in-flight request to be acknowledged. :py:class:`KafkaProducerPool` keeps one producer per Kafka
+cluster, for the whole session when used through the ``kafka_producer_pool`` fixture, and
+:py:func:`produce_kafka_messages_batch` serializes any number of messages in one pass and flushes once.
+"""
+
+import io
+import json
+import logging
+import string
+
+import avro
+from avro.datafile import DataFileWriter
+from streamsets.testframework.utils import get_random_string
+
+logger = logging.getLogger(__name__)
+
+# Data formats for which the message is sent as is. Messages in any of these formats have to be bytes already.
+RAW_DATA_FORMATS = ['XML', 'CSV', 'SYSLOG', 'NETFLOW', 'COLLECTD', 'BINARY', 'LOG', 'PROTOBUF', 'TEXT', 'JSON']
+
+
+class KafkaProducerPool:
+    """Hands out one producer per Kafka cluster and reuses it until :py:meth:`close` is called."""
+    def __init__(self):
+        # id of the cluster's kafka service -> (kafka service, producer). Keeping a reference to the service ensures
+        # that its id is not reused for another one while the producer is cached.
+        self._producers = {}
+
+    def get(self, cluster):
+        kafka = cluster.kafka
+        if id(kafka) not in self._producers:
+            logger.debug('Creating Kafka producer ...')
+            self._producers[id(kafka)] = (kafka, kafka.producer())
+        return self._producers[id(kafka)][1]
+
+    def close(self):
+        for _, producer in self._producers.values():
+            producer.close()
+        self._producers.clear()
+
+
+def serialize_kafka_message(message, data_format, schema=None):
+    """Return the ``(value, key)`` to send for the message in the given data format.
+
+    Args:
+        message: Bytes for the raw data formats and ``WITH_KEY``, a datum of ``schema`` for ``AVRO`` and
+            ``AVRO_WITHOUT_SCHEMA``.
+        data_format (:obj:`str`): One of :py:data:`RAW_DATA_FORMATS`, ``WITH_KEY`` (sent with a random key),
+            ``AVRO`` (binary encoded datum) or ``AVRO_WITHOUT_SCHEMA`` (Avro container file embedding the schema).
+        schema (:py:class:`avro.schema.Schema`, optional): Parsed Avro schema, required for the Avro formats.
+            Default: ``None``
+    """
+    if data_format in RAW_DATA_FORMATS:
+        return message, None
+
+    elif data_format == 'WITH_KEY':
+        return message, get_random_string(string.ascii_letters, 10).encode()
+
+    elif data_format == 'AVRO':
+        bytes_writer = io.BytesIO()
+        avro.io.DatumWriter(schema).write(message, avro.io.BinaryEncoder(bytes_writer))
+        return bytes_writer.getvalue(), None
+
+    elif data_format == 'AVRO_WITHOUT_SCHEMA':
+        bytes_writer = io.BytesIO()
+        data_file_writer = DataFileWriter(writer=bytes_writer, datum_writer=avro.io.DatumWriter(schema),
+                                          writer_schema=schema)
+        data_file_writer.append(message)
+        data_file_writer.flush()
+        raw_bytes = bytes_writer.getvalue()
+        data_file_writer.close()
+        return raw_bytes, None
+
+    raise ValueError(f'Unsupported data format {data_format}')
+
+
+def produce_kafka_messages_batch(producer_pool, topic, cluster, messages, data_format, schema=None):
+    """Send all messages to the topic with the pooled producer of the cluster, flushing once at the end.
+
+    Args:
+        producer_pool (:py:class:`KafkaProducerPool`): Pool to take the producer from.
+        topic (:obj:`str`): Topic to send the messages to.
+        cluster: Cluster providing the Kafka service.
+        messages: Iterable of messages, see :py:func:`serialize_kafka_message`.
+        data_format (:obj:`str`): Data format of the messages, see :py:func:`serialize_kafka_message`.
+        schema (:obj:`dict`, optional): Avro schema, required for the Avro formats. Default: ``None``
+
+    Returns:
+        The number of messages sent.
+    """
+    producer = producer_pool.get(cluster)
+    parsed_schema = avro.schema.Parse(json.dumps(schema)) if schema is not None else None
+
+    number_of_messages = 0
+    for message in messages:
+        value, key = serialize_kafka_message(message, data_format, parsed_schema)
+        producer.send(topic, value, key=key)
+        number_of_messages += 1
+    producer.flush()
+
+    logger.debug('Sent %s %s messages to topic %s', number_of_messages, data_format, topic)
+    return number_of_messages
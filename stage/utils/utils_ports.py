@@ -0,0 +1,74 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Allocation of the ports SDC stages listen on (SDC RPC, TCP Server, ...).
+
+Hard-coded ports make tests collide as soon as two of them run at the same time, e.g. under pytest-xdist. Every xdist
+worker (``PYTEST_XDIST_WORKER`` being ``gw0``, ``gw1``, ...) gets its own block of ports, and within a block a port is
+not handed out again until it was released. Ports that are already bound on this host are skipped, which covers SDC
+instances running locally or with host networking.
+"""
+
+import logging
+import socket
+
+logger = logging.getLogger(__name__)
+
+PORT_RANGE_START = 20000
+PORTS_PER_WORKER = 1000
+
+
+class PortAllocator:
+    """Hands out ports from ``[start, end)``.
+
+    Args:
+        start (:obj:`int`): First port of the range.
+        end (:obj:`int`): End of the range, exclusive.
+    """
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self._allocated = set()
+        self._next_port = start
+
+    @classmethod
+    def for_worker(cls, worker_id=None):
+        """Allocator over the block of ports of the given xdist worker (``'gw<n>'``); the first block if ``None``."""
+        worker_index = int(worker_id[len('gw'):]) if worker_id and worker_id.startswith('gw') else 0
+        start = PORT_RANGE_START + worker_index * PORTS_PER_WORKER
+        return cls(start, start + PORTS_PER_WORKER)
+
+    def allocate(self):
+        """Return a port that is neither handed out nor bound on this host."""
+        for _ in range(self.end - self.start):
+            port = self._next_port
+            self._next_port = port + 1 if port + 1 < self.end else self.start
+            if port not in self._allocated and _is_port_free(port):
+                self._allocated.add(port)
+                logger.debug('Allocated port %s', port)
+                return port
+        raise RuntimeError(f'No free port left in range [{self.start}, {self.end}).')
+
+    def release(self, port):
+        self._allocated.discard(port)
+
+
+def _is_port_free(port):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind(('', port))
+        except OSError:
+            return False
+    return True
@@ -0,0 +1,96 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Seeding and cleaning up S3 objects in bulk.
+
+All helpers take a plain boto3 S3 client, so they work the same against AWS and against any S3-compatible endpoint
+(e.g. a local MinIO) the client was created for. Low-level boto3 clients are thread-safe, which lets
+:py:func:`upload_s3_objects` share one client between its workers.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 16
+# Maximum number of keys accepted by a single DeleteObjects request.
+DELETE_BATCH_SIZE = 1000
+
+
+def upload_s3_objects(client, bucket, objects, max_workers=DEFAULT_MAX_WORKERS):
+    """Put the objects into the bucket concurrently.
+
+    Args:
+        client: boto3 S3 client.
+        bucket (:obj:`str`): Bucket name.
+        objects: Iterable of ``(key, body)`` tuples.
+        max_workers (:obj:`int`, optional): Number of concurrent uploads. Default: ``16``
+
+    Returns:
+        The number of objects uploaded.
+    """
+    def put_object(key_and_body):
+        key, body = key_and_body
+        client.put_object(Bucket=bucket, Key=key, Body=body)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Consuming the results re-raises the first failed upload.
+        number_of_objects = sum(1 for _ in executor.map(put_object, objects))
+    logger.info('Uploaded %s objects to s3://%s', number_of_objects, bucket)
+    return number_of_objects
+
+
+def list_s3_keys(client, bucket, prefix=''):
+    """Yield the keys of all objects under the prefix, following list pagination."""
+    for page in client.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+        for s3_object in page.get('Contents', []):
+            yield s3_object['Key']
+
+
+def delete_s3_objects(client, bucket, prefix):
+    """Delete all objects under the prefix, :py:data:`DELETE_BATCH_SIZE` keys per request.
+
+    Returns:
+        The number of objects deleted.
+
+    Raises:
+        :py:class:`RuntimeError`: When S3 reported objects it failed to delete.
+    """
+    if not prefix:
+        raise ValueError('Refusing to delete the whole bucket, a prefix is required.')
+
+    number_of_objects = 0
+    errors = []
+    batch = []
+    for key in list_s3_keys(client, bucket, prefix):
+        batch.append({'Key': key})
+        if len(batch) == DELETE_BATCH_SIZE:
+            errors.extend(_delete_batch(client, bucket, batch))
+            number_of_objects += len(batch)
+            batch = []
+    if batch:
+        errors.extend(_delete_batch(client, bucket, batch))
+        number_of_objects += len(batch)
+
+    if errors:
+        raise RuntimeError(f'Failed to delete {len(errors)} objects from s3://{bucket}/{prefix}: {errors[:10]}')
+    logger.info('Deleted %s objects from s3://%s/%s', number_of_objects, bucket, prefix)
+    return number_of_objects
+
+
+def _delete_batch(client, bucket, batch):
+    response = client.delete_objects(Bucket=bucket, Delete={'Objects': batch, 'Quiet': True})
+    return response.get('Errors', [])
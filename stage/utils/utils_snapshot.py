@@ -0,0 +1,210 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Column-oriented access to snapshot records.
+
+Walking ``snapshot[stage].output`` and reading ``record.field[...]`` wraps every visited field in an SDK object, which
+dominates the time spent in assertions once snapshots hold thousands of records. :py:class:`SnapshotView` works on the
+raw JSON of the records instead: the records of a stage are collected across all snapshot batches the first time the
+stage is accessed, and :py:meth:`StageOutputView.column` only decodes the fields on the requested path.
+
+    view = SnapshotView(snapshot)
+    assert sorted(view[tcp_server_stage].column('/text')) == sorted(expected_messages)
+    assert view[jdbc_origin].rows('/name', '/id') == [(row['name'], row['id']) for row in rows_in_database]
+
+Values are converted to Python types (numbers, :py:class:`decimal.Decimal`, :obj:`bytes` for byte arrays, dicts and
+lists for maps and lists). Date and time fields are returned as the epoch milliseconds SDC serializes them as.
+"""
+
+import base64
+import collections
+import functools
+import logging
+import re
+from decimal import Decimal
+
+logger = logging.getLogger(__name__)
+
+_INTEGRAL_TYPES = {'BYTE', 'SHORT', 'INTEGER', 'LONG'}
+_FLOATING_POINT_TYPES = {'FLOAT', 'DOUBLE'}
+# Field path segment: /name, /'quoted name' or /"quoted name", optionally followed by list indices like [0].
+_PATH_SEGMENT = re.compile(r"""/(?:'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)"|([^/\[]*))((?:\[\d+\])*)""")
+_MISSING = object()
+
+
+class SnapshotView:
+    """Read-only, lazily decoded view of a snapshot.
+
+    Args:
+        snapshot (:py:class:`streamsets.sdk.sdc_models.Snapshot`): Snapshot to view.
+    """
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+        self._stage_outputs = {}
+
+    def __getitem__(self, stage):
+        """Output of the stage (stage object or instance name) over all snapshot batches."""
+        instance_name = getattr(stage, 'instance_name', stage)
+        if instance_name not in self._stage_outputs:
+            self._stage_outputs[instance_name] = StageOutputView(self._snapshot, instance_name)
+        return self._stage_outputs[instance_name]
+
+
+class StageOutputView:
+    """Records a stage produced in a snapshot, with field paths projected into columns."""
+    def __init__(self, snapshot, instance_name):
+        self._snapshot = snapshot
+        self.instance_name = instance_name
+        self._records = None
+        self._error_records = None
+
+    @property
+    def records(self):
+        """Raw JSON of the output records, in batch order."""
+        if self._records is None:
+            self._records = self._collect('output')
+        return self._records
+
+    @property
+    def error_records(self):
+        """Raw JSON of the error records, in batch order."""
+        if self._error_records is None:
+            self._error_records = self._collect('error_records')
+        return self._error_records
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, path, default=_MISSING, raw=False):
+        """Values of the field at ``path`` (e.g. ``/id``, ``/address/zip``, ``/items[0]``) for every record.
+
+        Args:
+            path (:obj:`str`): Field path.
+            default (optional): Value for records lacking the field. If not given, a missing field raises
+                :py:class:`KeyError`.
+            raw (:obj:`bool`, optional): Return the values as serialized by SDC instead of converting them.
+                Default: ``False``
+        """
+        segments = _parse_path(path)
+        convert = (lambda field: field.get('value')) if raw else field_to_python
+        values = []
+        for record in self.records:
+            field = _resolve(record['value'], segments)
+            if field is _MISSING:
+                if default is _MISSING:
+                    raise KeyError(f'Field {path} not found in a record of stage {self.instance_name}')
+                values.append(default)
+            else:
+                values.append(convert(field))
+        return values
+
+    def columns(self, *paths, **kwargs):
+        """Dictionary of path to :py:meth:`column`."""
+        return {path: self.column(path, **kwargs) for path in paths}
+
+    def rows(self, *paths, **kwargs):
+        """List of tuples holding the values of the given paths, one tuple per record."""
+        return list(zip(*(self.column(path, **kwargs) for path in paths))) if self.records else []
+
+    def header_column(self, attribute, default=None):
+        """Values of the record header attribute for every record."""
+        return [record['header']['values'].get(attribute, default) for record in self.records]
+
+    def _collect(self, attribute):
+        records = []
+        for batch in self._snapshot.snapshot_batches:
+            try:
+                stage_output = batch.stage_outputs[self.instance_name]
+            except KeyError:
+                continue
+            records.extend(record._data for record in getattr(stage_output, attribute))
+        return records
+
+
+def field_to_python(field):
+    """Convert the raw JSON of a field to a Python value."""
+    if field is None:
+        return None
+    field_type = field.get('type')
+    value = field.get('value')
+    if value is None:
+        return None
+    if field_type == 'MAP':
+        return {name: field_to_python(child) for name, child in value.items()}
+    if field_type == 'LIST_MAP':
+        return collections.OrderedDict((_list_map_key(child), field_to_python(child)) for child in value)
+    if field_type == 'LIST':
+        return [field_to_python(child) for child in value]
+    if field_type in _INTEGRAL_TYPES:
+        return int(value)
+    if field_type in _FLOATING_POINT_TYPES:
+        return float(value)
+    if field_type == 'DECIMAL':
+        return Decimal(str(value))
+    if field_type == 'BOOLEAN':
+        return value if isinstance(value, bool) else value.lower() == 'true'
+    if field_type == 'BYTE_ARRAY':
+        return base64.b64decode(value)
+    return value
+
+
+def _parse_path(path):
+    if path in ('', '/'):
+        return []
+    segments = []
+    position = 0
+    while position < len(path):
+        match = _PATH_SEGMENT.match(path, position)
+        if not match or match.end() == position:
+            raise ValueError(f'Invalid field path {path}')
+        single_quoted, double_quoted, plain, indices = match.groups()
+        name = single_quoted if single_quoted is not None else double_quoted if double_quoted is not None else plain
+        segments.append(re.sub(r'\\(.)', r'\1', name))
+        segments.extend(int(index) for index in re.findall(r'\[(\d+)\]', indices))
+        position = match.end()
+    return segments
+
+
+def _resolve(field, segments):
+    for segment in segments:
+        if field is None or field.get('value') is None:
+            return _MISSING
+        field_type = field.get('type')
+        value = field['value']
+        if isinstance(segment, int):
+            if field_type != 'LIST' or segment >= len(value):
+                return _MISSING
+            field = value[segment]
+        elif field_type == 'MAP':
+            if segment not in value:
+                return _MISSING
+            field = value[segment]
+        elif field_type == 'LIST_MAP':
+            field = next((child for child in value if _list_map_key(child) == segment), _MISSING)
+            if field is _MISSING:
+                return _MISSING
+        else:
+            return _MISSING
+    return field
+
+
+def _list_map_key(field):
+    # LIST_MAP entries carry their own path, e.g. /name or /'name with spaces'; the key is its last segment.
+    return _last_path_segment(field['sqpath'])
+
+
+@functools.lru_cache(maxsize=4096)
+def _last_path_segment(path):
+    return _parse_path(path)[-1]
@@ -0,0 +1,290 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Bulk creation, seeding and removal of database tables.
+
+Tests replicating many tables spend most of their setup in round trips: one ``INSERT`` per row and one reflection per
+dropped table. :py:func:`create_tables` creates tables concurrently and seeds each of them in bulk;
+:py:func:`drop_tables` reflects all tables to drop in one pass and drops them together. Both only need an SQLAlchemy
+engine, so they work with any database the test framework provides.
+
+:py:class:`TableFactory`, exposed to tests as the ``table_factory`` fixture, builds on them: it keeps the metadata of
+every table it defined or reflected, creates tables and schemas, and drops everything it created when the test ends.
+
+Rows are inserted through :py:func:`bulk_insert`, which uses ``COPY`` on PostgreSQL (psycopg2) and
+``fast_executemany`` on SQL Server (pyodbc). Other drivers already turn ``executemany`` into multi-row inserts
+(MySQL) or array binds (Oracle), so they go through :py:func:`insert_rows`.
+"""
+
+import csv
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlalchemy
+
+logger = logging.getLogger(__name__)
+
+# Number of tables created concurrently. Kept below the default SQLAlchemy pool size plus overflow (5 + 10).
+DEFAULT_MAX_WORKERS = 8
+# Number of rows sent per executemany call or COPY statement.
+DEFAULT_CHUNK_SIZE = 10_000
+# Representation of NULL in the CSV data sent to PostgreSQL's COPY.
+_COPY_NULL = r'\N'
+
+
+def create_tables(db_engine, tables, rows=None, max_workers=DEFAULT_MAX_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Create tables concurrently and insert their rows in bulk.
+
+    Args:
+        db_engine (:py:class:`sqlalchemy.engine.Engine`): Engine of the database to create the tables in.
+        tables (:obj:`list` of :py:class:`sqlalchemy.Table`): Tables to create.
+        rows (:obj:`dict`, optional): Rows to insert, as a list of dictionaries keyed by column name, per table name
+            (``schema.table`` for tables in a schema). Rows may also be given as a generator, which lets large tables
+            be seeded without holding all rows in memory. Default: ``None``
+        max_workers (:obj:`int`, optional): Number of tables created at the same time. Default: ``8``
+        chunk_size (:obj:`int`, optional): Number of rows inserted per statement execution. Default: ``10000``
+    """
+    rows = rows or {}
+
+    def create_table(table):
+        _create_and_seed(db_engine, table, rows.get(table.fullname), chunk_size)
+
+    _run_concurrently(create_table, tables, max_workers)
+
+
+def bulk_insert(db_engine, table, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Insert rows into the table using the fastest path of the database driver and return the number of rows."""
+    dialect = db_engine.dialect
+    if dialect.name == 'postgresql' and dialect.driver == 'psycopg2':
+        return _copy_rows(db_engine, table, rows, chunk_size)
+    if dialect.name == 'mssql' and dialect.driver == 'pyodbc':
+        return _fast_executemany_rows(db_engine, table, rows, chunk_size)
+    return insert_rows(db_engine, table, rows, chunk_size)
+
+
+def insert_rows(db_engine, table, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Insert rows into the table with one executemany call per ``chunk_size`` rows and return the number of rows."""
+    number_of_rows = 0
+    for chunk in _chunks(rows, chunk_size):
+        db_engine.execute(table.insert(), chunk)
+        number_of_rows += len(chunk)
+    return number_of_rows
+
+
+def drop_tables(db_engine, table_names):
+    """Drop the given tables, reflecting all of them in a single pass.
+
+    Tables that do not exist are ignored, so this can be called from a ``finally`` block even when the setup failed
+    half-way.
+    """
+    table_names = set(table_names)
+    metadata = sqlalchemy.MetaData()
+    metadata.reflect(bind=db_engine, only=lambda table_name, _: table_name in table_names)
+    logger.info('Dropping tables %s ...', ', '.join(sorted(metadata.tables)))
+    metadata.drop_all(db_engine)
+
+
+def create_schema(db_engine, schema_name):
+    """Create a new schema in the database.
+
+    For RDBMs with no distinction between schema and database (e.g. MySQL), it creates a new database. For Oracle, it
+    creates a new user. For databases with schema objects, it creates a new schema.
+    """
+    logger.info('Creating schema %s ...', schema_name)
+    if db_engine.dialect.name == 'oracle':
+        db_engine.execute(f'CREATE USER {schema_name} IDENTIFIED BY {schema_name}')
+        db_engine.execute(f'GRANT UNLIMITED TABLESPACE TO {schema_name}')
+    else:
+        db_engine.execute(sqlalchemy.schema.CreateSchema(schema_name))
+
+
+def drop_schema(db_engine, schema_name):
+    """Remove a schema created by :py:func:`create_schema`. The schema has to be empty."""
+    logger.info('Dropping schema %s ...', schema_name)
+    if db_engine.dialect.name == 'oracle':
+        db_engine.execute(f'DROP USER {schema_name}')
+    else:
+        db_engine.execute(sqlalchemy.schema.DropSchema(schema_name))
+
+
+class TableFactory:
+    """Creates tables and schemas for a test and drops everything it created in one batched teardown.
+
+    Args:
+        database: Database of the test framework.
+        max_workers (:obj:`int`, optional): Number of tables created at the same time. Default: ``8``
+        chunk_size (:obj:`int`, optional): Number of rows inserted per statement execution. Default: ``10000``
+    """
+    def __init__(self, database, max_workers=DEFAULT_MAX_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.database = database
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        # Metadata of all tables defined or reflected through this factory.
+        self.metadata = sqlalchemy.MetaData()
+        self._created_tables = []
+        self._created_schemas = []
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self):
+        return self.database.engine
+
+    def table(self, table_name, *columns, schema=None):
+        """Define the table, or return it if it was already defined or reflected. The table is not created."""
+        key = f'{schema}.{table_name}' if schema else table_name
+        if key in self.metadata.tables:
+            return self.metadata.tables[key]
+        return sqlalchemy.Table(table_name, self.metadata, *columns, schema=schema)
+
+    def reflect(self, table_name, schema=None):
+        """Return the table as it exists in the database, reflecting it only the first time."""
+        key = f'{schema}.{table_name}' if schema else table_name
+        if key not in self.metadata.tables:
+            sqlalchemy.Table(table_name, self.metadata, autoload=True, autoload_with=self.engine, schema=schema)
+        return self.metadata.tables[key]
+
+    def create(self, tables, rows=None):
+        """Create the tables concurrently and seed them.
+
+        Args:
+            tables (:obj:`list` of :py:class:`sqlalchemy.Table`): Tables to create, usually defined with
+                :py:meth:`table`.
+            rows (:obj:`dict`, optional): Rows to insert, as an iterable of dictionaries keyed by column name, per
+                table name, as for :py:func:`create_tables`. Default: ``None``
+
+        Returns:
+            The tables.
+        """
+        rows = rows or {}
+
+        def create_table(table):
+            _create_and_seed(self.engine, table, rows.get(table.fullname), self.chunk_size)
+            with self._lock:
+                self._created_tables.append(table)
+
+        _run_concurrently(create_table, tables, self.max_workers)
+        return tables
+
+    def create_table(self, table_name, *columns, schema=None, rows=None):
+        """Define, create and seed a single table and return it."""
+        table = self.table(table_name, *columns, schema=schema)
+        self.create([table], {table.fullname: rows} if rows is not None else None)
+        return table
+
+    def create_schema(self, schema_name):
+        """Create a schema, see :py:func:`create_schema`, and drop it on teardown."""
+        create_schema(self.engine, schema_name)
+        self._created_schemas.append(schema_name)
+        return schema_name
+
+    def drop_all(self):
+        """Drop all tables, then all schemas, created by this factory."""
+        if self._created_tables:
+            logger.info('Dropping tables %s in %s database ...',
+                        ', '.join(str(table) for table in self._created_tables), self.database.type)
+            # The tables are known to exist, so skip the per-table existence check of drop_all.
+            self.metadata.drop_all(self.engine, tables=self._created_tables, checkfirst=False)
+            self._created_tables = []
+        for schema_name in reversed(self._created_schemas):
+            drop_schema(self.engine, schema_name)
+        self._created_schemas = []
+
+
+def _create_and_seed(db_engine, table, rows, chunk_size):
+    logger.info('Creating table %s ...', table)
+    table.create(db_engine)
+    if rows is not None:
+        number_of_rows = bulk_insert(db_engine, table, rows, chunk_size)
+        logger.info('Inserted %s rows into table %s', number_of_rows, table)
+
+
+def _chunks(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _copy_rows(db_engine, table, rows, chunk_size):
+    preparer = db_engine.dialect.identifier_preparer
+    number_of_rows = 0
+    connection = db_engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for chunk in _chunks(rows, chunk_size):
+            columns = _chunk_columns(table, chunk)
+            if any(isinstance(row.get(column), bytes) for row in chunk for column in columns):
+                # Binary values have no plain CSV representation, let the driver bind them instead.
+                cursor.executemany(_insert_statement(preparer, table, columns, '%s'),
+                                   [[row.get(column) for column in columns] for row in chunk])
+            else:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows([_COPY_NULL if row.get(column) is None else row[column] for column in columns]
+                                 for row in chunk)
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {preparer.format_table(table)} "
+                                   f"({', '.join(preparer.quote(column) for column in columns)}) "
+                                   f"FROM STDIN WITH (FORMAT csv, NULL '{_COPY_NULL}')", buffer)
+            number_of_rows += len(chunk)
+        connection.commit()
+    finally:
+        connection.close()
+    return number_of_rows
+
+
+def _fast_executemany_rows(db_engine, table, rows, chunk_size):
+    preparer = db_engine.dialect.identifier_preparer
+    number_of_rows = 0
+    connection = db_engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.fast_executemany = True
+        for chunk in _chunks(rows, chunk_size):
+            columns = _chunk_columns(table, chunk)
+            cursor.executemany(_insert_statement(preparer, table, columns, '?'),
+                               [[row.get(column) for column in columns] for row in chunk])
+            number_of_rows += len(chunk)
+        connection.commit()
+    finally:
+        connection.close()
+    return number_of_rows
+
+
+def _chunk_columns(table, chunk):
+    """Columns of the table given in any row of the chunk, in table order; rows lacking one of them insert NULL."""
+    given = set().union(*chunk)
+    return [column.name for column in table.columns if column.name in given]
+
+
+def _insert_statement(preparer, table, columns, placeholder):
+    return (f"INSERT INTO {preparer.format_table(table)} ({', '.join(preparer.quote(column) for column in columns)}) "
+            f"VALUES ({', '.join([placeholder] * len(columns))})")
+
+
+def _run_concurrently(function, items, max_workers):
+    items = list(items)
+    if not items:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        # Calling result() re-raises the first failure in the calling thread.
+        for future in [executor.submit(function, item) for item in items]:
+            future.result()
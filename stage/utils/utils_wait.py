@@ -0,0 +1,157 @@
+# Copyright 2019 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Condition-based waiting, to be used instead of fixed sleeps.
+
+:py:func:`wait_until` polls a condition, starting with a short interval that grows geometrically up to a cap, so that
+fast conditions return almost immediately while slow ones (MapReduce jobs, Firehose buffering, ...) are not hammered.
+When the timeout expires, the error carries what was being waited for, how long and how often it was polled, the last
+value or exception the condition produced and, optionally, extra diagnostics collected at that moment.
+
+:py:func:`assert_holds_for` is its counterpart for negative checks, i.e. verifying that something does *not* happen
+during a period of time.
+"""
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class WaitTimeoutError(TimeoutError):
+    """Raised by :py:func:`wait_until` when the condition is not met in time."""
+
+
+def wait_until(condition, timeout_sec=60, description=None, poll_interval_sec=0.1, max_poll_interval_sec=5,
+               backoff_factor=1.5, diagnostics=None):
+    """Poll ``condition`` until it returns a truthy value and return that value.
+
+    Exceptions raised by the condition are logged and treated as a falsy result, so that e.g. a table that does not
+    exist yet can be polled like an empty one.
+
+    Args:
+        condition: Callable taking no arguments.
+        timeout_sec (:obj:`float`, optional): Time to wait for the condition. Default: ``60``
+        description (:obj:`str`, optional): What is being waited for, used in logs and in the timeout error.
+            Default: name of the condition
+        poll_interval_sec (:obj:`float`, optional): Interval before the second poll. Default: ``0.1``
+        max_poll_interval_sec (:obj:`float`, optional): Cap on the poll interval. Default: ``5``
+        backoff_factor (:obj:`float`, optional): Growth factor of the poll interval. Default: ``1.5``
+        diagnostics (optional): Callable taking no arguments, invoked on timeout; its result is included in the error.
+            Default: ``None``
+
+    Returns:
+        The first truthy value returned by ``condition``.
+
+    Raises:
+        :py:class:`WaitTimeoutError`: When the condition is still not met after ``timeout_sec``.
+    """
+    description = description or getattr(condition, '__name__', repr(condition))
+    logger.debug('Waiting up to %s seconds for %s ...', timeout_sec, description)
+    start_time = time.monotonic()
+    deadline = start_time + timeout_sec
+    attempts = 0
+    result = last_exception = None
+    while True:
+        attempts += 1
+        try:
+            result = condition()
+            last_exception = None
+        except Exception as exception:
+            logger.debug('Condition %s raised %r', description, exception)
+            result, last_exception = None, exception
+        if result:
+            logger.debug('Condition %s met after %.2f seconds (%s polls)',
+                         description, time.monotonic() - start_time, attempts)
+            return result
+
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        time.sleep(min(poll_interval_sec, deadline - now))
+        poll_interval_sec = min(poll_interval_sec * backoff_factor, max_poll_interval_sec)
+
+    message = [f'Timed out after {time.monotonic() - start_time:.1f} seconds ({attempts} polls) '
+               f'waiting for {description}.',
+               f'Last result: {result!r}']
+    if last_exception is not None:
+        message.append(f'Last exception: {last_exception!r}')
+    if diagnostics:
+        try:
+            message.append(f'Diagnostics: {diagnostics()}')
+        except Exception as exception:
+            message.append(f'Diagnostics could not be collected: {exception!r}')
+    raise WaitTimeoutError('\n'.join(message)) from last_exception
+
+
+def assert_holds_for(condition, duration_sec, description=None, poll_interval_sec=0.5):
+    """Assert that ``condition`` stays truthy for ``duration_sec``, failing as soon as it does not.
+
+    Args:
+        condition: Callable taking no arguments.
+        duration_sec (:obj:`float`): How long the condition has to hold.
+        description (:obj:`str`, optional): What is being checked, used in the assertion message.
+            Default: name of the condition
+        poll_interval_sec (:obj:`float`, optional): Interval between two checks. Default: ``0.5``
+    """
+    description = description or getattr(condition, '__name__', repr(condition))
+    start_time = time.monotonic()
+    deadline = start_time + duration_sec
+    while True:
+        result = condition()
+        assert result, (f'{description} stopped holding after {time.monotonic() - start_time:.1f} seconds '
+                        f'(last result: {result!r})')
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        time.sleep(min(poll_interval_sec, deadline - now))
+
+
+def get_pipeline_status(sdc_executor, pipeline):
+    return sdc_executor.get_pipeline_status(pipeline).response.json().get('status')
+
+
+def get_pipeline_counter(sdc_executor, pipeline, counter_name):
+    """Current value of a counter of a running pipeline, 0 if the counter does not exist (yet)."""
+    metrics = sdc_executor.api_client.get_pipeline_metrics(pipeline.id) or {}
+    return metrics.get('counters', {}).get(counter_name, {}).get('count', 0)
+
+
+def wait_for_pipeline_status(sdc_executor, pipeline, statuses, timeout_sec=60):
+    """Wait until the pipeline is in one of ``statuses``."""
+    statuses = [statuses] if isinstance(statuses, str) else statuses
+
+    def pipeline_in_status():
+        return get_pipeline_status(sdc_executor, pipeline) in statuses
+
+    wait_until(pipeline_in_status,
+               timeout_sec=timeout_sec,
+               description=f'pipeline {pipeline.id} to be in status {", ".join(statuses)}',
+               diagnostics=lambda: f'status is {get_pipeline_status(sdc_executor, pipeline)}')
+
+
+def wait_for_pipeline_counter(sdc_executor, pipeline, counter_name, count, timeout_sec=60):
+    """Wait until a counter of a running pipeline reached at least ``count``."""
+    def counter_reached():
+        return get_pipeline_counter(sdc_executor, pipeline, counter_name) >= count
+
+    def diagnostics():
+        return (f'{counter_name} is {get_pipeline_counter(sdc_executor, pipeline, counter_name)}, '
+                f'pipeline status is {get_pipeline_status(sdc_executor, pipeline)}')
+
+    wait_until(counter_reached,
+               timeout_sec=timeout_sec,
+               description=f'{counter_name} of pipeline {pipeline.id} to reach {count}',
+               diagnostics=diagnostics)
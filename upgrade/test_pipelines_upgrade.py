@@ -13,12 +13,20 @@
 # limitations under the License.
 """The tests in this module are used to test pipeline upgrades. Assumption is that there is only one SDC version
 provided for running the upgrade against.
+
+Every pipeline JSON file of the corpus is read and parsed once per session. The pipelines are imported into SDC
+concurrently by a module-scoped fixture, each test then only checks the import issues of its own pipeline, and the
+per-pipeline upgrade latencies are logged at the end of the module.
 """
 
-import glob
+import copy
+import functools
 import json
 import logging
-from os.path import dirname, join, realpath
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from os.path import dirname
 from pathlib import Path
 from uuid import uuid4
 
@@ -30,6 +38,32 @@ from streamsets.testframework.markers import upgrade
 logger = logging.getLogger(__name__)
 
 DIR_TO_READ = Path(f'{dirname(__file__)}/pipelines')
+# Number of pipelines imported into SDC at the same time.
+MAX_IMPORT_WORKERS = 8
+# Number of slowest pipelines listed in the latency report.
+SLOWEST_PIPELINES_TO_REPORT = 10
+
+# Outcome of importing one pipeline of the corpus.
+#   issues: the pipeline's issues as reported by SDC after the import, None if the import failed.
+#   error: the exception raised by the import, if any.
+#   latency_sec: time taken by the import, which is where SDC runs the stage upgraders, plus the export.
+UpgradeResult = namedtuple('UpgradeResult', ['issues', 'error', 'latency_sec'])
+
+
+@functools.lru_cache(maxsize=None)
+def load_pipeline_corpus():
+    """Parse every pipeline JSON file under DIR_TO_READ once and return them as path -> exported pipeline."""
+    corpus = OrderedDict()
+    for pipeline_file in sorted(DIR_TO_READ.glob('**/*.json')):
+        with open(pipeline_file) as f:
+            corpus[str(pipeline_file)] = json.load(f)
+    logger.info('Loaded %s pipeline JSON files from %s', len(corpus), DIR_TO_READ)
+    return corpus
+
+
+def _pipeline_from_corpus(pipeline_full_path):
+    # Pipeline objects get modified (e.g. their id), so every user gets its own copy of the cached JSON.
+    return sdc_models.Pipeline(copy.deepcopy(load_pipeline_corpus()[pipeline_full_path]))
 
 
 @pytest.fixture(scope='module')
@@ -39,37 +73,63 @@ def sdc_builder_hook(args):
     def hook(data_collector):
         if not args.run_sdc_upgrade_tests:
             logger.info(f'Configuring SDC for pipeline JSON files of {DIR_TO_READ} ...')
-            for pipeline_file in DIR_TO_READ.glob('**/*.json'):
-                logger.debug(f'Configuring SDC for pipeline {pipeline_file}')
-                with open(pipeline_file) as f:
-                    exported_pipeline = json.loads(f.read())
-                pipeline = sdc_models.Pipeline(exported_pipeline)
-                data_collector.configure_for_pipeline(pipeline)
+            for pipeline_full_path in load_pipeline_corpus():
+                logger.debug(f'Configuring SDC for pipeline {pipeline_full_path}')
+                data_collector.configure_for_pipeline(_pipeline_from_corpus(pipeline_full_path))
         else:
             pytest.skip('Test only runs for one given SDC version.')
     return hook
 
 
+@pytest.fixture(scope='module')
+def upgrade_results(request, sdc_builder):
+    """Import the pipelines of the selected tests concurrently and return their :py:class:`UpgradeResult` by path.
+
+    Only the tests left after selection (e.g. with ``-k``) are in the session's items, so that running a few of them
+    does not import the whole corpus.
+    """
+    def import_pipeline(pipeline_full_path):
+        pipeline = _pipeline_from_corpus(pipeline_full_path)
+        pipeline.id = str(uuid4())
+        logger.debug('Using pipeline id %s for file %s', pipeline.id, pipeline_full_path)
+        start_time = time.perf_counter()
+        try:
+            sdc_builder.add_pipeline(pipeline)
+            issues = sdc_builder.api_client.export_pipeline(pipeline.id)['pipelineConfig']['issues']
+        except Exception as e:
+            return UpgradeResult(issues=None, error=e, latency_sec=time.perf_counter() - start_time)
+        return UpgradeResult(issues=issues, error=None, latency_sec=time.perf_counter() - start_time)
+
+    pipeline_full_paths = list(dict.fromkeys(item.callspec.params['pipeline_full_path']
+                                             for item in request.session.items
+                                             if item.module is request.module and hasattr(item, 'callspec')
+                                             and 'pipeline_full_path' in item.callspec.params))
+    logger.info('Importing %s pipelines with %s workers ...', len(pipeline_full_paths), MAX_IMPORT_WORKERS)
+    with ThreadPoolExecutor(max_workers=MAX_IMPORT_WORKERS) as executor:
+        results = dict(zip(pipeline_full_paths, executor.map(import_pipeline, pipeline_full_paths)))
+    yield results
+
+    latencies = sorted(((result.latency_sec, path) for path, result in results.items()), reverse=True)
+    logger.info('Pipeline upgrade latency: %s pipelines, %.2f s in total, slowest:\n%s',
+                len(latencies), sum(latency for latency, _ in latencies),
+                '\n'.join(f'{latency:8.3f} s  {path}' for latency, path in latencies[:SLOWEST_PIPELINES_TO_REPORT]))
+
+
 @upgrade
-def test_pipeline_upgrade(sdc_builder, pipeline_full_path):
+def test_pipeline_upgrade(upgrade_results, pipeline_full_path):
     """Test pipeline upgrades by importing JSON files against a given SDC version and asserting that they
     have no pipeline import issues."""
-    logger.info('Importing and checking pipeline JSON file %s', pipeline_full_path)
-    uuid = str(uuid4())
-    logger.debug('Using pipeline id %s for file %s', uuid, pipeline_full_path)
-    with open(pipeline_full_path) as f:
-        exported_pipeline = json.loads(f.read())
-    pipeline = sdc_models.Pipeline(exported_pipeline)
-    pipeline.id = uuid
-    sdc_builder.add_pipeline(pipeline)
-    issues = sdc_builder.api_client.export_pipeline(pipeline.id)['pipelineConfig']['issues']
-    if issues['issueCount']:
-        pytest.fail(json.dumps(issues, indent=4, default=pipeline_json_encoder))
+    logger.info('Checking pipeline JSON file %s', pipeline_full_path)
+    result = upgrade_results[pipeline_full_path]
+    logger.info('Pipeline upgrade of %s took %.3f s', pipeline_full_path, result.latency_sec)
+    if result.error:
+        raise result.error
+    if result.issues['issueCount']:
+        pytest.fail(json.dumps(result.issues, indent=4, default=pipeline_json_encoder))
 
 
 # pytest_generate_tests helps to parametrize pipelines which we will read from disk.
 # More about pytest parametrization at http://doc.pytest.org/en/latest/parametrize.html
 def pytest_generate_tests(metafunc):
-    pipelines = glob.iglob(join(dirname(realpath(__file__)), DIR_TO_READ, '**', '*.json'),
-                           recursive=True)
-    metafunc.parametrize('pipeline_full_path', pipelines)
+    if 'pipeline_full_path' in metafunc.fixturenames:
+        metafunc.parametrize('pipeline_full_path', list(load_pipeline_corpus()))